@@ -0,0 +1,124 @@
+"""
+One-time database preparation before the API starts serving.
+
+Run by ``entrypoint.sh`` (``python -m app.bootstrap``) and by the gunicorn
+master before it forks workers. The work is done under the "startup"
+process lock, so several containers starting at once still initialize or
+migrate the database exactly once; the others wait and then find it ready.
+
+A new database is created from the models, given its default store and
+stamped with the latest Alembic revision. A database created before migrations existed is stamped
+with the baseline revision and then upgraded like any other.
+"""
+import logging
+import os
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import Base, engine
+from .models import Store, User
+from .models.store import DEFAULT_STORE_NAME
+from .models.user import UserRole
+from .utils.locks import process_lock
+from .utils.security import get_password_hash
+
+logger = logging.getLogger(__name__)
+
+STARTUP_LOCK = "startup"
+BASELINE_REVISION = "0001"
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def alembic_config(connection: Optional[Connection] = None) -> Config:
+    """Alembic configuration, optionally bound to an open connection"""
+    config = Config(ALEMBIC_INI)
+    # Keep the application's logging setup when run from the server
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def migrate(bind: Engine) -> bool:
+    """
+    Bring the schema to the latest revision.
+
+    Returns:
+        True if the database was empty and the schema was created
+    """
+    tables = inspect(bind).get_table_names()
+    with bind.connect() as connection:
+        config = alembic_config(connection)
+        if "users" not in tables:
+            Base.metadata.create_all(bind=connection)
+            # Gets id 1, the store_id default (migration 0006 does the same on upgrade)
+            connection.execute(Store.__table__.insert().values(name=DEFAULT_STORE_NAME))
+            connection.commit()
+            command.stamp(config, "head")
+            return True
+
+        if "alembic_version" not in tables:
+            logger.info("ℹ️ Database predates migrations, stamping baseline revision")
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
+        return False
+
+
+def seed_default_users(db: Session):
+    """Create the default admin and technician accounts"""
+    db.add_all([
+        User(username="admin", hashed_password=get_password_hash("admin123"), role=UserRole.ADMIN),
+        User(username="tech", hashed_password=get_password_hash("tech123"), role=UserRole.TECHNICIAN),
+    ])
+    db.commit()
+
+
+def prepare_database(bind: Optional[Engine] = None) -> bool:
+    """
+    Create or migrate the schema and seed a fresh database, once across processes.
+
+    Args:
+        bind: Engine to prepare (defaults to the application engine)
+
+    Returns:
+        True if the database was empty and has been initialized
+    """
+    bind = bind or engine
+    with process_lock(STARTUP_LOCK, bind=bind):
+        initialized = migrate(bind)
+
+        with Session(bind) as db:
+            if db.query(User.id).first() is None:
+                seed_default_users(db)
+                initialized = True
+
+    # The gunicorn master forks workers after this; never hand them its connections
+    bind.dispose()
+
+    if initialized:
+        logger.info("✅ Database initialized (admin/admin123, tech/tech123)")
+    else:
+        logger.info("✅ Database already initialized")
+    return initialized
+
+
+def worker_count() -> int:
+    """Number of server processes: WEB_CONCURRENCY, or one per available CPU"""
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    try:
+        # Respects CPU affinity / container cpusets where available
+        return max(len(os.sched_getaffinity(0)), 1)
+    except AttributeError:
+        return max(os.cpu_count() or 1, 1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    prepare_database()
@@ -6,11 +6,99 @@ class Settings(BaseSettings):
     """Application settings loaded from environment variables"""
     
     DATABASE_URL: str = "sqlite:///./mobilepos.db"
+    DATABASE_READ_URL: str = ""  # Optional read replica for dashboards, reports and listings
+    DATABASE_READ_MAX_LAG_SECONDS: float = 5.0  # Fall back to the primary beyond this lag
+    DATABASE_READ_CHECK_SECONDS: float = 5.0  # How often each worker re-checks the replica
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
     
+    # Production server (gunicorn.conf.py); 0 = one worker per available CPU
+    WEB_CONCURRENCY: int = 0
+    
+    # Current exchange rate cache, per server worker
+    EXCHANGE_RATE_CACHE_SECONDS: int = 60
+    
+    # Archival job (python -m app.services.archive): settled tickets and
+    # work orders older than this move to the archive tables
+    ARCHIVE_AFTER_MONTHS: int = 12
+    ARCHIVE_BATCH_SIZE: int = 1000
+    
+    # WhatsApp/SMS transport (Twilio REST API over pooled async HTTP), per server worker
+    NOTIFICATION_API_URL: str = "https://api.twilio.com"  # Point to a fake provider for local runs
+    NOTIFICATION_TIMEOUT_SECONDS: float = 10.0
+    NOTIFICATION_CONCURRENCY: int = 10  # Requests in flight (and pooled connections)
+    NOTIFICATION_RATE_PER_SECOND: float = 5.0  # 0 = unlimited
+    
+    # Warranty of delivered repairs and the reminder sent before it expires
+    WARRANTY_DAYS: int = 8
+    WARRANTY_REMINDER_DAYS_BEFORE: int = 2
+    WARRANTY_REMINDERS_ENABLED: bool = False  # In-process scheduler, in every worker
+    WARRANTY_REMINDER_INTERVAL_MINUTES: int = 60
+    WARRANTY_REMINDER_BATCH_SIZE: int = 50
+    
+    # Google Sheets export of tickets and work orders (python -m app.services.sheets_sync)
+    GOOGLE_SHEET_ID: str = ""
+    GOOGLE_SERVICE_ACCOUNT_JSON: str = ""  # Path to the service account key file
+    SHEETS_SYNC_ENABLED: bool = False  # In-process scheduler, in every worker
+    SHEETS_SYNC_INTERVAL_MINUTES: int = 15
+    SHEETS_SYNC_BATCH_SIZE: int = 500  # Rows per Sheets API call
+    SHEETS_SYNC_SETTLE_SECONDS: int = 60  # Only export changes older than this (commits still in flight)
+    SHEETS_SYNC_MAX_RETRIES: int = 5  # Retries of a call hitting the API quota, with exponential backoff
+    
+    # Online backups (python -m app.services.backups): snapshots kept in BACKUP_DIR
+    BACKUP_DIR: str = "backups"
+    BACKUP_KEEP: int = 7  # Newest snapshots kept, older ones are deleted
+    BACKUP_ENABLED: bool = False  # In-process scheduler, in every worker
+    BACKUP_INTERVAL_HOURS: int = 24
+    BACKUP_PAGES_PER_STEP: int = 256  # SQLite pages copied per lock, writers commit in between
+    BACKUP_STEP_PAUSE_SECONDS: float = 0.01
+    BACKUP_MAX_RESTARTS: int = 3  # SQLite copies restarted by writes before copying in one step
+    BACKUP_ADMINS: str = ""  # Usernames allowed to use /api/backups (comma-separated); empty disables it
+    
+    # Audit log, buffered per server worker and written in batches
+    AUDIT_QUEUE_SIZE: int = 10000  # Entries beyond this go straight to the fallback file
+    AUDIT_BATCH_SIZE: int = 200  # Entries per insert
+    AUDIT_FLUSH_SECONDS: float = 1.0  # Longest wait before a partial batch is written
+    AUDIT_FALLBACK_PATH: str = "audit_fallback.jsonl"  # Entries that could not be written, inserted on start
+    
+    # Country calling code given to customer phones typed without one (Venezuela)
+    DEFAULT_PHONE_COUNTRY_CODE: str = "58"
+    
+    # Versioned product/part catalog for terminals (GET /api/catalog), in memory per server worker
+    CATALOG_MAX_DELTA_VERSIONS: int = 10000  # Terminals further behind get a full snapshot
+    CATALOG_SCAN_REFRESH_SECONDS: float = 1.0  # Longest a scan trusts the snapshot without reading the version
+    
+    # Dashboard counters cache, per server worker and store (0 disables it)
+    DASHBOARD_CACHE_SECONDS: int = 15
+    
+    # Per-client rate limiting (token bucket keyed by JWT subject, or IP without a token)
+    RATE_LIMIT_ENABLED: bool = False
+    # "memory" (per worker) or "database" (shared by every worker, one write per request)
+    RATE_LIMIT_STORE: str = "memory"
+    RATE_LIMIT_CAPACITY: float = 60  # Burst size, in tokens
+    RATE_LIMIT_REFILL_PER_SECOND: float = 20  # Sustained rate, in tokens per second
+    RATE_LIMIT_DEFAULT_COST: float = 1  # Tokens taken by a request to any other route
+    RATE_LIMIT_ROUTE_COSTS: str = (
+        "/api/reports=10,/api/analytics=10,/api/dashboard=2,/api/repairs/dashboard=2,"
+        "/api/sync=5,POST /api/auth/login=5,POST /api/backups=30"
+    )
+    
+    # Response compression (gzip always; br/zstd when brotli/zstandard are installed)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes
+    COMPRESSION_CONTENT_TYPES: str = "application/json,application/javascript,application/xml,image/svg+xml,text/"
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    
+    # Uploaded product/part images
+    UPLOAD_DIR: str = "uploads"
+    IMAGE_MAX_UPLOAD_BYTES: int = 5 * 1024 * 1024  # 5 MB
+    IMAGE_THUMBNAIL_SIZES: str = "128,256,512"  # longest edge in pixels
+    IMAGE_WORKERS: int = 2  # thumbnail rendering processes
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -20,6 +108,21 @@ class Settings(BaseSettings):
     def cors_origins_list(self) -> List[str]:
         """Convert CORS_ORIGINS string to list"""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
+    
+    @property
+    def compression_content_types_list(self) -> List[str]:
+        """Convert COMPRESSION_CONTENT_TYPES string to list"""
+        return [content_type.strip() for content_type in self.COMPRESSION_CONTENT_TYPES.split(",") if content_type.strip()]
+    
+    @property
+    def backup_admins_list(self) -> List[str]:
+        """Convert BACKUP_ADMINS string to list of (lowercase) usernames"""
+        return [username.strip().lower() for username in self.BACKUP_ADMINS.split(",") if username.strip()]
+    
+    @property
+    def image_thumbnail_sizes_list(self) -> List[int]:
+        """Convert IMAGE_THUMBNAIL_SIZES string to list of ints"""
+        return [int(size) for size in self.IMAGE_THUMBNAIL_SIZES.split(",") if size.strip()]
 
 
 settings = Settings()
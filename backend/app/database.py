@@ -1,18 +1,114 @@
-from sqlalchemy import create_engine
+import logging
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
+
+def _create_engine(url: str, **kwargs) -> Engine:
+    # For SQLite, we need to add check_same_thread=False to allow usage across threads
+    return create_engine(
+        url,
+        connect_args={"check_same_thread": False} if "sqlite" in url else {},
+        **kwargs
+    )
+
+
 # Create SQLAlchemy engine
-# For SQLite, we need to add check_same_thread=False to allow usage across threads
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+engine = _create_engine(settings.DATABASE_URL)
 
 # Create SessionLocal class for database sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional read replica for heavy read-only endpoints (see get_read_db)
+# (pre-ping so connections broken by a replica restart are replaced, not used)
+read_engine = (
+    _create_engine(settings.DATABASE_READ_URL, pool_pre_ping=True) if settings.DATABASE_READ_URL else None
+)
+ReadSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine is not None else None
+)
+
+
+class ReplicaMonitor:
+    """
+    Tracks whether the read replica is reachable and caught up.
+    
+    The replica is probed at most once per ``check_interval`` seconds per
+    process; between probes the last verdict is reused.
+    """
+    
+    # Seconds behind the primary; 0 when every received WAL record is replayed
+    # (an idle primary must not look like a lagging replica)
+    LAG_QUERY = text(
+        "SELECT CASE "
+        "WHEN NOT pg_is_in_recovery() THEN 0 "
+        "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )
+    
+    def __init__(self, replica: Engine, max_lag_seconds: float, check_interval: float):
+        self.replica = replica
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._available = False
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def lag_seconds(self) -> float:
+        """Measure replication lag, raising if the replica cannot be reached"""
+        with self.replica.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                conn.execute(text("SELECT 1"))
+                return 0.0
+            return float(conn.execute(self.LAG_QUERY).scalar() or 0)
+    
+    def available(self) -> bool:
+        """Whether reads may currently be sent to the replica"""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return self._available
+        
+        with self._lock:
+            # Another thread may have probed while we waited
+            if self._checked_at is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._available
+            try:
+                lag = self.lag_seconds()
+                available = lag <= self.max_lag_seconds
+                if not available:
+                    logger.warning(f"⚠️ Read replica {lag:.1f}s behind, reading from primary")
+            except SQLAlchemyError as e:
+                logger.warning(f"⚠️ Read replica unavailable, reading from primary: {e}")
+                available = False
+            self._available = available
+            self._checked_at = time.monotonic()
+            return available
+    
+    def mark_down(self):
+        """Stop using the replica until the next probe"""
+        with self._lock:
+            self._available = False
+            self._checked_at = time.monotonic()
+
+
+replica_monitor = (
+    ReplicaMonitor(
+        read_engine,
+        max_lag_seconds=settings.DATABASE_READ_MAX_LAG_SECONDS,
+        check_interval=settings.DATABASE_READ_CHECK_SECONDS
+    )
+    if read_engine is not None else None
+)
+
 # Create Base class for declarative models
 Base = declarative_base()
 
@@ -27,3 +123,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_engine() -> Engine:
+    """
+    Dependency function to get the database engine, for work on the
+    whole database that needs no session (e.g. backups).
+    """
+    return engine
@@ -1,6 +1,16 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
+from .middleware import (
+    CompressionMiddleware, RateLimitMiddleware, UploadLimitMiddleware, create_bucket_store, parse_route_costs
+)
+from .services import audit_log, image_store, notification_service
+from .services.backups import scheduled_backup
+from .services.sheets_sync import sync_to_sheets
+from .services.warranty import send_warranty_reminders
+from .utils.scheduler import PeriodicJob
+from .utils.static import ImmutableStaticFiles
 from .routers import (
     auth_router,
     products_router,
@@ -8,18 +18,69 @@ from .routers import (
     work_orders_router,
     parts_router,
     dashboard_router,
-    users_router
+    users_router,
+    sync_router,
+    exchange_rates_router,
+    reports_router,
+    stores_router,
+    analytics_router,
+    customers_router,
+    backups_router,
+    audit_router,
+    catalog_router,
+    scan_router
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background services with the application"""
+    audit_log.start()
+    jobs = []
+    if settings.WARRANTY_REMINDERS_ENABLED:
+        jobs.append(PeriodicJob(
+            "warranty-reminders", settings.WARRANTY_REMINDER_INTERVAL_MINUTES * 60, send_warranty_reminders
+        ).start())
+    if settings.BACKUP_ENABLED:
+        # Ticks more often than the interval; scheduled_backup skips while a recent snapshot exists
+        jobs.append(PeriodicJob(
+            "backups", min(settings.BACKUP_INTERVAL_HOURS * 3600, 3600), scheduled_backup
+        ).start())
+    if settings.SHEETS_SYNC_ENABLED:
+        jobs.append(PeriodicJob(
+            "sheets-sync", settings.SHEETS_SYNC_INTERVAL_MINUTES * 60, sync_to_sheets
+        ).start())
+    yield
+    for job in jobs:
+        job.stop()
+    audit_log.stop()
+    notification_service.shutdown()
+    image_store.shutdown()
+
+
 # Create FastAPI application
 app = FastAPI(
     title="ServiceFlow API",
     description="Backend API for ServiceFlow Management System",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
+# Rate limit per client; added before CORS so 429 responses carry CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        store=create_bucket_store(settings.RATE_LIMIT_STORE),
+        capacity=settings.RATE_LIMIT_CAPACITY,
+        refill_per_second=settings.RATE_LIMIT_REFILL_PER_SECOND,
+        route_costs=parse_route_costs(settings.RATE_LIMIT_ROUTE_COSTS),
+        default_cost=settings.RATE_LIMIT_DEFAULT_COST,
+    )
+
+# Refuse oversized image uploads before Starlette spools their body
+app.add_middleware(UploadLimitMiddleware, max_bytes=settings.IMAGE_MAX_UPLOAD_BYTES)
+
 # Configure CORS - Allow all origins for development
 app.add_middleware(
     CORSMiddleware,
@@ -35,6 +96,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON listings; images and streamed exports are skipped
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        content_types=settings.compression_content_types_list,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+    )
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(products_router)
@@ -43,6 +115,23 @@ app.include_router(work_orders_router)
 app.include_router(parts_router)
 app.include_router(dashboard_router)
 app.include_router(users_router)
+app.include_router(sync_router)
+app.include_router(exchange_rates_router)
+app.include_router(reports_router)
+app.include_router(stores_router)
+app.include_router(analytics_router)
+app.include_router(customers_router)
+app.include_router(backups_router)
+app.include_router(audit_router)
+app.include_router(catalog_router)
+app.include_router(scan_router)
+
+# Uploaded images are content-addressed, so they are served as immutable
+app.mount(
+    "/uploads",
+    ImmutableStaticFiles(directory=settings.UPLOAD_DIR, check_dir=False),
+    name="uploads"
+)
 
 
 @app.get("/")
@@ -0,0 +1,9 @@
+# Import all middleware here for easier imports
+from .compression import CompressionMiddleware
+from .rate_limit import RateLimitMiddleware, create_bucket_store, parse_route_costs
+from .upload_limit import UploadLimitMiddleware
+
+__all__ = [
+    "CompressionMiddleware", "RateLimitMiddleware", "create_bucket_store", "parse_route_costs",
+    "UploadLimitMiddleware"
+]
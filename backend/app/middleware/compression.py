@@ -0,0 +1,192 @@
+"""
+Response compression middleware.
+
+Compresses buffered responses with gzip, or with Brotli / Zstandard when the
+optional ``brotli`` / ``zstandard`` packages are installed and the client
+accepts them. Only allowlisted content types above a minimum size are
+compressed; images, already-encoded bodies and streamed responses (exports)
+pass through untouched.
+"""
+import gzip
+import logging
+from typing import Callable, Dict, Iterable, Optional, Sequence
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+DEFAULT_CONTENT_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+# Bodies above this size are compressed in a worker thread so a multi-MB
+# listing does not stall the event loop for every other request
+THREADED_COMPRESSION_SIZE = 256 * 1024
+
+
+def _compressors(gzip_level: int, brotli_quality: int, zstd_level: int) -> Dict[str, Callable[[bytes], bytes]]:
+    """Build the compressor for every encoding available in this process"""
+    available = {
+        "gzip": lambda body: gzip.compress(body, compresslevel=gzip_level, mtime=0),
+    }
+    if brotli is not None:
+        available["br"] = lambda body: brotli.compress(body, quality=brotli_quality)
+    if zstandard is not None:
+        available["zstd"] = lambda body: zstandard.ZstdCompressor(level=zstd_level).compress(body)
+    return available
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Parse an Accept-Encoding header into ``{coding: q}``.
+
+    Args:
+        header: Raw header value, e.g. ``"gzip, br;q=0.9, *;q=0"``
+
+    Returns:
+        Mapping of lower-cased content codings to their quality values
+    """
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+class CompressionMiddleware:
+    """ASGI middleware that negotiates and applies response compression"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: Iterable[str] = DEFAULT_CONTENT_TYPES,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+        preferred_encodings: Sequence[str] = ("br", "zstd", "gzip"),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_type.strip().lower() for content_type in content_types)
+        self.compressors = _compressors(gzip_level, brotli_quality, zstd_level)
+        self.preferred_encodings = [name for name in preferred_encodings if name in self.compressors]
+        logger.info(f"🗜️ Response compression enabled: {', '.join(self.preferred_encodings)}")
+
+    def select_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Pick the preferred server encoding the client accepts, if any"""
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        for name in self.preferred_encodings:
+            if accepted.get(name, wildcard) > 0:
+                return name
+        return None
+
+    def is_compressible(self, content_type: str) -> bool:
+        content_type = content_type.split(";")[0].strip().lower()
+        return any(
+            content_type.startswith(allowed) if allowed.endswith("/") else content_type == allowed
+            for allowed in self.content_types
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-request send wrapper that decides whether to compress the body"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Hold the headers back until the first body chunk shows
+            # whether the response is buffered or streamed
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.start_message is None:
+            await self.downstream(message)
+            return
+
+        if self.passthrough:
+            await self.downstream(message)
+            return
+
+        start, self.start_message = self.start_message, None
+        headers = MutableHeaders(scope=start)
+        body = message.get("body", b"")
+        compressible = self.middleware.is_compressible(headers.get("content-type", ""))
+        if compressible:
+            headers.add_vary_header("Accept-Encoding")
+
+        if (
+            not compressible
+            or "content-encoding" in headers
+            or message.get("more_body", False)
+            or len(body) < self.middleware.minimum_size
+        ):
+            # Images, pre-encoded bodies, streamed exports and small payloads
+            self.passthrough = True
+            await self.downstream(start)
+            await self.downstream(message)
+            return
+
+        compress = self.middleware.compressors[self.encoding]
+        if len(body) >= THREADED_COMPRESSION_SIZE:
+            compressed = await anyio.to_thread.run_sync(compress, body)
+        else:
+            compressed = compress(body)
+
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # The encoded representation is no longer byte-identical
+            headers["ETag"] = f"W/{etag}"
+
+        await self.downstream(start)
+        await self.downstream({"type": "http.response.body", "body": compressed})
@@ -0,0 +1,252 @@
+"""
+Token-bucket rate limiting middleware.
+
+Every client has a bucket of ``capacity`` tokens refilled at
+``refill_per_second``; a request takes its route's cost (reports and
+analytics cost more than plain reads) and is answered ``429`` with a
+``Retry-After`` header when the bucket does not hold enough. Clients are
+keyed by the JWT subject, so terminals behind one NAT do not share a
+bucket, and by client IP when there is no valid token (e.g. login
+attempts). Behind a reverse proxy, list it in ``FORWARDED_ALLOW_IPS`` so
+uvicorn takes the client IP from ``X-Forwarded-For`` instead of the proxy's.
+
+Buckets live in a pluggable store:
+
+- ``MemoryBucketStore``: per process. With several workers each one has its
+  own buckets, so a client gets up to ``workers`` times the limit.
+- ``DatabaseBucketStore``: one row per client, updated by a single atomic
+  upsert, so every worker and host shares the same buckets. SQLite works
+  as a local stand-in for PostgreSQL.
+
+A failing store lets requests through rather than taking the API down.
+"""
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import anyio
+from sqlalchemy import case, delete, func
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..models.rate_limit_bucket import RateLimitBucket
+from ..utils.security import verify_token
+
+logger = logging.getLogger(__name__)
+
+# Never limited: health checks, API docs and uploaded images
+DEFAULT_EXEMPT_PATHS = ("/health", "/docs", "/redoc", "/openapi.json", "/uploads/")
+
+# Idle buckets are dropped at most this often
+PRUNE_INTERVAL_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class RouteCost:
+    """Tokens taken by requests to paths under ``prefix`` (with ``method``, if set)"""
+    prefix: str
+    cost: float
+    method: Optional[str] = None
+
+
+def parse_route_costs(spec: str) -> List[RouteCost]:
+    """
+    Parse route costs written as ``"[METHOD ]prefix=cost"`` separated by commas.
+
+    Example: ``"/api/reports=10,POST /api/backups=30"``
+    """
+    costs = []
+    for item in spec.split(","):
+        route, _, cost = item.strip().rpartition("=")
+        if not route:
+            continue
+        method, _, prefix = route.strip().rpartition(" ")
+        costs.append(RouteCost(prefix=prefix, cost=float(cost), method=method.upper() or None))
+    return costs
+
+
+def client_key(scope: Scope) -> str:
+    """Bucket key of a request: its JWT subject, or its client IP"""
+    authorization = Headers(scope=scope).get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        payload = verify_token(token)
+        if payload and payload.get("sub"):
+            return f"user:{payload['sub']}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class MemoryBucketStore:
+    """Buckets in the memory of one process"""
+
+    blocking = False
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+        self._pruned_at = clock()
+
+    def take(self, key: str, cost: float, capacity: float, refill_per_second: float) -> float:
+        """
+        Take ``cost`` tokens from a bucket.
+
+        Returns:
+            0 if the request may proceed, otherwise seconds until it would
+        """
+        now = self._clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+            granted = tokens >= cost
+            self._buckets[key] = (tokens - cost if granted else tokens, now)
+            if now - self._pruned_at >= PRUNE_INTERVAL_SECONDS:
+                self._prune(now, capacity, refill_per_second)
+        return 0.0 if granted else (cost - tokens) / refill_per_second
+
+    def _prune(self, now: float, capacity: float, refill_per_second: float):
+        # A bucket idle long enough to be full again is the same as no bucket
+        self._buckets = {
+            key: (tokens, updated_at) for key, (tokens, updated_at) in self._buckets.items()
+            if tokens + (now - updated_at) * refill_per_second < capacity
+        }
+        self._pruned_at = now
+
+
+class DatabaseBucketStore:
+    """Buckets in the ``rate_limit_buckets`` table, shared by every process"""
+
+    blocking = True
+
+    def __init__(self, bind: Optional[Engine] = None, clock: Callable[[], float] = time.time):
+        if bind is None:
+            from ..database import engine as bind
+        if bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+            self._least = func.least
+        elif bind.dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+            self._least = func.min
+        else:
+            raise ValueError(f"Database rate limit buckets are not supported for {bind.dialect.name}")
+        self._insert = insert
+        self.bind = bind
+        self._clock = clock
+        self._pruned_at = clock()
+        self._prune_lock = threading.Lock()
+
+    def take(self, key: str, cost: float, capacity: float, refill_per_second: float) -> float:
+        """
+        Take ``cost`` tokens from a bucket with one atomic upsert.
+
+        Returns:
+            0 if the request may proceed, otherwise seconds until it would
+        """
+        now = self._clock()
+        bucket = RateLimitBucket.__table__
+        refilled = self._least(capacity, bucket.c.tokens + (now - bucket.c.updated_at) * refill_per_second)
+        granted = refilled >= cost
+        statement = (
+            self._insert(bucket)
+            .values(key=key, tokens=capacity - cost, updated_at=now, granted=True)
+            .on_conflict_do_update(
+                index_elements=[bucket.c.key],
+                set_={
+                    "tokens": case((granted, refilled - cost), else_=refilled),
+                    "updated_at": now,
+                    "granted": granted,
+                },
+            )
+            .returning(bucket.c.tokens, bucket.c.granted)
+        )
+        with self.bind.begin() as conn:
+            tokens, was_granted = conn.execute(statement).one()
+        self._maybe_prune(now, capacity, refill_per_second)
+        return 0.0 if was_granted else (cost - tokens) / refill_per_second
+
+    def _maybe_prune(self, now: float, capacity: float, refill_per_second: float):
+        if now - self._pruned_at < PRUNE_INTERVAL_SECONDS or not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            self._pruned_at = now
+            bucket = RateLimitBucket.__table__
+            with self.bind.begin() as conn:
+                # Long enough idle for any bucket to be full again
+                conn.execute(delete(bucket).where(bucket.c.updated_at < now - capacity / refill_per_second))
+        finally:
+            self._prune_lock.release()
+
+
+def create_bucket_store(name: str):
+    """Bucket store named by RATE_LIMIT_STORE"""
+    if name == "memory":
+        return MemoryBucketStore()
+    if name == "database":
+        return DatabaseBucketStore()
+    raise ValueError(f"Unknown rate limit store {name!r} (expected 'memory' or 'database')")
+
+
+class RateLimitMiddleware:
+    """Answer ``429`` to clients whose token bucket cannot pay for the request"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store,
+        capacity: float = 60,
+        refill_per_second: float = 20,
+        route_costs: Sequence[RouteCost] = (),
+        default_cost: float = 1,
+        exempt_paths: Sequence[str] = DEFAULT_EXEMPT_PATHS,
+    ):
+        self.app = app
+        self.store = store
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        # Longest prefix first, so the most specific route wins
+        self.route_costs = sorted(route_costs, key=lambda route: (len(route.prefix), route.method is not None),
+                                  reverse=True)
+        self.default_cost = default_cost
+        self.exempt_paths = tuple(exempt_paths)
+
+    def cost(self, method: str, path: str) -> float:
+        """Tokens a request takes, at most the bucket capacity"""
+        for route in self.route_costs:
+            if path.startswith(route.prefix) and route.method in (None, method):
+                return min(route.cost, self.capacity)
+        return min(self.default_cost, self.capacity)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        key = client_key(scope)
+        cost = self.cost(scope["method"], scope["path"])
+        try:
+            if self.store.blocking:
+                wait = await anyio.to_thread.run_sync(
+                    self.store.take, key, cost, self.capacity, self.refill_per_second
+                )
+            else:
+                wait = self.store.take(key, cost, self.capacity, self.refill_per_second)
+        except Exception:
+            logger.exception("❌ Rate limit store failed, letting the request through")
+            wait = 0.0
+
+        if wait > 0:
+            logger.debug(f"Rate limit exceeded by {key} on {scope['method']} {scope['path']}")
+            response = JSONResponse(
+                {"detail": "Too many requests, slow down"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
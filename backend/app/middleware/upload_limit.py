@@ -0,0 +1,66 @@
+"""
+Request body limit for image uploads.
+
+Starlette reads a multipart body (spooling it to a temporary file) before the
+endpoint runs, so the image store's own size check only sees an oversized
+photo after it has been fully received and written. This middleware stops
+such uploads at the door with ``413``: before reading anything when the
+declared ``Content-Length`` is over the limit, and as soon as the bytes
+received go over it for bodies sent without one (chunked).
+
+The limit covers the whole body, so it allows ``MULTIPART_OVERHEAD_BYTES``
+on top of the file for the multipart boundaries and part headers; the image
+store still enforces the exact file size.
+"""
+import re
+from typing import Pattern
+
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Boundaries and part headers around the file
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+# Image upload endpoints of products and parts
+DEFAULT_UPLOAD_PATHS = re.compile(r"^/api/(products|parts)/[^/]+/image$")
+
+
+class UploadLimitMiddleware:
+    """Answer ``413`` to image uploads larger than the limit without receiving them whole"""
+
+    def __init__(self, app: ASGIApp, max_bytes: int, paths: Pattern = DEFAULT_UPLOAD_PATHS):
+        self.app = app
+        self.max_body_bytes = max_bytes + MULTIPART_OVERHEAD_BYTES
+        self.paths = paths
+        self.detail = f"Image exceeds the maximum size of {max_bytes // (1024 * 1024)} MB"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not self.paths.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        length = Headers(scope=scope).get("content-length", "")
+        if length.isdigit() and int(length) > self.max_body_bytes:
+            response = JSONResponse(
+                {"detail": self.detail},
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                headers={"Connection": "close"},
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # Raised while the form is parsed, answered by the app's exception handler
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=self.detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,8 +1,22 @@
 # Import all models here for easier imports
+from .store import Store
+from .customer import Customer
 from .user import User
 from .product import Product
 from .ticket import Ticket, TicketItem
 from .work_order import WorkOrder
+from .work_order_event import WorkOrderStatusEvent
+from .warranty_reminder import WarrantyReminder
+from .sync_watermark import SyncWatermark
+from .audit_entry import AuditEntry
+from .rate_limit_bucket import RateLimitBucket
+from .catalog_tombstone import CatalogTombstone
+from .catalog_stock_change import CatalogStockChange
 from .part import Part
+from .idempotency import IdempotencyKey
+from .exchange_rate import ExchangeRate
+from .archive import ArchivedTicket, ArchivedTicketItem, ArchivedWorkOrder
 
-__all__ = ["User", "Product", "Ticket", "TicketItem", "WorkOrder", "Part"]
+__all__ = ["Store", "Customer", "User", "Product", "Ticket", "TicketItem", "WorkOrder", "WorkOrderStatusEvent",
+           "WarrantyReminder", "SyncWatermark", "AuditEntry", "RateLimitBucket", "CatalogTombstone", "CatalogStockChange", "Part", "IdempotencyKey", "ExchangeRate", "ArchivedTicket", "ArchivedTicketItem",
+           "ArchivedWorkOrder"]
@@ -0,0 +1,103 @@
+"""
+Cold storage for settled tickets and work orders.
+
+Fully paid tickets (with their items) and delivered-and-paid work orders
+older than ``ARCHIVE_AFTER_MONTHS`` are moved here by the archival job
+(``app.services.archive``), so the hot tables and their indexes only hold
+recent or still open records. The archive tables mirror the hot tables
+column for column, plus ``archived_at``.
+"""
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Enum, Index, text
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..database import Base
+from .money import Money
+from .store import StoreScoped
+from .ticket import PaymentStatus
+from .work_order import RepairStatus, PaymentStatus as WorkOrderPaymentStatus
+
+
+class ArchivedTicket(StoreScoped, Base):
+    """Archived copy of a fully paid ticket"""
+
+    __tablename__ = "tickets_archive"
+
+    id = Column(String(36), primary_key=True)
+    date = Column(DateTime(timezone=True))
+    customer_name = Column(String(100), nullable=False)
+    customer_ref_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
+    payment_method = Column(String(50), nullable=False)
+    payment_status = Column(Enum(PaymentStatus), nullable=False)
+    subtotal = Column(Money("USD", asdecimal=False), nullable=False)
+    tax = Column(Money("USD", asdecimal=False), nullable=False)
+    total = Column(Money("USD", asdecimal=False), nullable=False)
+    exchange_rate = Column(Float, nullable=True)
+    amount_usd = Column(Money("USD", asdecimal=False), nullable=True)
+    amount_ves = Column(Money("VES", asdecimal=False), nullable=True)
+    updated_at = Column(DateTime(timezone=True))
+    row_version = Column(Integer, nullable=False, server_default=text("0"))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    items = relationship("ArchivedTicketItem", back_populates="ticket", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_tickets_archive_store_date", "store_id", "date"),
+        Index("ix_tickets_archive_store_customer_date", "store_id", "customer_ref_id", "date"),
+    )
+
+    def __repr__(self):
+        return f"<ArchivedTicket(id='{self.id}', customer='{self.customer_name}', total={self.total})>"
+
+
+class ArchivedTicketItem(Base):
+    """Archived copy of an item of an archived ticket"""
+
+    __tablename__ = "ticket_items_archive"
+
+    id = Column(Integer, primary_key=True)
+    ticket_id = Column(String(36), ForeignKey("tickets_archive.id"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    quantity = Column(Integer, nullable=False)
+    price = Column(Money("USD", asdecimal=False), nullable=False)
+
+    ticket = relationship("ArchivedTicket", back_populates="items")
+
+    def __repr__(self):
+        return f"<ArchivedTicketItem(id={self.id}, product_id={self.product_id}, quantity={self.quantity})>"
+
+
+class ArchivedWorkOrder(StoreScoped, Base):
+    """Archived copy of a delivered and paid work order"""
+
+    __tablename__ = "work_orders_archive"
+
+    id = Column(String(36), primary_key=True)
+    code = Column(String(8), unique=True, index=True, nullable=True)
+    customer_name = Column(String(100), nullable=False)
+    customer_phone = Column(String(20), nullable=True)
+    customer_id = Column(String(20), nullable=True)
+    customer_ref_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
+    device = Column(String(100), nullable=False)
+    issue = Column(Text, nullable=False)
+    status = Column(Enum(RepairStatus), nullable=False)
+    received_date = Column(DateTime(timezone=True))
+    estimated_completion_date = Column(DateTime(timezone=True), nullable=True)
+    repair_cost = Column(Money("USD"), nullable=True)
+    amount_paid = Column(Money("USD"), nullable=True)
+    payment_status = Column(Enum(WorkOrderPaymentStatus), nullable=False)
+    payment_date = Column(DateTime(timezone=True), nullable=True)
+    payment_notes = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    row_version = Column(Integer, nullable=False, server_default=text("0"))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_work_orders_archive_store_received_date", "store_id", "received_date"),
+        Index(
+            "ix_work_orders_archive_store_customer_received_date", "store_id", "customer_ref_id", "received_date"
+        ),
+    )
+
+    def __repr__(self):
+        return f"<ArchivedWorkOrder(code='{self.code}', customer='{self.customer_name}', status='{self.status}')>"
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
+from ..database import Base
+from .store import StoreScoped
+
+
+class AuditEntry(StoreScoped, Base):
+    """Append-only record of who created, changed or deleted a record"""
+    
+    __tablename__ = "audit_log"
+    
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)  # When the change was made, not when it was written
+    # No foreign keys: entries outlive deleted users and records
+    user_id = Column(Integer, nullable=True)
+    username = Column(String(50), nullable=True)
+    action = Column(String(10), nullable=False)  # create, update or delete
+    entity = Column(String(20), nullable=False)  # e.g. "product", "work_order"
+    entity_id = Column(String(36), nullable=False)
+    changes = Column(JSON, nullable=True)  # {field: [before, after]}
+    
+    __table_args__ = (
+        Index("ix_audit_log_store_created_at", "store_id", "created_at"),
+        # A record's history
+        Index("ix_audit_log_store_entity_created_at", "store_id", "entity", "entity_id", "created_at"),
+        # A user's activity
+        Index("ix_audit_log_store_user_created_at", "store_id", "user_id", "created_at"),
+    )
+    
+    def __repr__(self):
+        return f"<AuditEntry(action='{self.action}', entity='{self.entity}', entity_id='{self.entity_id}')>"
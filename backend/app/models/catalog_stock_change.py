@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Column, Integer, String, Index
+from ..database import Base
+from .store import StoreScoped
+
+
+class CatalogStockChange(StoreScoped, Base):
+    """Stock change of a product or part, given a catalog version by the next catalog read"""
+    
+    __tablename__ = "catalog_stock_changes"
+    
+    id = Column(Integer, primary_key=True)
+    entity = Column(String(20), nullable=False)  # "product" or "part"
+    entity_id = Column(Integer, nullable=False)
+    version = Column(BigInteger, nullable=True)  # Store catalog version; None while pending
+    
+    __table_args__ = (
+        Index("ix_catalog_stock_changes_store_version", "store_id", "version"),
+    )
+    
+    def __repr__(self):
+        return f"<CatalogStockChange(entity='{self.entity}', entity_id={self.entity_id}, version={self.version})>"
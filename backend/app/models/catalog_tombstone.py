@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Column, Integer, String, Index
+from ..database import Base
+from .store import StoreScoped
+
+
+class CatalogTombstone(StoreScoped, Base):
+    """Deleted product or part, kept so terminals syncing the catalog can drop it"""
+    
+    __tablename__ = "catalog_tombstones"
+    
+    id = Column(Integer, primary_key=True)
+    entity = Column(String(20), nullable=False)  # "product" or "part"
+    entity_id = Column(Integer, nullable=False)
+    version = Column(BigInteger, nullable=False)  # Store catalog version of the deletion
+    
+    __table_args__ = (
+        Index("ix_catalog_tombstones_store_version", "store_id", "version"),
+    )
+    
+    def __repr__(self):
+        return f"<CatalogTombstone(entity='{self.entity}', entity_id={self.entity_id}, version={self.version})>"
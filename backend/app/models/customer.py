@@ -0,0 +1,34 @@
+"""
+Customers, identified by phone number or C.I.
+
+Tickets and work orders keep the customer name (and, for work orders, the
+phone and C.I.) typed at the counter, and point to the matching customer
+through ``customer_ref_id`` (``WorkOrder.customer_id`` already holds the raw
+C.I.). Phones are stored in E.164 form and C.I. numbers without separators
+(``app.services.customers``), so each is unique within a store.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy.sql import func
+from ..database import Base
+from .store import StoreScoped
+
+
+class Customer(StoreScoped, Base):
+    """Customer model"""
+
+    __tablename__ = "customers"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False)
+    phone = Column(String(16), nullable=True)  # E.164, e.g. +584141234567
+    national_id = Column(String(20), nullable=True)  # C.I., e.g. V12345678
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_customers_store_phone", "store_id", "phone", unique=True),
+        Index("ix_customers_store_national_id", "store_id", "national_id", unique=True),
+        Index("ix_customers_store_name", "store_id", "name"),
+    )
+
+    def __repr__(self):
+        return f"<Customer(id={self.id}, name='{self.name}', phone='{self.phone}')>"
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class ExchangeRate(Base):
+    """Exchange rate history: units of ``currency`` per US dollar from ``effective_from`` on"""
+    
+    __tablename__ = "exchange_rates"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    currency = Column(String(3), nullable=False, default="VES")
+    rate = Column(Numeric(18, 6), nullable=False)
+    effective_from = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        # Rate in effect at a moment: latest effective_from <= moment
+        Index("ix_exchange_rates_currency_effective_from", "currency", "effective_from", unique=True),
+    )
+    
+    def __repr__(self):
+        return f"<ExchangeRate(currency='{self.currency}', rate={self.rate}, effective_from={self.effective_from})>"
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, DateTime, PrimaryKeyConstraint
+from sqlalchemy.sql import func
+from ..database import Base
+from .store import StoreScoped
+
+
+class IdempotencyKey(StoreScoped, Base):
+    """Client-generated idempotency key recorded for each applied request"""
+    
+    __tablename__ = "idempotency_keys"
+    
+    key = Column(String(100), nullable=False)
+    scope = Column(String(50), nullable=False)  # e.g. "ticket"
+    request_hash = Column(String(64), nullable=False)  # SHA-256 of the request payload
+    resource_id = Column(String(36), nullable=False)  # ID of the created resource
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    
+    __table_args__ = (
+        # Keys come from each store's terminals, so they only identify a request within its store
+        PrimaryKeyConstraint("store_id", "key", name="pk_idempotency_keys"),
+    )
+    
+    def __repr__(self):
+        return f"<IdempotencyKey(key='{self.key}', scope='{self.scope}', resource_id='{self.resource_id}')>"
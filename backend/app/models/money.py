@@ -0,0 +1,89 @@
+"""
+Money column type stored as integer minor units.
+
+Amounts are persisted as BIGINT cents (minor units of the column's currency),
+so SUM/subtraction run exactly in SQL and never drift the way floats do.
+Python code keeps seeing the same types as before: ``asdecimal=True`` yields
+``Decimal`` (like ``Numeric``), ``asdecimal=False`` yields ``float`` (like
+``Float``).
+"""
+import operator
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Optional, Union
+
+from sqlalchemy import BigInteger, func, literal, type_coerce
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.types import TypeDecorator
+
+# ISO 4217 minor unit exponent per supported currency
+CURRENCY_EXPONENTS = {
+    "USD": 2,
+    "VES": 2,
+}
+
+
+def to_minor_units(amount: Union[int, float, Decimal, str], currency: str = "USD") -> int:
+    """
+    Convert an amount to integer minor units, rounding half up.
+
+    Floats are converted through their shortest repr, so ``19.99`` becomes
+    ``1999`` rather than ``1998``.
+    """
+    exponent = CURRENCY_EXPONENTS[currency]
+    if isinstance(amount, float):
+        amount = repr(amount)
+    value = Decimal(amount).scaleb(exponent).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    return int(value)
+
+
+def from_minor_units(minor: int, currency: str = "USD") -> Decimal:
+    """Convert integer minor units back to an exact Decimal amount"""
+    return Decimal(minor).scaleb(-CURRENCY_EXPONENTS[currency])
+
+
+class Money(TypeDecorator):
+    """Monetary amount in a fixed currency, stored as BIGINT minor units"""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def __init__(self, currency: str = "USD", asdecimal: bool = True):
+        if currency not in CURRENCY_EXPONENTS:
+            raise ValueError(f"Unsupported currency {currency}")
+        super().__init__()
+        self.currency = currency
+        self.asdecimal = asdecimal
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[int]:
+        if value is None:
+            return None
+        return to_minor_units(value, self.currency)
+
+    def process_result_value(self, value: Optional[int], dialect) -> Any:
+        if value is None:
+            return None
+        amount = from_minor_units(int(value), self.currency)
+        return amount if self.asdecimal else float(amount)
+
+    def coerce_compared_value(self, op, value):
+        # Comparing or adding an amount converts it to minor units; scaling
+        # factors (quantity, rates) must stay plain numbers
+        if op in (operator.mul, operator.truediv, operator.floordiv):
+            return literal(value).type
+        return self
+
+    @property
+    def python_type(self):
+        return Decimal if self.asdecimal else float
+
+
+def money_sum(expression: ColumnElement, money_type: Optional[Money] = None) -> ColumnElement:
+    """
+    Exact SQL SUM of a money expression, returning 0 for no rows.
+
+    Arithmetic between money columns (e.g. ``repair_cost - amount_paid``)
+    yields a plain integer expression, so pass the column type it should be
+    read back as.
+    """
+    money_type = money_type or expression.type
+    return type_coerce(func.coalesce(func.sum(type_coerce(expression, BigInteger)), 0), money_type)
@@ -1,23 +1,41 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Index, literal_column, text
 from sqlalchemy.types import JSON
 from sqlalchemy.sql import func
 from ..database import Base
+from .money import Money
+from .store import StoreScoped
 
 
-class Part(Base):
+class Part(StoreScoped, Base):
     """Part model for repair parts inventory"""
     
     __tablename__ = "parts"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(100), nullable=False, index=True)
-    sku = Column(String(50), unique=True, nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+    sku = Column(String(50), nullable=False)
+    barcode = Column(String(64), nullable=True)  # EAN/UPC or any code printed on the label
     stock = Column(Integer, nullable=False, default=0)
-    price = Column(Float, nullable=False)
+    price = Column(Money("USD", asdecimal=False), nullable=False)
     compatible_models = Column(JSON, nullable=False)  # List of compatible device models
+    image_url = Column(String(500), nullable=True)
     min_stock = Column(Integer, nullable=False, default=5)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped by every UPDATE, so listing ETags change within one timestamp second
+    row_version = Column(Integer, nullable=False, default=0, server_default=text("0"),
+                         onupdate=literal_column("row_version") + 1)
+    # Store catalog version of the last change (see app.services.catalog)
+    catalog_version = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    
+    __table_args__ = (
+        Index("ix_parts_store_name", "store_id", "name"),
+        Index("ix_parts_store_catalog_version", "store_id", "catalog_version"),
+        # Scans resolve a code to one row of the store
+        Index("ix_parts_store_barcode", "store_id", "barcode", unique=True),
+        # Each store keeps its own SKU catalogue
+        Index("ix_parts_store_sku", "store_id", "sku", unique=True),
+    )
     
     def __repr__(self):
         return f"<Part(id={self.id}, name='{self.name}', sku='{self.sku}', stock={self.stock})>"
@@ -1,22 +1,37 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Index, literal_column, text
 from sqlalchemy.sql import func
 from ..database import Base
+from .money import Money
+from .store import StoreScoped
 
 
-class Product(Base):
+class Product(StoreScoped, Base):
     """Product model for inventory management"""
     
     __tablename__ = "products"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(100), nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+    barcode = Column(String(64), nullable=True)  # EAN/UPC or any code printed on the label
     brand = Column(String(50), nullable=False)
     stock = Column(Integer, nullable=False, default=0)
-    price = Column(Float, nullable=False)
+    price = Column(Money("USD", asdecimal=False), nullable=False)
     image_url = Column(String(500), nullable=True)
     min_stock = Column(Integer, nullable=False, default=5)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped by every UPDATE, so listing ETags change within one timestamp second
+    row_version = Column(Integer, nullable=False, default=0, server_default=text("0"),
+                         onupdate=literal_column("row_version") + 1)
+    # Store catalog version of the last change (see app.services.catalog)
+    catalog_version = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    
+    __table_args__ = (
+        Index("ix_products_store_name", "store_id", "name"),
+        Index("ix_products_store_catalog_version", "store_id", "catalog_version"),
+        # Scans resolve a code to one row of the store
+        Index("ix_products_store_barcode", "store_id", "barcode", unique=True),
+    )
     
     def __repr__(self):
         return f"<Product(id={self.id}, name='{self.name}', stock={self.stock})>"
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Float, Boolean
+from ..database import Base
+
+
+class RateLimitBucket(Base):
+    """Token bucket of one client, shared by every server process (RATE_LIMIT_STORE=database)"""
+    
+    __tablename__ = "rate_limit_buckets"
+    
+    key = Column(String(120), primary_key=True)  # "user:<username>" or "ip:<address>"
+    tokens = Column(Float, nullable=False)  # Left after the last request
+    updated_at = Column(Float, nullable=False)  # Epoch seconds of the last request
+    granted = Column(Boolean, nullable=False)  # Whether the last request was let through
+    
+    def __repr__(self):
+        return f"<RateLimitBucket(key='{self.key}', tokens={self.tokens})>"
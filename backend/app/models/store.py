@@ -0,0 +1,92 @@
+"""
+Stores (branches) and automatic per-store scoping of queries.
+
+One deployment serves every branch. Rows of store-owned tables carry a
+``store_id``, and a session bound to a store (``set_store_scope``, done by
+``get_current_user`` from the JWT) only ever sees and creates rows of that
+store: every ORM SELECT, UPDATE and DELETE issued through it gets a
+``store_id = :store`` criterion, and new rows are stamped with the store on
+flush. Sessions without a store (startup, scripts, background jobs) are not
+filtered.
+
+A single statement can opt out with ``execution_options(all_stores=True)``,
+e.g. cross-store reports or checks of globally unique values.
+"""
+from typing import Optional
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String, event, text
+from sqlalchemy.orm import Session, declared_attr, with_loader_criteria
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+DEFAULT_STORE_ID = 1
+DEFAULT_STORE_NAME = "Principal"
+
+# Session.info key holding the store a session is bound to
+STORE_SCOPE_KEY = "store_id"
+# Execution option that disables the store filter for one statement
+ALL_STORES = "all_stores"
+
+
+class Store(Base):
+    """Store (branch) model"""
+
+    __tablename__ = "stores"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped by every product/part write of the store (see app.services.catalog)
+    catalog_version = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
+
+    def __repr__(self):
+        return f"<Store(id={self.id}, name='{self.name}')>"
+
+
+class StoreScoped:
+    """Mixin for models whose rows belong to one store"""
+
+    @declared_attr
+    def store_id(cls):
+        return Column(
+            Integer, ForeignKey("stores.id"), nullable=False,
+            default=DEFAULT_STORE_ID, server_default=text(str(DEFAULT_STORE_ID))
+        )
+
+
+def set_store_scope(session: Session, store_id: Optional[int]):
+    """Bind a session to a store, or unbind it with None"""
+    if store_id is None:
+        session.info.pop(STORE_SCOPE_KEY, None)
+    else:
+        session.info[STORE_SCOPE_KEY] = store_id
+
+
+def get_store_scope(session: Session) -> Optional[int]:
+    """Store a session is bound to, if any"""
+    return session.info.get(STORE_SCOPE_KEY)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _filter_by_store(execute_state):
+    store_id = get_store_scope(execute_state.session)
+    if store_id is None or execute_state.execution_options.get(ALL_STORES, False):
+        return
+    if execute_state.is_column_load or execute_state.is_relationship_load:
+        # Lazy loads start from rows the scoped query already returned
+        return
+    if execute_state.is_select or execute_state.is_update or execute_state.is_delete:
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(StoreScoped, lambda cls: cls.store_id == store_id, include_aliases=True)
+        )
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_store(session, flush_context, instances):
+    store_id = get_store_scope(session)
+    if store_id is None:
+        return
+    for instance in session.new:
+        if isinstance(instance, StoreScoped) and instance.store_id is None:
+            instance.store_id = store_id
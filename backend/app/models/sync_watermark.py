@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class SyncWatermark(Base):
+    """How far an export job has synced a table, across every store"""
+    
+    __tablename__ = "sync_watermarks"
+    
+    name = Column(String(50), primary_key=True)  # e.g. "sheets:tickets"
+    synced_until = Column(DateTime(timezone=True), nullable=False)  # Rows changed up to here are exported
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<SyncWatermark(name='{self.name}', synced_until={self.synced_until})>"
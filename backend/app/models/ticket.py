@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Index, literal_column, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 from ..database import Base
+from .money import Money
+from .store import StoreScoped
 
 
 class PaymentStatus(str, enum.Enum):
@@ -13,7 +15,7 @@ class PaymentStatus(str, enum.Enum):
     OVERDUE = "Overdue"
 
 
-class Ticket(Base):
+class Ticket(StoreScoped, Base):
     """Ticket model for sales transactions"""
     
     __tablename__ = "tickets"
@@ -21,19 +23,41 @@ class Ticket(Base):
     id = Column(String(36), primary_key=True, index=True)  # UUID
     date = Column(DateTime(timezone=True), server_default=func.now())
     customer_name = Column(String(100), nullable=False)
+    customer_ref_id = Column(Integer, ForeignKey("customers.id"), nullable=True)  # Matched customer, if any
     payment_method = Column(String(50), nullable=False)
     payment_status = Column(Enum(PaymentStatus), nullable=False, default=PaymentStatus.PENDING)
-    subtotal = Column(Float, nullable=False)
-    tax = Column(Float, nullable=False)
-    total = Column(Float, nullable=False)
+    subtotal = Column(Money("USD", asdecimal=False), nullable=False)
+    tax = Column(Money("USD", asdecimal=False), nullable=False)
+    total = Column(Money("USD", asdecimal=False), nullable=False)
     
     # Multi-currency payment details
     exchange_rate = Column(Float, nullable=True)  # VES/USD rate at time of sale
-    amount_usd = Column(Float, nullable=True, default=0.0)  # Amount paid in USD
-    amount_ves = Column(Float, nullable=True, default=0.0)  # Amount paid in VES
+    amount_usd = Column(Money("USD", asdecimal=False), nullable=True, default=0.0)  # Amount paid in USD
+    amount_ves = Column(Money("VES", asdecimal=False), nullable=True, default=0.0)  # Amount paid in VES
+    
+    # Set on insert too: offline sales arrive with their original (past) date
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Bumped by every UPDATE, so listing ETags change within one timestamp second
+    row_version = Column(Integer, nullable=False, default=0, server_default=text("0"),
+                         onupdate=literal_column("row_version") + 1)
     
     # Relationship to ticket items
     items = relationship("TicketItem", back_populates="ticket", cascade="all, delete-orphan")
+    customer = relationship("Customer")
+    
+    __table_args__ = (
+        Index("ix_tickets_store_date", "store_id", "date"),
+        # Changes since the last Google Sheets sync
+        Index("ix_tickets_store_updated_at", "store_id", "updated_at"),
+        # Customer history
+        Index("ix_tickets_store_customer_date", "store_id", "customer_ref_id", "date"),
+        # Delinquent/debtor lookups only read unpaid tickets, a small slice of the table
+        Index(
+            "ix_tickets_store_unpaid_date", "store_id", "payment_status", "date",
+            postgresql_where=text("payment_status <> 'PAID'"),
+            sqlite_where=text("payment_status <> 'PAID'")
+        ),
+    )
     
     def __repr__(self):
         return f"<Ticket(id='{self.id}', customer='{self.customer_name}', total={self.total})>"
@@ -45,10 +69,10 @@ class TicketItem(Base):
     __tablename__ = "ticket_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    ticket_id = Column(String(36), ForeignKey("tickets.id"), nullable=False)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    ticket_id = Column(String(36), ForeignKey("tickets.id"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
     quantity = Column(Integer, nullable=False)
-    price = Column(Float, nullable=False)  # Price at time of sale
+    price = Column(Money("USD", asdecimal=False), nullable=False)  # Price at time of sale
     
     # Relationships
     ticket = relationship("Ticket", back_populates="items")
@@ -3,6 +3,7 @@ from sqlalchemy.sql import func
 from datetime import datetime
 import enum
 from ..database import Base
+from .store import StoreScoped
 
 
 class UserRole(str, enum.Enum):
@@ -11,7 +12,7 @@ class UserRole(str, enum.Enum):
     TECHNICIAN = "technician"
 
 
-class User(Base):
+class User(StoreScoped, Base):
     """User model for authentication and authorization"""
     
     __tablename__ = "users"
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy.sql import func
+from ..database import Base
+from .store import StoreScoped
+
+
+class WarrantyReminder(StoreScoped, Base):
+    """Warranty reminder claimed (and then sent) for a delivered work order"""
+    
+    __tablename__ = "warranty_reminders"
+    
+    id = Column(Integer, primary_key=True)
+    # One reminder per order; no foreign key so the record outlives archival
+    work_order_id = Column(String(36), nullable=False, unique=True)
+    phone = Column(String(20), nullable=False)
+    claimed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)  # Null while the send is in flight
+    delivered = Column(Boolean, nullable=True)  # Whether WhatsApp or SMS accepted the message
+    
+    def __repr__(self):
+        return f"<WarrantyReminder(work_order_id='{self.work_order_id}', delivered={self.delivered})>"
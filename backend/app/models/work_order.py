@@ -1,7 +1,10 @@
-from sqlalchemy import Column, String, Text, DateTime, Enum, Numeric
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey, Index, literal_column, text
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 from ..database import Base
+from .money import Money
+from .store import StoreScoped
 
 
 class RepairStatus(str, enum.Enum):
@@ -22,16 +25,17 @@ class PaymentStatus(str, enum.Enum):
     VENCIDO = "Vencido"
 
 
-class WorkOrder(Base):
+class WorkOrder(StoreScoped, Base):
     """Work order model for repair tracking"""
     
     __tablename__ = "work_orders"
     
     id = Column(String(36), primary_key=True, index=True)  # UUID
     code = Column(String(8), unique=True, index=True, nullable=True) # Short ID (e.g., "ABC-123")
-    customer_name = Column(String(100), nullable=False, index=True)
+    customer_name = Column(String(100), nullable=False)
     customer_phone = Column(String(20), nullable=True)  # Phone for WhatsApp/SMS notifications
-    customer_id = Column(String(20), nullable=True, index=True)  # C.I. or other ID
+    customer_id = Column(String(20), nullable=True)  # C.I. or other ID
+    customer_ref_id = Column(Integer, ForeignKey("customers.id"), nullable=True)  # Matched customer, if any
     device = Column(String(100), nullable=False)
     issue = Column(Text, nullable=False)
     status = Column(Enum(RepairStatus), nullable=False, default=RepairStatus.RECIBIDO)
@@ -39,14 +43,34 @@ class WorkOrder(Base):
     estimated_completion_date = Column(DateTime(timezone=True), nullable=True)
     
     # Payment fields
-    repair_cost = Column(Numeric(10, 2), nullable=True, default=0.00)  # Total repair cost
-    amount_paid = Column(Numeric(10, 2), nullable=True, default=0.00)  # Amount already paid
+    repair_cost = Column(Money("USD"), nullable=True, default=0.00)  # Total repair cost
+    amount_paid = Column(Money("USD"), nullable=True, default=0.00)  # Amount already paid
     payment_status = Column(Enum(PaymentStatus), nullable=False, default=PaymentStatus.PENDIENTE)
     payment_date = Column(DateTime(timezone=True), nullable=True)  # When fully paid
     payment_notes = Column(Text, nullable=True)  # Additional payment notes
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Set on insert too, so it alone is the time of the last change
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Bumped by every UPDATE, so listing ETags change within one timestamp second
+    row_version = Column(Integer, nullable=False, default=0, server_default=text("0"),
+                         onupdate=literal_column("row_version") + 1)
+    
+    customer = relationship("Customer")
+    
+    __table_args__ = (
+        Index("ix_work_orders_store_received_date", "store_id", "received_date"),
+        Index("ix_work_orders_store_customer_name", "store_id", "customer_name"),
+        Index("ix_work_orders_store_customer_id", "store_id", "customer_id"),
+        # Customer history
+        Index("ix_work_orders_store_customer_received_date", "store_id", "customer_ref_id", "received_date"),
+        # Status counts on the dashboards and per-status lists, newest first
+        Index("ix_work_orders_store_status_received_date", "store_id", "status", "received_date"),
+        # Unpaid orders and distinct customers with debt
+        Index("ix_work_orders_store_payment_status_customer", "store_id", "payment_status", "customer_name"),
+        # Changes since the last Google Sheets sync, read store by store
+        Index("ix_work_orders_store_updated_at", "store_id", "updated_at"),
+    )
     
     @property
     def balance_due(self) -> float:
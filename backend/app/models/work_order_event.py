@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Index
+from sqlalchemy.sql import func
+from ..database import Base
+from .store import StoreScoped
+from .work_order import RepairStatus
+
+
+class WorkOrderStatusEvent(StoreScoped, Base):
+    """Append-only record of a work order entering a repair status"""
+    
+    __tablename__ = "work_order_status_events"
+    
+    id = Column(Integer, primary_key=True)
+    # No foreign key: events outlive the order's move to the archive
+    work_order_id = Column(String(36), nullable=False)
+    status = Column(Enum(RepairStatus), nullable=False)
+    device = Column(String(100), nullable=False)  # Copied from the order for per-device analytics
+    entered_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    __table_args__ = (
+        # Time-in-status analytics per status and period
+        Index("ix_work_order_status_events_store_status_entered_at", "store_id", "status", "entered_at"),
+        # An order's timeline (the next event closes the previous status)
+        Index("ix_work_order_status_events_work_order_entered_at", "work_order_id", "entered_at"),
+    )
+    
+    def __repr__(self):
+        return f"<WorkOrderStatusEvent(work_order_id='{self.work_order_id}', status='{self.status}')>"
@@ -6,6 +6,16 @@ from .work_orders import router as work_orders_router
 from .parts import router as parts_router
 from .dashboard import router as dashboard_router
 from .users import router as users_router
+from .sync import router as sync_router
+from .exchange_rates import router as exchange_rates_router
+from .reports import router as reports_router
+from .stores import router as stores_router
+from .analytics import router as analytics_router
+from .customers import router as customers_router
+from .backups import router as backups_router
+from .audit import router as audit_router
+from .catalog import router as catalog_router
+from .scan import router as scan_router
 
 __all__ = [
     "auth_router",
@@ -14,5 +24,15 @@ __all__ = [
     "work_orders_router",
     "parts_router",
     "dashboard_router",
-    "users_router"
+    "users_router",
+    "sync_router",
+    "exchange_rates_router",
+    "reports_router",
+    "stores_router",
+    "analytics_router",
+    "customers_router",
+    "backups_router",
+    "audit_router",
+    "catalog_router",
+    "scan_router"
 ]
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
+from ..models.user import User
+from ..services.status_history import turnaround
+from ..utils.dependencies import get_read_db, get_current_user
+
+router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
+
+
+@router.get("/turnaround", response_model=dict)
+def get_turnaround(
+    start_date: Optional[datetime] = Query(None, description="Only statuses entered on or after this moment"),
+    end_date: Optional[datetime] = Query(None, description="Only statuses entered before this moment"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get how long work orders spend in each status, per status and per device.
+    
+    Computed in SQL from the status history: average, median (p50) and p90
+    time in seconds. Statuses orders are still in are not counted.
+    
+    Args:
+        start_date: Optional start of the period
+        end_date: Optional end of the period (exclusive)
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Turnaround statistics grouped by status and by device and status
+    """
+    return {
+        "by_status": turnaround(db, start_date=start_date, end_date=end_date),
+        "by_device": turnaround(db, by_device=True, start_date=start_date, end_date=end_date)
+    }
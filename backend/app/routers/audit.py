@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+from ..models.audit_entry import AuditEntry
+from ..models.user import User
+from ..schemas.audit import AuditEntryResponse
+from ..utils.dependencies import get_read_db, require_admin
+
+router = APIRouter(prefix="/api/audit", tags=["Audit"])
+
+
+@router.get("", response_model=List[AuditEntryResponse])
+def get_audit_log(
+    entity: Optional[str] = Query(None, description="Kind of record, e.g. product or work_order"),
+    entity_id: Optional[str] = Query(None, description="Id of the record (with entity)"),
+    user_id: Optional[int] = Query(None, description="User who made the changes"),
+    start_date: Optional[datetime] = Query(None, description="Changes made on or after this moment"),
+    end_date: Optional[datetime] = Query(None, description="Changes made before this moment"),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Get who changed what, newest first (admin only).
+    
+    Entries are written in the background, so a change shows up here a
+    moment (at most AUDIT_FLUSH_SECONDS) after it was made.
+    
+    Args:
+        entity: Optional kind of record
+        entity_id: Optional record id
+        user_id: Optional user id
+        start_date: Optional start of the period
+        end_date: Optional end of the period
+        limit: Maximum number of entries to return
+        db: Database session
+        current_user: Current authenticated admin user
+        
+    Returns:
+        Audit entries
+    """
+    query = db.query(AuditEntry)
+    if entity:
+        query = query.filter(AuditEntry.entity == entity)
+        if entity_id:
+            query = query.filter(AuditEntry.entity_id == entity_id)
+    if user_id is not None:
+        query = query.filter(AuditEntry.user_id == user_id)
+    if start_date:
+        query = query.filter(AuditEntry.created_at >= start_date)
+    if end_date:
+        query = query.filter(AuditEntry.created_at < end_date)
+    
+    return query.order_by(AuditEntry.created_at.desc(), AuditEntry.id.desc()).limit(limit).all()
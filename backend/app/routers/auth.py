@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from ..schemas.auth import LoginRequest, TokenResponse
+from ..models.store import ALL_STORES
 from ..models.user import User
 from ..utils.dependencies import get_db
 from ..utils.security import verify_password, create_access_token
@@ -18,13 +19,15 @@ def login(credentials: LoginRequest, db: Session = Depends(get_db)):
         db: Database session
         
     Returns:
-        JWT token and user role
+        JWT token, user role and store
         
     Raises:
         HTTPException: If credentials are invalid
     """
-    # Find user by username
-    user = db.query(User).filter(User.username == credentials.username).first()
+    # Find user by username (unique across stores)
+    user = db.query(User).filter(
+        User.username == credentials.username
+    ).execution_options(**{ALL_STORES: True}).first()
     
     # Verify user exists and password is correct
     if not user or not verify_password(credentials.password, user.hashed_password):
@@ -35,10 +38,13 @@ def login(credentials: LoginRequest, db: Session = Depends(get_db)):
         )
     
     # Create access token
-    access_token = create_access_token(data={"sub": user.username, "role": user.role.value})
+    access_token = create_access_token(
+        data={"sub": user.username, "role": user.role.value, "store_id": user.store_id}
+    )
     
     return TokenResponse(
         access_token=access_token,
         token_type="bearer",
-        role=user.role.value
+        role=user.role.value,
+        store_id=user.store_id
     )
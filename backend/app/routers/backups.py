@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.engine import Engine
+from typing import List
+from ..database import get_engine
+from ..models.user import User
+from ..schemas.backup import BackupResponse
+from ..services.backups import BackupError, create_backup, list_backups
+from ..utils.dependencies import require_deployment_admin
+
+router = APIRouter(prefix="/api/backups", tags=["Backups"])
+
+
+@router.get("", response_model=List[BackupResponse])
+def get_backups(current_user: User = Depends(require_deployment_admin)):
+    """
+    List database snapshots, newest first (deployment admins only).
+    
+    Args:
+        current_user: Current authenticated deployment admin
+        
+    Returns:
+        List of snapshots
+    """
+    return list_backups()
+
+
+@router.post("", response_model=BackupResponse, status_code=status.HTTP_201_CREATED)
+def take_backup(
+    engine: Engine = Depends(get_engine),
+    current_user: User = Depends(require_deployment_admin)
+):
+    """
+    Take a database snapshot now (deployment admins only).
+    
+    The snapshot holds every store's data, so store admins cannot take it.
+    The copy runs online: sales keep being recorded while it is taken.
+    Restoring is done from the command line (``python -m app.services.backups restore``).
+    
+    Args:
+        engine: Database engine (no session is held during the copy)
+        current_user: Current authenticated deployment admin
+        
+    Returns:
+        Created snapshot
+        
+    Raises:
+        HTTPException: If a backup is already running or the database cannot be backed up
+    """
+    try:
+        backup = create_backup(bind=engine)
+    except BackupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Backup failed: {e}"
+        )
+    
+    if backup is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A backup or restore is already running"
+        )
+    return backup
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from ..models.store import get_store_scope
+from ..models.user import User
+from ..schemas.catalog import CatalogResponse
+from ..services.catalog import catalog
+from ..utils.dependencies import get_db, get_current_user
+from ..utils.serialization import json_response
+
+router = APIRouter(prefix="/api/catalog", tags=["Catalog"])
+
+
+@router.get("", response_model=CatalogResponse)
+def get_catalog(
+    since_version: Optional[int] = Query(
+        None, ge=0, description="Catalog version the terminal holds; omit it for the full catalog"
+    ),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the products and parts changed or deleted since a catalog version.
+    
+    Terminals keep the catalog for their search box: they load it once
+    without ``since_version`` and then send back the ``version`` of the last
+    response. When the version is too old (more than
+    CATALOG_MAX_DELTA_VERSIONS behind) or unknown, the full catalog is sent
+    with ``full`` set and must replace the local copy.
+    
+    Served from an in-memory snapshot; reads the primary database, whose
+    catalog version the snapshot is checked against.
+    
+    Args:
+        since_version: Catalog version the terminal holds
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Catalog version, changed rows and deleted ids
+    """
+    store_id = get_store_scope(db) or current_user.store_id
+    return json_response(catalog.changes(db, store_id, since_version))
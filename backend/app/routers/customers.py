@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ..schemas.customer import CustomerResponse, CustomerHistory
+from ..models.customer import Customer
+from ..models.user import User
+from ..services.customers import normalize_phone, normalize_national_id, customer_history
+from ..utils.dependencies import get_read_db, get_current_user
+
+router = APIRouter(prefix="/api/customers", tags=["Customers"])
+
+
+@router.get("", response_model=List[CustomerResponse])
+def find_customers(
+    phone: Optional[str] = Query(None, description="Phone in any format"),
+    national_id: Optional[str] = Query(None, description="C.I. with or without separators"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Look up customers by phone or C.I.
+    
+    Both are normalized the same way as when they are stored, so the lookup
+    is an exact match on a unique index.
+    
+    Args:
+        phone: Optional phone number
+        national_id: Optional C.I.
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Customers matching either value
+        
+    Raises:
+        HTTPException: If neither a valid phone nor a C.I. is given
+    """
+    conditions = []
+    if normalize_phone(phone):
+        conditions.append(Customer.phone == normalize_phone(phone))
+    if normalize_national_id(national_id):
+        conditions.append(Customer.national_id == normalize_national_id(national_id))
+    if not conditions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide a valid phone or national_id"
+        )
+    
+    return db.query(Customer).filter(or_(*conditions)).order_by(Customer.id).all()
+
+
+@router.get("/{customer_id}/history", response_model=CustomerHistory)
+def get_customer_history(
+    customer_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a customer's sales and repairs, newest first, including archived ones.
+    
+    Args:
+        customer_id: Customer ID
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        The customer with their tickets and work orders
+        
+    Raises:
+        HTTPException: If customer not found
+    """
+    customer = db.query(Customer).filter(Customer.id == customer_id).first()
+    if not customer:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Customer with id {customer_id} not found"
+        )
+    
+    return customer_history(db, customer)
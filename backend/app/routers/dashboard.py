@@ -5,20 +5,30 @@ from ..models.product import Product
 from ..models.ticket import Ticket, PaymentStatus
 from ..models.work_order import WorkOrder, RepairStatus
 from ..models.part import Part
+from ..models.money import Money, money_sum
+from ..models.archive import ArchivedTicket, ArchivedWorkOrder
+from ..models.store import get_store_scope
 from ..models.user import User, UserRole
-from ..utils.dependencies import get_db, get_current_user
+from ..config import settings
+from ..utils.cache import TTLCache
+from ..utils.dependencies import get_read_db, get_current_user
 
 router = APIRouter(prefix="/api", tags=["Dashboard"])
 
+# Counters per (dashboard, store); each branch sees only its own figures
+dashboard_cache = TTLCache(ttl_seconds=settings.DASHBOARD_CACHE_SECONDS)
+
 
 @router.get("/dashboard/summary")
 def get_admin_dashboard_summary(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get dashboard summary for admin users.
     
+    Cached per store for DASHBOARD_CACHE_SECONDS.
+    
     Args:
         db: Database session
         current_user: Current authenticated user
@@ -26,16 +36,27 @@ def get_admin_dashboard_summary(
     Returns:
         Dashboard summary with sales, stock, and ticket information
     """
-    # Total sales (sum of all paid tickets)
-    total_sales = db.query(func.sum(Ticket.total)).filter(
+    return dashboard_cache.get_or_set(("admin", get_store_scope(db)), lambda: _admin_summary(db))
+
+
+def _admin_summary(db: Session) -> dict:
+    """Compute the admin dashboard counters of the session's store"""
+    # Total sales (sum of all paid tickets, archived ones are all paid),
+    # summed as exact decimals
+    exact = Money("USD")
+    total_sales = db.query(money_sum(Ticket.total, exact)).filter(
         Ticket.payment_status == PaymentStatus.PAID
-    ).scalar() or 0.0
+    ).scalar()
+    archived_tickets, archived_sales = db.query(
+        func.count(ArchivedTicket.id), money_sum(ArchivedTicket.total, exact)
+    ).one()
+    total_sales = float(total_sales + archived_sales)
     
     # Total products in stock
     total_products = db.query(func.sum(Product.stock)).scalar() or 0
     
     # Total tickets
-    total_tickets = db.query(func.count(Ticket.id)).scalar() or 0
+    total_tickets = (db.query(func.count(Ticket.id)).scalar() or 0) + archived_tickets
     
     # Products with low stock
     low_stock_products = db.query(func.count(Product.id)).filter(
@@ -52,12 +73,14 @@ def get_admin_dashboard_summary(
 
 @router.get("/repairs/dashboard/summary")
 def get_repairs_dashboard_summary(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get dashboard summary for technician users (repairs).
     
+    Cached per store for DASHBOARD_CACHE_SECONDS.
+    
     Args:
         db: Database session
         current_user: Current authenticated user
@@ -65,6 +88,11 @@ def get_repairs_dashboard_summary(
     Returns:
         Dashboard summary with repair status counts and parts information
     """
+    return dashboard_cache.get_or_set(("repairs", get_store_scope(db)), lambda: _repairs_summary(db))
+
+
+def _repairs_summary(db: Session) -> dict:
+    """Compute the repairs dashboard counters of the session's store"""
     # Count work orders by status
     pending = db.query(func.count(WorkOrder.id)).filter(
         WorkOrder.status == RepairStatus.RECIBIDO
@@ -85,6 +113,8 @@ def get_repairs_dashboard_summary(
     delivered = db.query(func.count(WorkOrder.id)).filter(
         WorkOrder.status == RepairStatus.ENTREGADO
     ).scalar() or 0
+    # Archived orders were all delivered
+    delivered += db.query(func.count(ArchivedWorkOrder.id)).scalar() or 0
     
     # Parts with low stock
     low_stock_parts = db.query(func.count(Part.id)).filter(
@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import List
+from ..schemas.exchange_rate import ExchangeRateCreate, ExchangeRateResponse
+from ..models.exchange_rate import ExchangeRate
+from ..models.user import User
+from ..services.exchange_rates import exchange_rate_cache, record_rate, LOCAL_CURRENCY
+from ..utils.dependencies import get_db, get_read_db, get_current_user, require_admin
+
+router = APIRouter(prefix="/api/exchange-rates", tags=["Exchange Rates"])
+
+
+@router.get("/current", response_model=ExchangeRateResponse)
+def get_current_rate(
+    currency: str = Query(LOCAL_CURRENCY, min_length=3, max_length=3),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the exchange rate currently in effect (served from the in-process cache).
+    
+    Args:
+        currency: Currency code
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Current rate
+        
+    Raises:
+        HTTPException: If no rate has been recorded
+    """
+    current = exchange_rate_cache.get(db, currency.upper())
+    if current is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No exchange rate recorded for {currency.upper()}"
+        )
+    return current
+
+
+@router.get("", response_model=List[ExchangeRateResponse])
+def get_rate_history(
+    currency: str = Query(LOCAL_CURRENCY, min_length=3, max_length=3),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the exchange rate history, newest first.
+    
+    Args:
+        currency: Currency code
+        limit: Maximum number of rates returned
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        List of rates
+    """
+    return db.query(ExchangeRate).filter(
+        ExchangeRate.currency == currency.upper()
+    ).order_by(ExchangeRate.effective_from.desc()).limit(limit).all()
+
+
+@router.post("", response_model=ExchangeRateResponse, status_code=status.HTTP_201_CREATED)
+def create_rate(
+    rate_data: ExchangeRateCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Record a new exchange rate (admin only).
+    
+    Args:
+        rate_data: Rate and optional effective date (defaults to now)
+        db: Database session
+        current_user: Current authenticated admin user
+        
+    Returns:
+        Recorded rate
+        
+    Raises:
+        HTTPException: If a rate already starts at the same moment
+    """
+    try:
+        return record_rate(db, rate_data)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"A {rate_data.currency.upper()} rate already starts at {rate_data.effective_from}"
+        )
@@ -1,24 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..schemas.part import PartCreate, PartUpdate, PartResponse
 from ..models.part import Part
 from ..models.user import User
-from ..utils.dependencies import get_db, get_current_user
+from ..utils.dependencies import get_db, get_read_db, get_current_user
+from ..utils.serialization import schema_columns, to_records, json_response
+from ..utils.etag import listing_etag, etag_matches, not_modified, cache_headers
+from ..utils.uploads import store_uploaded_image
+from ..services.audit import audit_log, created, updated, deleted, CREATE, UPDATE, DELETE
 
 router = APIRouter(prefix="/api/parts", tags=["Parts"])
 
 
 @router.get("", response_model=List[PartResponse])
 def get_parts(
+    request: Request,
     q: Optional[str] = Query(None, description="Search query for name or SKU"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all parts with optional search.
     
+    Supports conditional requests: a matching If-None-Match returns
+    304 Not Modified without querying the listing.
+    
     Args:
+        request: Incoming request (for If-None-Match)
         q: Optional search query
         db: Database session
         current_user: Current authenticated user
@@ -26,16 +36,29 @@ def get_parts(
     Returns:
         List of parts
     """
-    query = db.query(Part)
-    
+    filters = []
     if q:
         search_filter = f"%{q}%"
-        query = query.filter(
+        filters.append(
             (Part.name.ilike(search_filter)) | (Part.sku.ilike(search_filter))
         )
     
-    parts = query.all()
-    return parts
+    etag = listing_etag(
+        db, "parts",
+        [func.count(Part.id), func.max(Part.id), func.sum(Part.row_version),
+         func.max(func.coalesce(Part.updated_at, Part.created_at))],
+        filters, {"q": q}
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    # Project only the response columns and encode them directly,
+    # skipping ORM hydration and response_model re-validation
+    fields, columns = schema_columns(PartResponse, Part)
+    query = select(*columns).where(*filters)
+    
+    parts = to_records(fields, fields, db.execute(query))
+    return json_response(parts, headers=cache_headers(etag))
 
 
 @router.post("", response_model=PartResponse, status_code=status.HTTP_201_CREATED)
@@ -56,7 +79,7 @@ def create_part(
         Created part
         
     Raises:
-        HTTPException: If SKU already exists
+        HTTPException: If SKU or barcode already exists
     """
     # Check if SKU already exists
     existing_part = db.query(Part).filter(Part.sku == part.sku).first()
@@ -66,8 +89,16 @@ def create_part(
             detail=f"Part with SKU {part.sku} already exists"
         )
     
+    # Check if barcode already exists
+    if part.barcode and db.query(Part).filter(Part.barcode == part.barcode).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Part with barcode {part.barcode} already exists"
+        )
+    
     db_part = Part(**part.model_dump())
     db.add(db_part)
+    audit_log.record(db, current_user, CREATE, "part", db_part, changes=created(part.model_dump(exclude_unset=True)))
     db.commit()
     db.refresh(db_part)
     return db_part
@@ -93,7 +124,7 @@ def update_part(
         Updated part
         
     Raises:
-        HTTPException: If part not found or SKU conflict
+        HTTPException: If part not found, or SKU or barcode conflict
     """
     db_part = db.query(Part).filter(Part.id == part_id).first()
     
@@ -112,8 +143,17 @@ def update_part(
                 detail=f"Part with SKU {part.sku} already exists"
             )
     
+    # Check barcode conflict if updating barcode
+    if part.barcode and part.barcode != db_part.barcode:
+        if db.query(Part).filter(Part.barcode == part.barcode).first():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Part with barcode {part.barcode} already exists"
+            )
+    
     # Update only provided fields
     update_data = part.model_dump(exclude_unset=True)
+    audit_log.record(db, current_user, UPDATE, "part", db_part, changes=updated(db_part, update_data))
     for field, value in update_data.items():
         setattr(db_part, field, value)
     
@@ -122,6 +162,47 @@ def update_part(
     return db_part
 
 
+@router.post("/{part_id}/image", response_model=PartResponse)
+def upload_part_image(
+    part_id: int,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Upload a part image.
+    
+    The image is stored under its content hash and thumbnails are
+    rendered in the background.
+    
+    Args:
+        part_id: Part ID
+        file: Image file (JPEG, PNG or WebP)
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Updated part
+        
+    Raises:
+        HTTPException: If part not found or the image is invalid
+    """
+    db_part = db.query(Part).filter(Part.id == part_id).first()
+    
+    if not db_part:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Part with id {part_id} not found"
+        )
+    
+    image_url = store_uploaded_image(file, "parts")
+    audit_log.record(db, current_user, UPDATE, "part", db_part, changes=updated(db_part, {"image_url": image_url}))
+    db_part.image_url = image_url
+    db.commit()
+    db.refresh(db_part)
+    return db_part
+
+
 @router.delete("/{part_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_part(
     part_id: int,
@@ -147,6 +228,7 @@ def delete_part(
             detail=f"Part with id {part_id} not found"
         )
     
+    audit_log.record(db, current_user, DELETE, "part", db_part, changes=deleted(db_part))
     db.delete(db_part)
     db.commit()
     return None
@@ -1,24 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..schemas.product import ProductCreate, ProductUpdate, ProductResponse
 from ..models.product import Product
 from ..models.user import User
-from ..utils.dependencies import get_db, get_current_user, require_admin
+from ..utils.dependencies import get_db, get_read_db, get_current_user, require_admin
+from ..utils.serialization import schema_columns, to_records, json_response
+from ..utils.etag import listing_etag, etag_matches, not_modified, cache_headers
+from ..utils.uploads import store_uploaded_image
+from ..services.audit import audit_log, created, updated, deleted, CREATE, UPDATE, DELETE
 
 router = APIRouter(prefix="/api/products", tags=["Products"])
 
 
 @router.get("", response_model=List[ProductResponse])
 def get_products(
+    request: Request,
     q: Optional[str] = Query(None, description="Search query for name or brand"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all products with optional search.
     
+    Supports conditional requests: a matching If-None-Match returns
+    304 Not Modified without querying the listing.
+    
     Args:
+        request: Incoming request (for If-None-Match)
         q: Optional search query
         db: Database session
         current_user: Current authenticated user
@@ -26,16 +36,29 @@ def get_products(
     Returns:
         List of products
     """
-    query = db.query(Product)
-    
+    filters = []
     if q:
         search_filter = f"%{q}%"
-        query = query.filter(
+        filters.append(
             (Product.name.ilike(search_filter)) | (Product.brand.ilike(search_filter))
         )
     
-    products = query.all()
-    return products
+    etag = listing_etag(
+        db, "products",
+        [func.count(Product.id), func.max(Product.id), func.sum(Product.row_version),
+         func.max(func.coalesce(Product.updated_at, Product.created_at))],
+        filters, {"q": q}
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    # Project only the response columns and encode them directly,
+    # skipping ORM hydration and response_model re-validation
+    fields, columns = schema_columns(ProductResponse, Product)
+    query = select(*columns).where(*filters)
+    
+    products = to_records(fields, fields, db.execute(query))
+    return json_response(products, headers=cache_headers(etag))
 
 
 @router.post("", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
@@ -54,9 +77,20 @@ def create_product(
         
     Returns:
         Created product
+        
+    Raises:
+        HTTPException: If the barcode already exists
     """
+    # Check if barcode already exists
+    if product.barcode and db.query(Product).filter(Product.barcode == product.barcode).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Product with barcode {product.barcode} already exists"
+        )
+    
     db_product = Product(**product.model_dump())
     db.add(db_product)
+    audit_log.record(db, current_user, CREATE, "product", db_product, changes=created(product.model_dump(exclude_unset=True)))
     db.commit()
     db.refresh(db_product)
     return db_product
@@ -82,7 +116,7 @@ def update_product(
         Updated product
         
     Raises:
-        HTTPException: If product not found
+        HTTPException: If product not found or barcode conflict
     """
     db_product = db.query(Product).filter(Product.id == product_id).first()
     
@@ -92,8 +126,17 @@ def update_product(
             detail=f"Product with id {product_id} not found"
         )
     
+    # Check barcode conflict if updating barcode
+    if product.barcode and product.barcode != db_product.barcode:
+        if db.query(Product).filter(Product.barcode == product.barcode).first():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Product with barcode {product.barcode} already exists"
+            )
+    
     # Update only provided fields
     update_data = product.model_dump(exclude_unset=True)
+    audit_log.record(db, current_user, UPDATE, "product", db_product, changes=updated(db_product, update_data))
     for field, value in update_data.items():
         setattr(db_product, field, value)
     
@@ -102,6 +145,47 @@ def update_product(
     return db_product
 
 
+@router.post("/{product_id}/image", response_model=ProductResponse)
+def upload_product_image(
+    product_id: int,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Upload a product image (admin only).
+    
+    The image is stored under its content hash and thumbnails are
+    rendered in the background.
+    
+    Args:
+        product_id: Product ID
+        file: Image file (JPEG, PNG or WebP)
+        db: Database session
+        current_user: Current authenticated admin user
+        
+    Returns:
+        Updated product
+        
+    Raises:
+        HTTPException: If product not found or the image is invalid
+    """
+    db_product = db.query(Product).filter(Product.id == product_id).first()
+    
+    if not db_product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product with id {product_id} not found"
+        )
+    
+    image_url = store_uploaded_image(file, "products")
+    audit_log.record(db, current_user, UPDATE, "product", db_product, changes=updated(db_product, {"image_url": image_url}))
+    db_product.image_url = image_url
+    db.commit()
+    db.refresh(db_product)
+    return db_product
+
+
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_product(
     product_id: int,
@@ -127,6 +211,7 @@ def delete_product(
             detail=f"Product with id {product_id} not found"
         )
     
+    audit_log.record(db, current_user, DELETE, "product", db_product, changes=deleted(db_product))
     db.delete(db_product)
     db.commit()
     return None
@@ -0,0 +1,109 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Literal, Optional
+from ..models.money import Money, money_sum
+from ..models.store import Store, ALL_STORES
+from ..models.ticket import Ticket, PaymentStatus
+from ..models.user import User
+from ..services.archive import report_tickets, period_conditions
+from ..services.exchange_rates import ticket_rate, convert_minor, ticket_debt_minor, BASE_CURRENCY
+from ..utils.dependencies import get_read_db, get_current_user, require_admin
+
+router = APIRouter(prefix="/api/reports", tags=["Reports"])
+
+
+def _sales_totals(currency: str, ticket=Ticket) -> list:
+    """Ticket count, total sold, paid total and amount owed, in ``currency``"""
+    rate = ticket_rate(ticket=ticket)
+    total = convert_minor(ticket.total, BASE_CURRENCY, currency, rate)
+    money_type = Money(currency, asdecimal=False)
+    return [
+        func.count(ticket.id),
+        money_sum(total, money_type),
+        money_sum(case((ticket.payment_status == PaymentStatus.PAID, total), else_=0), money_type),
+        money_sum(
+            case((ticket.payment_status != PaymentStatus.PAID, ticket_debt_minor(currency, rate, ticket)), else_=0),
+            money_type
+        )
+    ]
+
+
+@router.get("/sales", response_model=dict)
+def get_sales_report(
+    currency: Literal["USD", "VES"] = Query("USD"),
+    start_date: Optional[datetime] = Query(None, description="Only tickets sold on or after this moment"),
+    end_date: Optional[datetime] = Query(None, description="Only tickets sold before this moment"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get sales totals in USD or VES, computed in a single SQL query.
+    
+    Each ticket is converted at the exchange rate in effect when it was sold.
+    Archived tickets are included only when the period reaches them.
+    
+    Args:
+        currency: Currency of the returned totals
+        start_date: Optional start of the period
+        end_date: Optional end of the period (exclusive)
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Ticket count, total sold, total of paid tickets and amount still owed
+    """
+    ticket = report_tickets(db, start_date, end_date)
+    query = db.query(*_sales_totals(currency, ticket)).filter(*period_conditions(ticket, start_date, end_date))
+    
+    tickets, total_sales, paid_sales, outstanding = query.one()
+    return {
+        "currency": currency,
+        "tickets": tickets,
+        "total": total_sales,
+        "paid_total": paid_sales,
+        "outstanding": outstanding
+    }
+
+
+@router.get("/sales/by-store", response_model=List[dict])
+def get_sales_report_by_store(
+    currency: Literal["USD", "VES"] = Query("USD"),
+    start_date: Optional[datetime] = Query(None, description="Only tickets sold on or after this moment"),
+    end_date: Optional[datetime] = Query(None, description="Only tickets sold before this moment"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Get the sales totals of every store in a single grouped query (admin only).
+    
+    Args:
+        currency: Currency of the returned totals
+        start_date: Optional start of the period
+        end_date: Optional end of the period (exclusive)
+        db: Database session
+        current_user: Current authenticated admin user
+        
+    Returns:
+        One row per store, including stores without sales
+    """
+    ticket = report_tickets(db, start_date, end_date, all_stores=True)
+    # The period goes in the join so stores without sales still get a row
+    query = db.query(Store.id, Store.name, *_sales_totals(currency, ticket)).outerjoin(
+        ticket, and_(ticket.store_id == Store.id, *period_conditions(ticket, start_date, end_date))
+    )
+    rows = query.group_by(Store.id, Store.name).order_by(Store.id).execution_options(**{ALL_STORES: True}).all()
+    
+    return [
+        {
+            "store_id": store_id,
+            "store_name": store_name,
+            "currency": currency,
+            "tickets": tickets,
+            "total": total_sales,
+            "paid_total": paid_sales,
+            "outstanding": outstanding
+        }
+        for store_id, store_name, tickets, total_sales, paid_sales, outstanding in rows
+    ]
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from ..models.store import get_store_scope
+from ..models.user import User
+from ..schemas.catalog import ScanResponse
+from ..services.catalog import catalog, PRODUCT, PART
+from ..utils.dependencies import get_db, get_current_user
+from ..utils.serialization import json_response
+
+router = APIRouter(prefix="/api/scan", tags=["Scan"])
+
+
+@router.get("/{code}", response_model=ScanResponse)
+def scan_code(
+    code: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the product or part a scanned barcode (or part SKU) belongs to.
+    
+    Resolved from the in-memory catalog's hash maps (see GET /api/catalog):
+    a product barcode first, then a part barcode, then a part SKU.
+    
+    Args:
+        code: Scanned code
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Kind of record and the product or part
+        
+    Raises:
+        HTTPException: If no product or part has the code
+    """
+    store_id = get_store_scope(db) or current_user.store_id
+    found = catalog.scan(db, store_id, code)
+    
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No product or part with code {code}"
+        )
+    
+    kind, record = found
+    return json_response({
+        "kind": kind,
+        "product": record if kind == PRODUCT else None,
+        "part": record if kind == PART else None,
+    })
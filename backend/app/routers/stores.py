@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import List
+from ..schemas.store import StoreCreate, StoreResponse
+from ..models.store import Store
+from ..models.user import User
+from ..utils.dependencies import get_db, get_current_user, require_admin
+
+router = APIRouter(prefix="/api/stores", tags=["Stores"])
+
+
+@router.get("", response_model=List[StoreResponse])
+def get_stores(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get list of all stores (branches).
+    
+    Args:
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        List of stores
+    """
+    return db.query(Store).order_by(Store.id).all()
+
+
+@router.post("", response_model=StoreResponse, status_code=status.HTTP_201_CREATED)
+def create_store(
+    store: StoreCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Create a new store (admin only).
+    
+    Args:
+        store: Store data
+        db: Database session
+        current_user: Current authenticated admin user
+        
+    Returns:
+        Created store
+        
+    Raises:
+        HTTPException: If a store with the same name exists
+    """
+    db_store = Store(name=store.name)
+    db.add(db_store)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Store {store.name} already exists"
+        )
+    db.refresh(db_store)
+    return db_store
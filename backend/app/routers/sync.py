@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from ..schemas.ticket import TicketSyncRequest, TicketSyncResult, TicketSyncResponse
+from ..models.user import User
+from ..services.sales import apply_sales, PendingSale, APPLIED, REPLAYED, FAILED
+from ..utils.dependencies import get_db, get_current_user
+
+router = APIRouter(prefix="/api/sync", tags=["Sync"])
+
+
+@router.post("/tickets", response_model=TicketSyncResponse)
+def sync_tickets(
+    batch: TicketSyncRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply a batch of sales queued by a POS terminal while offline.
+    
+    The batch is applied in one transaction. Each sale carries a
+    client-generated idempotency key: keys that were already applied are
+    replayed, and sales that fail (unknown product, insufficient stock)
+    are reported without affecting the rest of the batch.
+    
+    Args:
+        batch: Queued sales, in the order they were made
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Per-sale results and totals
+    """
+    sales = [
+        PendingSale(ticket_data=sale, idempotency_key=sale.idempotency_key, sold_at=sale.sold_at)
+        for sale in batch.sales
+    ]
+    results = apply_sales(db, sales, current_user)
+    
+    response_results = [
+        TicketSyncResult(
+            idempotency_key=result.idempotency_key,
+            status=result.status,
+            status_code=result.status_code,
+            ticket_id=result.ticket_id,
+            error=result.error.detail if result.error else None
+        )
+        for result in results
+    ]
+    
+    return TicketSyncResponse(
+        results=response_results,
+        applied=sum(1 for result in results if result.status == APPLIED),
+        replayed=sum(1 for result in results if result.status == REPLAYED),
+        failed=sum(1 for result in results if result.status == FAILED)
+    )
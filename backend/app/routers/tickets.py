@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Header
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
-from typing import List
-import uuid
-from ..schemas.ticket import TicketCreate, TicketResponse
+from typing import List, Optional
+from collections import defaultdict
+from ..schemas.ticket import TicketCreate, TicketResponse, TicketItemResponse
 from ..models.ticket import Ticket, TicketItem, PaymentStatus
-from ..models.product import Product
+from ..models.archive import ArchivedTicket
 from ..models.user import User
-from ..utils.dependencies import get_db, get_current_user
+from ..services.archive import find_ticket
+from ..services.audit import audit_log, updated, UPDATE
+from ..services.sales import apply_sales, PendingSale, REPLAYED
+from ..utils.dependencies import get_db, get_read_db, get_current_user
+from ..utils.serialization import schema_columns, to_records, json_response
+from ..utils.etag import listing_etag, etag_matches, not_modified, cache_headers
 
 router = APIRouter(prefix="/api/tickets", tags=["Tickets"])
 
@@ -14,14 +20,21 @@ router = APIRouter(prefix="/api/tickets", tags=["Tickets"])
 @router.post("", response_model=TicketResponse, status_code=status.HTTP_201_CREATED)
 def create_ticket(
     ticket_data: TicketCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=100),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Create a new ticket/sale and update product stock.
     
+    When an Idempotency-Key header is sent, retrying the same request
+    returns the original ticket instead of selling twice.
+    
     Args:
         ticket_data: Ticket data with items
+        response: Outgoing response (for the replay header)
+        idempotency_key: Optional client-generated key for safe retries
         db: Database session
         current_user: Current authenticated user
         
@@ -29,96 +42,88 @@ def create_ticket(
         Created ticket
         
     Raises:
-        HTTPException: If product not found or insufficient stock
+        HTTPException: If product not found, insufficient stock or the
+            idempotency key was used for a different sale
     """
-    # Calculate totals
-    subtotal = 0.0
-    ticket_items = []
-    
-    for item in ticket_data.items:
-        # Get product
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        if not product:
+    result = apply_sales(
+        db, [PendingSale(ticket_data=ticket_data, idempotency_key=idempotency_key)], current_user
+    )[0]
+    
+    if result.error:
+        raise HTTPException(
+            status_code=result.error.status_code,
+            detail=result.error.detail
+        )
+    
+    if result.status == REPLAYED:
+        response.headers["Idempotent-Replayed"] = "true"
+        ticket = find_ticket(db, result.ticket_id)
+        if not ticket:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Product with id {item.product_id} not found"
+                detail=f"Ticket for idempotency key {idempotency_key} no longer exists"
             )
-        
-        # Check stock
-        if product.stock < item.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient stock for product {product.name}. Available: {product.stock}, Requested: {item.quantity}"
-            )
-        
-        # Calculate item total
-        item_total = product.price * item.quantity
-        subtotal += item_total
-        
-        # Create ticket item
-        ticket_items.append({
-            "product_id": item.product_id,
-            "quantity": item.quantity,
-            "price": product.price
-        })
-        
-        # Update product stock
-        product.stock -= item.quantity
-    
-    # No additional tax - prices already include tax
-    tax = 0.0
-    total = subtotal
-    
-    # Create ticket
-    db_ticket = Ticket(
-        id=str(uuid.uuid4()),
-        customer_name=ticket_data.customer_name,
-        payment_method=ticket_data.payment_method,
-        payment_status=PaymentStatus(ticket_data.payment_status),
-        subtotal=subtotal,
-        tax=tax,
-        total=total,
-        exchange_rate=ticket_data.exchange_rate,
-        amount_usd=ticket_data.amount_usd,
-        amount_ves=ticket_data.amount_ves
-    )
-    
-    db.add(db_ticket)
-    db.flush()  # Flush to get the ticket ID
+        return ticket
     
-    # Create ticket items
-    for item_data in ticket_items:
-        db_item = TicketItem(ticket_id=db_ticket.id, **item_data)
-        db.add(db_item)
-    
-    db.commit()
-    db.refresh(db_ticket)
-    
-    return db_ticket
+    db.refresh(result.ticket)
+    return result.ticket
 
 
 @router.get("", response_model=List[TicketResponse])
 def get_tickets(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all tickets.
     
+    Supports conditional requests: a matching If-None-Match returns
+    304 Not Modified without querying the listing.
+    
     Args:
+        request: Incoming request (for If-None-Match)
         db: Database session
         current_user: Current authenticated user
         
     Returns:
         List of tickets
     """
-    tickets = db.query(Ticket).order_by(Ticket.date.desc()).all()
-    return tickets
+    etag = listing_etag(
+        db, "tickets",
+        [func.count(Ticket.id), func.max(Ticket.updated_at), func.sum(Ticket.row_version)]
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    # Project only the response columns and encode them directly,
+    # skipping ORM hydration and response_model re-validation.
+    # Items are fetched in one query instead of one lazy load per ticket,
+    # joined to the listed tickets (which also applies the store filter).
+    fields = list(TicketResponse.model_fields)
+    column_names, ticket_columns = schema_columns(TicketResponse, Ticket, exclude=["items"])
+    item_fields, item_columns = schema_columns(TicketItemResponse, TicketItem)
+    
+    items_by_ticket = defaultdict(list)
+    item_rows = db.execute(
+        select(TicketItem.ticket_id, *item_columns)
+        .join(Ticket, Ticket.id == TicketItem.ticket_id)
+        .order_by(TicketItem.id)
+    )
+    for ticket_id, *values in item_rows:
+        items_by_ticket[ticket_id].append(dict(zip(item_fields, values)))
+    
+    rows = db.execute(select(*ticket_columns).order_by(Ticket.date.desc()))
+    tickets = to_records(
+        fields, column_names, rows,
+        nested={"items": lambda ticket: items_by_ticket.get(ticket["id"], [])}
+    )
+    return json_response(tickets, headers=cache_headers(etag))
 
 
 @router.get("/delinquents", response_model=List[TicketResponse])
 def get_delinquent_tickets(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -144,7 +149,7 @@ def get_ticket(
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get a specific ticket by ID.
+    Get a specific ticket by ID, including archived tickets.
     
     Args:
         ticket_id: Ticket ID
@@ -157,7 +162,7 @@ def get_ticket(
     Raises:
         HTTPException: If ticket not found
     """
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket = find_ticket(db, ticket_id)
     
     if not ticket:
         raise HTTPException(
@@ -188,7 +193,7 @@ def mark_ticket_as_paid(
     Raises:
         HTTPException: If ticket not found
     """
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket = find_ticket(db, ticket_id)
     
     if not ticket:
         raise HTTPException(
@@ -196,6 +201,14 @@ def mark_ticket_as_paid(
             detail=f"Ticket with id {ticket_id} not found"
         )
     
+    if isinstance(ticket, ArchivedTicket):
+        # Only fully paid tickets are archived
+        return ticket
+    
+    audit_log.record(
+        db, current_user, UPDATE, "ticket", ticket,
+        changes=updated(ticket, {"payment_status": PaymentStatus.PAID})
+    )
     ticket.payment_status = PaymentStatus.PAID
     db.commit()
     db.refresh(ticket)
@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from ..schemas.user import UserCreate, UserUpdate, PasswordChange, UserResponse, UserListResponse
+from ..models.store import Store, ALL_STORES
 from ..models.user import User, UserRole
 from ..utils.dependencies import get_db, get_current_user
+from ..services.audit import audit_log, created, updated, deleted, CREATE, UPDATE, DELETE, REDACTED
 from ..utils.security import get_password_hash, verify_password
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
@@ -46,6 +48,7 @@ def get_users(
             id=user.id,
             username=user.username,
             role=user.role.value,
+            store_id=user.store_id,
             created_at=user.created_at.isoformat() if user.created_at else ""
         )
         for user in users
@@ -81,23 +84,33 @@ def create_user(
             detail="Not authorized to create users"
         )
     
-    # Check if username already exists
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
+    # Check if username already exists (usernames are unique across stores)
+    existing_user = db.query(User).filter(
+        User.username == user_data.username
+    ).execution_options(**{ALL_STORES: True}).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already exists"
         )
     
-    # Create new user
+    if user_data.store_id is not None and db.get(Store, user_data.store_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Store {user_data.store_id} not found"
+        )
+    
+    # Create new user (in the admin's own store unless another is given)
     hashed_password = get_password_hash(user_data.password)
     new_user = User(
         username=user_data.username,
         hashed_password=hashed_password,
-        role=user_data.role
+        role=user_data.role,
+        store_id=user_data.store_id
     )
     
     db.add(new_user)
+    audit_log.record(db, current_user, CREATE, "user", new_user, changes=created(user_data.model_dump(exclude_unset=True)))
     db.commit()
     db.refresh(new_user)
     
@@ -105,6 +118,7 @@ def create_user(
         id=new_user.id,
         username=new_user.username,
         role=new_user.role.value,
+        store_id=new_user.store_id,
         created_at=new_user.created_at.isoformat() if new_user.created_at else ""
     )
 
@@ -146,13 +160,15 @@ def update_user(
             detail="User not found"
         )
     
+    changes = updated(user, user_data.model_dump(exclude_unset=True, exclude_none=True))
+    
     # Update fields
     if user_data.username:
         # Check if new username already exists
         existing = db.query(User).filter(
             User.username == user_data.username,
             User.id != user_id
-        ).first()
+        ).execution_options(**{ALL_STORES: True}).first()
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -163,6 +179,7 @@ def update_user(
     if user_data.role:
         user.role = user_data.role
     
+    audit_log.record(db, current_user, UPDATE, "user", user, changes=changes)
     db.commit()
     db.refresh(user)
     
@@ -170,6 +187,7 @@ def update_user(
         id=user.id,
         username=user.username,
         role=user.role.value,
+        store_id=user.store_id,
         created_at=user.created_at.isoformat() if user.created_at else ""
     )
 
@@ -228,6 +246,7 @@ def change_password(
             )
     
     # Update password
+    audit_log.record(db, current_user, UPDATE, "user", user, changes={"password": [REDACTED, REDACTED]})
     user.hashed_password = get_password_hash(password_data.new_password)
     db.commit()
     
@@ -276,6 +295,7 @@ def delete_user(
             detail="User not found"
         )
     
+    audit_log.record(db, current_user, DELETE, "user", user, changes=deleted(user))
     db.delete(user)
     db.commit()
     
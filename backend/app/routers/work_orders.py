@@ -1,18 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request
+from sqlalchemy import select, func, type_coerce, union_all, and_, or_, insert, update
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from datetime import datetime
+import base64
 import uuid
-from ..schemas.work_order import WorkOrderCreate, WorkOrderUpdate, WorkOrderResponse
+from ..schemas.work_order import (
+    WorkOrderCreate, WorkOrderUpdate, WorkOrderResponse, WorkOrderBoardColumn, WorkOrderBoard,
+    WorkOrderBulkStatusRequest, WorkOrderBulkStatusResponse
+)
+from ..config import settings
 from ..models.work_order import WorkOrder, RepairStatus
+from ..models.money import Money, money_sum
+from ..models.archive import ArchivedWorkOrder
+from ..models.work_order_event import WorkOrderStatusEvent
+from ..models.store import ALL_STORES
 from ..models.user import User
-from ..utils.dependencies import get_db, get_current_user
+from ..services.archive import find_work_order, is_archived_work_order
+from ..services.audit import audit_log, created, updated, deleted, CREATE, UPDATE, DELETE
+from ..services.customers import link_customer
+from ..services.status_history import record_status_change
+from ..utils.dependencies import get_db, get_read_db, get_current_user
+from ..utils.serialization import schema_columns, to_records, json_response
+from ..utils.etag import listing_etag, etag_matches, not_modified, cache_headers
 
 router = APIRouter(prefix="/api/work-orders", tags=["Work Orders"])
 
+CUSTOMER_FIELDS = {"customer_name", "customer_phone", "customer_id"}
+
+# Columns the board fills on load; delivered orders are only counted
+BOARD_STATUSES = [repair_status for repair_status in RepairStatus if repair_status != RepairStatus.ENTREGADO]
+
 
 @router.get("/delinquent", response_model=List[dict])
 def get_delinquent_customers(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -22,9 +44,9 @@ def get_delinquent_customers(
         List of customers with their total debt and unpaid orders
     """
     from ..models.work_order import PaymentStatus as WOPaymentStatus
-    from ..models.ticket import Ticket, PaymentStatus as TicketPaymentStatus
+    from ..models.ticket import Ticket, TicketItem, PaymentStatus as TicketPaymentStatus
+    from ..services.exchange_rates import ticket_debt_minor
     from collections import defaultdict
-    from datetime import datetime
     
     # Get all delivered orders that are not fully paid
     unpaid_orders = db.query(WorkOrder).filter(
@@ -32,14 +54,27 @@ def get_delinquent_customers(
         WorkOrder.payment_status.in_([WOPaymentStatus.PENDIENTE, WOPaymentStatus.PAGO_PARCIAL, WOPaymentStatus.VENCIDO])
     ).all()
     
-    # Get all unpaid tickets
-    unpaid_tickets = db.query(Ticket).filter(
+    # Unpaid tickets, with the debt converted at the rate in effect at sale time in SQL
+    item_count = select(func.count(TicketItem.id)).where(
+        TicketItem.ticket_id == Ticket.id
+    ).scalar_subquery()
+    unpaid_tickets = db.query(
+        Ticket.id, Ticket.customer_name, Ticket.customer_ref_id, Ticket.payment_status, Ticket.date,
+        type_coerce(ticket_debt_minor(), Money("USD", asdecimal=False)).label("debt"),
+        item_count.label("item_count")
+    ).filter(
         Ticket.payment_status.in_([TicketPaymentStatus.PENDING, TicketPaymentStatus.PARTIAL, TicketPaymentStatus.OVERDUE])
     ).all()
     
-    # Group by customer
+    # Group by customer record, or by name for sales and repairs without one
+    def customer_key_of(record):
+        if record.customer_ref_id is not None:
+            return ("customer", record.customer_ref_id)
+        return ("name", record.customer_name)
+    
     customers_debt = defaultdict(lambda: {
         'customer_name': '',
+        'customer_ref_id': None,
         'customer_phone': None,
         'customer_id': None,
         'total_debt': 0.0,
@@ -49,10 +84,11 @@ def get_delinquent_customers(
     
     # Process Work Orders
     for order in unpaid_orders:
-        debt = float(order.repair_cost or 0) - float(order.amount_paid or 0)
+        debt = float((order.repair_cost or 0) - (order.amount_paid or 0))
         
-        customer_key = order.customer_name
+        customer_key = customer_key_of(order)
         customers_debt[customer_key]['customer_name'] = order.customer_name
+        customers_debt[customer_key]['customer_ref_id'] = order.customer_ref_id
         # Prioritize phone/id from work order if available
         if order.customer_phone:
             customers_debt[customer_key]['customer_phone'] = order.customer_phone
@@ -72,31 +108,19 @@ def get_delinquent_customers(
         
     # Process Tickets
     for ticket in unpaid_tickets:
-        # For tickets, debt is total - (amount_usd * rate + amount_ves) roughly, 
-        # but simpler is total - paid. 
-        # Assuming total is the final amount and we need to calculate paid.
-        # If payment_status is PENDING, paid is 0.
-        # If PARTIAL, we need to know how much was paid. 
-        # Ticket model has amount_usd and amount_ves which represent what was paid.
-        
-        paid_amount = (ticket.amount_usd or 0) * (ticket.exchange_rate or 1) + (ticket.amount_ves or 0)
-        # If exchange rate is not stored for USD, we might have an issue, but let's assume it is.
-        # Actually, let's look at how total is calculated. 
-        # If total is in VES (base currency), then debt = total - paid_in_ves_equivalent.
-        
-        debt = float(ticket.total) - float(paid_amount)
-        if debt < 0: debt = 0 # Safety check
+        debt = ticket.debt
         
-        customer_key = ticket.customer_name
+        customer_key = customer_key_of(ticket)
         if not customers_debt[customer_key]['customer_name']:
              customers_debt[customer_key]['customer_name'] = ticket.customer_name
+        customers_debt[customer_key]['customer_ref_id'] = ticket.customer_ref_id
              
         customers_debt[customer_key]['total_debt'] += debt
         customers_debt[customer_key]['orders_count'] += 1
         customers_debt[customer_key]['orders'].append({
             'type': 'sale',
             'code': f"T-{ticket.id[:8]}",
-            'device': f"Venta ({len(ticket.items)} items)",
+            'device': f"Venta ({ticket.item_count} items)",
             'debt': debt,
             'payment_status': ticket.payment_status,
             'received_date': ticket.date.isoformat() if ticket.date else None
@@ -114,7 +138,7 @@ def get_delinquent_customers(
 
 @router.get("/payment-stats", response_model=dict)
 def get_payment_statistics(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -124,32 +148,40 @@ def get_payment_statistics(
         Dictionary with payment statistics
     """
     from ..models.work_order import PaymentStatus
-    from sqlalchemy import func
     
-    # Get all orders
-    all_orders = db.query(WorkOrder).all()
+    # Exact per-status sums of integer cents, computed in SQL
+    totals = {
+        payment_status: (count, repair_cost, amount_paid)
+        for payment_status, count, repair_cost, amount_paid in db.query(
+            WorkOrder.payment_status,
+            func.count(WorkOrder.id),
+            money_sum(WorkOrder.repair_cost),
+            money_sum(WorkOrder.amount_paid)
+        ).group_by(WorkOrder.payment_status)
+    }
     
-    total_pending = 0.0
-    total_paid = 0.0
-    total_partial = 0.0
-    overdue_count = 0
-    overdue_amount = 0.0
+    # Archived orders are all fully paid
+    archived = db.query(
+        func.count(ArchivedWorkOrder.id),
+        money_sum(ArchivedWorkOrder.repair_cost),
+        money_sum(ArchivedWorkOrder.amount_paid)
+    ).one()
+    if archived[0]:
+        totals[PaymentStatus.PAGADO] = tuple(
+            hot + cold for hot, cold in zip(totals.get(PaymentStatus.PAGADO, (0, 0, 0)), archived)
+        )
     
-    for order in all_orders:
-        repair_cost = float(order.repair_cost or 0)
-        amount_paid = float(order.amount_paid or 0)
-        balance = repair_cost - amount_paid
-        
-        if order.payment_status == PaymentStatus.PAGADO:
-            total_paid += repair_cost
-        elif order.payment_status == PaymentStatus.PAGO_PARCIAL:
-            total_partial += balance
-            total_paid += amount_paid
-        elif order.payment_status == PaymentStatus.PENDIENTE:
-            total_pending += balance
-        elif order.payment_status == PaymentStatus.VENCIDO:
-            overdue_amount += balance
-            overdue_count += 1
+    def balance(payment_status):
+        _, repair_cost, amount_paid = totals.get(payment_status, (0, 0, 0))
+        return repair_cost - amount_paid
+    
+    paid = totals.get(PaymentStatus.PAGADO, (0, 0, 0))
+    partial = totals.get(PaymentStatus.PAGO_PARCIAL, (0, 0, 0))
+    total_paid = paid[1] + partial[2]
+    total_partial = balance(PaymentStatus.PAGO_PARCIAL)
+    total_pending = balance(PaymentStatus.PENDIENTE)
+    overdue_amount = balance(PaymentStatus.VENCIDO)
+    overdue_count = totals.get(PaymentStatus.VENCIDO, (0, 0, 0))[0]
     
     # Count unique customers with debt
     customers_with_debt = db.query(WorkOrder.customer_name).filter(
@@ -157,25 +189,30 @@ def get_payment_statistics(
     ).distinct().count()
     
     return {
-        'total_pending': round(total_pending, 2),
-        'total_paid': round(total_paid, 2),
-        'total_partial': round(total_partial, 2),
+        'total_pending': float(total_pending),
+        'total_paid': float(total_paid),
+        'total_partial': float(total_partial),
         'overdue_count': overdue_count,
-        'overdue_amount': round(overdue_amount, 2),
+        'overdue_amount': float(overdue_amount),
         'customers_with_debt': customers_with_debt
     }
 
 
 @router.get("", response_model=List[WorkOrderResponse])
 def get_work_orders(
+    request: Request,
     q: Optional[str] = Query(None, description="Search query for customer name or device"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all work orders with optional search.
     
+    Supports conditional requests: a matching If-None-Match returns
+    304 Not Modified without querying the listing.
+    
     Args:
+        request: Incoming request (for If-None-Match)
         q: Optional search query
         db: Database session
         current_user: Current authenticated user
@@ -183,17 +220,156 @@ def get_work_orders(
     Returns:
         List of work orders
     """
-    query = db.query(WorkOrder)
-    
+    filters = []
     if q:
         search_filter = f"%{q}%"
-        query = query.filter(
+        filters.append(
             (WorkOrder.customer_name.ilike(search_filter)) | 
             (WorkOrder.device.ilike(search_filter))
         )
     
-    work_orders = query.order_by(WorkOrder.received_date.desc()).all()
-    return work_orders
+    etag = listing_etag(
+        db, "work_orders",
+        [func.count(WorkOrder.id), func.sum(WorkOrder.row_version),
+         func.max(func.coalesce(WorkOrder.updated_at, WorkOrder.created_at))],
+        filters, {"q": q}
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    # Project only the response columns and encode them directly,
+    # skipping ORM hydration and response_model re-validation
+    fields, columns = schema_columns(WorkOrderResponse, WorkOrder)
+    query = select(*columns).where(*filters)
+    
+    rows = db.execute(query.order_by(WorkOrder.received_date.desc()))
+    work_orders = to_records(fields, fields, rows)
+    return json_response(work_orders, headers=cache_headers(etag))
+
+
+def _encode_cursor(received_date: datetime, order_id: str) -> str:
+    """Opaque keyset cursor pointing just after a board card"""
+    return base64.urlsafe_b64encode(f"{received_date.isoformat()}|{order_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Parse a cursor made by ``_encode_cursor``"""
+    try:
+        received_date, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(received_date), order_id
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid board cursor"
+        )
+
+
+def _board_page(repair_status: RepairStatus, limit: int, cursor: Optional[str] = None):
+    """
+    One page of a board column, newest first.
+
+    Each page is a range scan of the (store_id, status, received_date) index.
+    One row beyond ``limit`` is fetched to know whether another page exists.
+    """
+    _, columns = schema_columns(WorkOrderResponse, WorkOrder)
+    query = select(*columns).where(WorkOrder.status == repair_status)
+    if cursor:
+        received_date, order_id = _decode_cursor(cursor)
+        query = query.where(or_(
+            WorkOrder.received_date < received_date,
+            and_(WorkOrder.received_date == received_date, WorkOrder.id < order_id)
+        ))
+    return query.order_by(WorkOrder.received_date.desc(), WorkOrder.id.desc()).limit(limit + 1)
+
+
+def _board_column(repair_status: RepairStatus, records: List[dict], limit: int) -> dict:
+    """Board column payload from up to ``limit + 1`` records of a page"""
+    page = records[:limit]
+    next_cursor = None
+    if len(records) > limit:
+        next_cursor = _encode_cursor(page[-1]["received_date"], page[-1]["id"])
+    return {"status": repair_status.value, "orders": page, "next_cursor": next_cursor}
+
+
+@router.get("/board", response_model=WorkOrderBoard)
+def get_work_order_board(
+    limit: int = Query(20, ge=1, le=100, description="Orders per column"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the work order board in one round-trip.
+    
+    Returns the number of orders in every status and the newest ``limit``
+    orders of each active column (every status but "Entregado"). Columns
+    with more orders carry a ``next_cursor`` for ``/board/{status}``.
+    
+    Args:
+        limit: Orders per column
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Status counts and the first page of each active column
+    """
+    counts = dict(
+        db.query(WorkOrder.status, func.count(WorkOrder.id)).group_by(WorkOrder.status).all()
+    )
+    
+    # The first page of every column in a single query: each branch is its
+    # own index range scan with its own LIMIT
+    fields, _ = schema_columns(WorkOrderResponse, WorkOrder)
+    pages = union_all(*[
+        select(_board_page(repair_status, limit).subquery())
+        for repair_status in BOARD_STATUSES
+    ]).subquery("board")
+    rows = db.execute(
+        select(*[pages.c[field] for field in fields])
+        .order_by(pages.c.status, pages.c.received_date.desc(), pages.c.id.desc())
+    )
+    by_status = {repair_status: [] for repair_status in BOARD_STATUSES}
+    for record in to_records(fields, fields, rows):
+        by_status[record["status"]].append(record)
+    
+    return json_response({
+        "counts": {repair_status.value: counts.get(repair_status, 0) for repair_status in RepairStatus},
+        "columns": [
+            _board_column(repair_status, records, limit) for repair_status, records in by_status.items()
+        ]
+    })
+
+
+@router.get("/board/{repair_status}", response_model=WorkOrderBoardColumn)
+def get_work_order_board_column(
+    repair_status: RepairStatus,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(20, ge=1, le=100, description="Orders per page"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get one page of a board column, newest first.
+    
+    Without a cursor this is the first page, which also lets the UI load
+    the "Entregado" column on demand.
+    
+    Args:
+        repair_status: Column status
+        cursor: Cursor returned with the previous page
+        limit: Orders per page
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Orders of the page and the cursor of the next one
+        
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    fields, _ = schema_columns(WorkOrderResponse, WorkOrder)
+    rows = db.execute(_board_page(repair_status, limit, cursor))
+    records = to_records(fields, fields, rows)
+    return json_response(_board_column(repair_status, records, limit))
 
 
 @router.post("", response_model=WorkOrderResponse, status_code=status.HTTP_201_CREATED)
@@ -221,8 +397,15 @@ def create_work_order(
         chars = string.ascii_uppercase + string.digits
         return ''.join(random.choice(chars) for _ in range(length))
     
+    # Codes are unique across stores and across the hot and archive tables
+    def code_taken(code):
+        return any(
+            db.query(model.id).filter(model.code == code).execution_options(**{ALL_STORES: True}).first()
+            for model in (WorkOrder, ArchivedWorkOrder)
+        )
+    
     code = generate_code()
-    while db.query(WorkOrder).filter(WorkOrder.code == code).first():
+    while code_taken(code):
         code = generate_code()
 
     db_work_order = WorkOrder(
@@ -230,12 +413,89 @@ def create_work_order(
         code=code,
         **work_order.model_dump()
     )
+    link_customer(db, db_work_order, work_order.customer_name, work_order.customer_phone, work_order.customer_id)
     db.add(db_work_order)
+    record_status_change(db, db_work_order)
+    audit_log.record(
+        db, current_user, CREATE, "work_order", db_work_order,
+        changes=created(work_order.model_dump(exclude_unset=True))
+    )
     db.commit()
     db.refresh(db_work_order)
     return db_work_order
 
 
+@router.get("/code/{code}", response_model=WorkOrderResponse)
+def get_work_order_by_code(
+    code: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a work order by its short code, including archived orders.
+    
+    Args:
+        code: Work order short code
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Work order details
+        
+    Raises:
+        HTTPException: If work order not found
+    """
+    work_order = find_work_order(db, code=code.upper())
+    if not work_order:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Work order with code {code} not found"
+        )
+    return work_order
+
+
+@router.get("/{order_id}", response_model=WorkOrderResponse)
+def get_work_order(
+    order_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a specific work order by ID, including archived orders.
+    
+    Args:
+        order_id: Work order ID
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Work order details
+        
+    Raises:
+        HTTPException: If work order not found
+    """
+    work_order = find_work_order(db, order_id=order_id)
+    if not work_order:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Work order with id {order_id} not found"
+        )
+    return work_order
+
+
+def _raise_missing(db: Session, order_id: str):
+    """Reject changes to a work order that is not in the hot table"""
+    if is_archived_work_order(db, order_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Work order with id {order_id} is archived and can no longer be changed"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Work order with id {order_id} not found"
+    )
+
+
 @router.put("/{order_id}", response_model=WorkOrderResponse)
 def update_work_order(
     order_id: str,
@@ -256,7 +516,7 @@ def update_work_order(
         Updated work order
         
     Raises:
-        HTTPException: If work order not found
+        HTTPException: If work order not found, or archived (read-only)
     """
     from ..services import notification_service, NotificationTemplates
     import logging
@@ -266,19 +526,27 @@ def update_work_order(
     db_work_order = db.query(WorkOrder).filter(WorkOrder.id == order_id).first()
     
     if not db_work_order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Work order with id {order_id} not found"
-        )
+        _raise_missing(db, order_id)
     
     # Store old status for comparison
     old_status = db_work_order.status
     
     # Update only provided fields
     update_data = work_order.model_dump(exclude_unset=True)
+    audit_log.record(db, current_user, UPDATE, "work_order", db_work_order, changes=updated(db_work_order, update_data))
     for field, value in update_data.items():
         setattr(db_work_order, field, value)
     
+    if CUSTOMER_FIELDS & update_data.keys():
+        link_customer(
+            db, db_work_order,
+            db_work_order.customer_name, db_work_order.customer_phone, db_work_order.customer_id
+        )
+    
+    # Keep the status history in the same transaction as the change
+    if db_work_order.status != old_status:
+        record_status_change(db, db_work_order)
+    
     db.commit()
     db.refresh(db_work_order)
     
@@ -308,7 +576,7 @@ def update_work_order(
             message = NotificationTemplates.repair_delivered(
                 customer_name=db_work_order.customer_name,
                 device=db_work_order.device,
-                warranty_days=8
+                warranty_days=settings.WARRANTY_DAYS
             )
             notification_service.send_notification(
                 phone=db_work_order.customer_phone,
@@ -322,6 +590,140 @@ def update_work_order(
     return db_work_order
 
 
+@router.post("/bulk-status", response_model=WorkOrderBulkStatusResponse)
+def bulk_update_status(
+    request: WorkOrderBulkStatusRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Move many work orders to one status, e.g. "Entregado" at end of day.
+    
+    The orders are read in one query and changed with a single
+    UPDATE ... RETURNING; their status history is inserted in one batch, and
+    the "ready" or "delivered" notifications of the orders that changed are
+    sent as one batch after the response. Orders already in the status are
+    left untouched.
+    
+    Args:
+        request: Target status and the ids and/or codes of the orders
+        background_tasks: Runs the notification batch after the response
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Outcome per requested id or code, and the ones not found
+        
+    Raises:
+        HTTPException: If neither ids nor codes are given
+    """
+    from ..services import notification_service, NotificationTemplates
+    import logging
+    
+    logger = logging.getLogger(__name__)
+    
+    if not request.ids and not request.codes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide the ids or codes of the work orders to change"
+        )
+    
+    new_status = request.status
+    # Codes are stored upper case, as GET /code/{code} looks them up
+    ids = list(dict.fromkeys(request.ids))
+    codes = list(dict.fromkeys(code.upper() for code in request.codes))
+    
+    query = select(WorkOrder.id, WorkOrder.code, WorkOrder.status).where(
+        or_(WorkOrder.id.in_(ids), WorkOrder.code.in_(codes))
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        # Keep the previous statuses current until the update
+        query = query.with_for_update()
+    found = db.execute(query).all()
+    by_id = {order.id: order for order in found}
+    by_code = {order.code: order for order in found if order.code}
+    
+    changed = []
+    if found:
+        changed = db.execute(
+            update(WorkOrder)
+            .where(WorkOrder.id.in_(by_id), WorkOrder.status != new_status)
+            .values(status=new_status)
+            .returning(WorkOrder.id, WorkOrder.code, WorkOrder.store_id, WorkOrder.customer_name,
+                       WorkOrder.customer_phone, WorkOrder.device),
+            execution_options={"synchronize_session": False}
+        ).all()
+    
+    if changed:
+        # Keep the status history in the same transaction as the change
+        db.execute(insert(WorkOrderStatusEvent), [
+            {"work_order_id": order.id, "status": new_status, "device": order.device, "store_id": order.store_id}
+            for order in changed
+        ])
+        for order in changed:
+            audit_log.record(db, current_user, UPDATE, "work_order", entity_id=order.id,
+                             changes=updated(by_id[order.id], {"status": new_status}))
+    db.commit()
+    
+    # Requested orders that are not in the hot table may have been archived
+    missing_ids = [key for key in ids if key not in by_id]
+    missing_codes = [key for key in codes if key not in by_code]
+    archived = set()
+    if missing_ids or missing_codes:
+        for order_id, code in db.execute(
+            select(ArchivedWorkOrder.id, ArchivedWorkOrder.code).where(
+                or_(ArchivedWorkOrder.id.in_(missing_ids), ArchivedWorkOrder.code.in_(missing_codes))
+            )
+        ):
+            archived.update({order_id, code})
+    
+    changed_ids = {order.id for order in changed}
+    results, not_found = [], []
+    for key, order in [(key, by_id.get(key)) for key in ids] + [(key, by_code.get(key)) for key in codes]:
+        if order is None:
+            result = "archived" if key in archived else "not_found"
+            if result == "not_found":
+                not_found.append(key)
+            results.append({"key": key, "result": result})
+            continue
+        results.append({
+            "key": key,
+            "result": "updated" if order.id in changed_ids else "unchanged",
+            "id": order.id,
+            "code": order.code,
+            "previous_status": order.status.value,
+        })
+    
+    # Notify customers of ready or delivered repairs, in one batch
+    messages = []
+    notified = changed if new_status in (RepairStatus.REPARADO, RepairStatus.ENTREGADO) else []
+    for order in notified:
+        if not order.customer_phone:
+            logger.warning(f"⚠️ No phone number for order {order.code}")
+            continue
+        if new_status == RepairStatus.REPARADO:
+            message = NotificationTemplates.repair_ready(
+                customer_name=order.customer_name, device=order.device, code=order.code or order.id[:8]
+            )
+        else:
+            message = NotificationTemplates.repair_delivered(
+                customer_name=order.customer_name, device=order.device, warranty_days=settings.WARRANTY_DAYS
+            )
+        messages.append((order.customer_phone, message))
+    if messages:
+        background_tasks.add_task(notification_service.send_bulk, messages, prefer_whatsapp=True)
+        logger.info(f"📱 {len(messages)} notifications queued for orders moved to {new_status.value}")
+    
+    return {
+        "status": new_status.value,
+        "updated": len(changed),
+        "not_found": not_found,
+        "notifications_queued": len(messages),
+        "results": results,
+    }
+
+
 @router.delete("/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_work_order(
     order_id: str,
@@ -337,16 +739,15 @@ def delete_work_order(
         current_user: Current authenticated user
         
     Raises:
-        HTTPException: If work order not found
+        HTTPException: If work order not found, or archived (read-only)
     """
     db_work_order = db.query(WorkOrder).filter(WorkOrder.id == order_id).first()
     
     if not db_work_order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Work order with id {order_id} not found"
-        )
+        _raise_missing(db, order_id)
     
+    db.query(WorkOrderStatusEvent).filter(WorkOrderStatusEvent.work_order_id == order_id).delete()
+    audit_log.record(db, current_user, DELETE, "work_order", db_work_order, changes=deleted(db_work_order))
     db.delete(db_work_order)
     db.commit()
     return None
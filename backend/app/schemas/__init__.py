@@ -1,14 +1,34 @@
 # Import all schemas here for easier imports
 from .auth import LoginRequest, TokenResponse
 from .product import ProductBase, ProductCreate, ProductUpdate, ProductResponse
-from .ticket import TicketItemCreate, TicketCreate, TicketResponse, TicketItemResponse
-from .work_order import WorkOrderCreate, WorkOrderUpdate, WorkOrderResponse
+from .ticket import (
+    TicketItemCreate, TicketCreate, TicketResponse, TicketItemResponse,
+    TicketSyncItem, TicketSyncRequest, TicketSyncResult, TicketSyncResponse
+)
+from .work_order import (
+    WorkOrderCreate, WorkOrderUpdate, WorkOrderResponse, WorkOrderBoardColumn, WorkOrderBoard,
+    WorkOrderBulkStatusRequest, WorkOrderBulkStatusResult, WorkOrderBulkStatusResponse
+)
 from .part import PartBase, PartCreate, PartUpdate, PartResponse
+from .exchange_rate import ExchangeRateCreate, ExchangeRateResponse
+from .store import StoreCreate, StoreResponse
+from .customer import CustomerResponse, CustomerHistory
+from .backup import BackupResponse
+from .audit import AuditEntryResponse
+from .catalog import CatalogResponse, ScanResponse
 
 __all__ = [
     "LoginRequest", "TokenResponse",
     "ProductBase", "ProductCreate", "ProductUpdate", "ProductResponse",
     "TicketItemCreate", "TicketCreate", "TicketResponse", "TicketItemResponse",
-    "WorkOrderCreate", "WorkOrderUpdate", "WorkOrderResponse",
-    "PartBase", "PartCreate", "PartUpdate", "PartResponse"
+    "TicketSyncItem", "TicketSyncRequest", "TicketSyncResult", "TicketSyncResponse",
+    "WorkOrderCreate", "WorkOrderUpdate", "WorkOrderResponse", "WorkOrderBoardColumn", "WorkOrderBoard",
+    "WorkOrderBulkStatusRequest", "WorkOrderBulkStatusResult", "WorkOrderBulkStatusResponse",
+    "PartBase", "PartCreate", "PartUpdate", "PartResponse",
+    "ExchangeRateCreate", "ExchangeRateResponse",
+    "StoreCreate", "StoreResponse",
+    "CustomerResponse", "CustomerHistory",
+    "BackupResponse",
+    "AuditEntryResponse",
+    "CatalogResponse", "ScanResponse"
 ]
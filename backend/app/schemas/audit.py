@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+
+class AuditEntryResponse(BaseModel):
+    """Schema for an audit log entry"""
+    id: int
+    created_at: datetime
+    user_id: Optional[int] = None
+    username: Optional[str] = None
+    action: str
+    entity: str
+    entity_id: str
+    changes: Optional[Dict[str, List[Any]]] = None  # {field: [before, after]}
+    
+    class Config:
+        from_attributes = True
@@ -12,6 +12,7 @@ class TokenResponse(BaseModel):
     access_token: str
     token_type: str
     role: str
+    store_id: int
     
     class Config:
         from_attributes = True
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class BackupResponse(BaseModel):
+    """Schema for a database snapshot"""
+    name: str
+    size: int  # bytes
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from .part import PartResponse
+from .product import ProductResponse
+
+
+class CatalogResponse(BaseModel):
+    """Schema for the catalog changes since a version, or the full catalog"""
+    version: int  # Send it back as since_version on the next request
+    full: bool  # True: replace the local catalog with these rows
+    products: List[ProductResponse]  # Created or changed since the version
+    parts: List[PartResponse]
+    deleted_products: List[int]
+    deleted_parts: List[int]
+
+
+class ScanResponse(BaseModel):
+    """Schema for the product or part a scanned code belongs to"""
+    kind: str  # "product" or "part"
+    product: Optional[ProductResponse] = None
+    part: Optional[PartResponse] = None
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from .ticket import TicketResponse
+from .work_order import WorkOrderResponse
+
+
+class CustomerResponse(BaseModel):
+    """Schema for customer response"""
+    id: int
+    name: str
+    phone: Optional[str] = None
+    national_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class CustomerHistory(BaseModel):
+    """Schema for a customer's purchases and repairs, newest first"""
+    customer: CustomerResponse
+    tickets: List[TicketResponse]
+    work_orders: List[WorkOrderResponse]
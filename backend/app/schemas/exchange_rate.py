@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class ExchangeRateCreate(BaseModel):
+    """Schema for recording a new exchange rate"""
+    rate: float = Field(..., gt=0)  # Units of currency per USD
+    currency: str = Field(default="VES", min_length=3, max_length=3)
+    effective_from: Optional[datetime] = None  # Defaults to now
+
+
+class ExchangeRateResponse(BaseModel):
+    """Schema for exchange rate response"""
+    id: int
+    currency: str
+    rate: float
+    effective_from: datetime
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -6,10 +6,12 @@ from datetime import datetime
 class PartBase(BaseModel):
     """Base schema for part"""
     name: str = Field(..., min_length=1, max_length=100)
+    barcode: Optional[str] = Field(None, min_length=1, max_length=64)
     sku: str = Field(..., min_length=1, max_length=50)
     stock: int = Field(..., ge=0)
     price: float = Field(..., gt=0)
     compatible_models: List[str] = Field(default_factory=list)
+    image_url: Optional[str] = Field(None, max_length=500)
     min_stock: int = Field(default=5, ge=0)
 
 
@@ -21,10 +23,12 @@ class PartCreate(PartBase):
 class PartUpdate(BaseModel):
     """Schema for updating a part (all fields optional)"""
     name: Optional[str] = Field(None, min_length=1, max_length=100)
+    barcode: Optional[str] = Field(None, min_length=1, max_length=64)
     sku: Optional[str] = Field(None, min_length=1, max_length=50)
     stock: Optional[int] = Field(None, ge=0)
     price: Optional[float] = Field(None, gt=0)
     compatible_models: Optional[List[str]] = None
+    image_url: Optional[str] = Field(None, max_length=500)
     min_stock: Optional[int] = Field(None, ge=0)
 
 
@@ -6,6 +6,7 @@ from datetime import datetime
 class ProductBase(BaseModel):
     """Base schema for product"""
     name: str = Field(..., min_length=1, max_length=100)
+    barcode: Optional[str] = Field(None, min_length=1, max_length=64)
     brand: str = Field(..., min_length=1, max_length=50)
     stock: int = Field(..., ge=0)
     price: float = Field(..., gt=0)
@@ -21,6 +22,7 @@ class ProductCreate(ProductBase):
 class ProductUpdate(BaseModel):
     """Schema for updating a product (all fields optional)"""
     name: Optional[str] = Field(None, min_length=1, max_length=100)
+    barcode: Optional[str] = Field(None, min_length=1, max_length=64)
     brand: Optional[str] = Field(None, min_length=1, max_length=50)
     stock: Optional[int] = Field(None, ge=0)
     price: Optional[float] = Field(None, gt=0)
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class StoreCreate(BaseModel):
+    """Schema for creating a store (branch)"""
+    name: str = Field(..., min_length=1, max_length=100)
+
+
+class StoreResponse(BaseModel):
+    """Schema for store response"""
+    id: int
+    name: str
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -23,6 +23,9 @@ class TicketItemResponse(BaseModel):
 class TicketCreate(BaseModel):
     """Schema for creating a ticket"""
     customer_name: str = Field(default="Cliente General", min_length=1, max_length=100)
+    # Optional, to link the sale to a customer
+    customer_phone: Optional[str] = Field(None, max_length=20)
+    customer_id: Optional[str] = Field(None, max_length=20)  # C.I.
     payment_method: str = Field(default="mixed", min_length=1, max_length=50)
     payment_status: str = Field(default="Paid")
     items: List[TicketItemCreate] = Field(..., min_length=1)
@@ -38,6 +41,7 @@ class TicketResponse(BaseModel):
     id: str
     date: datetime
     customer_name: str
+    customer_ref_id: Optional[int] = None
     payment_method: str
     payment_status: str
     subtotal: float
@@ -52,3 +56,31 @@ class TicketResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class TicketSyncItem(TicketCreate):
+    """Schema for a sale queued offline by a POS terminal"""
+    idempotency_key: str = Field(..., min_length=8, max_length=100)
+    sold_at: Optional[datetime] = None  # When the sale happened on the terminal
+
+
+class TicketSyncRequest(BaseModel):
+    """Schema for a batch of queued sales"""
+    sales: List[TicketSyncItem] = Field(..., min_length=1, max_length=500)
+
+
+class TicketSyncResult(BaseModel):
+    """Schema for the outcome of one synced sale"""
+    idempotency_key: str
+    status: str  # "applied", "replayed" or "failed"
+    status_code: int
+    ticket_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TicketSyncResponse(BaseModel):
+    """Schema for batch sync response"""
+    results: List[TicketSyncResult]
+    applied: int
+    replayed: int
+    failed: int
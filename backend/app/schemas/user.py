@@ -8,6 +8,7 @@ class UserCreate(BaseModel):
     username: str = Field(..., min_length=3, max_length=50, description="Username for the user")
     password: str = Field(..., min_length=6, description="Password for the user")
     role: UserRole = Field(..., description="Role of the user (admin or technician)")
+    store_id: Optional[int] = Field(None, description="Store of the user (defaults to the creator's store)")
     
     @validator('username')
     def username_alphanumeric(cls, v):
@@ -47,6 +48,7 @@ class UserResponse(BaseModel):
     id: int
     username: str
     role: str
+    store_id: int
     created_at: str
     
     class Config:
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from decimal import Decimal
+from ..models.work_order import RepairStatus
 
 
 class WorkOrderCreate(BaseModel):
@@ -46,6 +47,7 @@ class WorkOrderResponse(BaseModel):
     customer_name: str
     customer_phone: Optional[str] = None
     customer_id: Optional[str] = None
+    customer_ref_id: Optional[int] = None
     device: str
     issue: str
     status: str
@@ -64,3 +66,41 @@ class WorkOrderResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class WorkOrderBoardColumn(BaseModel):
+    """One status column of the work order board, newest first"""
+    status: str
+    orders: List[WorkOrderResponse]
+    next_cursor: Optional[str] = None  # Pass back to load the next page of the column
+
+
+class WorkOrderBoard(BaseModel):
+    """Per-status counts plus the first page of each active column"""
+    counts: Dict[str, int]
+    columns: List[WorkOrderBoardColumn]
+
+
+class WorkOrderBulkStatusRequest(BaseModel):
+    """Schema for moving many work orders to one status"""
+    status: RepairStatus
+    ids: List[str] = Field(default_factory=list, max_length=500)
+    codes: List[str] = Field(default_factory=list, max_length=500)
+
+
+class WorkOrderBulkStatusResult(BaseModel):
+    """Outcome for one requested id or code"""
+    key: str  # The id as sent, or the code in upper case
+    result: str  # "updated", "unchanged" (already in the status), "not_found" or "archived"
+    id: Optional[str] = None
+    code: Optional[str] = None
+    previous_status: Optional[str] = None
+
+
+class WorkOrderBulkStatusResponse(BaseModel):
+    """Schema for the outcome of a bulk status change"""
+    status: str
+    updated: int
+    not_found: List[str]  # Requested ids and codes with no work order
+    notifications_queued: int
+    results: List[WorkOrderBulkStatusResult]
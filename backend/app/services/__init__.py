@@ -2,5 +2,9 @@
 Services package for business logic
 """
 from .notifications import notification_service, NotificationTemplates
+from .images import image_store, ImageTooLargeError, UnsupportedImageError, IMAGE_FORMATS
+from .exchange_rates import exchange_rate_cache
+from .audit import audit_log
+from .catalog import catalog
 
-__all__ = ['notification_service', 'NotificationTemplates']
+__all__ = ['notification_service', 'NotificationTemplates', 'image_store', 'ImageTooLargeError', 'UnsupportedImageError', 'IMAGE_FORMATS', 'exchange_rate_cache', 'audit_log', 'catalog']
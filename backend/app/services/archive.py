@@ -0,0 +1,266 @@
+"""
+Hot/cold archival of settled tickets and work orders.
+
+The archival job moves fully paid tickets and delivered-and-paid work orders
+older than ``ARCHIVE_AFTER_MONTHS`` into the archive tables
+(``app.models.archive``). Rows move in batches of ``ARCHIVE_BATCH_SIZE``,
+each in its own short transaction (copy, then delete), so the hot tables are
+never locked for long; on PostgreSQL rows locked by a running request are
+skipped and picked up by the next run.
+
+Readers do not need to know where a record lives: ``find_ticket`` and
+``find_work_order`` fall through to the archive, and ``report_tickets`` only
+unions the archive into a report when it holds tickets of the requested
+period.
+
+Run periodically, e.g. from cron::
+
+    python -m app.services.archive --months 12
+"""
+import argparse
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional, Union
+
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, aliased
+
+from ..config import settings
+from ..models.archive import ArchivedTicket, ArchivedTicketItem, ArchivedWorkOrder
+from ..models.store import ALL_STORES
+from ..models.ticket import Ticket, TicketItem, PaymentStatus
+from ..models.work_order import WorkOrder, RepairStatus, PaymentStatus as WorkOrderPaymentStatus
+from ..utils.locks import process_lock
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_LOCK = "archive"
+
+
+@dataclass
+class ArchiveResult:
+    """Number of rows moved by one archival run"""
+    tickets: int = 0
+    ticket_items: int = 0
+    work_orders: int = 0
+
+
+def months_ago(moment: datetime, months: int) -> datetime:
+    """Same day and time ``months`` calendar months earlier (clamped to month end)"""
+    month_index = moment.year * 12 + moment.month - 1 - months
+    year, month = divmod(month_index, 12)
+    month += 1
+    next_month = datetime(year + (month == 12), month % 12 + 1, 1)
+    last_day = (next_month - datetime(year, month, 1)).days
+    return moment.replace(year=year, month=month, day=min(moment.day, last_day))
+
+
+def _columns(model) -> List[str]:
+    return [column.name for column in model.__table__.columns]
+
+
+def _copy(db: Session, source, target, condition) -> int:
+    # Archive tables mirror the hot ones, so columns are copied by name
+    names = _columns(source)
+    result = db.execute(
+        insert(target).from_select(names, select(*[getattr(source, name) for name in names]).where(condition))
+    )
+    return result.rowcount
+
+
+def archive_tickets(db: Session, cutoff: datetime, batch_size: int) -> ArchiveResult:
+    """
+    Move fully paid tickets sold before ``cutoff``, with their items, to the archive.
+
+    Args:
+        db: Database session not bound to a store
+        cutoff: Tickets sold before this moment are archived
+        batch_size: Tickets moved per transaction
+
+    Returns:
+        Rows moved
+    """
+    result = ArchiveResult()
+    while True:
+        ids = db.execute(
+            select(Ticket.id)
+            .where(Ticket.payment_status == PaymentStatus.PAID, Ticket.date < cutoff)
+            .order_by(Ticket.date)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            return result
+
+        _copy(db, Ticket, ArchivedTicket, Ticket.id.in_(ids))
+        result.ticket_items += _copy(db, TicketItem, ArchivedTicketItem, TicketItem.ticket_id.in_(ids))
+        db.execute(delete(TicketItem).where(TicketItem.ticket_id.in_(ids)))
+        db.execute(delete(Ticket).where(Ticket.id.in_(ids)))
+        db.commit()
+        result.tickets += len(ids)
+
+
+def archive_work_orders(db: Session, cutoff: datetime, batch_size: int) -> ArchiveResult:
+    """
+    Move work orders delivered and paid before ``cutoff`` to the archive.
+
+    The age of an order is its last activity: payment date, else last
+    update, else reception.
+
+    Args:
+        db: Database session not bound to a store
+        cutoff: Orders settled before this moment are archived
+        batch_size: Orders moved per transaction
+
+    Returns:
+        Rows moved
+    """
+    result = ArchiveResult()
+    settled_at = func.coalesce(WorkOrder.payment_date, WorkOrder.updated_at, WorkOrder.received_date)
+    while True:
+        ids = db.execute(
+            select(WorkOrder.id)
+            .where(
+                WorkOrder.status == RepairStatus.ENTREGADO,
+                WorkOrder.payment_status == WorkOrderPaymentStatus.PAGADO,
+                settled_at < cutoff
+            )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            return result
+
+        _copy(db, WorkOrder, ArchivedWorkOrder, WorkOrder.id.in_(ids))
+        db.execute(delete(WorkOrder).where(WorkOrder.id.in_(ids)))
+        db.commit()
+        result.work_orders += len(ids)
+
+
+def run_archival(
+    bind: Optional[Engine] = None,
+    months: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    now: Optional[datetime] = None
+) -> Optional[ArchiveResult]:
+    """
+    Archive everything settled more than ``months`` ago, once across processes.
+
+    Args:
+        bind: Engine to archive (defaults to the application engine)
+        months: Age in months (defaults to ARCHIVE_AFTER_MONTHS)
+        batch_size: Rows per transaction (defaults to ARCHIVE_BATCH_SIZE)
+        now: Reference moment (defaults to the current time)
+
+    Returns:
+        Rows moved, or None if another process is already archiving
+    """
+    if bind is None:
+        from ..database import engine as bind
+    months = months if months is not None else settings.ARCHIVE_AFTER_MONTHS
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    cutoff = months_ago(now or datetime.now(timezone.utc), months)
+
+    with process_lock(ARCHIVE_LOCK, bind=bind, blocking=False) as acquired:
+        if not acquired:
+            logger.info("ℹ️ Archival already running in another process, skipping")
+            return None
+
+        with Session(bind) as db:
+            result = archive_tickets(db, cutoff, batch_size)
+            result.work_orders = archive_work_orders(db, cutoff, batch_size).work_orders
+
+    logger.info(
+        f"✅ Archived {result.tickets} tickets ({result.ticket_items} items) and "
+        f"{result.work_orders} work orders settled before {cutoff.isoformat()}"
+    )
+    return result
+
+
+def find_ticket(db: Session, ticket_id: str) -> Optional[Union[Ticket, ArchivedTicket]]:
+    """Get a ticket by id from the hot table, falling through to the archive"""
+    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    if ticket is None:
+        ticket = db.query(ArchivedTicket).filter(ArchivedTicket.id == ticket_id).first()
+    return ticket
+
+
+def find_work_order(
+    db: Session, order_id: Optional[str] = None, code: Optional[str] = None
+) -> Optional[Union[WorkOrder, ArchivedWorkOrder]]:
+    """Get a work order by id or code from the hot table, falling through to the archive"""
+    for model in (WorkOrder, ArchivedWorkOrder):
+        condition = model.id == order_id if order_id is not None else model.code == code
+        order = db.query(model).filter(condition).first()
+        if order is not None:
+            return order
+    return None
+
+
+def is_archived_work_order(db: Session, order_id: str) -> bool:
+    """Whether a work order only exists in the archive (and is read-only)"""
+    return db.query(ArchivedWorkOrder.id).filter(ArchivedWorkOrder.id == order_id).first() is not None
+
+
+def period_conditions(ticket, start_date: Optional[datetime], end_date: Optional[datetime]) -> list:
+    """Conditions restricting ``ticket`` (the model or an alias) to a period"""
+    conditions = []
+    if start_date:
+        conditions.append(ticket.date >= start_date)
+    if end_date:
+        conditions.append(ticket.date < end_date)
+    return conditions
+
+
+def report_tickets(
+    db: Session,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    all_stores: bool = False
+):
+    """
+    Ticket entity a report over a period should query.
+
+    The hot table alone when the archive holds no ticket of the period (one
+    indexed probe); otherwise an alias of ``Ticket`` over the union of both
+    tables, each side already restricted to the period.
+
+    Args:
+        db: Database session
+        start_date: Optional start of the period
+        end_date: Optional end of the period (exclusive)
+        all_stores: Look for archived tickets of every store, not just the
+            session's (for cross-store reports)
+
+    Returns:
+        ``Ticket`` or an alias of it with the same attributes
+    """
+    archived = db.query(ArchivedTicket.id).filter(
+        *period_conditions(ArchivedTicket, start_date, end_date)
+    ).execution_options(**{ALL_STORES: all_stores}).limit(1).first()
+    if archived is None:
+        return Ticket
+
+    names = _columns(Ticket)
+    sides = [
+        select(*[getattr(model, name) for name in names]).where(
+            *period_conditions(model, start_date, end_date)
+        )
+        for model in (Ticket, ArchivedTicket)
+    ]
+    return aliased(Ticket, union_all(*sides).subquery("report_tickets"))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Move settled tickets and work orders to the archive tables")
+    parser.add_argument("--months", type=int, default=None, help="Archive records settled more than N months ago")
+    parser.add_argument("--batch-size", type=int, default=None, help="Rows moved per transaction")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    run_archival(months=args.months, batch_size=args.batch_size)
@@ -0,0 +1,349 @@
+"""
+Audit log of who created, changed or deleted which record.
+
+Routers call ``audit_log.record(...)`` next to the change, before the
+commit. The entry (user, entity, and a ``{field: [before, after]}`` diff of
+the fields sent) is built on the spot and parked on the session; it is
+queued only when the transaction commits, so a rolled back change leaves no
+trace, and recording costs the request no database round trip. A background
+thread drains the bounded in-memory queue and writes up to
+``AUDIT_BATCH_SIZE`` entries per multi-row insert, at least every
+``AUDIT_FLUSH_SECONDS``.
+
+Entries that cannot reach the database (the queue is full, an insert fails,
+the database is down at shutdown) are appended to ``AUDIT_FALLBACK_PATH`` as
+JSON lines and inserted on the next start. Only a crash of the process loses
+entries: at most those of the last flush interval.
+"""
+import enum
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.audit_entry import AuditEntry
+from ..models.store import get_store_scope
+
+logger = logging.getLogger(__name__)
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+# Never written to the log, only the fact that they changed
+SENSITIVE_FIELDS = {"password", "hashed_password", "current_password", "new_password"}
+REDACTED = "***"
+
+# Session.info key holding the entries of the open transaction
+PENDING_KEY = "audit_pending"
+
+# How often the writer thread checks for stop and flush requests
+POLL_SECONDS = 0.05
+
+Changes = Dict[str, List[Any]]
+
+
+def _value(value: Any) -> Any:
+    """JSON value of a field"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, dict):
+        return {str(key): _value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_value(item) for item in value]
+    return value
+
+
+def _change(field: str, before: Any, after: Any) -> List[Any]:
+    if field in SENSITIVE_FIELDS:
+        return [REDACTED if before is not None else None, REDACTED if after is not None else None]
+    return [_value(before), _value(after)]
+
+
+def created(data: Dict[str, Any]) -> Changes:
+    """Changes of a new record with the given fields"""
+    return {field: _change(field, None, value) for field, value in data.items()}
+
+
+def updated(record: Any, data: Dict[str, Any]) -> Changes:
+    """
+    Changes ``data`` (e.g. ``model_dump(exclude_unset=True)``) makes to a record.
+
+    Call it before the fields are set; fields sent with their current value
+    are left out.
+    """
+    changes = {}
+    for field, value in data.items():
+        before, after = _value(getattr(record, field, None)), _value(value)
+        if before != after:
+            changes[field] = _change(field, getattr(record, field, None), value)
+    return changes
+
+
+def deleted(record: Any) -> Changes:
+    """Changes of deleting a record: every column's last value"""
+    return {
+        attribute.key: _change(attribute.key, getattr(record, attribute.key), None)
+        for attribute in inspect(record).mapper.column_attrs
+    }
+
+
+def _identity(record: Any) -> Optional[str]:
+    identity = inspect(record).identity
+    return str(identity[0]) if identity else None
+
+
+class AuditLog:
+    """Buffers committed audit entries and writes them in batches on a daemon thread"""
+
+    def __init__(self, queue_size: int, batch_size: int, flush_seconds: float, fallback_path: str):
+        self.batch_size = max(batch_size, 1)
+        self.flush_seconds = flush_seconds
+        self.fallback_path = fallback_path
+        self._queue: "queue.Queue[Tuple[Engine, Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._flush_requested = threading.Event()
+        self._file_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(
+        self,
+        db: Session,
+        user,
+        action: str,
+        entity: str,
+        target: Any = None,
+        entity_id: Any = None,
+        changes: Optional[Changes] = None
+    ):
+        """
+        Stage an audit entry on the session; it is queued when the session commits.
+
+        Args:
+            db: Session the change is made in
+            user: User making the change
+            action: CREATE, UPDATE or DELETE
+            entity: Kind of record, e.g. "product"
+            target: The changed record; the id of a new one is read once it is flushed
+            entity_id: Id of the record, when there is no target
+            changes: ``{field: [before, after]}`` (see ``created``, ``updated``, ``deleted``)
+        """
+        if entity_id is None and target is not None:
+            entity_id = _identity(target)
+        entry = {
+            "created_at": datetime.now(timezone.utc),
+            "store_id": get_store_scope(db) or user.store_id,
+            "user_id": user.id,
+            "username": user.username,
+            "action": action,
+            "entity": entity,
+            "entity_id": None if entity_id is None else str(entity_id),
+            "changes": changes,
+        }
+        db.info.setdefault(PENDING_KEY, []).append((self, entry, target))
+
+    def enqueue(self, bind: Engine, entries: List[Dict[str, Any]]):
+        """Queue committed entries, spilling to the fallback file when the queue is full"""
+        spilled = []
+        for entry in entries:
+            try:
+                self._queue.put_nowait((bind, entry))
+            except queue.Full:
+                spilled.append(entry)
+        if spilled:
+            logger.warning(f"⚠️ Audit queue full, {len(spilled)} entries saved to {self.fallback_path}")
+            self._spill(spilled)
+
+    def start(self, bind: Optional[Engine] = None) -> "AuditLog":
+        """Insert entries left in the fallback file, then start the writer thread"""
+        self.replay(bind)
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-log", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 10.0):
+        """Write every queued entry and stop the writer thread"""
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning("⚠️ Audit writer did not stop in time, queued entries may be lost")
+                return
+        self._drain()
+
+    def flush(self):
+        """Write every queued entry now"""
+        if self._thread is None or not self._thread.is_alive():
+            self._drain()
+            return
+        self._flush_requested.set()
+        try:
+            self._queue.join()
+        finally:
+            self._flush_requested.clear()
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=POLL_SECONDS)]
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+
+            # Wait up to flush_seconds for a full batch, unless asked to write now
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    if self._stop.is_set() or self._flush_requested.is_set():
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    batch.append(self._queue.get(timeout=min(remaining, POLL_SECONDS)))
+                except queue.Empty:
+                    if self._stop.is_set() or self._flush_requested.is_set():
+                        break
+
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for start in range(0, len(batch), self.batch_size):
+            self._write(batch[start:start + self.batch_size])
+        for _ in batch:
+            self._queue.task_done()
+
+    def _write(self, batch: List[Tuple[Engine, Dict[str, Any]]]):
+        by_bind: Dict[Engine, List[Dict[str, Any]]] = {}
+        for bind, entry in batch:
+            by_bind.setdefault(bind, []).append(entry)
+        for bind, entries in by_bind.items():
+            try:
+                _insert(bind, entries)
+            except Exception:
+                logger.exception(f"❌ Could not write {len(entries)} audit entries, saving to {self.fallback_path}")
+                self._spill(entries)
+
+    def _spill(self, entries: List[Dict[str, Any]]):
+        """Append entries to the fallback file, durably"""
+        directory = os.path.dirname(os.path.abspath(self.fallback_path))
+        with self._file_lock:
+            os.makedirs(directory, exist_ok=True)
+            with open(self.fallback_path, "a", encoding="utf-8") as fallback:
+                for entry in entries:
+                    fallback.write(json.dumps({**entry, "created_at": entry["created_at"].isoformat()}) + "\n")
+                fallback.flush()
+                os.fsync(fallback.fileno())
+
+    def replay(self, bind: Optional[Engine] = None) -> int:
+        """
+        Insert the entries saved in the fallback file and remove it.
+
+        Returns:
+            Number of entries inserted
+        """
+        if not os.path.exists(self.fallback_path):
+            return 0
+        if bind is None:
+            from ..database import engine as bind
+
+        # Every worker replays on start: the one that renames the file owns it
+        claimed = f"{self.fallback_path}.{os.getpid()}.replay"
+        try:
+            os.replace(self.fallback_path, claimed)
+        except FileNotFoundError:
+            return 0
+
+        entries = []
+        with open(claimed, encoding="utf-8") as fallback:
+            for line in fallback:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A line torn by a crash mid-write
+                    logger.warning(f"⚠️ Skipping unreadable audit entry in {self.fallback_path}")
+                    continue
+                entry["created_at"] = datetime.fromisoformat(entry["created_at"])
+                entries.append(entry)
+
+        try:
+            for start in range(0, len(entries), self.batch_size):
+                _insert(bind, entries[start:start + self.batch_size])
+        except Exception:
+            # Back to the fallback file (entries inserted before the failure are repeated)
+            logger.exception(f"❌ Could not replay audit entries from {self.fallback_path}")
+            self._spill(entries)
+            os.remove(claimed)
+            return 0
+        os.remove(claimed)
+        logger.info(f"✅ Replayed {len(entries)} audit entries from {self.fallback_path}")
+        return len(entries)
+
+
+def _insert(bind: Engine, entries: List[Dict[str, Any]]):
+    if entries:
+        with bind.begin() as conn:
+            conn.execute(insert(AuditEntry), entries)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _resolve_new_ids(session, flush_context):
+    for _, entry, target in session.info.get(PENDING_KEY, ()):
+        if entry["entity_id"] is None and target is not None:
+            entry["entity_id"] = _identity(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_committed(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending:
+        return
+    by_log: Dict[AuditLog, List[Dict[str, Any]]] = {}
+    for log, entry, _ in pending:
+        if entry["entity_id"] is None:
+            logger.warning(f"⚠️ Audit entry for a {entry['entity']} that was never flushed, skipping")
+            continue
+        by_log.setdefault(log, []).append(entry)
+    bind = session.get_bind()
+    for log, entries in by_log.items():
+        log.enqueue(bind, entries)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_uncommitted(session, transaction):
+    # Runs after after_commit, so only entries of rolled back or closed transactions are left
+    if transaction.parent is None:
+        session.info.pop(PENDING_KEY, None)
+
+
+audit_log = AuditLog(
+    queue_size=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_seconds=settings.AUDIT_FLUSH_SECONDS,
+    fallback_path=settings.AUDIT_FALLBACK_PATH,
+)
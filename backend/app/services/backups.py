@@ -0,0 +1,339 @@
+"""
+Online database backups and restore.
+
+Snapshots are taken while the application keeps selling:
+
+- SQLite: the online backup API copies ``BACKUP_PAGES_PER_STEP`` pages per
+  step and holds the database's read lock only during a step, pausing
+  ``BACKUP_STEP_PAUSE_SECONDS`` in between so checkouts can commit. A write
+  from another connection restarts the copy; after ``BACKUP_MAX_RESTARTS``
+  restarts the rest is copied in a single step (one short read lock) so a
+  busy store still gets its backup. The copy is checked and gzipped.
+- PostgreSQL: ``pg_dump`` streams a compressed custom-format dump from an
+  MVCC snapshot, which never blocks writers.
+
+Snapshots are written under a temporary name and renamed when complete, so
+a listed snapshot is never torn. The newest ``BACKUP_KEEP`` are kept. Only
+one backup or restore runs at a time per deployment (``process_lock``).
+
+Admins can take a backup from the API (``POST /api/backups``); the scheduler
+(``BACKUP_ENABLED``) takes one every ``BACKUP_INTERVAL_HOURS``; and from the
+command line::
+
+    python -m app.services.backups create
+    python -m app.services.backups list
+    python -m app.services.backups restore serviceflow-20240610T120000Z.db.gz
+"""
+import argparse
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+
+from ..config import settings
+from ..utils.locks import process_lock
+
+logger = logging.getLogger(__name__)
+
+BACKUP_LOCK = "backup"
+BACKUP_PREFIX = "serviceflow-"
+TIMESTAMP_FORMAT = "%Y%m%dT%H%M%SZ"
+SQLITE_SUFFIX = ".db.gz"
+POSTGRES_SUFFIX = ".dump"
+CHUNK_SIZE = 1024 * 1024
+
+
+class BackupError(Exception):
+    """A backup or restore could not be completed"""
+
+
+@dataclass(frozen=True)
+class Backup:
+    """Snapshot file in the backup directory"""
+    name: str
+    path: str
+    size: int
+    created_at: datetime
+
+
+def _directory(directory: Optional[str]) -> str:
+    return directory or settings.BACKUP_DIR
+
+
+def _parse(directory: str, name: str) -> Optional[Backup]:
+    for suffix in (SQLITE_SUFFIX, POSTGRES_SUFFIX):
+        if name.startswith(BACKUP_PREFIX) and name.endswith(suffix):
+            try:
+                created_at = datetime.strptime(name[len(BACKUP_PREFIX):-len(suffix)], TIMESTAMP_FORMAT)
+            except ValueError:
+                return None
+            path = os.path.join(directory, name)
+            return Backup(name, path, os.path.getsize(path), created_at.replace(tzinfo=timezone.utc))
+    return None
+
+
+def list_backups(directory: Optional[str] = None) -> List[Backup]:
+    """Complete snapshots in the backup directory, newest first"""
+    directory = _directory(directory)
+    if not os.path.isdir(directory):
+        return []
+    backups = [backup for backup in (_parse(directory, name) for name in os.listdir(directory)) if backup]
+    return sorted(backups, key=lambda backup: backup.created_at, reverse=True)
+
+
+def prune_backups(directory: Optional[str] = None, keep: Optional[int] = None) -> List[str]:
+    """
+    Delete all but the newest ``keep`` snapshots (defaults to BACKUP_KEEP).
+
+    Returns:
+        Names of the deleted snapshots
+    """
+    keep = settings.BACKUP_KEEP if keep is None else keep
+    deleted = []
+    for backup in list_backups(directory)[max(keep, 1):]:
+        os.remove(backup.path)
+        deleted.append(backup.name)
+    return deleted
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def _copy_sqlite(source: sqlite3.Connection, destination: sqlite3.Connection):
+    """Online copy in small steps, falling back to one step if writers keep restarting it"""
+    restarts = 0
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal restarts, last_remaining
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > settings.BACKUP_MAX_RESTARTS:
+                raise _TooManyRestarts()
+        last_remaining = remaining
+        # No lock is held between steps: let checkouts commit
+        time.sleep(settings.BACKUP_STEP_PAUSE_SECONDS)
+
+    try:
+        source.backup(destination, pages=settings.BACKUP_PAGES_PER_STEP, progress=progress)
+    except _TooManyRestarts:
+        logger.warning(f"⚠️ Backup restarted {restarts} times by writes, copying the rest in one step")
+        source.backup(destination)
+
+
+def _check_sqlite(connection: sqlite3.Connection):
+    result = connection.execute("PRAGMA quick_check").fetchone()[0]
+    if result != "ok":
+        raise BackupError(f"Backup copy failed its integrity check: {result}")
+
+
+def _backup_sqlite(bind: Engine, target: str):
+    copy_path = f"{target}.db"
+    raw = bind.raw_connection()
+    try:
+        destination = sqlite3.connect(copy_path)
+        try:
+            _copy_sqlite(raw.driver_connection, destination)
+            _check_sqlite(destination)
+        finally:
+            destination.close()
+    finally:
+        raw.close()
+
+    try:
+        with open(copy_path, "rb") as copy, gzip.open(target, "wb", compresslevel=6) as compressed:
+            shutil.copyfileobj(copy, compressed, CHUNK_SIZE)
+    finally:
+        os.remove(copy_path)
+
+
+def _restore_sqlite(bind: Engine, path: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(dir=directory, suffix=".restore", delete=False) as copy:
+        with gzip.open(path, "rb") as compressed:
+            shutil.copyfileobj(compressed, copy, CHUNK_SIZE)
+    try:
+        source = sqlite3.connect(copy.name)
+        try:
+            _check_sqlite(source)
+            raw = bind.raw_connection()
+            try:
+                # One step: the live database is replaced atomically under its write lock
+                source.backup(raw.driver_connection)
+            finally:
+                raw.close()
+        finally:
+            source.close()
+    finally:
+        os.remove(copy.name)
+
+
+def _libpq(bind: Engine) -> Tuple[str, dict]:
+    """Connection URI for the PostgreSQL client tools, with the password in the environment"""
+    env = dict(os.environ)
+    if bind.url.password:
+        env["PGPASSWORD"] = bind.url.password
+    uri = bind.url.set(drivername="postgresql", password=None).render_as_string(hide_password=False)
+    return uri, env
+
+
+def _run(command: List[str], env: dict):
+    try:
+        result = subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        raise BackupError(f"{command[0]} not found; install the PostgreSQL client tools")
+    if result.returncode != 0:
+        raise BackupError(f"{command[0]} failed: {result.stderr.decode(errors='replace').strip()}")
+
+
+def _backup_postgres(bind: Engine, target: str):
+    uri, env = _libpq(bind)
+    # Written by pg_dump as it reads, compressed, from a consistent snapshot
+    _run(["pg_dump", "--format=custom", "--compress=6", "--no-owner", f"--file={target}", f"--dbname={uri}"], env)
+
+
+def _restore_postgres(bind: Engine, path: str):
+    uri, env = _libpq(bind)
+    _run(
+        ["pg_restore", "--clean", "--if-exists", "--no-owner", "--single-transaction", f"--dbname={uri}", path],
+        env
+    )
+
+
+def create_backup(
+    bind: Optional[Engine] = None,
+    directory: Optional[str] = None,
+    now: Optional[datetime] = None
+) -> Optional[Backup]:
+    """
+    Take a snapshot of the live database and apply the retention.
+
+    Args:
+        bind: Engine to back up (defaults to the application engine)
+        directory: Backup directory (defaults to BACKUP_DIR)
+        now: Snapshot time used in its name (defaults to the current time)
+
+    Returns:
+        The new snapshot, or None if another backup or restore is running
+
+    Raises:
+        BackupError: If the database cannot be backed up
+    """
+    if bind is None:
+        from ..database import engine as bind
+    directory = _directory(directory)
+    now = now or datetime.now(timezone.utc)
+
+    dialect = bind.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        raise BackupError(f"Backups are not supported for {dialect}")
+    suffix = SQLITE_SUFFIX if dialect == "sqlite" else POSTGRES_SUFFIX
+    name = f"{BACKUP_PREFIX}{now.astimezone(timezone.utc).strftime(TIMESTAMP_FORMAT)}{suffix}"
+
+    with process_lock(BACKUP_LOCK, bind=bind, blocking=False) as acquired:
+        if not acquired:
+            logger.info("ℹ️ Backup or restore already running in another process, skipping")
+            return None
+
+        os.makedirs(directory, exist_ok=True)
+        partial = os.path.join(directory, f".{name}.partial")
+        started = time.monotonic()
+        try:
+            if dialect == "sqlite":
+                _backup_sqlite(bind, partial)
+            else:
+                _backup_postgres(bind, partial)
+            os.replace(partial, os.path.join(directory, name))
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+        backup = _parse(directory, name)
+        deleted = prune_backups(directory)
+        logger.info(
+            f"✅ Backup {name} ({backup.size} bytes) in {time.monotonic() - started:.1f}s, "
+            f"{len(deleted)} old snapshots deleted"
+        )
+        return backup
+
+
+def restore_backup(name: str, bind: Optional[Engine] = None, directory: Optional[str] = None):
+    """
+    Replace the database contents with a snapshot.
+
+    Stop the application (or at least the scheduler) first: requests running
+    during a restore see the database change under them.
+
+    Args:
+        name: Snapshot name in the backup directory, or a path to one
+        bind: Engine to restore into (defaults to the application engine)
+        directory: Backup directory (defaults to BACKUP_DIR)
+
+    Raises:
+        BackupError: If the snapshot is missing, of another database kind, or invalid
+    """
+    if bind is None:
+        from ..database import engine as bind
+    path = name if os.path.sep in name else os.path.join(_directory(directory), name)
+    if not os.path.isfile(path):
+        raise BackupError(f"Backup {name} not found")
+
+    dialect = bind.dialect.name
+    expected = SQLITE_SUFFIX if dialect == "sqlite" else POSTGRES_SUFFIX
+    if not path.endswith(expected):
+        raise BackupError(f"Backup {name} is not a {dialect} backup (*{expected})")
+
+    with process_lock(BACKUP_LOCK, bind=bind):
+        if dialect == "sqlite":
+            _restore_sqlite(bind, path)
+        else:
+            _restore_postgres(bind, path)
+    # Pooled connections may hold pages or catalog state of the old contents
+    bind.dispose()
+    logger.info(f"✅ Restored backup {name}")
+
+
+def scheduled_backup(bind: Optional[Engine] = None, directory: Optional[str] = None) -> Optional[Backup]:
+    """
+    Take a backup unless a recent one exists.
+
+    Every worker runs the scheduler; the worker that ticks first takes the
+    backup and the others find it and skip.
+    """
+    backups = list_backups(directory)
+    interval = timedelta(hours=settings.BACKUP_INTERVAL_HOURS)
+    if backups and datetime.now(timezone.utc) - backups[0].created_at < interval * 0.9:
+        return None
+    return create_backup(bind, directory)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Back up or restore the database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("create", help="Take a backup now")
+    subparsers.add_parser("list", help="List backups, newest first")
+    restore = subparsers.add_parser("restore", help="Replace the database with a backup")
+    restore.add_argument("name", help="Backup name (see list) or path")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    if args.command == "create":
+        create_backup()
+    elif args.command == "list":
+        for backup in list_backups():
+            print(f"{backup.name}\t{backup.size}\t{backup.created_at.isoformat()}")
+    else:
+        restore_backup(args.name)
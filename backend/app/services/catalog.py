@@ -0,0 +1,439 @@
+"""
+Versioned catalog of products and parts for POS terminals.
+
+Terminals keep the catalog locally for their search box and ask
+``GET /api/catalog?since_version=N`` only for what changed since the version
+they hold, instead of pulling the full product and part listings.
+
+Versions are counted per store in the database, so every worker agrees on
+them: a flush that inserts, changes or deletes products or parts bumps
+``stores.catalog_version`` once and stamps the rows with the new version;
+deletions leave a ``CatalogTombstone``. The counter row stays locked until
+the transaction ends, so versions become visible in order and a terminal
+never skips one. Bulk ``update()`` and ``delete()`` statements bypass the
+flush and must not be used on these tables.
+
+Stock changes alone, as in every sale, do not take that lock, which would
+make a store's checkouts wait on each other: they record a
+``CatalogStockChange`` without a version. The next catalog read of the store
+gives every committed pending change the next version in one short
+transaction, so they too become visible in order and reach terminals with
+the following delta.
+
+Each worker keeps an in-memory snapshot per store: the rows as the listings
+render them and a log of which row changed at which version. A request costs
+one primary key lookup of the counter (and of pending stock changes) when
+nothing changed, and a few indexed ``version > N`` queries when something
+did. Terminals more than ``CATALOG_MAX_DELTA_VERSIONS`` behind (or ahead,
+after a restore) get a full snapshot instead; tombstones and stock changes
+older than that are pruned.
+
+The snapshot also maps barcodes and part SKUs to their rows, so a scan at the
+register (``GET /api/scan/{code}``) is a dict lookup. Scans skip the counter
+lookup for ``CATALOG_SCAN_REFRESH_SECONDS`` after the last one: a commit in
+this worker that touches a store's products or parts marks its snapshot
+stale at once, so only other workers' changes can take that long to show.
+"""
+import bisect
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, event, exists, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.catalog_stock_change import CatalogStockChange
+from ..models.catalog_tombstone import CatalogTombstone
+from ..models.part import Part
+from ..models.product import Product
+from ..models.store import DEFAULT_STORE_ID, Store, get_store_scope
+from ..schemas.part import PartResponse
+from ..schemas.product import ProductResponse
+from ..utils.serialization import schema_columns
+
+PRODUCT = "product"
+PART = "part"
+
+# Model and response schema of each catalog entity
+CATALOG_MODELS = {PRODUCT: (Product, ProductResponse), PART: (Part, PartResponse)}
+
+# Columns sales change, versioned without the counter's lock
+STOCK_COLUMNS = {"stock"}
+# Columns the flush itself sets
+FLUSH_COLUMNS = {"updated_at", "row_version", "catalog_version"}
+
+# Columns a scanned code is looked up in, in order (a product's barcode wins)
+SCAN_CODES = ((PRODUCT, "barcode"), (PART, "barcode"), (PART, "sku"))
+
+# Session.info key of the stores whose catalog the transaction changed
+TOUCHED_KEY = "catalog_touched_stores"
+
+
+def _entity(instance: Any) -> Optional[str]:
+    if isinstance(instance, Product):
+        return PRODUCT
+    if isinstance(instance, Part):
+        return PART
+    return None
+
+
+def _changed_columns(instance: Any) -> Set[str]:
+    """Columns of a row with pending changes, other than those the flush sets"""
+    return {attr.key for attr in inspect(instance).attrs if attr.history.has_changes()} - FLUSH_COLUMNS
+
+
+def _store_of(session: Session, instance: Any) -> int:
+    return instance.store_id or get_store_scope(session) or DEFAULT_STORE_ID
+
+
+def _bump_version(session: Session, store_id: int, prune: bool) -> Optional[int]:
+    """Increment a store's catalog version, locking its row until the transaction ends"""
+    stores = Store.__table__
+    connection = session.connection()
+    version = connection.execute(
+        update(stores)
+        .where(stores.c.id == store_id)
+        .values(catalog_version=stores.c.catalog_version + 1)
+        .returning(stores.c.catalog_version)
+    ).scalar()
+    if version is not None and prune:
+        # Terminals this far behind get a full snapshot, which needs neither
+        for table in (CatalogTombstone.__table__, CatalogStockChange.__table__):
+            connection.execute(delete(table).where(
+                table.c.store_id == store_id,
+                table.c.version <= version - settings.CATALOG_MAX_DELTA_VERSIONS
+            ))
+    return version
+
+
+def _sequence_stock_changes(session: Session, store_id: int) -> Optional[int]:
+    """
+    Give a store's committed pending stock changes the next catalog version.
+
+    Runs as its own short transaction: the session is committed, or rolled
+    back when another worker already versioned the changes.
+
+    Returns:
+        The new version, or None if there was nothing to version
+    """
+    version = _bump_version(session, store_id, prune=True)
+    changes = CatalogStockChange.__table__
+    stamped = session.connection().execute(
+        update(changes)
+        .where(changes.c.store_id == store_id, changes.c.version.is_(None))
+        .values(version=version)
+    ).rowcount if version is not None else 0
+    if not stamped:
+        session.rollback()
+        return None
+    session.commit()
+    return version
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_versions(session, flush_context, instances):
+    changed: Dict[int, List[Any]] = {}
+    removed: Dict[int, List[Any]] = {}
+    restocked: Dict[int, List[Any]] = {}
+    for instance in session.new:
+        if _entity(instance):
+            changed.setdefault(_store_of(session, instance), []).append(instance)
+    for instance in session.dirty:
+        if not _entity(instance):
+            continue
+        columns = _changed_columns(instance)
+        if columns and columns <= STOCK_COLUMNS:
+            restocked.setdefault(_store_of(session, instance), []).append(instance)
+        elif columns:
+            changed.setdefault(_store_of(session, instance), []).append(instance)
+    for instance in session.deleted:
+        if _entity(instance):
+            removed.setdefault(_store_of(session, instance), []).append(instance)
+
+    session.info.setdefault(TOUCHED_KEY, set()).update(changed.keys() | removed.keys() | restocked.keys())
+    versioned = set()
+    for store_id in sorted(changed.keys() | removed.keys()):
+        version = _bump_version(session, store_id, prune=store_id in removed)
+        if version is None:
+            # No such store row (e.g. a bare test database): nothing to version
+            continue
+        versioned.add(store_id)
+        for instance in changed.get(store_id, ()) + restocked.get(store_id, []):
+            instance.catalog_version = version
+        for instance in removed.get(store_id, ()):
+            session.add(CatalogTombstone(
+                store_id=store_id, entity=_entity(instance), entity_id=instance.id, version=version
+            ))
+
+    # Stock-only changes wait for the next catalog read to be versioned
+    for store_id, instances in restocked.items():
+        if store_id not in versioned:
+            session.add_all(
+                CatalogStockChange(store_id=store_id, entity=_entity(instance), entity_id=instance.id)
+                for instance in instances
+            )
+
+
+@dataclass
+class CatalogSnapshot:
+    """One store's catalog as held by this worker"""
+    version: int = -1  # Not loaded yet
+    # Rendered rows by entity and id
+    rows: Dict[str, Dict[int, Dict[str, Any]]] = field(
+        default_factory=lambda: {entity: {} for entity in CATALOG_MODELS}
+    )
+    # (entity, id) changed at each version, in version order
+    versions: List[int] = field(default_factory=list)
+    changes: List[Tuple[str, int]] = field(default_factory=list)
+    # Ids by scan code, for each of SCAN_CODES
+    codes: Dict[Tuple[str, str], Dict[str, int]] = field(default_factory=lambda: {key: {} for key in SCAN_CODES})
+    checked_at: float = 0.0  # When the version was last read
+    stale: bool = False  # Changed by a commit of this worker since then
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def reset(self):
+        """Drop everything, to be loaded again"""
+        self.version = -1
+        self.rows = {entity: {} for entity in CATALOG_MODELS}
+        self.versions = []
+        self.changes = []
+        self.codes = {key: {} for key in SCAN_CODES}
+
+    def put(self, entity: str, record: Dict[str, Any]):
+        """Add or replace a row and its scan codes"""
+        self.drop(entity, record["id"])
+        self.rows[entity][record["id"]] = record
+        for key in SCAN_CODES:
+            if key[0] == entity and record.get(key[1]):
+                self.codes[key][record[key[1]]] = record["id"]
+
+    def drop(self, entity: str, entity_id: int):
+        """Remove a row and its scan codes (unless another row took them since)"""
+        record = self.rows[entity].pop(entity_id, None)
+        if record is None:
+            return
+        for key in SCAN_CODES:
+            code = record.get(key[1]) if key[0] == entity else None
+            if code and self.codes[key].get(code) == entity_id:
+                del self.codes[key][code]
+
+
+class Catalog:
+    """In-memory catalog snapshots of every store, refreshed from the version counter"""
+
+    def __init__(self, max_delta_versions: int, scan_refresh_seconds: float = 0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_delta_versions = max_delta_versions
+        self.scan_refresh_seconds = scan_refresh_seconds
+        self._clock = clock
+        self._snapshots: Dict[int, CatalogSnapshot] = {}
+        self._lock = threading.Lock()
+
+    def changes(self, db: Session, store_id: int, since_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Rows changed and deleted since a version, or the whole catalog.
+
+        Args:
+            db: Database session (of the primary: a lagging replica would look like a restore)
+            store_id: Store whose catalog is read
+            since_version: Version the terminal holds; None for a full snapshot
+
+        Returns:
+            ``version``, ``full``, ``products``, ``parts``, ``deleted_products``
+            and ``deleted_parts``; a full snapshot lists every row and no deletions
+        """
+        snapshot = self._snapshot(store_id)
+        with snapshot.lock:
+            self._refresh(db, store_id, snapshot)
+            return self._changes(snapshot, since_version)
+
+    def scan(self, db: Session, store_id: int, code: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Find the product or part a scanned barcode or SKU belongs to.
+
+        Resolved from the snapshot's hash maps, checking the version first
+        only if the snapshot is stale or was checked more than
+        ``scan_refresh_seconds`` ago; a code missing there is looked up
+        through the unique indexes, in case rows were changed without a
+        flush.
+
+        Args:
+            db: Database session (of the primary)
+            store_id: Store whose catalog is searched
+            code: Scanned barcode, or part SKU
+
+        Returns:
+            The entity (PRODUCT or PART) and its row, or None if no row has the code
+        """
+        snapshot = self._snapshot(store_id)
+        found = self._lookup(snapshot, code) if self._fresh(snapshot) else None
+        if found is None:
+            with snapshot.lock:
+                if not self._fresh(snapshot):
+                    self._refresh(db, store_id, snapshot)
+                found = self._lookup(snapshot, code)
+        if found is not None:
+            return found
+
+        for entity, name in SCAN_CODES:
+            model, schema = CATALOG_MODELS[entity]
+            fields, columns = schema_columns(schema, model)
+            row = db.execute(
+                select(*columns).where(model.store_id == store_id, getattr(model, name) == code).limit(1)
+            ).first()
+            if row is not None:
+                return entity, dict(zip(fields, row))
+        return None
+
+    def _fresh(self, snapshot: CatalogSnapshot) -> bool:
+        """Whether a scan may trust the snapshot without reading the version"""
+        return (
+            snapshot.version >= 0 and not snapshot.stale
+            and self._clock() - snapshot.checked_at < self.scan_refresh_seconds
+        )
+
+    @staticmethod
+    def _lookup(snapshot: CatalogSnapshot, code: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        # Safe without the lock: a row replaced meanwhile is just missed, and found under it
+        for entity, name in SCAN_CODES:
+            entity_id = snapshot.codes[(entity, name)].get(code)
+            record = snapshot.rows[entity].get(entity_id) if entity_id is not None else None
+            if record is not None:
+                return entity, record
+        return None
+
+    def invalidate(self, store_ids: Iterable[int]):
+        """Mark stores' snapshots stale, so their next scan reads the version"""
+        with self._lock:
+            for store_id in store_ids:
+                if store_id in self._snapshots:
+                    self._snapshots[store_id].stale = True
+
+    def _snapshot(self, store_id: int) -> CatalogSnapshot:
+        with self._lock:
+            return self._snapshots.setdefault(store_id, CatalogSnapshot())
+
+    def clear(self):
+        """Forget every snapshot; the next request of each store reloads it"""
+        with self._lock:
+            self._snapshots.clear()
+
+    def _refresh(self, db: Session, store_id: int, snapshot: CatalogSnapshot):
+        # Cleared before reading, so a commit landing meanwhile marks it again
+        snapshot.stale = False
+        snapshot.checked_at = self._clock()
+        pending = exists().where(CatalogStockChange.store_id == store_id, CatalogStockChange.version.is_(None))
+        row = db.execute(select(Store.catalog_version, pending).where(Store.id == store_id)).first()
+        current = row[0] if row else 0
+        if row and row[1]:
+            current = _sequence_stock_changes(db, store_id) or db.execute(
+                select(Store.catalog_version).where(Store.id == store_id)
+            ).scalar()
+        if current == snapshot.version:
+            return
+        if current < snapshot.version or snapshot.version < 0:
+            # First load, or the database went back (restored from a backup)
+            snapshot.reset()
+            self._load(db, store_id, snapshot, current, since=None)
+        else:
+            self._load(db, store_id, snapshot, current, since=snapshot.version)
+
+    def _load(self, db: Session, store_id: int, snapshot: CatalogSnapshot, current: int, since: Optional[int]):
+        changes: List[Tuple[int, str, int]] = []
+
+        # Tombstones first: a row loaded afterwards is newer than its deletion
+        query = select(CatalogTombstone.version, CatalogTombstone.entity, CatalogTombstone.entity_id).where(
+            CatalogTombstone.store_id == store_id
+        )
+        if since is not None:
+            query = query.where(CatalogTombstone.version > since)
+        for version, entity, entity_id in db.execute(query):
+            if entity in snapshot.rows:
+                snapshot.drop(entity, entity_id)
+                changes.append((version, entity, entity_id))
+
+        # Rows whose stock changed, loaded with the rest on a full load
+        query = select(CatalogStockChange.version, CatalogStockChange.entity, CatalogStockChange.entity_id).where(
+            CatalogStockChange.store_id == store_id, CatalogStockChange.version.is_not(None)
+        )
+        if since is not None:
+            query = query.where(CatalogStockChange.version > since)
+        restocked = {entity: set() for entity in CATALOG_MODELS}
+        for version, entity, entity_id in db.execute(query):
+            if entity in restocked:
+                restocked[entity].add(entity_id)
+                changes.append((version, entity, entity_id))
+
+        for entity, (model, schema) in CATALOG_MODELS.items():
+            fields, columns = schema_columns(schema, model)
+            query = select(model.catalog_version, *columns).where(model.store_id == store_id).order_by(model.id)
+            if since is not None:
+                query = query.where(or_(model.catalog_version > since, model.id.in_(restocked[entity])))
+            for version, *values in db.execute(query):
+                record = dict(zip(fields, values))
+                snapshot.put(entity, record)
+                if since is None or version > since:
+                    changes.append((version, entity, record["id"]))
+
+        # Rows committed after the counter was read carry later versions, all
+        # already visible since versions commit in order
+        version = max([current] + [change[0] for change in changes])
+        changes = sorted(change for change in changes if change[0] > snapshot.version)
+        snapshot.versions.extend(change[0] for change in changes)
+        snapshot.changes.extend((entity, entity_id) for _, entity, entity_id in changes)
+        snapshot.version = version
+
+        # Changes older than any delta still served are never read again
+        stale = bisect.bisect_right(snapshot.versions, version - self.max_delta_versions)
+        if stale:
+            del snapshot.versions[:stale]
+            del snapshot.changes[:stale]
+
+    def _changes(self, snapshot: CatalogSnapshot, since_version: Optional[int]) -> Dict[str, Any]:
+        version = snapshot.version
+        if since_version is None or since_version > version or since_version < version - self.max_delta_versions:
+            return {
+                "version": version,
+                "full": True,
+                "products": list(snapshot.rows[PRODUCT].values()),
+                "parts": list(snapshot.rows[PART].values()),
+                "deleted_products": [],
+                "deleted_parts": [],
+            }
+
+        start = bisect.bisect_right(snapshot.versions, since_version)
+        touched = {entity: [] for entity in CATALOG_MODELS}
+        seen = set()
+        for entity, entity_id in snapshot.changes[start:]:
+            if (entity, entity_id) not in seen:
+                seen.add((entity, entity_id))
+                touched[entity].append(entity_id)
+
+        delta: Dict[str, Any] = {"version": version, "full": False}
+        for entity, key in ((PRODUCT, "products"), (PART, "parts")):
+            rows = snapshot.rows[entity]
+            delta[key] = [rows[entity_id] for entity_id in touched[entity] if entity_id in rows]
+            delta[f"deleted_{key}"] = [entity_id for entity_id in touched[entity] if entity_id not in rows]
+        return delta
+
+
+catalog = Catalog(
+    max_delta_versions=settings.CATALOG_MAX_DELTA_VERSIONS,
+    scan_refresh_seconds=settings.CATALOG_SCAN_REFRESH_SECONDS,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    touched = session.info.pop(TOUCHED_KEY, None)
+    if touched:
+        catalog.invalidate(touched)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_uncommitted(session, transaction):
+    # Runs after after_commit, so only stores of rolled back or closed transactions are left
+    if transaction.parent is None:
+        session.info.pop(TOUCHED_KEY, None)
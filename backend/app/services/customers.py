@@ -0,0 +1,176 @@
+"""
+Customer normalization, matching and history.
+
+The phone and C.I. typed at the counter are normalized before matching, so
+"0414-123.45.67", "+58 414 1234567" and "584141234567" are the same
+customer: phones become E.164 (numbers without a country code get
+``DEFAULT_PHONE_COUNTRY_CODE``) and C.I. numbers lose their separators. A
+sale or repair with neither is not linked to a customer.
+"""
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+
+from ..config import settings
+from ..models.archive import ArchivedTicket, ArchivedWorkOrder
+from ..models.customer import Customer
+from ..models.ticket import Ticket
+from ..models.work_order import WorkOrder
+
+# E.164 allows up to 15 digits; shorter than 8 is a typo or an extension
+E164_MIN_DIGITS = 8
+E164_MAX_DIGITS = 15
+
+
+def normalize_phone(phone: Optional[str], country_code: Optional[str] = None) -> Optional[str]:
+    """
+    Phone number in E.164 form (``+`` and digits), or None if it is not one.
+
+    Args:
+        phone: Phone as typed, with any spacing or punctuation
+        country_code: Code for national numbers (defaults to DEFAULT_PHONE_COUNTRY_CODE)
+
+    Returns:
+        Normalized phone or None
+    """
+    if not phone:
+        return None
+    country_code = country_code or settings.DEFAULT_PHONE_COUNTRY_CODE
+    phone = phone.strip()
+    digits = re.sub(r"\D", "", phone)
+
+    if phone.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        # International call prefix
+        digits = digits[2:]
+    elif digits.startswith("0"):
+        # National trunk prefix, e.g. 0414 in Venezuela
+        digits = country_code + digits[1:]
+    elif not digits.startswith(country_code) or len(digits) <= 10:
+        digits = country_code + digits
+
+    if not E164_MIN_DIGITS <= len(digits) <= E164_MAX_DIGITS:
+        return None
+    return f"+{digits}"
+
+
+def normalize_national_id(national_id: Optional[str]) -> Optional[str]:
+    """C.I. in upper case without separators (``V-12.345.678`` -> ``V12345678``), or None"""
+    if not national_id:
+        return None
+    return re.sub(r"[^0-9A-Z]", "", national_id.upper()) or None
+
+
+def _find(db: Session, attribute: str, value: str) -> Optional[Customer]:
+    # Customers created earlier in the same unflushed batch count too
+    for pending in db.new:
+        if isinstance(pending, Customer) and getattr(pending, attribute) == value:
+            return pending
+    return db.query(Customer).filter(getattr(Customer, attribute) == value).first()
+
+
+def _match(db: Session, phone: Optional[str], national_id: Optional[str]):
+    """Matched customer (or None), the customer matched by phone, and the phone still assignable"""
+    by_national_id = _find(db, "national_id", national_id) if national_id else None
+    by_phone = _find(db, "phone", phone) if phone else None
+
+    if by_phone is not None and national_id and by_phone.national_id not in (None, national_id):
+        # Shared phone (e.g. a relative's): keep it with its current owner
+        by_phone, phone = None, None
+    return by_national_id or by_phone, by_phone, phone
+
+
+def resolve_customer(
+    db: Session,
+    name: str,
+    phone: Optional[str] = None,
+    national_id: Optional[str] = None
+) -> Optional[Customer]:
+    """
+    Find the customer with this C.I. or phone, creating it if there is none.
+
+    The C.I. wins over the phone: a phone already registered to a customer
+    with another C.I. is not reassigned. A matched customer takes the latest
+    name and any phone or C.I. it did not have yet.
+
+    A new customer is inserted at once, in a savepoint: if a concurrent
+    request created the same customer first, the unique index rejects the
+    insert and that customer is matched instead. This flushes the session.
+
+    Args:
+        db: Database session
+        name: Customer name as typed
+        phone: Optional phone as typed
+        national_id: Optional C.I. as typed
+
+    Returns:
+        The customer, or None when neither phone nor C.I. is usable
+    """
+    phone = normalize_phone(phone)
+    national_id = normalize_national_id(national_id)
+    if not phone and not national_id:
+        return None
+
+    customer, by_phone, new_phone = _match(db, phone, national_id)
+
+    if customer is None:
+        customer = Customer(name=name, phone=new_phone, national_id=national_id)
+        # Flushed first, so only the customer's own insert is rolled back on a conflict
+        db.flush()
+        try:
+            with db.begin_nested():
+                db.add(customer)
+            return customer
+        except IntegrityError:
+            customer, by_phone, new_phone = _match(db, phone, national_id)
+            if customer is None:
+                raise
+
+    customer.name = name
+    if national_id and customer.national_id is None:
+        customer.national_id = national_id
+    if new_phone and customer.phone is None and by_phone is None:
+        customer.phone = new_phone
+    return customer
+
+
+def link_customer(
+    db: Session,
+    record,
+    name: str,
+    phone: Optional[str] = None,
+    national_id: Optional[str] = None
+):
+    """Point a ticket or work order to its customer (or to none)"""
+    record.customer = resolve_customer(db, name, phone, national_id)
+
+
+def customer_history(db: Session, customer: Customer) -> Dict[str, List]:
+    """
+    Tickets and work orders of a customer, newest first, including archived ones.
+
+    Each table is read through its (store_id, customer_ref_id) index.
+
+    Args:
+        db: Database session bound to the customer's store
+        customer: Customer
+
+    Returns:
+        Dict with ``customer``, ``tickets`` and ``work_orders``
+    """
+    tickets = []
+    for model in (Ticket, ArchivedTicket):
+        tickets += db.query(model).options(selectinload(model.items)).filter(
+            model.customer_ref_id == customer.id
+        ).order_by(model.date.desc()).all()
+
+    work_orders = []
+    for model in (WorkOrder, ArchivedWorkOrder):
+        work_orders += db.query(model).filter(
+            model.customer_ref_id == customer.id
+        ).order_by(model.received_date.desc()).all()
+
+    return {"customer": customer, "tickets": tickets, "work_orders": work_orders}
@@ -0,0 +1,179 @@
+"""
+Exchange rate history, cached current rate and SQL currency conversion.
+
+The current rate is read by every sale and report, so it is cached in
+process memory. Recording a rate invalidates this process's cache; other
+server workers pick the new rate up when their entry expires after
+``EXCHANGE_RATE_CACHE_SECONDS``. An entry never outlives the
+``effective_from`` of a rate scheduled for later, so that rate takes effect
+on time.
+
+Reports convert amounts in SQL: each ticket is matched to the rate in effect
+at its sale date (an index lookup on ``ix_exchange_rates_currency_effective_from``),
+falling back to the rate stored on the ticket for sales older than the
+recorded history.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import Float, case, cast, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..config import settings
+from ..models.exchange_rate import ExchangeRate
+from ..models.ticket import Ticket
+from ..schemas.exchange_rate import ExchangeRateCreate
+
+BASE_CURRENCY = "USD"
+LOCAL_CURRENCY = "VES"
+
+
+@dataclass(frozen=True)
+class CurrentRate:
+    """Snapshot of the rate in effect, safe to share between requests"""
+    id: int
+    currency: str
+    rate: Decimal
+    effective_from: datetime
+    created_at: Optional[datetime]
+
+
+class ExchangeRateCache:
+    """Per-process cache of the current rate of each currency"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, Optional[CurrentRate]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, currency: str = LOCAL_CURRENCY) -> Optional[CurrentRate]:
+        """
+        Get the rate currently in effect for a currency.
+
+        Args:
+            db: Database session, used on a cache miss
+            currency: Currency code
+
+        Returns:
+            The current rate, or None if no rate has been recorded yet
+        """
+        entry = self._entries.get(currency)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        record = db.query(ExchangeRate).filter(
+            ExchangeRate.currency == currency,
+            ExchangeRate.effective_from <= func.now()
+        ).order_by(ExchangeRate.effective_from.desc()).first()
+        current = None
+        if record is not None:
+            current = CurrentRate(
+                id=record.id,
+                currency=record.currency,
+                rate=Decimal(record.rate),
+                effective_from=record.effective_from,
+                created_at=record.created_at
+            )
+
+        # Expire no later than the next scheduled rate takes effect (compared
+        # on the database clock, which also stamps effective_from)
+        ttl = self.ttl_seconds
+        scheduled, now = db.query(func.min(ExchangeRate.effective_from), func.now()).filter(
+            ExchangeRate.currency == currency,
+            ExchangeRate.effective_from > func.now()
+        ).one()
+        if scheduled is not None:
+            ttl = min(ttl, max((scheduled - now).total_seconds(), 0.0))
+
+        with self._lock:
+            self._entries[currency] = (time.monotonic() + ttl, current)
+        return current
+
+    def invalidate(self, currency: Optional[str] = None):
+        """Drop the cached rate of a currency, or of all currencies"""
+        with self._lock:
+            if currency is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(currency, None)
+
+
+def record_rate(db: Session, rate_data: ExchangeRateCreate) -> ExchangeRate:
+    """
+    Store a new rate and invalidate the cached current rate.
+
+    Raises:
+        IntegrityError: If a rate already starts at the same moment
+    """
+    record = ExchangeRate(currency=rate_data.currency.upper(), rate=Decimal(str(rate_data.rate)))
+    if rate_data.effective_from is not None:
+        record.effective_from = rate_data.effective_from
+    db.add(record)
+    db.commit()
+    db.refresh(record)
+    exchange_rate_cache.invalidate(record.currency)
+    return record
+
+
+def rate_at(moment: ColumnElement, currency: str = LOCAL_CURRENCY) -> ColumnElement:
+    """Correlated SQL lookup of the rate in effect at ``moment``"""
+    return (
+        select(ExchangeRate.rate)
+        .where(ExchangeRate.currency == currency, ExchangeRate.effective_from <= moment)
+        .order_by(ExchangeRate.effective_from.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def ticket_rate(currency: str = LOCAL_CURRENCY, ticket=Ticket) -> ColumnElement:
+    """SQL rate of ``currency`` per USD in effect when each ``ticket`` (model or alias) was sold"""
+    # Floating point so integer-looking rates never trigger integer division
+    return cast(func.coalesce(rate_at(ticket.date, currency), ticket.exchange_rate, 1), Float)
+
+
+def convert_minor(amount: ColumnElement, source: str, target: str, rate: ColumnElement) -> ColumnElement:
+    """
+    Convert a minor-unit amount between USD and the local currency in SQL.
+
+    Args:
+        amount: Integer minor-unit expression in ``source`` currency
+        source: Currency of ``amount``
+        target: Currency to convert to
+        rate: Units of local currency per USD
+
+    Returns:
+        Rounded integer minor-unit expression in ``target`` currency
+    """
+    if source == target:
+        return amount
+    if source == BASE_CURRENCY:
+        return func.round(amount * rate)
+    return func.round(amount / rate)
+
+
+def ticket_debt_minor(
+    currency: str = BASE_CURRENCY, rate: Optional[ColumnElement] = None, ticket=Ticket
+) -> ColumnElement:
+    """
+    SQL amount still owed on each ticket, in minor units of ``currency``.
+
+    Ticket totals are in USD; payments may be split between USD and the
+    local currency, which is converted at the rate in effect at sale time.
+    ``ticket`` may be an alias of the model (e.g. over the archive union).
+    """
+    rate = rate if rate is not None else ticket_rate(ticket=ticket)
+    paid = func.coalesce(ticket.amount_usd, 0) + convert_minor(
+        func.coalesce(ticket.amount_ves, 0), LOCAL_CURRENCY, BASE_CURRENCY, rate
+    )
+    debt = convert_minor(ticket.total - paid, BASE_CURRENCY, currency, rate)
+    return case((debt > 0, debt), else_=0)
+
+
+# Global instance
+exchange_rate_cache = ExchangeRateCache(ttl_seconds=settings.EXCHANGE_RATE_CACHE_SECONDS)
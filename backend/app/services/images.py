@@ -0,0 +1,209 @@
+"""
+Image storage service for product and part photos.
+
+Uploads are streamed to disk while being hashed and stored content-addressed
+(``<sha256>.<ext>``), so identical photos are stored once and every URL is
+immutable. The extension comes from the format Pillow decodes the file as;
+the client's declared content type is not trusted. Thumbnails are rendered
+with Pillow on a process pool, off the request thread.
+
+``save`` reads the file Starlette already spooled from the multipart body,
+so its size check comes after the upload was received; oversized uploads
+are refused earlier, as the body arrives, by ``UploadLimitMiddleware``.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import BinaryIO, List, Optional, Sequence
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Accepted image formats, as Pillow reports them, and the extension they are stored with
+IMAGE_FORMATS = {
+    "JPEG": "jpg",
+    "PNG": "png",
+    "WEBP": "webp",
+}
+
+
+class ImageTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+class UnsupportedImageError(Exception):
+    """Raised when an upload does not decode as one of IMAGE_FORMATS"""
+
+
+def detect_format(path: str) -> Optional[str]:
+    """Format Pillow decodes a file as (e.g. "PNG"), or None if it is not an image"""
+    from PIL import Image
+
+    try:
+        with Image.open(path) as image:
+            image.verify()
+            return image.format
+    except Exception:
+        return None
+
+
+def render_thumbnails(source: str, thumbs_dir: str, digest: str, sizes: Sequence[int]) -> List[str]:
+    """
+    Render square-bounded WebP thumbnails for an image.
+
+    Runs inside a pool worker process.
+
+    Args:
+        source: Path of the stored original
+        thumbs_dir: Directory holding one sub-directory per size
+        digest: Content hash used as the file name
+        sizes: Longest-edge sizes in pixels
+
+    Returns:
+        Paths of the thumbnails written
+    """
+    from PIL import Image, ImageOps
+
+    written = []
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        for size in sizes:
+            target_dir = os.path.join(thumbs_dir, str(size))
+            os.makedirs(target_dir, exist_ok=True)
+            target = os.path.join(target_dir, f"{digest}.webp")
+            if os.path.exists(target):
+                continue
+            thumbnail = image.copy()
+            thumbnail.thumbnail((size, size), Image.Resampling.LANCZOS)
+            # Write to a temporary name first so a half-written file is never served
+            partial = f"{target}.{os.getpid()}.tmp"
+            thumbnail.save(partial, "WEBP", quality=80, method=4)
+            os.replace(partial, target)
+            written.append(target)
+    return written
+
+
+class ImageStore:
+    """Content-addressed image storage with background thumbnail rendering"""
+
+    def __init__(self, root: str, url_prefix: str, thumbnail_sizes: Sequence[int], max_bytes: int, workers: int):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+        self.thumbnail_sizes = list(thumbnail_sizes)
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        try:
+            import PIL  # noqa: F401
+            self.pillow_available = True
+        except ImportError:
+            logger.warning("⚠️ Pillow not installed, image uploads disabled. Run: pip install Pillow")
+            self.pillow_available = False
+        self.thumbnails_enabled = self.pillow_available and bool(self.thumbnail_sizes)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Created lazily so importing the app (and each forked server worker)
+        # does not start idle processes; "spawn" avoids forking a threaded server
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def save(self, stream: BinaryIO, kind: str) -> str:
+        """
+        Stream an upload to disk under its content hash.
+
+        Args:
+            stream: File-like object positioned at the start of the upload
+            kind: Entity folder, e.g. "products" or "parts"
+
+        Returns:
+            Public URL of the stored image
+
+        Raises:
+            ImageTooLargeError: If the upload exceeds max_bytes
+            UnsupportedImageError: If the upload is not an image in IMAGE_FORMATS
+        """
+        if not self.pillow_available:
+            raise UnsupportedImageError("Pillow is not installed, images cannot be validated")
+        directory = os.path.join(self.root, kind)
+        os.makedirs(directory, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        handle, partial = tempfile.mkstemp(dir=directory, suffix=".upload")
+        try:
+            with os.fdopen(handle, "wb") as target:
+                while chunk := stream.read(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ImageTooLargeError(f"Image exceeds {self.max_bytes} bytes")
+                    digest.update(chunk)
+                    target.write(chunk)
+
+            extension = IMAGE_FORMATS.get(detect_format(partial))
+            if extension is None:
+                raise UnsupportedImageError(f"Not an image of type {', '.join(IMAGE_FORMATS)}")
+            name = f"{digest.hexdigest()}.{extension}"
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                # Same content already stored
+                os.remove(partial)
+            else:
+                os.replace(partial, path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+
+        self.schedule_thumbnails(path, kind, digest.hexdigest())
+        return f"{self.url_prefix}/{kind}/{name}"
+
+    def schedule_thumbnails(self, path: str, kind: str, digest: str) -> Optional[Future]:
+        """Queue thumbnail rendering without waiting for it"""
+        if not self.thumbnails_enabled:
+            return None
+
+        future = self._pool().submit(
+            render_thumbnails, path, os.path.join(self.root, kind, "thumbs"), digest, self.thumbnail_sizes
+        )
+        future.add_done_callback(self._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future: Future):
+        error = future.exception()
+        if error is not None:
+            logger.error(f"❌ Thumbnail rendering failed: {error}")
+
+    def thumbnail_url(self, image_url: str, size: int) -> str:
+        """URL of a thumbnail for a stored image URL"""
+        prefix, _, name = image_url.rpartition("/")
+        return f"{prefix}/thumbs/{size}/{name.rsplit('.', 1)[0]}.webp"
+
+    def shutdown(self):
+        """Stop the worker pool, letting queued thumbnails finish"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# Global instance
+image_store = ImageStore(
+    root=settings.UPLOAD_DIR,
+    url_prefix="/uploads",
+    thumbnail_sizes=settings.image_thumbnail_sizes_list,
+    max_bytes=settings.IMAGE_MAX_UPLOAD_BYTES,
+    workers=settings.IMAGE_WORKERS
+)
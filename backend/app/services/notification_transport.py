@@ -0,0 +1,169 @@
+"""
+Asynchronous HTTP transport for WhatsApp and SMS messages.
+
+Messages are posted to the Twilio Messages REST API with one pooled
+``httpx.AsyncClient`` per provider, so connections are kept alive and
+reused instead of opening one blocking connection per message. Each provider
+caps the requests in flight with a semaphore, spaces them with a
+requests-per-second limiter and bounds every request with a timeout, so a
+bulk send of hundreds of messages is a set of coroutines, not a thread per
+message.
+
+The transport runs on a single background event loop (``BackgroundLoop``)
+shared by the synchronous callers (request handlers, scheduled jobs) of
+``NotificationService``. The client and semaphore are created by the first
+send, on that loop, so the service can be built at import time (before the
+gunicorn master forks) without workers sharing the master's client.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Awaitable, Optional, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+TWILIO_API_URL = "https://api.twilio.com"
+
+
+class AsyncRateLimiter:
+    """Space requests evenly so at most ``per_second`` start each second (0 = unlimited)"""
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        # Slots are handed out without awaiting, so no lock is needed on one loop
+        now = time.monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class TwilioTransport:
+    """
+    One messaging provider account reached over pooled async HTTP.
+
+    Args:
+        account_sid: Twilio account SID
+        auth_token: Twilio auth token
+        whatsapp_from: WhatsApp sender, e.g. ``whatsapp:+14155238886``
+        sms_from: SMS sender number, or None to disable SMS
+        base_url: API root (a fake provider in tests and local runs)
+        timeout: Seconds allowed for each request
+        concurrency: Requests in flight at once (also the pool size)
+        rate_per_second: Requests started per second (0 = unlimited)
+        transport: Optional httpx transport (e.g. ``httpx.ASGITransport``)
+    """
+
+    def __init__(
+        self,
+        account_sid: str,
+        auth_token: str,
+        whatsapp_from: str,
+        sms_from: Optional[str] = None,
+        base_url: str = TWILIO_API_URL,
+        timeout: float = 10.0,
+        concurrency: int = 10,
+        rate_per_second: float = 0.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.account_sid = account_sid
+        self.whatsapp_from = whatsapp_from
+        self.sms_from = sms_from
+        self.concurrency = concurrency
+        self._client_options = dict(
+            base_url=base_url,
+            auth=(account_sid, auth_token),
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            transport=transport
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._limiter = AsyncRateLimiter(rate_per_second)
+
+    def _connect(self):
+        # Called on the loop that sends, in the process that sends
+        if self._client is None:
+            self._client = httpx.AsyncClient(**self._client_options)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def send(self, to: str, from_: str, body: str) -> bool:
+        """
+        Post one message.
+
+        Returns:
+            True if the provider accepted it, False otherwise
+        """
+        self._connect()
+        async with self._semaphore:
+            await self._limiter.wait()
+            try:
+                response = await self._client.post(
+                    f"/2010-04-01/Accounts/{self.account_sid}/Messages.json",
+                    data={"To": to, "From": from_, "Body": body}
+                )
+            except httpx.HTTPError as e:
+                logger.error(f"❌ Failed to send message to {to}: {e!r}")
+                return False
+
+        if response.status_code >= 400:
+            logger.error(f"❌ Provider rejected message to {to}: {response.status_code} {response.text[:200]}")
+            return False
+        logger.info(f"✅ Message sent to {to} - SID: {response.json().get('sid')}")
+        return True
+
+    async def send_whatsapp(self, phone: str, message: str) -> bool:
+        """Send a WhatsApp message to a phone in international format"""
+        return await self.send(f"whatsapp:{phone}", self.whatsapp_from, message)
+
+    async def send_sms(self, phone: str, message: str) -> bool:
+        """Send an SMS to a phone in international format"""
+        if not self.sms_from:
+            logger.warning(f"⚠️ No SMS sender number configured, not sending to {phone}")
+            return False
+        return await self.send(phone, self.sms_from, message)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+
+
+class BackgroundLoop:
+    """
+    Event loop running on a daemon thread, for synchronous callers.
+
+    Started lazily on first use, so a loop (and its thread) never crosses a
+    fork from the gunicorn master into the workers.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name=self.name, daemon=True).start()
+            return self._loop
+
+    def run(self, coroutine: Awaitable[T]) -> T:
+        """Run a coroutine on the loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._get_loop()).result()
+
+    def shutdown(self):
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
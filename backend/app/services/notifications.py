@@ -1,12 +1,17 @@
 """
 Notification service for sending WhatsApp and SMS messages to customers.
-Supports Twilio for both WhatsApp Business API and SMS.
+Supports Twilio for both WhatsApp Business API and SMS, through the pooled
+async transport in ``notification_transport``.
 """
 import os
+import asyncio
 import logging
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
 from datetime import datetime
 
+from ..config import settings
+from .notification_transport import BackgroundLoop, TwilioTransport
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,28 +20,65 @@ logger = logging.getLogger(__name__)
 class NotificationService:
     """Service for sending notifications via WhatsApp and SMS"""
     
-    def __init__(self):
+    def __init__(self, transport: Optional[TwilioTransport] = None):
         self.enabled = os.getenv("NOTIFICATIONS_ENABLED", "false").lower() == "true"
         self.twilio_account_sid = os.getenv("TWILIO_ACCOUNT_SID")
         self.twilio_auth_token = os.getenv("TWILIO_AUTH_TOKEN")
         self.twilio_whatsapp_number = os.getenv("TWILIO_WHATSAPP_NUMBER", "whatsapp:+14155238886")
         self.twilio_sms_number = os.getenv("TWILIO_SMS_NUMBER")
+        self._loop = BackgroundLoop("notifications")
         
-        self.client = None
-        if self.enabled and self.twilio_account_sid and self.twilio_auth_token:
-            try:
-                from twilio.rest import Client
-                self.client = Client(self.twilio_account_sid, self.twilio_auth_token)
-                logger.info("✅ Twilio client initialized successfully")
-            except ImportError:
-                logger.warning("⚠️ Twilio not installed. Run: pip install twilio")
-                self.enabled = False
-            except Exception as e:
-                logger.error(f"❌ Failed to initialize Twilio client: {e}")
-                self.enabled = False
+        self.client = transport
+        if transport is not None:
+            self.enabled = True
+        elif self.enabled and self.twilio_account_sid and self.twilio_auth_token:
+            self.client = TwilioTransport(
+                account_sid=self.twilio_account_sid,
+                auth_token=self.twilio_auth_token,
+                whatsapp_from=self.twilio_whatsapp_number,
+                sms_from=self.twilio_sms_number,
+                base_url=settings.NOTIFICATION_API_URL,
+                timeout=settings.NOTIFICATION_TIMEOUT_SECONDS,
+                concurrency=settings.NOTIFICATION_CONCURRENCY,
+                rate_per_second=settings.NOTIFICATION_RATE_PER_SECOND
+            )
+            logger.info("✅ Twilio transport initialized successfully")
         else:
             logger.info("ℹ️ Notifications disabled or credentials not configured")
     
+    @staticmethod
+    def _international(phone: str) -> str:
+        # Ensure phone number starts with +
+        return phone if phone.startswith('+') else f'+{phone}'
+    
+    async def send_whatsapp_async(self, phone: str, message: str) -> bool:
+        """Async version of ``send_whatsapp``, to run on the notification loop"""
+        if not self.enabled or not self.client:
+            logger.info(f"📱 [SIMULATION] WhatsApp to {phone}: {message}")
+            return False
+        return await self.client.send_whatsapp(self._international(phone), message)
+    
+    async def send_sms_async(self, phone: str, message: str) -> bool:
+        """Async version of ``send_sms``, to run on the notification loop"""
+        if not self.enabled or not self.client or not self.client.sms_from:
+            logger.info(f"📧 [SIMULATION] SMS to {phone}: {message}")
+            return False
+        return await self.client.send_sms(self._international(phone), message)
+    
+    async def send_notification_async(self, phone: str, message: str, prefer_whatsapp: bool = True) -> bool:
+        """Async version of ``send_notification``, to run on the notification loop"""
+        if not phone:
+            logger.warning("⚠️ No phone number provided")
+            return False
+        
+        if prefer_whatsapp:
+            # Try WhatsApp first
+            if await self.send_whatsapp_async(phone, message):
+                return True
+            # Fallback to SMS
+            logger.info("📱 WhatsApp failed, trying SMS fallback...")
+        return await self.send_sms_async(phone, message)
+    
     def send_whatsapp(self, phone: str, message: str) -> bool:
         """
         Send WhatsApp message using Twilio
@@ -48,27 +90,7 @@ class NotificationService:
         Returns:
             True if sent successfully, False otherwise
         """
-        if not self.enabled or not self.client:
-            logger.info(f"📱 [SIMULATION] WhatsApp to {phone}: {message}")
-            return False
-        
-        try:
-            # Ensure phone number starts with +
-            if not phone.startswith('+'):
-                phone = f'+{phone}'
-            
-            message_obj = self.client.messages.create(
-                from_=self.twilio_whatsapp_number,
-                body=message,
-                to=f'whatsapp:{phone}'
-            )
-            
-            logger.info(f"✅ WhatsApp sent to {phone} - SID: {message_obj.sid}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to send WhatsApp to {phone}: {e}")
-            return False
+        return self._loop.run(self.send_whatsapp_async(phone, message))
     
     def send_sms(self, phone: str, message: str) -> bool:
         """
@@ -81,27 +103,7 @@ class NotificationService:
         Returns:
             True if sent successfully, False otherwise
         """
-        if not self.enabled or not self.client or not self.twilio_sms_number:
-            logger.info(f"📧 [SIMULATION] SMS to {phone}: {message}")
-            return False
-        
-        try:
-            # Ensure phone number starts with +
-            if not phone.startswith('+'):
-                phone = f'+{phone}'
-            
-            message_obj = self.client.messages.create(
-                from_=self.twilio_sms_number,
-                body=message,
-                to=phone
-            )
-            
-            logger.info(f"✅ SMS sent to {phone} - SID: {message_obj.sid}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to send SMS to {phone}: {e}")
-            return False
+        return self._loop.run(self.send_sms_async(phone, message))
     
     def send_notification(self, phone: str, message: str, prefer_whatsapp: bool = True) -> bool:
         """
@@ -115,20 +117,34 @@ class NotificationService:
         Returns:
             True if any method succeeded, False otherwise
         """
-        if not phone:
-            logger.warning("⚠️ No phone number provided")
-            return False
+        return self._loop.run(self.send_notification_async(phone, message, prefer_whatsapp))
+    
+    def send_bulk(self, messages: Iterable[Tuple[str, str]], prefer_whatsapp: bool = True) -> List[bool]:
+        """
+        Send many notifications concurrently, within the transport's limits
         
-        if prefer_whatsapp:
-            # Try WhatsApp first
-            if self.send_whatsapp(phone, message):
-                return True
-            # Fallback to SMS
-            logger.info("📱 WhatsApp failed, trying SMS fallback...")
-            return self.send_sms(phone, message)
-        else:
-            # Send SMS directly
-            return self.send_sms(phone, message)
+        Args:
+            messages: (phone, message) pairs
+            prefer_whatsapp: Try WhatsApp first, fallback to SMS if it fails
+            
+        Returns:
+            Whether each notification was sent, in order
+        """
+        async def send_all():
+            return await asyncio.gather(*[
+                self.send_notification_async(phone, message, prefer_whatsapp) for phone, message in messages
+            ])
+        
+        return list(self._loop.run(send_all()))
+    
+    def shutdown(self):
+        """Close pooled connections and stop the notification loop"""
+        if self.client is not None:
+            try:
+                self._loop.run(self.client.aclose())
+            except RuntimeError:
+                pass
+        self._loop.shutdown()
 
 
 # Notification message templates
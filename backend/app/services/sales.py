@@ -0,0 +1,257 @@
+"""
+Sale processing shared by single checkout and offline batch sync.
+
+Every sale in a request is checked against one prefetched set of products
+(row-locked on PostgreSQL), so a whole batch is applied in one transaction:
+a sale that fails (unknown product, insufficient stock) is skipped without
+touching the database, and sales whose idempotency key was already applied
+are replayed instead of being sold twice.
+"""
+import hashlib
+import logging
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from fastapi import status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.idempotency import IdempotencyKey
+from ..models.money import from_minor_units, to_minor_units
+from ..models.product import Product
+from ..models.ticket import Ticket, TicketItem, PaymentStatus
+from ..schemas.ticket import TicketCreate
+from .audit import audit_log, created, CREATE
+from .customers import link_customer
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_SCOPE = "ticket"
+
+APPLIED = "applied"
+REPLAYED = "replayed"
+FAILED = "failed"
+
+
+class SaleError(Exception):
+    """A sale that cannot be applied, with the HTTP status it maps to"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class PendingSale:
+    """A sale waiting to be applied"""
+    ticket_data: TicketCreate
+    idempotency_key: Optional[str] = None
+    sold_at: Optional[datetime] = None
+
+
+@dataclass
+class SaleResult:
+    """Outcome of applying one sale"""
+    idempotency_key: Optional[str]
+    status: str
+    ticket_id: Optional[str] = None
+    ticket: Optional[Ticket] = None  # Only set for sales applied by this request
+    error: Optional[SaleError] = None
+
+    @property
+    def status_code(self) -> int:
+        if self.error is not None:
+            return self.error.status_code
+        return status.HTTP_201_CREATED if self.status == APPLIED else status.HTTP_200_OK
+
+
+def _is_key_conflict(error: IntegrityError) -> bool:
+    """Whether a commit failed on the idempotency_keys primary key (a key stored concurrently)"""
+    diag = getattr(error.orig, "diag", None)
+    if diag is not None:
+        # PostgreSQL reports the violated constraint by name
+        return getattr(diag, "constraint_name", None) == "pk_idempotency_keys"
+    return str(error.orig).startswith(f"UNIQUE constraint failed: {IdempotencyKey.__tablename__}.")
+
+
+def request_hash(ticket_data: TicketCreate) -> str:
+    """Fingerprint of the sale payload, used to detect reused idempotency keys"""
+    # Unset optional fields are left out so fingerprints of older payloads still match
+    payload = ticket_data.model_dump_json(include=set(TicketCreate.model_fields), exclude_none=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _load_products(db: Session, sales: Sequence[PendingSale]) -> Dict[int, Product]:
+    product_ids = {item.product_id for sale in sales for item in sale.ticket_data.items}
+    query = db.query(Product).filter(Product.id.in_(product_ids))
+    if db.get_bind().dialect.name == "postgresql":
+        # Serialize concurrent checkouts of the same products
+        query = query.with_for_update()
+    return {product.id: product for product in query}
+
+
+def _build_ticket(sale: PendingSale, products: Dict[int, Product]) -> Ticket:
+    """Validate a sale against current stock, then decrement stock and build its ticket"""
+    ticket_data = sale.ticket_data
+
+    try:
+        payment_status = PaymentStatus(ticket_data.payment_status)
+    except ValueError:
+        raise SaleError(
+            status.HTTP_400_BAD_REQUEST,
+            f"Invalid payment status {ticket_data.payment_status}"
+        )
+
+    # Check every item before touching stock so a failed sale changes nothing
+    requested = defaultdict(int)
+    for item in ticket_data.items:
+        product = products.get(item.product_id)
+        if not product:
+            raise SaleError(
+                status.HTTP_404_NOT_FOUND,
+                f"Product with id {item.product_id} not found"
+            )
+
+        available = product.stock - requested[item.product_id]
+        if available < item.quantity:
+            raise SaleError(
+                status.HTTP_400_BAD_REQUEST,
+                f"Insufficient stock for product {product.name}. Available: {available}, Requested: {item.quantity}"
+            )
+        requested[item.product_id] += item.quantity
+
+    # Sum in integer cents so long tickets do not accumulate float error
+    subtotal_minor = 0
+    ticket_items = []
+    for item in ticket_data.items:
+        product = products[item.product_id]
+        subtotal_minor += to_minor_units(product.price) * item.quantity
+        ticket_items.append(TicketItem(
+            product_id=item.product_id,
+            quantity=item.quantity,
+            price=product.price
+        ))
+        product.stock -= item.quantity
+
+    # No additional tax - prices already include tax
+    subtotal = float(from_minor_units(subtotal_minor))
+    tax = 0.0
+    total = subtotal
+
+    ticket = Ticket(
+        id=str(uuid.uuid4()),
+        customer_name=ticket_data.customer_name,
+        payment_method=ticket_data.payment_method,
+        payment_status=payment_status,
+        subtotal=subtotal,
+        tax=tax,
+        total=total,
+        exchange_rate=ticket_data.exchange_rate,
+        amount_usd=ticket_data.amount_usd,
+        amount_ves=ticket_data.amount_ves,
+        items=ticket_items
+    )
+    if sale.sold_at is not None:
+        ticket.date = sale.sold_at
+    return ticket
+
+
+def process_sales(db: Session, sales: Sequence[PendingSale], user=None) -> List[SaleResult]:
+    """
+    Apply sales to the session without committing.
+
+    Args:
+        db: Database session
+        sales: Sales to apply, in order
+        user: User making the sales, recorded in the audit log
+
+    Returns:
+        One result per sale, in the same order
+    """
+    keys = [sale.idempotency_key for sale in sales if sale.idempotency_key]
+    known_keys = {}
+    if keys:
+        known_keys = {
+            record.key: record
+            for record in db.query(IdempotencyKey).filter(IdempotencyKey.key.in_(keys))
+        }
+    products = _load_products(db, sales)
+
+    results = []
+    for sale in sales:
+        key = sale.idempotency_key
+        digest = request_hash(sale.ticket_data)
+
+        record = known_keys.get(key) if key else None
+        if record is not None:
+            if record.request_hash != digest:
+                results.append(SaleResult(key, FAILED, error=SaleError(
+                    status.HTTP_409_CONFLICT,
+                    f"Idempotency key {key} was already used for a different sale"
+                )))
+            else:
+                results.append(SaleResult(key, REPLAYED, ticket_id=record.resource_id))
+            continue
+
+        try:
+            ticket = _build_ticket(sale, products)
+        except SaleError as error:
+            results.append(SaleResult(key, FAILED, error=error))
+            continue
+
+        link_customer(
+            db, ticket, sale.ticket_data.customer_name,
+            sale.ticket_data.customer_phone, sale.ticket_data.customer_id
+        )
+        db.add(ticket)
+        if key:
+            record = IdempotencyKey(
+                key=key,
+                scope=IDEMPOTENCY_SCOPE,
+                request_hash=digest,
+                resource_id=ticket.id
+            )
+            db.add(record)
+            known_keys[key] = record
+        if user is not None:
+            audit_log.record(
+                db, user, CREATE, "ticket", entity_id=ticket.id,
+                changes=created(sale.ticket_data.model_dump(exclude_unset=True))
+            )
+        results.append(SaleResult(key, APPLIED, ticket_id=ticket.id, ticket=ticket))
+
+    return results
+
+
+def apply_sales(db: Session, sales: Sequence[PendingSale], user=None) -> List[SaleResult]:
+    """
+    Apply sales in a single transaction and commit.
+
+    If another request commits one of the same idempotency keys first, the
+    transaction is rolled back and retried once, turning those sales into
+    replays. Any other integrity error is raised as is.
+
+    Args:
+        db: Database session
+        sales: Sales to apply, in order
+        user: User making the sales, recorded in the audit log
+
+    Returns:
+        One result per sale, in the same order
+    """
+    try:
+        # Customers are inserted during processing, so a conflict may surface before the commit
+        results = process_sales(db, sales, user)
+        db.commit()
+    except IntegrityError as error:
+        db.rollback()
+        if not _is_key_conflict(error):
+            raise
+        logger.info("🔁 Idempotency key committed concurrently, retrying sales as replays")
+        results = process_sales(db, sales, user)
+        db.commit()
+    return results
@@ -0,0 +1,307 @@
+"""
+Incremental export of tickets and work orders to Google Sheets.
+
+Each table has a worksheet with one row per record, keyed by its id in
+column A, and a watermark (``sync_watermarks``) recording up to when its
+changes were exported. A run reads the id column once, then streams the
+rows changed since the watermark store by store, each a range scan of the
+table's ``(store_id, updated_at)`` index, and writes each batch of
+``SHEETS_SYNC_BATCH_SIZE`` rows with at most two API calls: one
+``batch_update`` for rows already in the sheet and one ``append_rows`` for
+new ones. The sheet is never rewritten as a whole.
+
+Only changes older than ``SHEETS_SYNC_SETTLE_SECONDS`` are exported, so a
+transaction still in flight is not skipped. The watermark moves once a
+table is fully written; a run that dies halfway is repeated by the next one,
+and the rows it already wrote are updated in place, not duplicated. Calls
+hitting the API quota (or a transient server error) are retried with
+exponential backoff.
+
+The scheduler (``SHEETS_SYNC_ENABLED``) runs this every
+``SHEETS_SYNC_INTERVAL_MINUTES``; it can also be run from cron::
+
+    python -m app.services.sheets_sync
+"""
+import argparse
+import enum
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine, Result
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..config import settings
+from ..models.store import Store
+from ..models.sync_watermark import SyncWatermark
+from ..models.ticket import Ticket
+from ..models.work_order import WorkOrder
+from ..utils.locks import process_lock
+
+logger = logging.getLogger(__name__)
+
+SHEETS_SYNC_LOCK = "sheets_sync"
+
+# Quota exceeded and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+MAX_BACKOFF_SECONDS = 64
+
+_sleep = time.sleep
+
+
+@dataclass
+class SheetTable:
+    """How a table is exported to its worksheet"""
+    name: str  # Watermark name
+    title: str  # Worksheet title
+    model: Any
+    changed_at: ColumnElement
+    columns: List[Tuple[str, ColumnElement]]  # (header, column), the id first
+
+
+@dataclass
+class SyncResult:
+    """Rows written to one worksheet by one run"""
+    appended: int = 0
+    updated: int = 0
+
+
+SHEET_TABLES = [
+    SheetTable(
+        name="sheets:tickets",
+        title="Tickets",
+        model=Ticket,
+        changed_at=Ticket.updated_at,
+        columns=[
+            ("ID", Ticket.id),
+            ("Fecha", Ticket.date),
+            ("Sucursal", Store.name),
+            ("Cliente", Ticket.customer_name),
+            ("Método de pago", Ticket.payment_method),
+            ("Estado de pago", Ticket.payment_status),
+            ("Subtotal", Ticket.subtotal),
+            ("Impuesto", Ticket.tax),
+            ("Total", Ticket.total),
+            ("Tasa", Ticket.exchange_rate),
+            ("Monto USD", Ticket.amount_usd),
+            ("Monto VES", Ticket.amount_ves),
+            ("Actualizado", Ticket.updated_at),
+        ],
+    ),
+    SheetTable(
+        name="sheets:work_orders",
+        title="Órdenes de trabajo",
+        model=WorkOrder,
+        changed_at=WorkOrder.updated_at,
+        columns=[
+            ("ID", WorkOrder.id),
+            ("Código", WorkOrder.code),
+            ("Sucursal", Store.name),
+            ("Cliente", WorkOrder.customer_name),
+            ("Teléfono", WorkOrder.customer_phone),
+            ("C.I.", WorkOrder.customer_id),
+            ("Equipo", WorkOrder.device),
+            ("Falla", WorkOrder.issue),
+            ("Estado", WorkOrder.status),
+            ("Recibido", WorkOrder.received_date),
+            ("Entrega estimada", WorkOrder.estimated_completion_date),
+            ("Costo", WorkOrder.repair_cost),
+            ("Pagado", WorkOrder.amount_paid),
+            ("Estado de pago", WorkOrder.payment_status),
+            ("Fecha de pago", WorkOrder.payment_date),
+            ("Actualizado", WorkOrder.updated_at),
+        ],
+    ),
+]
+
+
+def _cell(value) -> Any:
+    """Sheet cell value for a column value"""
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _column_letter(number: int) -> str:
+    """A1 column letter of a 1-based column number (1 -> A, 27 -> AA)"""
+    letters = ""
+    while number:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _call(method, *args, **kwargs):
+    """Call the Sheets API, retrying quota and transient errors with exponential backoff"""
+    for attempt in range(settings.SHEETS_SYNC_MAX_RETRIES + 1):
+        try:
+            return method(*args, **kwargs)
+        except Exception as e:
+            # gspread's APIError carries the HTTP response
+            status_code = getattr(getattr(e, "response", None), "status_code", None)
+            if status_code not in RETRYABLE_STATUSES or attempt == settings.SHEETS_SYNC_MAX_RETRIES:
+                raise
+            delay = min(MAX_BACKOFF_SECONDS, 2 ** attempt) + random.random()
+            logger.warning(f"⚠️ Sheets API returned {status_code}, retrying in {delay:.1f}s")
+            _sleep(delay)
+
+
+def changed_rows(
+    db: Session, table: SheetTable, store_id: int, since: Optional[datetime], until: datetime
+) -> Result:
+    """
+    Rows of a store changed after ``since`` (if any) and up to ``until``, streamed.
+
+    Args:
+        db: Database session not bound to a store
+        table: Exported table
+        store_id: Store whose rows are read (the leading column of the index)
+        since: Watermark of the previous run, or None for every row
+        until: Upper bound of this run
+
+    Returns:
+        Result yielding the export columns, oldest change first
+    """
+    query = (
+        select(*[column for _, column in table.columns])
+        .join(Store, Store.id == table.model.store_id)
+        .where(table.model.store_id == store_id, table.changed_at <= until)
+        .order_by(table.changed_at, table.model.id)
+    )
+    if since is not None:
+        query = query.where(table.changed_at > since)
+    return db.execute(query.execution_options(yield_per=settings.SHEETS_SYNC_BATCH_SIZE))
+
+
+def _worksheet(spreadsheet, table: SheetTable):
+    for worksheet in _call(spreadsheet.worksheets):
+        if worksheet.title == table.title:
+            return worksheet
+    return _call(spreadsheet.add_worksheet, title=table.title, rows=1000, cols=len(table.columns))
+
+
+def sync_table(db: Session, spreadsheet, table: SheetTable, until: datetime) -> SyncResult:
+    """
+    Export the rows of a table changed since its watermark, then move the watermark.
+
+    Args:
+        db: Database session not bound to a store
+        spreadsheet: gspread ``Spreadsheet`` (or a fake with the same methods)
+        table: Exported table
+        until: Export changes up to this moment
+
+    Returns:
+        Rows appended and updated
+    """
+    watermark = db.get(SyncWatermark, table.name)
+    since = watermark.synced_until if watermark is not None else None
+
+    worksheet = _worksheet(spreadsheet, table)
+    ids = _call(worksheet.col_values, 1)
+    if not ids:
+        _call(worksheet.append_rows, [[header for header, _ in table.columns]], value_input_option="RAW")
+        ids = ["ID"]
+    row_numbers = {record_id: number for number, record_id in enumerate(ids, start=1)}
+    last_column = _column_letter(len(table.columns))
+
+    result = SyncResult()
+    store_ids = db.scalars(select(Store.id).order_by(Store.id)).all()
+    batches = (
+        batch
+        for store_id in store_ids
+        for batch in changed_rows(db, table, store_id, since, until).partitions()
+    )
+    for batch in batches:
+        updates, appends = [], []
+        for row in batch:
+            values = [_cell(value) for value in row]
+            number = row_numbers.get(values[0])
+            if number is None:
+                appends.append(values)
+            else:
+                updates.append({"range": f"A{number}:{last_column}{number}", "values": [values]})
+
+        # RAW: customer names starting with "=" are not formulas
+        if updates:
+            _call(worksheet.batch_update, updates, value_input_option="RAW")
+            result.updated += len(updates)
+        if appends:
+            _call(worksheet.append_rows, appends, value_input_option="RAW", insert_data_option="INSERT_ROWS")
+            result.appended += len(appends)
+
+    if watermark is None:
+        db.add(SyncWatermark(name=table.name, synced_until=until))
+    else:
+        watermark.synced_until = until
+    db.commit()
+    return result
+
+
+def open_spreadsheet():
+    """The configured spreadsheet, opened with the service account"""
+    import gspread
+
+    client = gspread.service_account(filename=settings.GOOGLE_SERVICE_ACCOUNT_JSON)
+    return client.open_by_key(settings.GOOGLE_SHEET_ID)
+
+
+def sync_to_sheets(
+    bind: Optional[Engine] = None,
+    now: Optional[datetime] = None,
+    spreadsheet=None
+) -> Optional[Dict[str, SyncResult]]:
+    """
+    Export every table's changes since the last run, once across processes.
+
+    Args:
+        bind: Engine to use (defaults to the application engine)
+        now: Reference moment (defaults to the current time)
+        spreadsheet: Spreadsheet to write (defaults to ``GOOGLE_SHEET_ID``)
+
+    Returns:
+        Rows written per worksheet title, or None if the sync is not
+        configured or another process is already running it
+    """
+    if spreadsheet is None and not settings.GOOGLE_SHEET_ID:
+        logger.info("ℹ️ GOOGLE_SHEET_ID not configured, skipping Sheets sync")
+        return None
+    if bind is None:
+        from ..database import engine as bind
+    now = now or datetime.now(timezone.utc)
+    until = now - timedelta(seconds=settings.SHEETS_SYNC_SETTLE_SECONDS)
+
+    with process_lock(SHEETS_SYNC_LOCK, bind=bind, blocking=False) as acquired:
+        if not acquired:
+            logger.info("ℹ️ Sheets sync already running in another process, skipping")
+            return None
+
+        spreadsheet = spreadsheet if spreadsheet is not None else open_spreadsheet()
+        results = {}
+        with Session(bind) as db:
+            for table in SHEET_TABLES:
+                results[table.title] = result = sync_table(db, spreadsheet, table, until)
+                logger.info(f"✅ Sheets sync of {table.title}: {result.appended} appended, {result.updated} updated")
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export changed tickets and work orders to Google Sheets")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parse_args()
+    sync_to_sheets()
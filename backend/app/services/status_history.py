@@ -0,0 +1,116 @@
+"""
+Work order status history and turnaround-time analytics.
+
+Every status a work order enters is appended to ``work_order_status_events``.
+The time an order spent in a status is the gap until its next event, so the
+analytics are computed entirely in SQL with window functions: ``LEAD`` pairs
+each event with the next one of the same order, and ``ROW_NUMBER``/``COUNT``
+rank the durations to pick nearest-rank percentiles, which works the same on
+PostgreSQL and SQLite. A status the order is still in has no duration yet and
+is left out.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..models.work_order import WorkOrder
+from ..models.work_order_event import WorkOrderStatusEvent
+
+PERCENTILES = {"p50": 0.5, "p90": 0.9}
+
+
+def record_status_change(db: Session, work_order: WorkOrder, entered_at: Optional[datetime] = None):
+    """
+    Append the work order's current status to its history.
+
+    The event is added to the session, so it commits together with the
+    status change itself.
+    """
+    event = WorkOrderStatusEvent(work_order_id=work_order.id, status=work_order.status, device=work_order.device)
+    if work_order.store_id is not None:
+        event.store_id = work_order.store_id
+    if entered_at is not None:
+        event.entered_at = entered_at
+    db.add(event)
+
+
+def seconds_between(start: ColumnElement, end: ColumnElement, dialect: str) -> ColumnElement:
+    """SQL number of seconds from ``start`` to ``end``"""
+    if dialect == "postgresql":
+        return func.extract("epoch", end - start)
+    return (func.julianday(end) - func.julianday(start)) * 86400.0
+
+
+def turnaround(
+    db: Session,
+    by_device: bool = False,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> List[Dict]:
+    """
+    Average, p50 and p90 time spent in each status, in one SQL query.
+
+    Args:
+        db: Database session
+        by_device: Group by device as well as by status
+        start_date: Only statuses entered on or after this moment
+        end_date: Only statuses entered before this moment
+
+    Returns:
+        One dict per group with status (and device), count and durations in seconds
+    """
+    event = WorkOrderStatusEvent
+    next_entered_at = func.lead(event.entered_at).over(
+        partition_by=event.work_order_id, order_by=(event.entered_at, event.id)
+    )
+    # The window sees every event, so the period only filters which statuses are reported
+    intervals = select(
+        event.status,
+        event.device,
+        event.entered_at,
+        seconds_between(event.entered_at, next_entered_at, db.get_bind().dialect.name).label("seconds")
+    ).subquery("intervals")
+
+    conditions = [intervals.c.seconds.isnot(None)]
+    if start_date:
+        conditions.append(intervals.c.entered_at >= start_date)
+    if end_date:
+        conditions.append(intervals.c.entered_at < end_date)
+
+    group = [intervals.c.status] + ([intervals.c.device] if by_device else [])
+    ranked = select(
+        *group,
+        intervals.c.seconds,
+        func.row_number().over(partition_by=group, order_by=intervals.c.seconds).label("position"),
+        func.count().over(partition_by=group).label("total")
+    ).where(*conditions).subquery("ranked")
+
+    ranked_group = [ranked.c[column.name] for column in group]
+    # Nearest-rank percentile: the smallest duration whose rank reaches p * n
+    percentiles = [
+        func.min(case((ranked.c.position >= fraction * ranked.c.total, ranked.c.seconds))).label(name)
+        for name, fraction in PERCENTILES.items()
+    ]
+    rows = db.execute(
+        select(
+            *ranked_group,
+            func.count().label("count"),
+            func.avg(ranked.c.seconds).label("average"),
+            *percentiles
+        ).group_by(*ranked_group).order_by(*ranked_group)
+    )
+
+    return [
+        {
+            "status": row.status.value,
+            **({"device": row.device} if by_device else {}),
+            "count": row.count,
+            "average_seconds": float(row.average),
+            "p50_seconds": float(row.p50),
+            "p90_seconds": float(row.p90),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,187 @@
+"""
+Warranty expiration reminders for delivered repairs.
+
+A delivered repair is under warranty for ``WARRANTY_DAYS`` from the moment
+it entered "Entregado" (its status history). Once
+``WARRANTY_REMINDER_DAYS_BEFORE`` days or fewer are left, the customer gets
+one WhatsApp/SMS reminder.
+
+Runs are safe to repeat and to start from every server worker: a run holds
+a non-blocking ``process_lock``, and each order gets a ``warranty_reminders``
+row, committed before its message is sent, so an order is never reminded
+twice, even if a run dies halfway. Each batch is handed to
+``notification_service.send_bulk``, whose transport bounds the messages in
+flight and per second.
+
+The scheduler (``WARRANTY_REMINDERS_ENABLED``) runs this every
+``WARRANTY_REMINDER_INTERVAL_MINUTES``; it can also be run from cron::
+
+    python -m app.services.warranty
+"""
+import argparse
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine, Row
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.store import Store
+from ..models.warranty_reminder import WarrantyReminder
+from ..models.work_order import WorkOrder, RepairStatus
+from ..models.work_order_event import WorkOrderStatusEvent
+from ..utils.locks import process_lock
+from .customers import normalize_phone
+from .notifications import notification_service, NotificationTemplates
+
+logger = logging.getLogger(__name__)
+
+WARRANTY_LOCK = "warranty_reminders"
+
+
+@dataclass
+class ReminderResult:
+    """Reminders handled by one run"""
+    sent: int = 0
+    failed: int = 0
+
+
+def _aware(moment: datetime) -> datetime:
+    # SQLite returns naive UTC datetimes
+    return moment if moment.tzinfo is not None else moment.replace(tzinfo=timezone.utc)
+
+
+def due_reminders(
+    db: Session,
+    now: datetime,
+    warranty_days: int,
+    days_before: int,
+    limit: int
+) -> List[Row]:
+    """
+    Delivered orders whose warranty ends within ``days_before`` days and
+    that were not reminded yet, oldest delivery first.
+
+    One query: a range scan of the status history index on the delivery
+    moment, joined to the order and anti-joined to the reminders.
+
+    Args:
+        db: Database session not bound to a store
+        now: Reference moment
+        warranty_days: Warranty length
+        days_before: Remind when this many days or fewer are left
+        limit: Maximum orders returned
+
+    Returns:
+        Rows with the order's id, store_id, customer_name, customer_phone,
+        device and delivered_at
+    """
+    event = WorkOrderStatusEvent
+    delivered_at = func.max(event.entered_at).label("delivered_at")
+    return db.execute(
+        select(
+            WorkOrder.id, WorkOrder.store_id, WorkOrder.customer_name, WorkOrder.customer_phone,
+            WorkOrder.device, delivered_at
+        )
+        .join(event, event.work_order_id == WorkOrder.id)
+        .outerjoin(WarrantyReminder, WarrantyReminder.work_order_id == WorkOrder.id)
+        .where(
+            # Every store, spelled out so the store-leading index is used
+            event.store_id.in_(select(Store.id)),
+            event.status == RepairStatus.ENTREGADO,
+            event.entered_at > now - timedelta(days=warranty_days),
+            event.entered_at <= now - timedelta(days=warranty_days - days_before),
+            WorkOrder.status == RepairStatus.ENTREGADO,
+            WorkOrder.customer_phone.isnot(None),
+            WorkOrder.customer_phone != "",
+            WarrantyReminder.id.is_(None)
+        )
+        .group_by(WorkOrder.id)
+        .order_by(delivered_at)
+        .limit(limit)
+    ).all()
+
+
+def _send_bulk(messages: List[Tuple[str, str]]) -> List[bool]:
+    return notification_service.send_bulk(messages, prefer_whatsapp=True)
+
+
+def send_warranty_reminders(
+    bind: Optional[Engine] = None,
+    now: Optional[datetime] = None,
+    send_bulk: Callable[[List[Tuple[str, str]]], List[bool]] = _send_bulk
+) -> Optional[ReminderResult]:
+    """
+    Send every due warranty reminder, once across processes.
+
+    Args:
+        bind: Engine to use (defaults to the application engine)
+        now: Reference moment (defaults to the current time)
+        send_bulk: Sends (phone, message) pairs, returning whether each was accepted
+
+    Returns:
+        Reminders sent and failed, or None if another process is already sending
+    """
+    if bind is None:
+        from ..database import engine as bind
+    now = now or datetime.now(timezone.utc)
+    warranty_days = settings.WARRANTY_DAYS
+
+    with process_lock(WARRANTY_LOCK, bind=bind, blocking=False) as acquired:
+        if not acquired:
+            logger.info("ℹ️ Warranty reminders already running in another process, skipping")
+            return None
+
+        result = ReminderResult()
+        with Session(bind) as db:
+            while True:
+                due = due_reminders(
+                    db, now, warranty_days, settings.WARRANTY_REMINDER_DAYS_BEFORE,
+                    settings.WARRANTY_REMINDER_BATCH_SIZE
+                )
+                if not due:
+                    break
+
+                # Claim the batch before sending anything
+                reminders, messages = [], []
+                for order in due:
+                    expires_at = _aware(order.delivered_at) + timedelta(days=warranty_days)
+                    days_left = max(1, math.ceil((expires_at - now) / timedelta(days=1)))
+                    phone = normalize_phone(order.customer_phone) or order.customer_phone
+                    reminders.append(WarrantyReminder(work_order_id=order.id, store_id=order.store_id, phone=phone))
+                    messages.append((phone, NotificationTemplates.warranty_reminder(
+                        customer_name=order.customer_name, device=order.device, days_left=days_left
+                    )))
+                db.add_all(reminders)
+                db.commit()
+
+                try:
+                    outcomes = [bool(outcome) for outcome in send_bulk(messages)]
+                except Exception:
+                    logger.exception(f"❌ Sending {len(messages)} warranty reminders failed")
+                    outcomes = [False] * len(messages)
+                sent_at = datetime.now(timezone.utc)
+                for reminder, delivered in zip(reminders, outcomes):
+                    reminder.sent_at = sent_at
+                    reminder.delivered = delivered
+                db.commit()
+                result.sent += sum(outcomes)
+                result.failed += len(outcomes) - sum(outcomes)
+
+    logger.info(f"✅ Warranty reminders: {result.sent} sent, {result.failed} failed")
+    return result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Send due warranty expiration reminders")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parse_args()
+    send_warranty_reminders()
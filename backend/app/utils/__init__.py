@@ -1,8 +1,8 @@
 # Import utilities here for easier imports
 from .security import verify_password, get_password_hash, create_access_token, verify_token
-from .dependencies import get_db, get_current_user, require_admin
+from .dependencies import get_db, get_read_db, get_current_user, require_admin
 
 __all__ = [
     "verify_password", "get_password_hash", "create_access_token", "verify_token",
-    "get_db", "get_current_user", "require_admin"
+    "get_db", "get_read_db", "get_current_user", "require_admin"
 ]
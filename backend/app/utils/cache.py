@@ -0,0 +1,43 @@
+"""
+Small per-process TTL cache for expensive read-only results.
+
+Entries live in the memory of one server worker, so a value can be up to
+``ttl_seconds`` stale and each worker computes its own copy. Use it for
+aggregates where that staleness is acceptable (e.g. dashboard counters).
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """Thread-safe mapping whose entries expire after ``ttl_seconds``"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Get the cached value of ``key``, computing and storing it when missing or expired.
+
+        A TTL of 0 disables caching.
+        """
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        value = compute()
+        if self.ttl_seconds > 0:
+            with self._lock:
+                # Expired entries of other keys are dropped on the way
+                self._entries = {k: e for k, e in self._entries.items() if e[0] > now}
+                self._entries[key] = (now + self.ttl_seconds, value)
+        return value
+
+    def invalidate(self, predicate: Callable[[Hashable], bool] = lambda key: True):
+        """Drop the entries whose key matches ``predicate`` (all by default)"""
+        with self._lock:
+            self._entries = {k: e for k, e in self._entries.items() if not predicate(k)}
@@ -2,7 +2,11 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Generator
+from sqlalchemy.exc import OperationalError
+from .. import database
+from ..config import settings
 from ..database import SessionLocal, get_db
+from ..models.store import ALL_STORES, get_store_scope, set_store_scope
 from ..models.user import User, UserRole
 from .security import verify_token
 
@@ -17,6 +21,10 @@ def get_current_user(
     """
     Dependency to get the current authenticated user from JWT token.
     
+    Also binds the request's database session to the store named by the
+    token's ``store_id`` claim, so every query of the request only sees that
+    store's rows.
+    
     Args:
         credentials: HTTP Authorization credentials with bearer token
         db: Database session
@@ -45,7 +53,8 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.username == username).first()
+    # Usernames are unique across stores
+    user = db.query(User).filter(User.username == username).execution_options(**{ALL_STORES: True}).first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -53,9 +62,56 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Tokens issued before stores existed carry no claim
+    store_id = payload.get("store_id", user.store_id)
+    if store_id != user.store_id:
+        # The user was moved to another store after the token was issued
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    set_store_scope(db, store_id)
+    
     return user
 
 
+def get_read_db(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Generator[Session, None, None]:
+    """
+    Dependency to get a session for read-only endpoints.
+    
+    Uses the read replica (DATABASE_READ_URL) when it is configured, reachable
+    and within DATABASE_READ_MAX_LAG_SECONDS of the primary; otherwise the
+    primary session. Either way the session is bound to the current user's
+    store. Never use it for endpoints that write.
+    
+    Args:
+        db: Primary database session, used as fallback
+        current_user: Current authenticated user, whose store scopes the session
+        
+    Yields:
+        Database session
+    """
+    monitor = database.replica_monitor
+    if monitor is None or not monitor.available():
+        yield db
+        return
+    
+    read_db = database.ReadSessionLocal()
+    set_store_scope(read_db, get_store_scope(db))
+    try:
+        yield read_db
+    except OperationalError:
+        # Replica went away mid-request; route the next requests to the primary
+        monitor.mark_down()
+        raise
+    finally:
+        read_db.close()
+
+
 def require_admin(current_user: User = Depends(get_current_user)) -> User:
     """
     Dependency to require admin role.
@@ -75,3 +131,28 @@ def require_admin(current_user: User = Depends(get_current_user)) -> User:
             detail="Admin privileges required"
         )
     return current_user
+
+
+def require_deployment_admin(current_user: User = Depends(require_admin)) -> User:
+    """
+    Dependency to require a deployment administrator.
+    
+    Admins manage their own store; operations on the whole database (e.g.
+    backups, which hold every store's data) are reserved to the admins
+    named in BACKUP_ADMINS.
+    
+    Args:
+        current_user: Current authenticated admin user
+        
+    Returns:
+        Current user if a deployment administrator
+        
+    Raises:
+        HTTPException: If user is not a deployment administrator
+    """
+    if current_user.username.lower() not in settings.backup_admins_list:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Deployment administrator privileges required"
+        )
+    return current_user
@@ -0,0 +1,80 @@
+"""
+Conditional GET support for listing endpoints.
+
+Listings derive a weak ETag from a single aggregate query (row count,
+latest modification timestamp and the sum of the ``row_version`` counters,
+which every UPDATE bumps even within one timestamp second) plus the
+request's query parameters and the session's store, so a client presenting
+a matching ``If-None-Match`` gets ``304 Not Modified`` without the full
+listing ever being queried or serialized.
+"""
+import hashlib
+from typing import Any, Dict, Optional, Sequence
+
+from fastapi import Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models.store import get_store_scope
+
+# Clients must revalidate on every use, but may keep their copy
+CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(*parts: Any) -> str:
+    """Build a weak ETag from the given validator parts"""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+def listing_etag(
+    db: Session,
+    name: str,
+    aggregates: Sequence[Any],
+    filters: Sequence[Any] = (),
+    params: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Compute the ETag of a listing with one aggregate query.
+
+    Args:
+        db: Database session
+        name: Listing name, keeps validators of different listings apart
+        aggregates: Aggregate expressions that change whenever the listing
+            does (e.g. count and sum(row_version))
+        filters: The same WHERE conditions the listing applies
+        params: Query parameters that shape the listing
+
+    Returns:
+        Weak ETag header value
+    """
+    query = select(*aggregates)
+    for condition in filters:
+        query = query.where(condition)
+    validator = tuple(db.execute(query).one())
+    return compute_etag(name, get_store_scope(db), sorted((params or {}).items()), validator)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check the request's If-None-Match header against an ETag.
+
+    Uses weak comparison, as required for If-None-Match.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """Validator headers attached to listing responses"""
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current validator"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag))
@@ -0,0 +1,103 @@
+"""
+Cross-process locks for work that must run once per deployment.
+
+In production the API runs as several server processes (and possibly several
+containers), so startup migrations and periodic jobs must not rely on
+in-process state to avoid running twice. On PostgreSQL a session-level
+advisory lock is used, which also covers processes on other hosts; on SQLite
+an exclusive ``flock`` on a file next to the database is used.
+"""
+import logging
+import os
+import tempfile
+import zlib
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def lock_key(name: str) -> int:
+    """Stable 32-bit advisory lock key for a lock name"""
+    return zlib.crc32(f"serviceflow:{name}".encode("utf-8"))
+
+
+def lock_path(name: str, bind: Engine) -> str:
+    """File used to lock ``name`` when the database has no advisory locks"""
+    database = bind.url.database
+    if database and database != ":memory:":
+        directory = os.path.dirname(os.path.abspath(database))
+    else:
+        directory = tempfile.gettempdir()
+    return os.path.join(directory, f".serviceflow-{name}.lock")
+
+
+@contextmanager
+def process_lock(name: str, bind: Optional[Engine] = None, blocking: bool = True) -> Iterator[bool]:
+    """
+    Hold a lock shared by every process using the same database.
+
+    Args:
+        name: Lock name, e.g. "startup"
+        bind: Engine to lock on (defaults to the application engine)
+        blocking: Wait for the lock; when False, yield False if it is taken
+
+    Yields:
+        True if the lock is held, False if it was taken and blocking is False
+    """
+    if bind is None:
+        from ..database import engine as bind
+
+    if bind.dialect.name == "postgresql":
+        with _advisory_lock(bind, lock_key(name), blocking) as acquired:
+            yield acquired
+    else:
+        with _file_lock(lock_path(name, bind), blocking) as acquired:
+            yield acquired
+
+
+@contextmanager
+def _advisory_lock(bind: Engine, key: int, blocking: bool) -> Iterator[bool]:
+    # Session-level locks outlive transactions, so one connection is kept
+    # for the whole critical section and the lock is released explicitly
+    with bind.connect() as conn:
+        if blocking:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+            acquired = True
+        else:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+        conn.commit()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                conn.commit()
+
+
+@contextmanager
+def _file_lock(path: str, blocking: bool) -> Iterator[bool]:
+    if fcntl is None:
+        logger.warning("⚠️ File locks not supported on this platform, running without lock")
+        yield True
+        return
+
+    with open(path, "a") as handle:
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(handle.fileno(), flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,42 @@
+"""
+Periodic background jobs running inside each server process.
+
+Every worker starts the same jobs from the application lifespan; jobs that
+must run once per deployment take a ``process_lock`` themselves, so the
+workers that lose the race simply skip that tick.
+"""
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """Run a function every ``interval_seconds`` on a daemon thread"""
+
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[], object]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"job-{name}", daemon=True)
+
+    def start(self) -> "PeriodicJob":
+        self._thread.start()
+        logger.info(f"⏱️ Job {self.name} scheduled every {self.interval_seconds:g}s")
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        """Ask the job to stop and wait for a running tick to finish"""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.func()
+            except Exception:
+                # A failed tick must not kill the schedule
+                logger.exception(f"❌ Job {self.name} failed")
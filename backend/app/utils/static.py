@@ -0,0 +1,98 @@
+"""
+Static file serving for content-addressed uploads.
+
+Uploaded images are stored under their content hash, so a URL never changes
+meaning and can be cached forever. This adds long-lived immutable cache
+headers and single byte-range (``Range: bytes=a-b``) support on top of
+Starlette's StaticFiles.
+"""
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range`` header.
+
+    Args:
+        header: Raw header value, e.g. ``"bytes=0-1023"`` or ``"bytes=-500"``
+        size: Total size of the file
+
+    Returns:
+        Inclusive ``(start, end)`` offsets, or None if the range is not satisfiable
+
+    Raises:
+        ValueError: If the header is malformed or requests several ranges
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        raise ValueError("Only single byte ranges are supported")
+
+    first, _, last = spec.strip().partition("-")
+    if first:
+        start = int(first)
+        end = int(last) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return None
+        start = max(size - length, 0)
+        end = size - 1
+
+    if start >= size or start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles with immutable caching and byte-range responses"""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code not in (200, 304):
+            return response
+
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        if not isinstance(response, FileResponse):
+            return response
+
+        response.headers["Accept-Ranges"] = "bytes"
+        range_header = Headers(scope=scope).get("range")
+        if response.status_code != 200 or not range_header:
+            return response
+
+        size = response.stat_result.st_size
+        try:
+            byte_range = parse_byte_range(range_header, size)
+        except ValueError:
+            # Malformed or multi-range requests get the full file
+            return response
+
+        if byte_range is None:
+            return Response(
+                status_code=416,
+                headers={"Content-Range": f"bytes */{size}", "Accept-Ranges": "bytes"}
+            )
+
+        start, end = byte_range
+        body = await anyio.to_thread.run_sync(_read_segment, response.path, start, end - start + 1)
+        headers = {
+            key: value for key, value in response.headers.items()
+            if key.lower() in ("content-type", "etag", "last-modified", "cache-control", "accept-ranges")
+        }
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return Response(content=body, status_code=206, headers=headers)
+
+
+def _read_segment(path: str, offset: int, length: int) -> bytes:
+    with open(path, "rb") as source:
+        source.seek(offset)
+        return source.read(length)
@@ -0,0 +1,32 @@
+from fastapi import HTTPException, UploadFile, status
+from ..services import image_store, ImageTooLargeError, UnsupportedImageError, IMAGE_FORMATS
+
+
+def store_uploaded_image(file: UploadFile, kind: str) -> str:
+    """
+    Validate and store an uploaded image.
+    
+    The type is checked on the decoded file, whatever the client declared.
+    
+    Args:
+        file: Uploaded file
+        kind: Entity folder ("products" or "parts")
+        
+    Returns:
+        Public URL of the stored image
+        
+    Raises:
+        HTTPException: If the file is not a supported image or is too large
+    """
+    try:
+        return image_store.save(file.file, kind)
+    except UnsupportedImageError:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported image type. Allowed: {', '.join(IMAGE_FORMATS)}"
+        )
+    except ImageTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Image exceeds the maximum size of {image_store.max_bytes // (1024 * 1024)} MB"
+        )
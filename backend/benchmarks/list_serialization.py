@@ -0,0 +1,125 @@
+"""
+Benchmark: ORM + response_model serialization vs. projected rows + orjson.
+
+Seeds an in-memory SQLite database and times the previous list serialization
+(ORM objects validated through the response schema) against the projected
+endpoint implementations, reporting the per-row cost of each.
+
+Usage (from backend/):
+    python -m benchmarks.list_serialization --rows 20000
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from functools import partial
+from typing import List
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Product, Part, Ticket, TicketItem, WorkOrder
+from app.models.ticket import PaymentStatus
+from app.models.work_order import RepairStatus, PaymentStatus as WOPaymentStatus
+from app.schemas import ProductResponse, PartResponse, TicketResponse, WorkOrderResponse
+from app.routers import products, parts, tickets, work_orders
+
+
+def seed(db, rows: int):
+    start = datetime(2024, 1, 1)
+    db.add_all(
+        Product(name=f"Producto {i}", brand="Generic", stock=i % 50, price=9.99 + i % 100, min_stock=5)
+        for i in range(rows)
+    )
+    db.add_all(
+        Part(name=f"Parte {i}", sku=f"SKU-{i:07d}", stock=i % 20, price=15.5,
+             compatible_models=["iPhone 13", "Galaxy S23"], min_stock=2)
+        for i in range(rows)
+    )
+    db.add_all(
+        WorkOrder(id=f"wo-{i}", code=f"C{i:06d}"[-8:], customer_name=f"Cliente {i % 500}",
+                  customer_phone="+584141234567", device="iPhone 13", issue="Pantalla rota",
+                  status=RepairStatus.ENTREGADO, received_date=start + timedelta(minutes=i),
+                  repair_cost=Decimal("45.00"), amount_paid=Decimal("45.00"),
+                  payment_status=WOPaymentStatus.PAGADO, created_at=start + timedelta(minutes=i))
+        for i in range(rows)
+    )
+    db.add_all(
+        Ticket(id=f"t-{i}", date=start + timedelta(minutes=i), customer_name="Cliente General",
+               payment_method="mixed", payment_status=PaymentStatus.PAID, subtotal=20.0, tax=0.0,
+               total=20.0, exchange_rate=36.5, amount_usd=20.0, amount_ves=0.0)
+        for i in range(rows)
+    )
+    db.flush()
+    db.add_all(
+        TicketItem(ticket_id=f"t-{i}", product_id=(i % rows) + 1, quantity=2, price=10.0)
+        for i in range(rows)
+    )
+    db.commit()
+
+
+def orm_path(db, model, schema, order_by=None):
+    query = db.query(model)
+    if order_by is not None:
+        query = query.order_by(order_by)
+    adapter = TypeAdapter(List[schema])
+    content = adapter.dump_python(adapter.validate_python(query.all(), from_attributes=True), mode="json")
+    db.expunge_all()
+    return JSONResponse(content).body
+
+
+def projected_path(endpoint, db):
+    request = Request({"type": "http", "method": "GET", "headers": []})
+    return endpoint(request=request, db=db, current_user=None).body
+
+
+def measure(func, *args, repeat: int):
+    best = float("inf")
+    body = b""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows per entity")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path (best is reported)")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, args.rows)
+    db.expunge_all()
+
+    cases = [
+        ("products", Product, ProductResponse, None, partial(products.get_products, q=None)),
+        ("parts", Part, PartResponse, None, partial(parts.get_parts, q=None)),
+        ("work_orders", WorkOrder, WorkOrderResponse, WorkOrder.received_date.desc(),
+         partial(work_orders.get_work_orders, q=None)),
+        ("tickets", Ticket, TicketResponse, Ticket.date.desc(), tickets.get_tickets),
+    ]
+
+    print(f"{'endpoint':<12} {'orm µs/row':>11} {'proj µs/row':>12} {'speedup':>8}  identical")
+    for name, model, schema, order_by, endpoint in cases:
+        slow_time, slow_body = measure(orm_path, db, model, schema, order_by, repeat=args.repeat)
+        fast_time, fast_body = measure(projected_path, endpoint, db, repeat=args.repeat)
+        print(
+            f"{name:<12} {slow_time / args.rows * 1e6:>11.2f} {fast_time / args.rows * 1e6:>12.2f} "
+            f"{slow_time / fast_time:>7.1f}x  {slow_body == fast_body}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,24 +2,23 @@
 
 # Entrypoint script for backend container
 # Initializes database and starts the application
+#
+# SERVER_MODE=production (default): gunicorn with one Uvicorn worker per CPU
+#                                   (WEB_CONCURRENCY overrides the count)
+# SERVER_MODE=single:               a single uvicorn process
 
 set -e
 
-echo "🔧 Checking database..."
+SERVER_MODE="${SERVER_MODE:-production}"
 
-# Only run init_db.py if database is empty (no users table)
-python -c "
-from app.database import engine
-from sqlalchemy import inspect
-inspector = inspect(engine)
-tables = inspector.get_table_names()
-if 'users' not in tables:
-    print('Database is empty, initializing...')
-    exit(0)
-else:
-    print('Database already initialized, skipping...')
-    exit(1)
-" && python init_db.py || echo "✅ Database already initialized"
+if [ "$SERVER_MODE" = "single" ]; then
+    echo "🔧 Checking database..."
+    python -m app.bootstrap
 
-echo "🚀 Starting application..."
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000
+    echo "🚀 Starting application (single process)..."
+    exec uvicorn app.main:app --host 0.0.0.0 --port 8000
+fi
+
+# gunicorn.conf.py prepares the database once before forking workers
+echo "🚀 Starting application (production, multi-process)..."
+exec gunicorn -c gunicorn.conf.py app.main:app
@@ -0,0 +1,40 @@
+"""
+Gunicorn configuration for the multi-process production server.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The master imports the application (``preload_app``), prepares the database
+once (under the startup process lock) and then forks one Uvicorn worker per
+CPU, so workers share the imported code pages and start instantly.
+"""
+import os
+
+from app.bootstrap import prepare_database, worker_count
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = worker_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# Restart a worker that stops answering (e.g. a stuck report) and let
+# in-flight requests finish on reload/shutdown
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    """Initialize/migrate the database in the master, before any worker forks"""
+    prepare_database()
+
+
+def post_fork(server, worker):
+    """Drop pooled connections inherited from the master"""
+    from app.database import engine, read_engine
+
+    engine.dispose(close=False)
+    if read_engine is not None:
+        read_engine.dispose(close=False)
@@ -1,50 +1,112 @@
 """
 Database initialization and seed data script.
 Run this script to create all tables and populate with initial users.
+
+Pass ``--scale`` to additionally bulk-generate a production-sized synthetic
+dataset (products, parts, tickets with items and work orders) so slow pages
+can be reproduced locally:
+
+    python init_db.py --scale 1 --seed 42
+
+The same ``--seed`` and ``--until`` always produce the same rows. A seed can
+only be generated once per database; use another seed to add more data.
 """
-from app.database import engine, SessionLocal, Base
-from app.models import User
-from app.models.user import UserRole
-from app.utils.security import get_password_hash
+import argparse
+import csv
+import enum
+import io
+import json
+import random
+import string
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.types import TypeDecorator
+
+from app.bootstrap import STARTUP_LOCK, migrate, seed_default_users
+from app.database import engine, SessionLocal
+from app.models import User, Product, Part, Ticket, TicketItem, WorkOrder
+from app.models.ticket import PaymentStatus as TicketPaymentStatus
+from app.models.work_order import RepairStatus, PaymentStatus as WOPaymentStatus
+from app.utils.locks import process_lock
+
+
+# Row volumes generated by --scale 1 (each one is multiplied by the factor).
+# Tickets average ~2.5 items, so scale 1 produces roughly 4M rows.
+SCALE_BASE_VOLUMES = {
+    "products": 5_000,
+    "parts": 3_000,
+    "customers": 40_000,
+    "tickets": 1_000_000,
+    "work_orders": 250_000,
+}
+
+FIRST_NAMES = [
+    "José", "María", "Luis", "Ana", "Carlos", "Carmen", "Jesús", "Rosa", "Miguel", "Luisa",
+    "Pedro", "Yusmary", "Juan", "Andreína", "Rafael", "Gabriela", "Francisco", "Daniela",
+    "Antonio", "Valentina", "Manuel", "Mariana", "Alejandro", "Fernanda", "Ricardo", "Paola",
+    "Jorge", "Isabel", "Eduardo", "Yelitza", "Oscar", "Patricia", "Héctor", "Lucía",
+]
+LAST_NAMES = [
+    "González", "Rodríguez", "Pérez", "Hernández", "García", "Martínez", "López", "Díaz",
+    "Sánchez", "Romero", "Torres", "Rojas", "Ramírez", "Flores", "Medina", "Castillo",
+    "Suárez", "Contreras", "Mendoza", "Morales", "Vargas", "Rivas", "Blanco", "Guerrero",
+]
+BRANDS = ["Apple", "Samsung", "Xiaomi", "Motorola", "Huawei", "Tecno", "Infinix", "Honor", "Generic"]
+DEVICE_MODELS = [
+    "iPhone 11", "iPhone 12", "iPhone 13", "iPhone 14", "iPhone 15", "Galaxy A14", "Galaxy A54",
+    "Galaxy S22", "Galaxy S23", "Redmi Note 12", "Redmi Note 13", "Redmi 12C", "Poco X5",
+    "Moto G54", "Moto E13", "Huawei Y9", "Tecno Spark 10", "Infinix Hot 30", "Honor X7",
+]
+PRODUCT_KINDS = [
+    "Funda", "Protector de pantalla", "Cargador", "Cable USB-C", "Cable Lightning", "Audífonos",
+    "Power Bank", "Soporte para auto", "Memoria microSD", "Adaptador", "Smartwatch", "Parlante",
+]
+PART_KINDS = [
+    "Pantalla", "Batería", "Pin de carga", "Cámara trasera", "Cámara frontal", "Tapa trasera",
+    "Flex de encendido", "Altavoz", "Micrófono", "Bandeja SIM", "Lente de cámara", "Placa de carga",
+]
+ISSUES = [
+    "Pantalla rota", "No carga", "Batería se descarga rápido", "No enciende", "Mojado",
+    "Cámara borrosa", "No se escucha en llamadas", "Botón de encendido dañado",
+    "Falla de señal", "Se reinicia solo", "Puerto de carga flojo", "Actualización de software",
+]
+PAYMENT_METHODS = ["mixed", "cash", "pago_movil", "card", "zelle", "transfer"]
+
+# Anchor of generated timestamps unless --until is given, so runs are reproducible
+DEFAULT_UNTIL = "2025-01-01"
 
 
 def init_db():
-    """Create all database tables"""
+    """Create all database tables, or migrate an existing database"""
     print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("✓ Tables created successfully")
+    if migrate(engine):
+        print("✓ Tables created successfully")
+    else:
+        print("✓ Existing database migrated to the latest revision")
 
 
 def seed_data():
     """Populate database with initial seed data"""
     db = SessionLocal()
-    
+
     try:
         print("\nSeeding database with initial data...")
-        
+
         # Create users
         print("Creating users...")
-        admin_user = User(
-            username="admin",
-            hashed_password=get_password_hash("admin123"),
-            role=UserRole.ADMIN
-        )
-        tech_user = User(
-            username="tech",
-            hashed_password=get_password_hash("tech123"),
-            role=UserRole.TECHNICIAN
-        )
-        db.add(admin_user)
-        db.add(tech_user)
-        db.commit()
+        seed_default_users(db)
         print("✓ Users created (admin/admin123, tech/tech123)")
-        
+
         print("\n✅ Database initialized successfully!")
         print("\nLogin credentials:")
         print("  Admin: username='admin', password='admin123'")
         print("  Tech:  username='tech', password='tech123'")
         print("\nYour system is ready to use with a clean database.")
-        
+
     except Exception as e:
         print(f"\n❌ Error seeding database: {e}")
         db.rollback()
@@ -53,14 +115,429 @@ def seed_data():
         db.close()
 
 
+def has_users() -> bool:
+    """Check whether the users table already has rows"""
+    with engine.connect() as conn:
+        return conn.execute(select(User.id).limit(1)).first() is not None
+
+
+# ---------------------------------------------------------------------------
+# Synthetic dataset generation (--scale)
+# ---------------------------------------------------------------------------
+
+def _copy_value(value, column_type=None):
+    """Render a Python value for a Postgres COPY ... (FORMAT csv) row"""
+    if value is None:
+        return None
+    if isinstance(column_type, TypeDecorator):
+        # e.g. Money columns store integer minor units
+        return column_type.process_bind_param(value, None)
+    if isinstance(value, enum.Enum):
+        # SQLAlchemy's Enum type persists member names, not values
+        return value.name
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def bulk_insert(table, columns, rows, bind=None):
+    """
+    Insert a batch of rows in a single round-trip.
+
+    Uses COPY FROM STDIN on PostgreSQL and a Core executemany elsewhere.
+
+    Args:
+        table: SQLAlchemy Table to insert into
+        columns: Column names, in the order used by each row tuple
+        rows: List of row tuples
+        bind: Engine to insert into (defaults to the application engine)
+    """
+    if not rows:
+        return
+
+    with (bind or engine).begin() as conn:
+        if conn.dialect.name == "postgresql":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            column_types = [table.c[name].type for name in columns]
+            for row in rows:
+                writer.writerow([_copy_value(value, column_type) for value, column_type in zip(row, column_types)])
+            buffer.seek(0)
+
+            cursor = conn.connection.cursor()
+            try:
+                cursor.copy_expert(
+                    f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+            finally:
+                cursor.close()
+        else:
+            conn.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+
+
+class DatasetExistsError(RuntimeError):
+    """The database already holds the dataset of this seed"""
+
+
+class ScaleDataGenerator:
+    """
+    Deterministic bulk generator for a production-sized dataset.
+
+    Every random choice comes from a single seeded ``random.Random`` and all
+    dates are offsets from ``until``, so the same seed and anchor date always
+    produce the same rows.
+    """
+
+    def __init__(self, volumes: dict, seed: int, days: int, until: datetime, batch_size: int, bind=None):
+        self.bind = bind or engine
+        self.volumes = volumes
+        self.seed = seed
+        self.days = days
+        self.until = until
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.start = until - timedelta(days=days)
+        self.customers = []
+        self.customer_weights = []
+        self.products = []  # (id, price)
+        self.product_weights = []
+
+    # -- helpers ------------------------------------------------------------
+
+    def _uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _moment(self, min_age_days: float = 0.0) -> datetime:
+        """Random timestamp inside the window, at least `min_age_days` old"""
+        span = max(self.days - min_age_days, 0.0)
+        seconds = self.rng.random() * span * 86400
+        return self.until - timedelta(days=min_age_days, seconds=seconds)
+
+    def _exchange_rate(self, moment: datetime) -> float:
+        """Smoothly devaluating VES/USD rate, so older sales carry older rates"""
+        elapsed_days = (moment - self.start).total_seconds() / 86400
+        return round(36.0 * (1.0009 ** elapsed_days), 4)
+
+    @staticmethod
+    def _zipf_weights(count: int, exponent: float) -> list:
+        """Cumulative weights where the first items are picked far more often"""
+        cumulative = []
+        running = 0.0
+        for rank in range(1, count + 1):
+            running += 1.0 / (rank ** exponent)
+            cumulative.append(running)
+        return cumulative
+
+    def _report(self, label: str, count: int, started: float):
+        elapsed = time.perf_counter() - started
+        rate = count / elapsed if elapsed else count
+        print(f"✓ {label}: {count:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+
+    # -- entities -----------------------------------------------------------
+
+    def build_customers(self):
+        """Customer pool with realistic reuse: a few regulars account for most visits"""
+        seen = set()
+        for _ in range(self.volumes["customers"]):
+            name = (
+                f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)} "
+                f"{self.rng.choice(LAST_NAMES)}"
+            )
+            phone = f"+58{self.rng.choice(['412', '414', '416', '424', '426'])}{self.rng.randint(1000000, 9999999)}"
+            customer_id = f"V-{self.rng.randint(5_000_000, 32_000_000)}"
+            if customer_id in seen:
+                continue
+            seen.add(customer_id)
+            self.customers.append((name, phone, customer_id))
+        self.customer_weights = self._zipf_weights(len(self.customers), 0.9)
+
+    def _pick_customers(self, count: int) -> list:
+        return self.rng.choices(self.customers, cum_weights=self.customer_weights, k=count)
+
+    def generate_products(self):
+        started = time.perf_counter()
+        columns = ["name", "brand", "stock", "price", "image_url", "min_stock", "created_at", "updated_at"]
+        total = self.volumes["products"]
+        rows = []
+        for index in range(total):
+            brand = self.rng.choice(BRANDS)
+            kind = self.rng.choice(PRODUCT_KINDS)
+            model = self.rng.choice(DEVICE_MODELS)
+            created_at = self._moment()
+            rows.append((
+                f"{kind} {model} #{index + 1}"[:100],
+                brand,
+                self.rng.randint(0, 200),
+                round(self.rng.uniform(2.0, 250.0), 2),
+                None,
+                self.rng.choice([2, 5, 5, 10]),
+                created_at,
+                created_at if self.rng.random() < 0.5 else None,
+            ))
+            if len(rows) >= self.batch_size:
+                bulk_insert(Product.__table__, columns, rows, bind=self.bind)
+                rows = []
+        bulk_insert(Product.__table__, columns, rows, bind=self.bind)
+
+        with self.bind.connect() as conn:
+            self.products = conn.execute(select(Product.id, Product.price).order_by(Product.id)).all()
+        self.product_weights = self._zipf_weights(len(self.products), 0.7)
+        self._report("Products", total, started)
+
+    def generate_parts(self):
+        started = time.perf_counter()
+        columns = ["name", "sku", "stock", "price", "compatible_models", "min_stock", "created_at", "updated_at"]
+        total = self.volumes["parts"]
+        rows = []
+        for index in range(total):
+            kind = self.rng.choice(PART_KINDS)
+            models = self.rng.sample(DEVICE_MODELS, self.rng.randint(1, 4))
+            created_at = self._moment()
+            rows.append((
+                f"{kind} {models[0]}"[:100],
+                f"S{self.seed}-{index + 1:07d}",
+                self.rng.randint(0, 60),
+                round(self.rng.uniform(3.0, 180.0), 2),
+                models,
+                self.rng.choice([1, 2, 5]),
+                created_at,
+                created_at if self.rng.random() < 0.5 else None,
+            ))
+            if len(rows) >= self.batch_size:
+                bulk_insert(Part.__table__, columns, rows, bind=self.bind)
+                rows = []
+        bulk_insert(Part.__table__, columns, rows, bind=self.bind)
+        self._report("Parts", total, started)
+
+    def generate_tickets(self):
+        if not self.products:
+            print("⚠️ No products available, skipping tickets")
+            return
+
+        started = time.perf_counter()
+        ticket_columns = [
+            "id", "date", "customer_name", "payment_method", "payment_status",
+            "subtotal", "tax", "total", "exchange_rate", "amount_usd", "amount_ves",
+        ]
+        item_columns = ["ticket_id", "product_id", "quantity", "price"]
+        statuses = [
+            TicketPaymentStatus.PAID, TicketPaymentStatus.PENDING,
+            TicketPaymentStatus.PARTIAL, TicketPaymentStatus.OVERDUE,
+        ]
+        total = self.volumes["tickets"]
+        item_count = 0
+        tickets, items = [], []
+
+        for _ in range(total):
+            ticket_id = self._uuid()
+            date = self._moment()
+            rate = self._exchange_rate(date)
+
+            subtotal = 0.0
+            for product_id, price in self.rng.choices(
+                self.products, cum_weights=self.product_weights, k=self.rng.choices([1, 2, 3, 4, 5], weights=[35, 25, 20, 12, 8])[0]
+            ):
+                quantity = self.rng.choices([1, 2, 3], weights=[80, 15, 5])[0]
+                subtotal += price * quantity
+                items.append((ticket_id, product_id, quantity, price))
+            subtotal = round(subtotal, 2)
+
+            status = self.rng.choices(statuses, weights=[85, 8, 5, 2])[0]
+            if status == TicketPaymentStatus.PAID:
+                paid_share = 1.0
+            elif status == TicketPaymentStatus.PARTIAL:
+                paid_share = self.rng.uniform(0.2, 0.8)
+            else:
+                paid_share = 0.0
+            usd_share = self.rng.choice([0.0, 0.5, 1.0])
+            amount_usd = round(subtotal * paid_share * usd_share, 2)
+            amount_ves = round(subtotal * paid_share * (1 - usd_share) * rate, 2)
+
+            customer = "Cliente General" if self.rng.random() < 0.35 else self._pick_customers(1)[0][0]
+            tickets.append((
+                ticket_id, date, customer, self.rng.choice(PAYMENT_METHODS), status,
+                subtotal, 0.0, subtotal, rate, amount_usd, amount_ves,
+            ))
+
+            if len(tickets) >= self.batch_size:
+                bulk_insert(Ticket.__table__, ticket_columns, tickets, bind=self.bind)
+                bulk_insert(TicketItem.__table__, item_columns, items, bind=self.bind)
+                item_count += len(items)
+                tickets, items = [], []
+
+        bulk_insert(Ticket.__table__, ticket_columns, tickets, bind=self.bind)
+        bulk_insert(TicketItem.__table__, item_columns, items, bind=self.bind)
+        item_count += len(items)
+        self._report("Tickets", total, started)
+        print(f"  ↳ {item_count:,} ticket items")
+
+    def generate_work_orders(self):
+        started = time.perf_counter()
+        columns = [
+            "id", "code", "customer_name", "customer_phone", "customer_id", "device", "issue",
+            "status", "received_date", "estimated_completion_date", "repair_cost", "amount_paid",
+            "payment_status", "payment_date", "payment_notes", "created_at", "updated_at",
+        ]
+        active_statuses = [
+            RepairStatus.RECIBIDO, RepairStatus.EN_DIAGNOSTICO, RepairStatus.ESPERANDO_PARTE,
+            RepairStatus.EN_REPARACION, RepairStatus.REPARADO, RepairStatus.ENTREGADO,
+        ]
+        payment_statuses = [
+            WOPaymentStatus.PAGADO, WOPaymentStatus.PENDIENTE,
+            WOPaymentStatus.PAGO_PARCIAL, WOPaymentStatus.VENCIDO,
+        ]
+
+        with self.bind.connect() as conn:
+            codes = set(conn.execute(select(WorkOrder.code)).scalars())
+        alphabet = string.ascii_uppercase + string.digits
+
+        total = self.volumes["work_orders"]
+        rows = []
+        for _ in range(total):
+            code = "".join(self.rng.choices(alphabet, k=6))
+            while code in codes:
+                code = "".join(self.rng.choices(alphabet, k=6))
+            codes.add(code)
+
+            received = self._moment()
+            age_days = (self.until - received).total_seconds() / 86400
+            if age_days > 30:
+                # Old orders are almost always delivered by now
+                status = RepairStatus.ENTREGADO if self.rng.random() < 0.92 else self.rng.choice(active_statuses)
+            else:
+                status = self.rng.choices(active_statuses, weights=[18, 16, 14, 18, 16, 18])[0]
+
+            if status == RepairStatus.ENTREGADO:
+                payment_status = self.rng.choices(payment_statuses, weights=[85, 5, 6, 4])[0]
+            else:
+                payment_status = self.rng.choices(payment_statuses, weights=[10, 58, 30, 2])[0]
+
+            repair_cost = round(self.rng.uniform(10.0, 250.0), 2)
+            if payment_status == WOPaymentStatus.PAGADO:
+                amount_paid = repair_cost
+            elif payment_status == WOPaymentStatus.PAGO_PARCIAL:
+                amount_paid = round(repair_cost * self.rng.uniform(0.2, 0.8), 2)
+            else:
+                amount_paid = 0.0
+
+            touched = received + timedelta(hours=self.rng.uniform(1, min(age_days * 24, 24 * 20) or 1))
+            payment_date = touched if payment_status == WOPaymentStatus.PAGADO else None
+            name, phone, customer_id = self._pick_customers(1)[0]
+            device = self.rng.choice(DEVICE_MODELS)
+
+            rows.append((
+                self._uuid(), code, name,
+                phone if self.rng.random() < 0.8 else None,
+                customer_id if self.rng.random() < 0.7 else None,
+                device, self.rng.choice(ISSUES), status, received,
+                received + timedelta(days=self.rng.randint(1, 7)),
+                repair_cost, amount_paid, payment_status, payment_date, None,
+                received, touched if status != RepairStatus.RECIBIDO else received,
+            ))
+
+            if len(rows) >= self.batch_size:
+                bulk_insert(WorkOrder.__table__, columns, rows, bind=self.bind)
+                rows = []
+        bulk_insert(WorkOrder.__table__, columns, rows, bind=self.bind)
+        self._report("Work orders", total, started)
+
+    def already_generated(self) -> bool:
+        """Whether this seed's dataset is already in the database (its part SKUs are seed-prefixed)"""
+        with self.bind.connect() as conn:
+            return conn.execute(
+                select(Part.id).where(Part.sku.like(f"S{self.seed}-%")).limit(1)
+            ).first() is not None
+
+    def run(self):
+        """
+        Generate every entity.
+
+        Raises:
+            DatasetExistsError: If the seed was already generated in this
+                database (its ticket ids and SKUs would collide)
+        """
+        if self.already_generated():
+            raise DatasetExistsError(
+                f"The dataset of seed {self.seed} is already in this database; "
+                f"pass another --seed or start from an empty database"
+            )
+        print(f"\nGenerating synthetic dataset (seed={self.seed}, window={self.days} days)...")
+        started = time.perf_counter()
+        self.build_customers()
+        try:
+            self.generate_products()
+            self.generate_parts()
+            self.generate_tickets()
+            self.generate_work_orders()
+        except IntegrityError as e:
+            raise DatasetExistsError(
+                f"Generated rows collide with existing ones (seed {self.seed} was likely generated "
+                f"before); pass another --seed or start from an empty database"
+            ) from e
+
+        if self.bind.dialect.name == "postgresql":
+            with self.bind.begin() as conn:
+                conn.exec_driver_sql("ANALYZE")
+        print(f"\n✅ Synthetic dataset generated in {time.perf_counter() - started:.1f}s")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="ServiceFlow database initialization")
+    parser.add_argument(
+        "--scale", type=float, default=None,
+        help="Generate a synthetic dataset; 1.0 ≈ 1M tickets and 250k work orders"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for --scale (default: 42)")
+    parser.add_argument("--days", type=int, default=730, help="History window in days (default: 730)")
+    parser.add_argument(
+        "--until", type=str, default=DEFAULT_UNTIL,
+        help=f"Anchor date (YYYY-MM-DD) for generated timestamps (default: {DEFAULT_UNTIL})"
+    )
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per insert batch")
+    for name in SCALE_BASE_VOLUMES:
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=int, default=None, dest=name,
+            help=f"Override the number of {name.replace('_', ' ')} generated"
+        )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+
     print("=" * 50)
     print("ServiceFlow Database Initialization")
     print("=" * 50)
-    
-    init_db()
-    seed_data()
-    
+
+    # Serialized with the server's startup bootstrap and other init_db runs
+    with process_lock(STARTUP_LOCK):
+        init_db()
+        if has_users():
+            print("✓ Users already exist, skipping seed data")
+        else:
+            seed_data()
+
+    if args.scale is not None:
+        volumes = {
+            name: getattr(args, name) if getattr(args, name) is not None else int(base * args.scale)
+            for name, base in SCALE_BASE_VOLUMES.items()
+        }
+        until = datetime.strptime(args.until, "%Y-%m-%d")
+        try:
+            ScaleDataGenerator(
+                volumes=volumes,
+                seed=args.seed,
+                days=args.days,
+                until=until,
+                batch_size=args.batch_size
+            ).run()
+        except DatasetExistsError as e:
+            print(f"\n❌ {e}")
+            raise SystemExit(1)
+
     print("\n" + "=" * 50)
     print("Initialization complete!")
     print("=" * 50)
@@ -0,0 +1,141 @@
+"""Baseline schema, as created by Base.metadata.create_all before migrations
+
+Installs created before Alembic was introduced are stamped with this
+revision by app.bootstrap and then upgraded normally.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(50), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("role", sa.Enum("ADMIN", "TECHNICIAN", name="userrole"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "products",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("brand", sa.String(50), nullable=False),
+        sa.Column("stock", sa.Integer(), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("image_url", sa.String(500), nullable=True),
+        sa.Column("min_stock", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_products_id", "products", ["id"])
+    op.create_index("ix_products_name", "products", ["name"])
+
+    op.create_table(
+        "tickets",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("date", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("customer_name", sa.String(100), nullable=False),
+        sa.Column("payment_method", sa.String(50), nullable=False),
+        sa.Column(
+            "payment_status",
+            sa.Enum("PAID", "PENDING", "PARTIAL", "OVERDUE", name="paymentstatus"),
+            nullable=False
+        ),
+        sa.Column("subtotal", sa.Float(), nullable=False),
+        sa.Column("tax", sa.Float(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("exchange_rate", sa.Float(), nullable=True),
+        sa.Column("amount_usd", sa.Float(), nullable=True),
+        sa.Column("amount_ves", sa.Float(), nullable=True),
+    )
+    op.create_index("ix_tickets_id", "tickets", ["id"])
+
+    op.create_table(
+        "ticket_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("ticket_id", sa.String(36), sa.ForeignKey("tickets.id"), nullable=False),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+    )
+    op.create_index("ix_ticket_items_id", "ticket_items", ["id"])
+
+    op.create_table(
+        "work_orders",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("code", sa.String(8), nullable=True),
+        sa.Column("customer_name", sa.String(100), nullable=False),
+        sa.Column("customer_phone", sa.String(20), nullable=True),
+        sa.Column("customer_id", sa.String(20), nullable=True),
+        sa.Column("device", sa.String(100), nullable=False),
+        sa.Column("issue", sa.Text(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "RECIBIDO", "EN_DIAGNOSTICO", "ESPERANDO_PARTE", "EN_REPARACION", "REPARADO", "ENTREGADO",
+                name="repairstatus"
+            ),
+            nullable=False
+        ),
+        sa.Column("received_date", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("estimated_completion_date", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("repair_cost", sa.Numeric(10, 2), nullable=True),
+        sa.Column("amount_paid", sa.Numeric(10, 2), nullable=True),
+        sa.Column(
+            "payment_status",
+            # Both payment status enums are named "paymentstatus" in the models,
+            # so PostgreSQL only ever had the one created with the tickets table
+            sa.Enum("PENDIENTE", "PAGADO", "PAGO_PARCIAL", "VENCIDO", name="paymentstatus").with_variant(
+                postgresql.ENUM(name="paymentstatus", create_type=False), "postgresql"
+            ),
+            nullable=False
+        ),
+        sa.Column("payment_date", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("payment_notes", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_work_orders_id", "work_orders", ["id"])
+    op.create_index("ix_work_orders_code", "work_orders", ["code"], unique=True)
+    op.create_index("ix_work_orders_customer_name", "work_orders", ["customer_name"])
+    op.create_index("ix_work_orders_customer_id", "work_orders", ["customer_id"])
+
+    op.create_table(
+        "parts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("sku", sa.String(50), nullable=False),
+        sa.Column("stock", sa.Integer(), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("compatible_models", sa.JSON(), nullable=False),
+        sa.Column("min_stock", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_parts_id", "parts", ["id"])
+    op.create_index("ix_parts_name", "parts", ["name"])
+    op.create_index("ix_parts_sku", "parts", ["sku"], unique=True)
+
+
+def downgrade():
+    op.drop_table("parts")
+    op.drop_table("work_orders")
+    op.drop_table("ticket_items")
+    op.drop_table("tickets")
+    op.drop_table("products")
+    op.drop_table("users")
@@ -0,0 +1,50 @@
+"""Add parts.image_url and the idempotency_keys table
+
+Databases started by a newer server before migrations existed may already
+have the table (create_all adds missing tables), so both steps are skipped
+when already applied.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_context().as_sql:
+        # Offline SQL generation cannot inspect the database
+        columns, tables = set(), set()
+    else:
+        inspector = sa.inspect(op.get_bind())
+        columns = {column["name"] for column in inspector.get_columns("parts")}
+        tables = set(inspector.get_table_names())
+
+    if "image_url" not in columns:
+        # Nullable column without default: a metadata-only change, no table rewrite
+        op.add_column("parts", sa.Column("image_url", sa.String(500), nullable=True))
+
+    if "idempotency_keys" not in tables:
+        op.create_table(
+            "idempotency_keys",
+            sa.Column("key", sa.String(100), primary_key=True),
+            sa.Column("scope", sa.String(50), nullable=False),
+            sa.Column("request_hash", sa.String(64), nullable=False),
+            sa.Column("resource_id", sa.String(36), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_idempotency_keys_created_at", "idempotency_keys", ["created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_idempotency_keys_created_at", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
+    with op.batch_alter_table("parts") as batch_op:
+        batch_op.drop_column("image_url")
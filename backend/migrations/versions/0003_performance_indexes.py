@@ -0,0 +1,74 @@
+"""Index the columns listings, dashboards and debt reports filter and sort by
+
+On PostgreSQL the indexes are built with CREATE INDEX CONCURRENTLY outside
+a transaction, so tables stay writable while an existing install upgrades.
+An index left INVALID by an interrupted concurrent build is dropped and
+rebuilt on the next run.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, partial-index predicate)
+INDEXES = [
+    ("ix_tickets_date", "tickets", ["date"], None),
+    ("ix_tickets_unpaid_date", "tickets", ["payment_status", "date"], "payment_status <> 'PAID'"),
+    ("ix_ticket_items_ticket_id", "ticket_items", ["ticket_id"], None),
+    ("ix_ticket_items_product_id", "ticket_items", ["product_id"], None),
+    ("ix_work_orders_received_date", "work_orders", ["received_date"], None),
+    ("ix_work_orders_status_received_date", "work_orders", ["status", "received_date"], None),
+    ("ix_work_orders_payment_status_customer", "work_orders", ["payment_status", "customer_name"], None),
+]
+
+
+def _drop_if_invalid(name):
+    if op.get_context().as_sql:
+        return
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name}
+    ).first()
+    if invalid:
+        op.execute(sa.text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, table, columns, where in INDEXES:
+                _drop_if_invalid(name)
+                op.create_index(
+                    name, table, columns,
+                    postgresql_where=sa.text(where) if where else None,
+                    postgresql_concurrently=True,
+                    if_not_exists=True
+                )
+    else:
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                sqlite_where=sa.text(where) if where else None,
+                if_not_exists=True
+            )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, table, _, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,85 @@
+"""Store money as BIGINT minor units (cents)
+
+Float and Numeric(10,2) amounts are converted in place, rounding to the
+nearest cent. On PostgreSQL each ALTER ... TYPE rewrites its table under an
+exclusive lock, so run this upgrade in a maintenance window on large
+databases.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# table -> [(column, previous type, nullable)]
+MONEY_COLUMNS = {
+    "products": [("price", sa.Float(), False)],
+    "parts": [("price", sa.Float(), False)],
+    "tickets": [
+        ("subtotal", sa.Float(), False),
+        ("tax", sa.Float(), False),
+        ("total", sa.Float(), False),
+        ("amount_usd", sa.Float(), True),
+        ("amount_ves", sa.Float(), True),
+    ],
+    "ticket_items": [("price", sa.Float(), False)],
+    "work_orders": [
+        ("repair_cost", sa.Numeric(10, 2), True),
+        ("amount_paid", sa.Numeric(10, 2), True),
+    ],
+}
+
+
+def upgrade():
+    postgresql = op.get_bind().dialect.name == "postgresql"
+    for table, columns in MONEY_COLUMNS.items():
+        if postgresql:
+            for column, _, nullable in columns:
+                op.alter_column(
+                    table, column,
+                    type_=sa.BigInteger(),
+                    existing_nullable=nullable,
+                    postgresql_using=f"round({column} * 100)::bigint"
+                )
+            continue
+
+        op.execute(
+            f"UPDATE {table} SET "
+            + ", ".join(f"{column} = CAST(ROUND({column} * 100) AS INTEGER)" for column, _, _ in columns)
+        )
+        with op.batch_alter_table(table) as batch_op:
+            for column, previous, nullable in columns:
+                batch_op.alter_column(
+                    column, type_=sa.BigInteger(), existing_type=previous, existing_nullable=nullable
+                )
+
+
+def downgrade():
+    postgresql = op.get_bind().dialect.name == "postgresql"
+    for table, columns in MONEY_COLUMNS.items():
+        if postgresql:
+            for column, previous, nullable in columns:
+                op.alter_column(
+                    table, column,
+                    type_=previous,
+                    existing_nullable=nullable,
+                    postgresql_using=f"{column} / 100.0"
+                )
+            continue
+
+        with op.batch_alter_table(table) as batch_op:
+            for column, previous, nullable in columns:
+                batch_op.alter_column(
+                    column, type_=previous, existing_type=sa.BigInteger(), existing_nullable=nullable
+                )
+        op.execute(
+            f"UPDATE {table} SET "
+            + ", ".join(f"{column} = {column} / 100.0" for column, _, _ in columns)
+        )
@@ -0,0 +1,33 @@
+"""Add the exchange_rates history table
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "exchange_rates",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("currency", sa.String(3), nullable=False),
+        sa.Column("rate", sa.Numeric(18, 6), nullable=False),
+        sa.Column("effective_from", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_exchange_rates_id", "exchange_rates", ["id"])
+    op.create_index(
+        "ix_exchange_rates_currency_effective_from", "exchange_rates", ["currency", "effective_from"], unique=True
+    )
+
+
+def downgrade():
+    op.drop_table("exchange_rates")
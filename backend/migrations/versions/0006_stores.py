@@ -0,0 +1,141 @@
+"""Add stores and scope products, parts, tickets, work orders and users to one
+
+Existing rows move to the default store (id 1). The hot indexes are rebuilt
+to lead with store_id, since every query of a store-bound session filters on
+it; part SKUs become unique per store. On PostgreSQL the indexes are built
+CONCURRENTLY before the ones they replace are dropped.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+SCOPED_TABLES = ["users", "products", "parts", "tickets", "work_orders"]
+
+# (name, table, columns, partial-index predicate, unique)
+INDEXES = [
+    ("ix_products_store_name", "products", ["store_id", "name"], None, False),
+    ("ix_parts_store_name", "parts", ["store_id", "name"], None, False),
+    ("ix_parts_store_sku", "parts", ["store_id", "sku"], None, True),
+    ("ix_tickets_store_date", "tickets", ["store_id", "date"], None, False),
+    (
+        "ix_tickets_store_unpaid_date", "tickets", ["store_id", "payment_status", "date"],
+        "payment_status <> 'PAID'", False
+    ),
+    ("ix_work_orders_store_received_date", "work_orders", ["store_id", "received_date"], None, False),
+    ("ix_work_orders_store_customer_name", "work_orders", ["store_id", "customer_name"], None, False),
+    ("ix_work_orders_store_customer_id", "work_orders", ["store_id", "customer_id"], None, False),
+    (
+        "ix_work_orders_store_status_received_date", "work_orders",
+        ["store_id", "status", "received_date"], None, False
+    ),
+    (
+        "ix_work_orders_store_payment_status_customer", "work_orders",
+        ["store_id", "payment_status", "customer_name"], None, False
+    ),
+]
+
+# Indexes superseded by the store-leading ones above
+# (name, table, columns, partial-index predicate, unique)
+REPLACED_INDEXES = [
+    ("ix_products_name", "products", ["name"], None, False),
+    ("ix_parts_name", "parts", ["name"], None, False),
+    ("ix_parts_sku", "parts", ["sku"], None, True),
+    ("ix_tickets_date", "tickets", ["date"], None, False),
+    ("ix_tickets_unpaid_date", "tickets", ["payment_status", "date"], "payment_status <> 'PAID'", False),
+    ("ix_work_orders_received_date", "work_orders", ["received_date"], None, False),
+    ("ix_work_orders_customer_name", "work_orders", ["customer_name"], None, False),
+    ("ix_work_orders_customer_id", "work_orders", ["customer_id"], None, False),
+    ("ix_work_orders_status_received_date", "work_orders", ["status", "received_date"], None, False),
+    ("ix_work_orders_payment_status_customer", "work_orders", ["payment_status", "customer_name"], None, False),
+]
+
+
+def _create_indexes(indexes):
+    postgresql = op.get_bind().dialect.name == "postgresql"
+    for name, table, columns, where, unique in indexes:
+        if postgresql:
+            op.create_index(
+                name, table, columns, unique=unique,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+        else:
+            op.create_index(
+                name, table, columns, unique=unique,
+                sqlite_where=sa.text(where) if where else None,
+                if_not_exists=True
+            )
+
+
+def _drop_indexes(indexes):
+    postgresql = op.get_bind().dialect.name == "postgresql"
+    for name, table, _, _, _ in indexes:
+        if postgresql:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        else:
+            op.drop_index(name, table_name=table, if_exists=True)
+
+
+def _swap_indexes(new, old):
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            # An index left INVALID by an interrupted concurrent build is rebuilt
+            _drop_indexes([index for index in new if _is_invalid(index[0])])
+            _create_indexes(new)
+            _drop_indexes(old)
+    else:
+        _create_indexes(new)
+        _drop_indexes(old)
+
+
+def _is_invalid(name):
+    if op.get_context().as_sql:
+        return False
+    return op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name}
+    ).first() is not None
+
+
+def upgrade():
+    stores = op.create_table(
+        "stores",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False, unique=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_stores_id", "stores", ["id"])
+    # First row of a new table, so it gets id 1 (the store_id default)
+    op.bulk_insert(stores, [{"name": "Principal"}])
+
+    for table in SCOPED_TABLES:
+        # A constant default fills existing rows without rewriting the table on PostgreSQL
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("store_id", sa.Integer(), nullable=False, server_default=sa.text("1")))
+            batch_op.create_foreign_key(f"fk_{table}_store_id", "stores", ["store_id"], ["id"])
+
+    _swap_indexes(INDEXES, REPLACED_INDEXES)
+
+
+def downgrade():
+    _swap_indexes(REPLACED_INDEXES, INDEXES)
+
+    for table in reversed(SCOPED_TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(f"fk_{table}_store_id", type_="foreignkey")
+            batch_op.drop_column("store_id")
+
+    op.drop_table("stores")
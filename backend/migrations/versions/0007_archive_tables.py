@@ -0,0 +1,97 @@
+"""Add archive tables for settled tickets and work orders
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def _enum(name, *values):
+    # The enum types already exist on PostgreSQL (created with the hot tables)
+    return sa.Enum(*values, name=name).with_variant(postgresql.ENUM(name=name, create_type=False), "postgresql")
+
+
+def _store_id():
+    return sa.Column("store_id", sa.Integer(), sa.ForeignKey("stores.id"), nullable=False, server_default=sa.text("1"))
+
+
+def upgrade():
+    op.create_table(
+        "tickets_archive",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("date", sa.DateTime(timezone=True)),
+        sa.Column("customer_name", sa.String(100), nullable=False),
+        sa.Column("payment_method", sa.String(50), nullable=False),
+        sa.Column("payment_status", _enum("paymentstatus", "PAID", "PENDING", "PARTIAL", "OVERDUE"), nullable=False),
+        sa.Column("subtotal", sa.BigInteger(), nullable=False),
+        sa.Column("tax", sa.BigInteger(), nullable=False),
+        sa.Column("total", sa.BigInteger(), nullable=False),
+        sa.Column("exchange_rate", sa.Float(), nullable=True),
+        sa.Column("amount_usd", sa.BigInteger(), nullable=True),
+        sa.Column("amount_ves", sa.BigInteger(), nullable=True),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        _store_id(),
+    )
+    op.create_index("ix_tickets_archive_store_date", "tickets_archive", ["store_id", "date"])
+
+    op.create_table(
+        "ticket_items_archive",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("ticket_id", sa.String(36), sa.ForeignKey("tickets_archive.id"), nullable=False),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("price", sa.BigInteger(), nullable=False),
+    )
+    op.create_index("ix_ticket_items_archive_ticket_id", "ticket_items_archive", ["ticket_id"])
+    op.create_index("ix_ticket_items_archive_product_id", "ticket_items_archive", ["product_id"])
+
+    op.create_table(
+        "work_orders_archive",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("code", sa.String(8), nullable=True),
+        sa.Column("customer_name", sa.String(100), nullable=False),
+        sa.Column("customer_phone", sa.String(20), nullable=True),
+        sa.Column("customer_id", sa.String(20), nullable=True),
+        sa.Column("device", sa.String(100), nullable=False),
+        sa.Column("issue", sa.Text(), nullable=False),
+        sa.Column(
+            "status",
+            _enum(
+                "repairstatus",
+                "RECIBIDO", "EN_DIAGNOSTICO", "ESPERANDO_PARTE", "EN_REPARACION", "REPARADO", "ENTREGADO"
+            ),
+            nullable=False
+        ),
+        sa.Column("received_date", sa.DateTime(timezone=True)),
+        sa.Column("estimated_completion_date", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("repair_cost", sa.BigInteger(), nullable=True),
+        sa.Column("amount_paid", sa.BigInteger(), nullable=True),
+        sa.Column(
+            "payment_status", _enum("paymentstatus", "PENDIENTE", "PAGADO", "PAGO_PARCIAL", "VENCIDO"), nullable=False
+        ),
+        sa.Column("payment_date", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("payment_notes", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        _store_id(),
+    )
+    op.create_index("ix_work_orders_archive_code", "work_orders_archive", ["code"], unique=True)
+    op.create_index(
+        "ix_work_orders_archive_store_received_date", "work_orders_archive", ["store_id", "received_date"]
+    )
+
+
+def downgrade():
+    op.drop_table("work_orders_archive")
+    op.drop_table("ticket_items_archive")
+    op.drop_table("tickets_archive")
@@ -0,0 +1,55 @@
+"""Add the work_order_status_events history table
+
+Existing work orders get one event for the status they are in, dated at
+their last update (or reception); earlier transitions were never recorded.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "work_order_status_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("work_order_id", sa.String(36), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "RECIBIDO", "EN_DIAGNOSTICO", "ESPERANDO_PARTE", "EN_REPARACION", "REPARADO", "ENTREGADO",
+                name="repairstatus"
+            ).with_variant(postgresql.ENUM(name="repairstatus", create_type=False), "postgresql"),
+            nullable=False
+        ),
+        sa.Column("device", sa.String(100), nullable=False),
+        sa.Column("entered_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("store_id", sa.Integer(), sa.ForeignKey("stores.id"), nullable=False, server_default=sa.text("1")),
+    )
+    op.create_index(
+        "ix_work_order_status_events_store_status_entered_at",
+        "work_order_status_events", ["store_id", "status", "entered_at"]
+    )
+    op.create_index(
+        "ix_work_order_status_events_work_order_entered_at",
+        "work_order_status_events", ["work_order_id", "entered_at"]
+    )
+
+    op.execute(
+        "INSERT INTO work_order_status_events (work_order_id, status, device, entered_at, store_id) "
+        "SELECT id, status, device, COALESCE(updated_at, received_date, CURRENT_TIMESTAMP), store_id "
+        "FROM work_orders"
+    )
+
+
+def downgrade():
+    op.drop_table("work_order_status_events")
@@ -0,0 +1,160 @@
+"""Add customers and link tickets and work orders to them
+
+Work orders (hot and archived) are grouped into customers by their
+normalized C.I. or phone, the same way new ones are matched at runtime
+(``app.services.customers``); orders with neither stay unlinked. Tickets
+only carry a name, so a ticket is linked when exactly one customer of its
+store has that name. On PostgreSQL the new indexes are built CONCURRENTLY
+after the backfill.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.customers import normalize_national_id, normalize_phone
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+LINKED_TABLES = ["tickets", "work_orders", "tickets_archive", "work_orders_archive"]
+
+# (name, table, columns)
+INDEXES = [
+    ("ix_tickets_store_customer_date", "tickets", ["store_id", "customer_ref_id", "date"]),
+    (
+        "ix_work_orders_store_customer_received_date", "work_orders",
+        ["store_id", "customer_ref_id", "received_date"]
+    ),
+    ("ix_tickets_archive_store_customer_date", "tickets_archive", ["store_id", "customer_ref_id", "date"]),
+    (
+        "ix_work_orders_archive_store_customer_received_date", "work_orders_archive",
+        ["store_id", "customer_ref_id", "received_date"]
+    ),
+]
+
+
+def _backfill_work_orders(customers):
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT 'work_orders', id, store_id, customer_name, customer_phone, customer_id, received_date "
+        "FROM work_orders "
+        "UNION ALL "
+        "SELECT 'work_orders_archive', id, store_id, customer_name, customer_phone, customer_id, received_date "
+        "FROM work_orders_archive "
+        "ORDER BY 7"
+    ))
+
+    # Same rules as resolve_customer: the C.I. wins, a phone stays with its
+    # first owner, and the latest name is kept
+    found = []
+    by_national_id, by_phone = {}, {}
+    links = {table: [] for table in LINKED_TABLES}
+    for table, order_id, store_id, name, raw_phone, raw_national_id, _ in rows:
+        phone, national_id = normalize_phone(raw_phone), normalize_national_id(raw_national_id)
+        if not phone and not national_id:
+            continue
+
+        match_national_id = by_national_id.get((store_id, national_id)) if national_id else None
+        match_phone = by_phone.get((store_id, phone)) if phone else None
+        if match_phone is not None and national_id and found[match_phone]["national_id"] not in (None, national_id):
+            match_phone, phone = None, None
+        index = match_national_id if match_national_id is not None else match_phone
+
+        if index is None:
+            index = len(found)
+            found.append({"store_id": store_id, "name": name, "phone": None, "national_id": None})
+        customer = found[index]
+        customer["name"] = name
+        if national_id and customer["national_id"] is None:
+            customer["national_id"] = national_id
+            by_national_id[(store_id, national_id)] = index
+        if phone and customer["phone"] is None and match_phone is None:
+            customer["phone"] = phone
+            by_phone[(store_id, phone)] = index
+        links[table].append((order_id, index))
+
+    if not found:
+        return
+    bind.execute(customers.insert(), found)
+
+    # Every customer has a C.I. or a phone, both unique per store
+    ids = {}
+    for customer_id, store_id, phone, national_id in bind.execute(
+        sa.select(customers.c.id, customers.c.store_id, customers.c.phone, customers.c.national_id)
+    ):
+        ids[(store_id, "national_id", national_id) if national_id else (store_id, "phone", phone)] = customer_id
+    for table, pairs in links.items():
+        if not pairs:
+            continue
+        updates = []
+        for order_id, index in pairs:
+            customer = found[index]
+            key = (
+                (customer["store_id"], "national_id", customer["national_id"]) if customer["national_id"]
+                else (customer["store_id"], "phone", customer["phone"])
+            )
+            updates.append({"customer": ids[key], "order": order_id})
+        bind.execute(sa.text(f"UPDATE {table} SET customer_ref_id = :customer WHERE id = :order"), updates)
+
+
+def _backfill_tickets():
+    for table in ("tickets", "tickets_archive"):
+        same_name = (
+            f"FROM customers c WHERE c.store_id = {table}.store_id AND c.name = {table}.customer_name"
+        )
+        op.execute(
+            f"UPDATE {table} SET customer_ref_id = (SELECT MIN(c.id) {same_name}) "
+            f"WHERE (SELECT COUNT(*) {same_name}) = 1"
+        )
+
+
+def upgrade():
+    customers = op.create_table(
+        "customers",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("phone", sa.String(16), nullable=True),
+        sa.Column("national_id", sa.String(20), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("store_id", sa.Integer(), sa.ForeignKey("stores.id"), nullable=False, server_default=sa.text("1")),
+    )
+    op.create_index("ix_customers_id", "customers", ["id"])
+    op.create_index("ix_customers_store_phone", "customers", ["store_id", "phone"], unique=True)
+    op.create_index("ix_customers_store_national_id", "customers", ["store_id", "national_id"], unique=True)
+    op.create_index("ix_customers_store_name", "customers", ["store_id", "name"])
+
+    for table in LINKED_TABLES:
+        # Nullable without default: no table rewrite on PostgreSQL
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("customer_ref_id", sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(f"fk_{table}_customer_ref_id", "customers", ["customer_ref_id"], ["id"])
+
+    if not op.get_context().as_sql:
+        _backfill_work_orders(customers)
+    _backfill_tickets()
+
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
+
+    for table in reversed(LINKED_TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(f"fk_{table}_customer_ref_id", type_="foreignkey")
+            batch_op.drop_column("customer_ref_id")
+
+    op.drop_table("customers")
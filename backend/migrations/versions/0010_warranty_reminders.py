@@ -0,0 +1,31 @@
+"""Add the warranty_reminders table
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "warranty_reminders",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("work_order_id", sa.String(36), nullable=False, unique=True),
+        sa.Column("phone", sa.String(20), nullable=False),
+        sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("delivered", sa.Boolean(), nullable=True),
+        sa.Column("store_id", sa.Integer(), sa.ForeignKey("stores.id"), nullable=False, server_default=sa.text("1")),
+    )
+
+
+def downgrade():
+    op.drop_table("warranty_reminders")
@@ -0,0 +1,64 @@
+"""Add sync watermarks and change-time indexes for the Google Sheets sync
+
+Tickets get an ``updated_at`` that is also set on insert, so offline sales
+synced late and tickets marked as paid are both picked up; existing tickets
+get the migration time, and the first sync exports everything anyway. On
+PostgreSQL the column is added with a constant-per-statement default (no
+table rewrite) and the indexes are built CONCURRENTLY.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns)
+INDEXES = [
+    ("ix_tickets_store_updated_at", "tickets", ["store_id", "updated_at"]),
+    ("ix_work_orders_store_changed_at", "work_orders", ["store_id", sa.text("coalesce(updated_at, created_at)")]),
+]
+
+
+def upgrade():
+    op.create_table(
+        "sync_watermarks",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("synced_until", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    updated_at = sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now())
+    if op.get_bind().dialect.name == "postgresql":
+        op.add_column("tickets", updated_at)
+    else:
+        # SQLite cannot add a column with a non-constant default in place
+        with op.batch_alter_table("tickets", recreate="always") as batch_op:
+            batch_op.add_column(updated_at)
+    op.add_column("tickets_archive", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
+
+    with op.batch_alter_table("tickets_archive") as batch_op:
+        batch_op.drop_column("updated_at")
+    with op.batch_alter_table("tickets") as batch_op:
+        batch_op.drop_column("updated_at")
+
+    op.drop_table("sync_watermarks")
@@ -0,0 +1,38 @@
+"""Add the audit_log table
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "audit_log",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("username", sa.String(50), nullable=True),
+        sa.Column("action", sa.String(10), nullable=False),
+        sa.Column("entity", sa.String(20), nullable=False),
+        sa.Column("entity_id", sa.String(36), nullable=False),
+        sa.Column("changes", sa.JSON(), nullable=True),
+        sa.Column("store_id", sa.Integer(), sa.ForeignKey("stores.id"), nullable=False, server_default=sa.text("1")),
+    )
+    op.create_index("ix_audit_log_store_created_at", "audit_log", ["store_id", "created_at"])
+    op.create_index(
+        "ix_audit_log_store_entity_created_at", "audit_log", ["store_id", "entity", "entity_id", "created_at"]
+    )
+    op.create_index("ix_audit_log_store_user_created_at", "audit_log", ["store_id", "user_id", "created_at"])
+
+
+def downgrade():
+    op.drop_table("audit_log")
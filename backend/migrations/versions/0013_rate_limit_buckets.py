@@ -0,0 +1,33 @@
+"""Add the rate_limit_buckets table
+
+Buckets are disposable (an empty table only means every client starts with
+a full bucket), so on PostgreSQL the table is UNLOGGED: the write made by
+every rate-limited request skips the WAL.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "rate_limit_buckets",
+        sa.Column("key", sa.String(120), primary_key=True),
+        sa.Column("tokens", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.Float(), nullable=False),
+        sa.Column("granted", sa.Boolean(), nullable=False),
+        prefixes=["UNLOGGED"] if op.get_bind().dialect.name == "postgresql" else [],
+    )
+
+
+def downgrade():
+    op.drop_table("rate_limit_buckets")
@@ -0,0 +1,50 @@
+"""Add catalog versions and the catalog_tombstones table
+
+Every store counts its catalog changes; products and parts record the
+version of their last change and deletions leave a tombstone, so terminals
+can fetch only what changed since the version they hold. Existing rows start
+at version 0 and are sent with the first full snapshot.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("stores") as batch_op:
+        batch_op.add_column(sa.Column("catalog_version", sa.BigInteger(), nullable=False, server_default=sa.text("0")))
+    for table in ("products", "parts"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(
+                sa.Column("catalog_version", sa.BigInteger(), nullable=False, server_default=sa.text("0"))
+            )
+        op.create_index(f"ix_{table}_store_catalog_version", table, ["store_id", "catalog_version"])
+
+    op.create_table(
+        "catalog_tombstones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("entity", sa.String(20), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("store_id", sa.Integer(), sa.ForeignKey("stores.id"), nullable=False, server_default=sa.text("1")),
+    )
+    op.create_index("ix_catalog_tombstones_store_version", "catalog_tombstones", ["store_id", "version"])
+
+
+def downgrade():
+    op.drop_table("catalog_tombstones")
+    for table in ("products", "parts"):
+        op.drop_index(f"ix_{table}_store_catalog_version", table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("catalog_version")
+    with op.batch_alter_table("stores") as batch_op:
+        batch_op.drop_column("catalog_version")
@@ -0,0 +1,30 @@
+"""Add barcodes to products and parts
+
+Unique per store; rows without a barcode (NULL) do not collide.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0015"
+down_revision = "0014"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ("products", "parts"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("barcode", sa.String(64), nullable=True))
+        op.create_index(f"ix_{table}_store_barcode", table, ["store_id", "barcode"], unique=True)
+
+
+def downgrade():
+    for table in ("products", "parts"):
+        op.drop_index(f"ix_{table}_store_barcode", table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("barcode")
@@ -0,0 +1,37 @@
+"""Add row_version counters to products, parts and work orders
+
+Every UPDATE increments the row's counter, so listing ETags change even when
+two edits fall within the same second of ``updated_at``. The work order
+archive mirrors the column.
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0016"
+down_revision = "0015"
+branch_labels = None
+depends_on = None
+
+TABLES = ("products", "parts", "work_orders", "work_orders_archive")
+
+# Expression index a batch recreate on SQLite cannot carry over
+CHANGED_AT_INDEX = ("ix_work_orders_store_changed_at", ["store_id", sa.text("coalesce(updated_at, created_at)")])
+
+
+def upgrade():
+    # A plain ADD COLUMN: no table recreate on SQLite
+    for table in TABLES:
+        op.add_column(table, sa.Column("row_version", sa.Integer(), nullable=False, server_default=sa.text("0")))
+
+
+def downgrade():
+    op.drop_index(CHANGED_AT_INDEX[0], table_name="work_orders")
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("row_version")
+    op.create_index(CHANGED_AT_INDEX[0], "work_orders", CHANGED_AT_INDEX[1])
@@ -0,0 +1,48 @@
+"""Scope idempotency keys to their store
+
+Keys are generated by each store's terminals, so the primary key becomes
+(store_id, key): a key reused by another store no longer replays its ticket.
+Existing keys belong to the default store.
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0017"
+down_revision = "0016"
+branch_labels = None
+depends_on = None
+
+
+# The table as 0002 created it, minus its primary key: the table is always
+# rebuilt, so the old key (unnamed on SQLite, where it cannot be dropped by
+# name) is simply left behind
+IDEMPOTENCY_KEYS = sa.Table(
+    "idempotency_keys",
+    sa.MetaData(),
+    sa.Column("key", sa.String(100), nullable=False),
+    sa.Column("scope", sa.String(50), nullable=False),
+    sa.Column("request_hash", sa.String(64), nullable=False),
+    sa.Column("resource_id", sa.String(36), nullable=False),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    sa.Index("ix_idempotency_keys_created_at", "created_at"),
+)
+
+
+def upgrade():
+    with op.batch_alter_table("idempotency_keys", recreate="always", copy_from=IDEMPOTENCY_KEYS) as batch_op:
+        batch_op.add_column(sa.Column("store_id", sa.Integer(), nullable=False, server_default=sa.text("1")))
+        batch_op.create_foreign_key("fk_idempotency_keys_store_id", "stores", ["store_id"], ["id"])
+        batch_op.create_primary_key("pk_idempotency_keys", ["store_id", "key"])
+
+
+def downgrade():
+    with op.batch_alter_table("idempotency_keys", recreate="always") as batch_op:
+        batch_op.drop_constraint("pk_idempotency_keys", type_="primary")
+        batch_op.drop_constraint("fk_idempotency_keys_store_id", type_="foreignkey")
+        batch_op.drop_column("store_id")
+        batch_op.create_primary_key("idempotency_keys_pkey", ["key"])
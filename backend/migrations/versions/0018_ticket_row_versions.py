@@ -0,0 +1,32 @@
+"""Add row_version counters to tickets
+
+Like products, parts and work orders (0016): every UPDATE increments it, so
+the tickets listing ETag changes even when two edits fall within the same
+second of ``updated_at``. The ticket archive mirrors the column.
+
+Revision ID: 0018
+Revises: 0017
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0018"
+down_revision = "0017"
+branch_labels = None
+depends_on = None
+
+TABLES = ("tickets", "tickets_archive")
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("row_version", sa.Integer(), nullable=False, server_default=sa.text("0")))
+
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("row_version")
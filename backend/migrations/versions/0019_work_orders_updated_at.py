@@ -0,0 +1,63 @@
+"""Set work_orders.updated_at on insert and index it per store
+
+Work orders never updated had no ``updated_at``, so the Google Sheets sync
+read them through an expression index on ``coalesce(updated_at,
+created_at)``. SQLite cannot reflect expression indexes, so batch
+migrations that recreate the table (0016) silently dropped it. Like tickets
+(0011), ``updated_at`` is now set on insert and backfilled from
+``created_at``, and a plain ``(store_id, updated_at)`` index replaces the
+expression one; the sync reads it store by store.
+
+Revision ID: 0019
+Revises: 0018
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0019"
+down_revision = "0018"
+branch_labels = None
+depends_on = None
+
+OLD_INDEX = ("ix_work_orders_store_changed_at", ["store_id", sa.text("coalesce(updated_at, created_at)")])
+NEW_INDEX = ("ix_work_orders_store_updated_at", ["store_id", "updated_at"])
+
+
+def _create_index(index):
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(index[0], "work_orders", index[1], postgresql_concurrently=True, if_not_exists=True)
+    else:
+        op.create_index(index[0], "work_orders", index[1])
+
+
+def _drop_index(index):
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index(index[0], table_name="work_orders", postgresql_concurrently=True, if_exists=True)
+    else:
+        op.drop_index(index[0], table_name="work_orders", if_exists=True)
+
+
+def _set_updated_at_default(server_default):
+    with op.batch_alter_table("work_orders") as batch_op:
+        batch_op.alter_column(
+            "updated_at", existing_type=sa.DateTime(timezone=True), server_default=server_default
+        )
+
+
+# Indexes are dropped before and created after the table change: a batch
+# recreate on SQLite cannot carry an expression index over
+def upgrade():
+    _drop_index(OLD_INDEX)
+    op.execute("UPDATE work_orders SET updated_at = created_at WHERE updated_at IS NULL")
+    _set_updated_at_default(sa.func.now())
+    _create_index(NEW_INDEX)
+
+
+def downgrade():
+    _drop_index(NEW_INDEX)
+    _set_updated_at_default(None)
+    _create_index(OLD_INDEX)
@@ -0,0 +1,34 @@
+"""Add the catalog_stock_changes table
+
+Sales record the stock changes of products and parts there instead of
+bumping the store's catalog version, whose row lock made a store's
+checkouts wait on each other; the next catalog read gives them a version.
+
+Revision ID: 0020
+Revises: 0019
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0020"
+down_revision = "0019"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "catalog_stock_changes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("entity", sa.String(20), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=True),
+        sa.Column("store_id", sa.Integer(), sa.ForeignKey("stores.id"), nullable=False, server_default=sa.text("1")),
+    )
+    op.create_index("ix_catalog_stock_changes_store_version", "catalog_stock_changes", ["store_id", "version"])
+
+
+def downgrade():
+    op.drop_table("catalog_stock_changes")
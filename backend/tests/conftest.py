@@ -1,6 +1,14 @@
 """
 Pytest configuration and shared fixtures for testing
 """
+import os
+
+# Requests share one in-memory connection: audit entries are written when the
+# client stops or on audit_log.flush(), never by the writer thread mid-request
+os.environ.setdefault("AUDIT_FLUSH_SECONDS", "3600")
+# Every test client shares one IP and a few users; rate limits have their own tests
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -8,7 +16,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_db, get_engine
 from app.models.user import User
 from app.utils.security import create_access_token, get_password_hash
 
@@ -48,6 +56,7 @@ def client(test_db):
     # Override both the database module and the dependencies module
     # to ensure all parts of the app use the test database
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = lambda: engine
     from app.utils import dependencies
     # We also need to override the get_db in dependencies if it's used directly
     # But since we refactored dependencies.py to import get_db from database.py,
@@ -0,0 +1,125 @@
+"""
+Fake messaging provider for tests and local runs.
+
+Implements the one Twilio endpoint the notification transport uses
+(``POST /2010-04-01/Accounts/{sid}/Messages.json``) and keeps every
+accepted message in memory, so notifications can be exercised end to end
+without credentials or real phones. Recipients can be made to fail and
+responses can be delayed, to check fallbacks and concurrency limits.
+
+Run it locally (from ``backend/``) and point ``NOTIFICATION_API_URL`` at it::
+
+    python -m tests.fake_notification_provider --port 8025
+"""
+import argparse
+import asyncio
+import base64
+import secrets
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+
+from fastapi import FastAPI, Form, HTTPException, Request, status
+from fastapi.security.utils import get_authorization_scheme_param
+
+
+@dataclass
+class SentMessage:
+    """Message accepted by the fake provider"""
+    sid: str
+    to: str
+    from_: str
+    body: str
+
+
+@dataclass
+class FakeProvider:
+    """
+    In-memory messaging provider.
+
+    Args:
+        account_sid: Account expected in the URL and credentials
+        auth_token: Expected auth token
+        failing: Recipients (``To`` values, e.g. ``whatsapp:+58...``) to reject
+        latency: Seconds each request takes
+    """
+    account_sid: str = "ACfake"
+    auth_token: str = "fake-token"
+    failing: Set[str] = field(default_factory=set)
+    latency: float = 0.0
+    messages: List[SentMessage] = field(default_factory=list)
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    def __post_init__(self):
+        self.app = self._build_app()
+
+    def sent_to(self, to: str) -> List[SentMessage]:
+        return [message for message in self.messages if message.to == to]
+
+    def _authorized(self, request: Request) -> bool:
+        scheme, credentials = get_authorization_scheme_param(request.headers.get("Authorization"))
+        if scheme.lower() != "basic":
+            return False
+        try:
+            user, _, password = base64.b64decode(credentials).decode().partition(":")
+        except ValueError:
+            return False
+        return secrets.compare_digest(user, self.account_sid) and secrets.compare_digest(password, self.auth_token)
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake messaging provider")
+
+        @app.post("/2010-04-01/Accounts/{account_sid}/Messages.json", status_code=status.HTTP_201_CREATED)
+        async def create_message(
+            account_sid: str,
+            request: Request,
+            to: str = Form(..., alias="To"),
+            from_: str = Form(..., alias="From"),
+            body: str = Form(..., alias="Body")
+        ) -> Dict[str, str]:
+            if account_sid != self.account_sid or not self._authorized(request):
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication Error")
+
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+            finally:
+                self.in_flight -= 1
+
+            if to in self.failing:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Cannot deliver to {to}")
+            message = SentMessage(sid=f"SM{secrets.token_hex(16)}", to=to, from_=from_, body=body)
+            self.messages.append(message)
+            return {"sid": message.sid, "status": "queued", "to": to, "from": from_, "body": body}
+
+        @app.get("/messages")
+        async def list_messages() -> List[Dict[str, str]]:
+            return [
+                {"sid": message.sid, "to": message.to, "from": message.from_, "body": message.body}
+                for message in self.messages
+            ]
+
+        return app
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run a fake messaging provider")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--account-sid", default="ACfake", help="Use as TWILIO_ACCOUNT_SID")
+    parser.add_argument("--auth-token", default="fake-token", help="Use as TWILIO_AUTH_TOKEN")
+    parser.add_argument("--fail", action="append", default=[], help="Recipient to reject (repeatable)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    args = parse_args()
+    provider = FakeProvider(
+        account_sid=args.account_sid, auth_token=args.auth_token, failing=set(args.fail), latency=args.latency
+    )
+    uvicorn.run(provider.app, host=args.host, port=args.port)
@@ -0,0 +1,85 @@
+"""
+Tests for work order status history and turnaround analytics
+"""
+from datetime import datetime, timedelta
+import pytest
+from app.models.work_order import RepairStatus
+from app.models.work_order_event import WorkOrderStatusEvent
+
+START = datetime(2024, 3, 1, 8, 0)
+HOUR = 3600.0
+
+
+def add_timeline(db, order_id, device, *steps):
+    """Insert the status events of one order: (status, hours after START) pairs"""
+    for status, hours in steps:
+        db.add(WorkOrderStatusEvent(
+            work_order_id=order_id, status=status, device=device, entered_at=START + timedelta(hours=hours)
+        ))
+    db.commit()
+
+
+@pytest.mark.work_orders
+class TestStatusHistory:
+    """Test status events are recorded with every change"""
+
+    def test_create_and_status_change_are_recorded(self, client, test_db, auth_headers_tech):
+        """Test the initial status and each change append an event"""
+        created = client.post("/api/work-orders", json={
+            "customer_name": "Ana", "device": "iPhone 12", "issue": "Pantalla rota"
+        }, headers=auth_headers_tech).json()
+        client.put(f"/api/work-orders/{created['id']}", json={"status": "En Diagnóstico"},
+                   headers=auth_headers_tech)
+        client.put(f"/api/work-orders/{created['id']}", json={"issue": "Pantalla y batería"},
+                   headers=auth_headers_tech)
+
+        events = test_db.query(WorkOrderStatusEvent).order_by(WorkOrderStatusEvent.id).all()
+
+        assert [event.status for event in events] == [RepairStatus.RECIBIDO, RepairStatus.EN_DIAGNOSTICO]
+        assert all(event.work_order_id == created["id"] for event in events)
+
+
+@pytest.mark.work_orders
+class TestTurnaround:
+    """Test time-in-status statistics"""
+
+    def test_percentiles_per_status(self, client, test_db, auth_headers_admin):
+        """Test average, p50 and p90 of completed statuses"""
+        for hours in range(1, 11):
+            add_timeline(
+                test_db, f"wo-{hours}", "iPhone 12",
+                (RepairStatus.EN_DIAGNOSTICO, 0), (RepairStatus.REPARADO, hours)
+            )
+
+        response = client.get("/api/analytics/turnaround", headers=auth_headers_admin)
+
+        assert response.status_code == 200
+        # Orders still in "Reparado" have no duration yet
+        [diagnosis] = response.json()["by_status"]
+        assert diagnosis["status"] == "En Diagnóstico"
+        assert diagnosis["count"] == 10
+        assert diagnosis["average_seconds"] == pytest.approx(5.5 * HOUR, abs=1)
+        assert diagnosis["p50_seconds"] == pytest.approx(5 * HOUR, abs=1)
+        assert diagnosis["p90_seconds"] == pytest.approx(9 * HOUR, abs=1)
+
+    def test_grouped_by_device(self, client, test_db, auth_headers_admin):
+        """Test statistics per device and status"""
+        add_timeline(test_db, "wo-1", "iPhone 12", (RepairStatus.ESPERANDO_PARTE, 0), (RepairStatus.EN_REPARACION, 48))
+        add_timeline(test_db, "wo-2", "Galaxy S21", (RepairStatus.ESPERANDO_PARTE, 0), (RepairStatus.EN_REPARACION, 2))
+
+        by_device = client.get("/api/analytics/turnaround", headers=auth_headers_admin).json()["by_device"]
+
+        waits = {row["device"]: row["p50_seconds"] for row in by_device if row["status"] == "Esperando Parte"}
+        assert waits == pytest.approx({"iPhone 12": 48 * HOUR, "Galaxy S21": 2 * HOUR}, abs=1)
+
+    def test_period_filters_by_entry_time(self, client, test_db, auth_headers_admin):
+        """Test only statuses entered within the period are reported"""
+        add_timeline(test_db, "wo-1", "iPhone 12", (RepairStatus.RECIBIDO, 0), (RepairStatus.EN_DIAGNOSTICO, 1),
+                     (RepairStatus.REPARADO, 4))
+
+        response = client.get("/api/analytics/turnaround", params={
+            "start_date": (START + timedelta(minutes=30)).isoformat()
+        }, headers=auth_headers_admin).json()
+
+        assert [(row["status"], row["count"]) for row in response["by_status"]] == [("En Diagnóstico", 1)]
+        assert response["by_status"][0]["average_seconds"] == pytest.approx(3 * HOUR, abs=1)
@@ -0,0 +1,139 @@
+"""
+Tests for hot/cold archival of settled tickets and work orders
+"""
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.database import Base
+from app.models.archive import ArchivedTicket, ArchivedTicketItem, ArchivedWorkOrder
+from app.models.product import Product
+from app.models.ticket import Ticket, TicketItem, PaymentStatus
+from app.models.work_order import WorkOrder, RepairStatus, PaymentStatus as WorkOrderPaymentStatus
+from app.services.archive import (
+    ARCHIVE_LOCK, archive_tickets, archive_work_orders, months_ago, report_tickets, run_archival
+)
+from app.utils.locks import process_lock
+
+CUTOFF = datetime(2024, 1, 1)
+
+
+def add_ticket(db, ticket_id, sold_at, status=PaymentStatus.PAID, total=10.0):
+    """Insert a ticket with one item"""
+    product = db.query(Product).first()
+    if product is None:
+        product = Product(name="Funda", brand="Generic", stock=100, price=10.0)
+        db.add(product)
+        db.flush()
+    db.add(Ticket(
+        id=ticket_id, date=sold_at, customer_name="Cliente", payment_method="cash", payment_status=status,
+        subtotal=total, tax=0.0, total=total, amount_usd=total,
+        items=[TicketItem(product_id=product.id, quantity=1, price=total)]
+    ))
+    db.commit()
+
+
+def add_work_order(db, order_id, code, received, status=RepairStatus.ENTREGADO,
+                   payment_status=WorkOrderPaymentStatus.PAGADO):
+    """Insert a work order received (and last touched) at a given moment"""
+    db.add(WorkOrder(
+        id=order_id, code=code, customer_name="Cliente", device="iPhone", issue="Pantalla rota",
+        status=status, received_date=received, updated_at=received, repair_cost=50, amount_paid=50,
+        payment_status=payment_status
+    ))
+    db.commit()
+
+
+class TestArchival:
+    """Test moving settled records to the archive tables"""
+
+    def test_months_ago_clamps_to_month_end(self):
+        """Test calendar month arithmetic"""
+        assert months_ago(datetime(2025, 3, 31, 12), 1) == datetime(2025, 2, 28, 12)
+        assert months_ago(datetime(2025, 1, 15), 13) == datetime(2023, 12, 15)
+
+    def test_only_old_paid_tickets_are_archived(self, test_db):
+        """Test paid tickets before the cutoff move with their items, in batches"""
+        add_ticket(test_db, "old-1", datetime(2023, 5, 1))
+        add_ticket(test_db, "old-2", datetime(2023, 6, 1))
+        add_ticket(test_db, "old-unpaid", datetime(2023, 6, 1), status=PaymentStatus.PENDING)
+        add_ticket(test_db, "recent", datetime(2024, 6, 1))
+
+        result = archive_tickets(test_db, CUTOFF, batch_size=1)
+
+        assert (result.tickets, result.ticket_items) == (2, 2)
+        assert {ticket.id for ticket in test_db.query(Ticket)} == {"old-unpaid", "recent"}
+        assert {ticket.id for ticket in test_db.query(ArchivedTicket)} == {"old-1", "old-2"}
+        assert test_db.query(TicketItem).count() == 2
+        assert test_db.query(ArchivedTicketItem).count() == 2
+
+    def test_only_delivered_and_paid_work_orders_are_archived(self, test_db):
+        """Test open or unpaid orders stay in the hot table"""
+        add_work_order(test_db, "wo-1", "AAA111", datetime(2023, 5, 1))
+        add_work_order(test_db, "wo-2", "BBB222", datetime(2023, 5, 1),
+                       payment_status=WorkOrderPaymentStatus.PENDIENTE)
+        add_work_order(test_db, "wo-3", "CCC333", datetime(2023, 5, 1), status=RepairStatus.REPARADO)
+
+        result = archive_work_orders(test_db, CUTOFF, batch_size=10)
+
+        assert result.work_orders == 1
+        assert [order.code for order in test_db.query(ArchivedWorkOrder)] == ["AAA111"]
+        assert test_db.query(WorkOrder).count() == 2
+
+    def test_run_is_skipped_while_another_process_archives(self, tmp_path):
+        """Test concurrent runs do not archive twice"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'shop.db'}")
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            add_ticket(db, "old-1", datetime(2023, 5, 1))
+
+        with process_lock(ARCHIVE_LOCK, bind=engine):
+            assert run_archival(engine, months=6, now=datetime(2024, 6, 1)) is None
+        result = run_archival(engine, months=6, now=datetime(2024, 6, 1))
+
+        assert result.tickets == 1
+        engine.dispose()
+
+
+class TestArchiveFallThrough:
+    """Test reads find archived records transparently"""
+
+    def test_ticket_lookup_falls_through(self, client, test_db, auth_headers_admin):
+        """Test an archived ticket is still found by id, with its items"""
+        add_ticket(test_db, "old-1", datetime(2023, 5, 1))
+        archive_tickets(test_db, CUTOFF, batch_size=10)
+
+        response = client.get("/api/tickets/old-1", headers=auth_headers_admin)
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 10.0
+        assert len(response.json()["items"]) == 1
+
+    def test_work_order_lookup_by_code_falls_through(self, client, test_db, auth_headers_tech):
+        """Test an archived work order is found by code and id but is read-only"""
+        add_work_order(test_db, "wo-1", "AAA111", datetime(2023, 5, 1))
+        archive_work_orders(test_db, CUTOFF, batch_size=10)
+
+        by_code = client.get("/api/work-orders/code/aaa111", headers=auth_headers_tech)
+        by_id = client.get("/api/work-orders/wo-1", headers=auth_headers_tech)
+        update = client.put("/api/work-orders/wo-1", json={"device": "iPad"}, headers=auth_headers_tech)
+
+        assert by_code.status_code == 200
+        assert by_code.json()["id"] == "wo-1"
+        assert by_id.status_code == 200
+        assert update.status_code == 409
+
+    def test_reports_union_the_archive_only_when_needed(self, client, test_db, auth_headers_admin):
+        """Test a period that reaches archived tickets includes them"""
+        add_ticket(test_db, "old-1", datetime(2023, 5, 1), total=10.0)
+        add_ticket(test_db, "recent", datetime(2024, 6, 1), total=25.0)
+        archive_tickets(test_db, CUTOFF, batch_size=10)
+
+        everything = client.get("/api/reports/sales", headers=auth_headers_admin).json()
+        recent = client.get(
+            "/api/reports/sales", params={"start_date": "2024-01-01T00:00:00"}, headers=auth_headers_admin
+        ).json()
+
+        assert (everything["tickets"], everything["total"]) == (2, 35.0)
+        assert (recent["tickets"], recent["total"]) == (1, 25.0)
+        assert report_tickets(test_db, datetime(2024, 1, 1)) is Ticket
+        assert report_tickets(test_db) is not Ticket
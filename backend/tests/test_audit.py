@@ -0,0 +1,183 @@
+"""
+Tests for the batched audit log
+"""
+import json
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import Session
+from app.database import Base
+from app.models.audit_entry import AuditEntry
+from app.models.product import Product
+from app.models.store import Store, DEFAULT_STORE_ID, DEFAULT_STORE_NAME
+from app.services import audit_log
+from app.services.audit import AuditLog, REDACTED
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """File database the writer thread inserts into"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'shop.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(Store(id=DEFAULT_STORE_ID, name=DEFAULT_STORE_NAME))
+        db.commit()
+    yield engine
+    engine.dispose()
+
+
+def make_entries(count):
+    return [
+        {
+            "created_at": datetime(2024, 6, 10, 12, 0, tzinfo=timezone.utc),
+            "store_id": DEFAULT_STORE_ID,
+            "user_id": 1,
+            "username": "admin",
+            "action": "update",
+            "entity": "product",
+            "entity_id": str(n),
+            "changes": {"stock": [n, n + 1]},
+        }
+        for n in range(count)
+    ]
+
+
+def count_entries(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(AuditEntry)).scalar()
+
+
+class TestAuditLog:
+    """Test buffering, batching and the fallback file"""
+
+    def test_entries_are_written_in_batches(self, engine, tmp_path):
+        """Test queued entries are inserted with one statement per batch"""
+        statements = []
+        event.listen(engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        log = AuditLog(queue_size=1000, batch_size=50, flush_seconds=5, fallback_path=str(tmp_path / "audit.jsonl"))
+        log.start(engine)
+        try:
+            log.enqueue(engine, make_entries(120))
+            log.flush()
+        finally:
+            log.stop()
+
+        assert count_entries(engine) == 120
+        assert len([statement for statement in statements if statement.startswith("INSERT INTO audit_log")]) == 3
+
+    def test_full_queue_spills_to_file_and_is_replayed(self, engine, tmp_path):
+        """Test entries beyond the queue size are kept on disk and inserted on the next start"""
+        path = tmp_path / "audit.jsonl"
+        log = AuditLog(queue_size=2, batch_size=50, flush_seconds=5, fallback_path=str(path))
+
+        log.enqueue(engine, make_entries(5))
+        assert len(path.read_text().splitlines()) == 3
+
+        log.start(engine)
+        log.stop()
+
+        assert count_entries(engine) == 5
+        assert not path.exists()
+
+    def test_unwritable_entries_survive_shutdown(self, tmp_path):
+        """Test entries that cannot be inserted at shutdown are saved, then replayed"""
+        path = tmp_path / "audit.jsonl"
+        engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+        log = AuditLog(queue_size=100, batch_size=50, flush_seconds=5, fallback_path=str(path))
+        log.start(engine)
+        log.enqueue(engine, make_entries(4))
+        log.stop()  # No audit_log table yet
+
+        [first, *_] = [json.loads(line) for line in path.read_text().splitlines()]
+        assert first["changes"] == {"stock": [0, 1]}
+
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            db.add(Store(id=DEFAULT_STORE_ID, name=DEFAULT_STORE_NAME))
+            db.commit()
+        assert log.replay(engine) == 4
+        assert count_entries(engine) == 4
+        engine.dispose()
+
+    def test_only_committed_changes_are_queued(self, engine, tmp_path, test_db):
+        """Test an entry is queued on commit and dropped on rollback"""
+        log = AuditLog(queue_size=100, batch_size=50, flush_seconds=5, fallback_path=str(tmp_path / "audit.jsonl"))
+        user = type("Actor", (), {"id": 7, "username": "ana", "store_id": DEFAULT_STORE_ID})()
+        with Session(engine) as db:
+            product = Product(name="Cargador", brand="Genérico", price=10.0, stock=3)
+            db.add(product)
+            log.record(db, user, "create", "product", product, changes={"name": [None, "Cargador"]})
+            db.rollback()
+
+            product = Product(name="Cable", brand="Genérico", price=5.0, stock=3)
+            db.add(product)
+            log.record(db, user, "create", "product", product, changes={"name": [None, "Cable"]})
+            db.commit()
+            product_id = product.id
+        log.flush()
+
+        with Session(engine) as db:
+            [entry] = db.query(AuditEntry).all()
+        assert (entry.username, entry.entity_id) == ("ana", str(product_id))
+        assert entry.changes == {"name": [None, "Cable"]}
+
+
+@pytest.mark.auth
+class TestAuditEndpoint:
+    """Test changes made through the API and the audit query"""
+
+    def test_product_changes_are_audited(self, client, auth_headers_admin):
+        """Test create, update and delete are recorded with their field diffs"""
+        product = {"name": "Funda", "brand": "Genérico", "price": 10.0, "stock": 5}
+        product_id = client.post("/api/products", json=product, headers=auth_headers_admin).json()["id"]
+        client.put(f"/api/products/{product_id}", json={"price": 12.5, "stock": 5}, headers=auth_headers_admin)
+        client.delete(f"/api/products/{product_id}", headers=auth_headers_admin)
+        audit_log.flush()
+
+        response = client.get(
+            "/api/audit", params={"entity": "product", "entity_id": product_id}, headers=auth_headers_admin
+        )
+
+        assert response.status_code == 200
+        entries = response.json()
+        assert [entry["action"] for entry in entries] == ["delete", "update", "create"]
+        assert all(entry["username"] == "admin" for entry in entries)
+        # Only fields that changed
+        assert entries[1]["changes"] == {"price": [10.0, 12.5]}
+        assert entries[2]["changes"]["name"] == [None, "Funda"]
+        assert entries[0]["changes"]["stock"] == [5, None]
+
+    def test_sales_and_failed_sales(self, client, auth_headers_admin, test_db):
+        """Test a sale is recorded and a rejected one is not"""
+        product = Product(name="Cargador", brand="Genérico", price=10.0, stock=1)
+        test_db.add(product)
+        test_db.commit()
+        sale = {
+            "customer_name": "Ana", "payment_method": "Efectivo", "exchange_rate": 36.5,
+            "items": [{"product_id": product.id, "quantity": 1}]
+        }
+        ticket_id = client.post("/api/tickets", json=sale, headers=auth_headers_admin).json()["id"]
+        assert client.post("/api/tickets", json=sale, headers=auth_headers_admin).status_code == 400
+        audit_log.flush()
+
+        entries = client.get("/api/audit", params={"entity": "ticket"}, headers=auth_headers_admin).json()
+
+        assert [(entry["action"], entry["entity_id"]) for entry in entries] == [("create", ticket_id)]
+        assert entries[0]["changes"]["customer_name"] == [None, "Ana"]
+
+    def test_passwords_are_redacted(self, client, auth_headers_admin):
+        """Test passwords never reach the audit log"""
+        user = {"username": "luis", "password": "secreto1", "role": "technician"}
+        user_id = client.post("/api/users", json=user, headers=auth_headers_admin).json()["id"]
+        client.put(f"/api/users/{user_id}/password", json={"new_password": "secreto2"}, headers=auth_headers_admin)
+        audit_log.flush()
+
+        entries = client.get("/api/audit", params={"entity": "user"}, headers=auth_headers_admin).json()
+
+        assert [entry["changes"]["password"] for entry in entries] == [[REDACTED, REDACTED], [None, REDACTED]]
+        assert "secreto" not in json.dumps(entries)
+
+    def test_technician_cannot_read_audit_log(self, client, auth_headers_tech):
+        """Test the audit log is admin only"""
+        assert client.get("/api/audit", headers=auth_headers_tech).status_code == 403
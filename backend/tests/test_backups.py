@@ -0,0 +1,159 @@
+"""
+Tests for online backups and restore
+"""
+import gzip
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import create_engine, text
+from app.services import backups
+from app.services.backups import BACKUP_LOCK, BackupError, create_backup, list_backups, restore_backup
+from app.utils.locks import process_lock
+
+NOW = datetime(2024, 6, 10, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """File database with a few rows"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'shop.db'}", connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE sales (id INTEGER PRIMARY KEY, note TEXT)"))
+        conn.execute(text("INSERT INTO sales (note) VALUES ('first'), ('second')"))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / "backups")
+
+
+def snapshot_rows(path):
+    """Rows of the sales table in a gzipped SQLite snapshot"""
+    copy = f"{path}.check"
+    with gzip.open(path, "rb") as compressed, open(copy, "wb") as out:
+        out.write(compressed.read())
+    conn = sqlite3.connect(copy)
+    try:
+        return [row[0] for row in conn.execute("SELECT note FROM sales ORDER BY id")]
+    finally:
+        conn.close()
+        os.remove(copy)
+
+
+class TestBackups:
+    """Test taking, keeping and restoring snapshots"""
+
+    def test_backup_is_a_compressed_copy(self, engine, directory):
+        """Test a snapshot holds the data and no temporary file is left"""
+        backup = create_backup(engine, directory, now=NOW)
+
+        assert backup.name == "serviceflow-20240610T120000Z.db.gz"
+        assert backup.created_at == NOW
+        assert os.listdir(directory) == [backup.name]
+        assert snapshot_rows(backup.path) == ["first", "second"]
+
+    def test_backup_completes_while_writers_commit(self, engine, directory, monkeypatch):
+        """Test concurrent sales keep committing and the copy still completes"""
+        monkeypatch.setattr(backups.settings, "BACKUP_PAGES_PER_STEP", 1)
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO sales (note) SELECT hex(randomblob(512)) FROM sales"))
+            for _ in range(6):
+                conn.execute(text("INSERT INTO sales (note) SELECT hex(randomblob(512)) FROM sales"))
+        stop = threading.Event()
+        commits = []
+
+        def sell():
+            while not stop.is_set():
+                with engine.begin() as conn:
+                    conn.execute(text("INSERT INTO sales (note) VALUES ('sale')"))
+                commits.append(1)
+
+        writer = threading.Thread(target=sell)
+        writer.start()
+        try:
+            backup = create_backup(engine, directory, now=NOW)
+        finally:
+            stop.set()
+            writer.join()
+
+        assert backup is not None
+        assert commits
+        assert snapshot_rows(backup.path)[:2] == ["first", "second"]
+
+    def test_only_newest_snapshots_are_kept(self, engine, directory, monkeypatch):
+        """Test retention deletes all but BACKUP_KEEP snapshots"""
+        monkeypatch.setattr(backups.settings, "BACKUP_KEEP", 2)
+        for hours in (3, 2, 1):
+            create_backup(engine, directory, now=NOW - timedelta(hours=hours))
+
+        assert [backup.created_at for backup in list_backups(directory)] == [
+            NOW - timedelta(hours=1), NOW - timedelta(hours=2)
+        ]
+
+    def test_restore_replaces_contents(self, engine, directory):
+        """Test a restore brings back the snapshot's rows"""
+        backup = create_backup(engine, directory, now=NOW)
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM sales"))
+
+        restore_backup(backup.name, engine, directory)
+
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM sales")).scalar() == 2
+
+    def test_restore_rejects_missing_or_foreign_snapshots(self, engine, directory, tmp_path):
+        """Test unknown names and PostgreSQL dumps are refused"""
+        with pytest.raises(BackupError):
+            restore_backup("serviceflow-20240610T120000Z.db.gz", engine, directory)
+
+        dump = tmp_path / "serviceflow-20240610T120000Z.dump"
+        dump.write_bytes(b"PGDMP")
+        with pytest.raises(BackupError):
+            restore_backup(str(dump), engine, directory)
+
+    def test_backup_is_skipped_while_another_runs(self, engine, directory):
+        """Test concurrent backups do not run twice"""
+        with process_lock(BACKUP_LOCK, bind=engine):
+            assert create_backup(engine, directory, now=NOW) is None
+
+        assert list_backups(directory) == []
+
+
+@pytest.mark.auth
+class TestBackupEndpoints:
+    """Test the deployment admin backup endpoints"""
+
+    def test_admin_takes_and_lists_backups(self, client, auth_headers_admin, tmp_path, monkeypatch):
+        """Test a deployment admin can take a snapshot and see it listed"""
+        monkeypatch.setattr(backups.settings, "BACKUP_DIR", str(tmp_path / "backups"))
+        monkeypatch.setattr(backups.settings, "BACKUP_ADMINS", "root, Admin")
+
+        response = client.post("/api/backups", headers=auth_headers_admin)
+        assert response.status_code == 201
+        name = response.json()["name"]
+
+        response = client.get("/api/backups", headers=auth_headers_admin)
+        assert response.status_code == 200
+        assert [backup["name"] for backup in response.json()] == [name]
+
+    def test_technician_cannot_take_backups(self, client, auth_headers_tech, tmp_path, monkeypatch):
+        """Test backups are admin only"""
+        monkeypatch.setattr(backups.settings, "BACKUP_DIR", str(tmp_path / "backups"))
+
+        monkeypatch.setattr(backups.settings, "BACKUP_ADMINS", "tech")
+
+        assert client.post("/api/backups", headers=auth_headers_tech).status_code == 403
+        assert client.get("/api/backups", headers=auth_headers_tech).status_code == 403
+
+    def test_store_admin_cannot_take_backups(self, client, auth_headers_admin, tmp_path, monkeypatch):
+        """Test an admin not named in BACKUP_ADMINS cannot back up every store's data"""
+        monkeypatch.setattr(backups.settings, "BACKUP_DIR", str(tmp_path / "backups"))
+        monkeypatch.setattr(backups.settings, "BACKUP_ADMINS", "root")
+
+        assert client.post("/api/backups", headers=auth_headers_admin).status_code == 403
+        assert client.get("/api/backups", headers=auth_headers_admin).status_code == 403
+        assert not os.path.exists(tmp_path / "backups")
@@ -0,0 +1,119 @@
+"""
+Tests for process-safe startup and cross-process locks
+"""
+import pytest
+from alembic import command
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+from app.bootstrap import alembic_config, prepare_database, worker_count
+from app.config import settings
+from app.models.user import User
+from app.utils.locks import process_lock
+
+pytest.importorskip("fcntl")
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    """SQLite engine backed by a file in a temporary directory"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'shop.db'}")
+    yield engine
+    engine.dispose()
+
+
+def index_names(engine):
+    """Names of every index, by table"""
+    inspector = inspect(engine)
+    return {
+        table: {index["name"] for index in inspector.get_indexes(table)}
+        for table in inspector.get_table_names() if table != "alembic_version"
+    }
+
+
+def create_legacy_database(engine):
+    """Build the schema as it was before migrations, without a version table"""
+    with engine.connect() as connection:
+        command.upgrade(alembic_config(connection), "0001")
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE alembic_version"))
+        connection.execute(text(
+            "INSERT INTO users (username, hashed_password, role) VALUES ('owner', 'x', 'ADMIN')"
+        ))
+        connection.execute(text(
+            "INSERT INTO products (name, brand, stock, price, min_stock) VALUES ('Funda', 'Generic', 1, 19.99, 5)"
+        ))
+
+
+class TestPrepareDatabase:
+    """Test one-time database preparation"""
+
+    def test_fresh_database_is_initialized(self, file_engine):
+        """Test tables and default users are created on an empty database"""
+        assert prepare_database(file_engine) is True
+
+        assert "tickets" in inspect(file_engine).get_table_names()
+        with Session(file_engine) as db:
+            assert {user.username for user in db.query(User)} == {"admin", "tech"}
+
+    def test_second_run_is_a_no_op(self, file_engine):
+        """Test preparing an initialized database does not seed again"""
+        prepare_database(file_engine)
+
+        assert prepare_database(file_engine) is False
+        with Session(file_engine) as db:
+            assert db.query(User).count() == 2
+
+    def test_legacy_database_is_migrated(self, file_engine, tmp_path):
+        """Test a pre-migration database is stamped and upgraded in place"""
+        create_legacy_database(file_engine)
+
+        assert prepare_database(file_engine) is False
+
+        inspector = inspect(file_engine)
+        assert "image_url" in {column["name"] for column in inspector.get_columns("parts")}
+        assert "idempotency_keys" in inspector.get_table_names()
+        assert "ix_tickets_store_unpaid_date" in index_names(file_engine)["tickets"]
+        with Session(file_engine) as db:
+            assert [user.username for user in db.query(User)] == ["owner"]
+        with file_engine.connect() as connection:
+            # Money columns now hold integer cents
+            assert connection.execute(text("SELECT price FROM products")).scalar() == 1999
+
+    def test_migrations_match_models(self, file_engine, tmp_path):
+        """Test a migrated database has the same indexes as a freshly created one"""
+        create_legacy_database(file_engine)
+        prepare_database(file_engine)
+        fresh = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+        prepare_database(fresh)
+
+        assert index_names(file_engine) == index_names(fresh)
+        fresh.dispose()
+
+    def test_worker_count_override(self, monkeypatch):
+        """Test WEB_CONCURRENCY overrides the CPU-based worker count"""
+        monkeypatch.setattr(settings, "WEB_CONCURRENCY", 3)
+        assert worker_count() == 3
+
+
+class TestProcessLock:
+    """Test the file lock used on SQLite"""
+
+    def test_lock_is_exclusive(self, file_engine):
+        """Test a held lock cannot be taken again without blocking"""
+        with process_lock("job", bind=file_engine) as held:
+            assert held is True
+            with process_lock("job", bind=file_engine, blocking=False) as second:
+                assert second is False
+
+    def test_lock_is_released(self, file_engine):
+        """Test the lock can be taken again once released"""
+        with process_lock("job", bind=file_engine):
+            pass
+        with process_lock("job", bind=file_engine, blocking=False) as held:
+            assert held is True
+
+    def test_locks_are_independent_by_name(self, file_engine):
+        """Test different names do not block each other"""
+        with process_lock("startup", bind=file_engine):
+            with process_lock("job", bind=file_engine, blocking=False) as held:
+                assert held is True
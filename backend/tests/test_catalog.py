@@ -0,0 +1,254 @@
+"""
+Tests for the versioned catalog snapshot and code scans
+"""
+import pytest
+from sqlalchemy import event, text
+from app.models.catalog_stock_change import CatalogStockChange
+from app.models.part import Part
+from app.models.product import Product
+from app.models.store import Store, DEFAULT_STORE_ID, DEFAULT_STORE_NAME
+from app.services import catalog
+from app.services.catalog import Catalog
+from tests.conftest import engine
+
+
+@pytest.fixture
+def store(test_db):
+    """Default store, whose row holds the catalog version"""
+    catalog.clear()
+    test_db.add(Store(id=DEFAULT_STORE_ID, name=DEFAULT_STORE_NAME))
+    test_db.commit()
+    yield
+    catalog.clear()
+
+
+def add_product(db, name, stock=5):
+    product = Product(name=name, brand="Genérico", price=10.0, stock=stock)
+    db.add(product)
+    db.commit()
+    return product
+
+
+@pytest.mark.products
+class TestCatalogVersions:
+    """Test versions bumped by writes and the deltas computed from them"""
+
+    def test_writes_bump_the_version(self, test_db, store):
+        """Test each committed flush stamps its rows with the next version"""
+        first = add_product(test_db, "Cargador")
+        second = add_product(test_db, "Cable")
+        second.price = 12.5
+        test_db.commit()
+
+        assert (first.catalog_version, second.catalog_version) == (1, 3)
+        assert test_db.get(Store, DEFAULT_STORE_ID).catalog_version == 3
+
+    def test_rolled_back_and_unchanged_writes_do_not_bump(self, test_db, store):
+        """Test a rollback or a no-op assignment leaves the version alone"""
+        product = add_product(test_db, "Cargador")
+        product.price = 12.5
+        test_db.flush()
+        test_db.rollback()
+        product.price = product.price
+        test_db.commit()
+
+        assert test_db.get(Store, DEFAULT_STORE_ID).catalog_version == 1
+
+    def test_stock_changes_are_versioned_by_the_next_read(self, test_db, store):
+        """Test a stock-only change is left pending, and the next read gives it a version once"""
+        product = add_product(test_db, "Cargador")
+        product.stock = 1
+        test_db.commit()
+
+        assert product.catalog_version == 1
+        assert test_db.get(Store, DEFAULT_STORE_ID).catalog_version == 1
+        assert [change.version for change in test_db.query(CatalogStockChange)] == [None]
+
+        delta = catalog.changes(test_db, DEFAULT_STORE_ID, since_version=1)
+        assert delta["version"] == 2
+        assert [(row["id"], row["stock"]) for row in delta["products"]] == [(product.id, 1)]
+        assert [change.version for change in test_db.query(CatalogStockChange)] == [2]
+        assert catalog.changes(test_db, DEFAULT_STORE_ID, since_version=2)["products"] == []
+        # A worker loading the catalog afresh logs the change too
+        fresh = Catalog(max_delta_versions=10)
+        assert fresh.changes(test_db, DEFAULT_STORE_ID, since_version=1)["products"] == delta["products"]
+
+    def test_delta_holds_changed_and_deleted_rows(self, test_db, store):
+        """Test only rows touched since the version are sent, with deletions"""
+        kept, changed, removed = (add_product(test_db, name) for name in ("Funda", "Cable", "Mica"))
+        full = catalog.changes(test_db, DEFAULT_STORE_ID)
+        assert full["full"] is True and full["version"] == 3
+        assert [row["name"] for row in full["products"]] == ["Funda", "Cable", "Mica"]
+
+        changed.price = 12.5
+        test_db.delete(removed)
+        test_db.add(Part(name="Pantalla", sku="PAN-1", price=40.0, stock=1, compatible_models=["A10"]))
+        test_db.commit()
+
+        delta = catalog.changes(test_db, DEFAULT_STORE_ID, since_version=full["version"])
+        assert delta["full"] is False and delta["version"] == 4
+        assert [(row["name"], row["price"]) for row in delta["products"]] == [("Cable", 12.5)]
+        assert [row["sku"] for row in delta["parts"]] == ["PAN-1"]
+        assert delta["deleted_products"] == [removed.id]
+        assert catalog.changes(test_db, DEFAULT_STORE_ID, since_version=4)["products"] == []
+
+    def test_unchanged_catalog_costs_one_lookup(self, test_db, store):
+        """Test a terminal that is up to date is answered from memory"""
+        add_product(test_db, "Cargador")
+        version = catalog.changes(test_db, DEFAULT_STORE_ID)["version"]
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            delta = catalog.changes(test_db, DEFAULT_STORE_ID, since_version=version)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert delta["products"] == []
+        assert len(statements) == 1
+
+    def test_old_or_unknown_version_gets_full_snapshot(self, test_db, store):
+        """Test terminals too far behind, or ahead after a restore, reload everything"""
+        small = Catalog(max_delta_versions=2)
+        for name in ("Funda", "Cable", "Mica"):
+            add_product(test_db, name)
+
+        assert small.changes(test_db, DEFAULT_STORE_ID, since_version=1)["full"] is False
+        assert small.changes(test_db, DEFAULT_STORE_ID, since_version=0)["full"] is True
+        assert small.changes(test_db, DEFAULT_STORE_ID, since_version=9)["full"] is True
+
+
+@pytest.mark.products
+class TestCatalogEndpoint:
+    """Test terminals syncing the catalog through the API"""
+
+    def test_sale_sends_new_stock(self, client, auth_headers_admin, test_db, store):
+        """Test checkouts never update (and so never lock) the store's version row, yet reach the next delta"""
+        product = add_product(test_db, "Cargador", stock=3)
+        version = client.get("/api/catalog", headers=auth_headers_admin).json()["version"]
+        sale = {
+            "customer_name": "Ana", "payment_method": "Efectivo", "exchange_rate": 36.5,
+            "items": [{"product_id": product.id, "quantity": 1}]
+        }
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            for _ in range(2):
+                assert client.post("/api/tickets", json=sale, headers=auth_headers_admin).status_code == 201
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert any(statement.startswith("UPDATE products") for statement in statements)
+        assert not [statement for statement in statements if statement.startswith("UPDATE stores")]
+        delta = client.get("/api/catalog", params={"since_version": version}, headers=auth_headers_admin).json()
+        assert delta["version"] > version
+        assert [(row["id"], row["stock"]) for row in delta["products"]] == [(product.id, 1)]
+
+    def test_requires_authentication(self, client):
+        """Test the catalog is not public"""
+        assert client.get("/api/catalog").status_code == 403
+
+
+@pytest.mark.products
+class TestScan:
+    """Test barcode and SKU scans"""
+
+    def test_scan_resolves_barcodes_and_skus(self, client, auth_headers_admin, test_db, store):
+        """Test a product barcode, a part barcode and a part SKU each find their row"""
+        product = {"name": "Cargador", "brand": "Genérico", "price": 10.0, "stock": 5, "barcode": "7591234567890"}
+        part = {"name": "Pantalla", "sku": "PAN-1", "price": 40.0, "stock": 1, "barcode": "0012345678905"}
+        assert client.post("/api/products", json=product, headers=auth_headers_admin).status_code == 201
+        assert client.post("/api/parts", json=part, headers=auth_headers_admin).status_code == 201
+
+        response = client.get("/api/scan/7591234567890", headers=auth_headers_admin)
+        assert response.status_code == 200
+        assert (response.json()["kind"], response.json()["product"]["name"]) == ("product", "Cargador")
+        assert client.get("/api/scan/0012345678905", headers=auth_headers_admin).json()["part"]["sku"] == "PAN-1"
+        assert client.get("/api/scan/PAN-1", headers=auth_headers_admin).json()["kind"] == "part"
+        assert client.get("/api/scan/0000", headers=auth_headers_admin).status_code == 404
+
+    def test_scan_follows_barcode_changes(self, test_db, store):
+        """Test a barcode moved to another product resolves to the new one"""
+        old = add_product(test_db, "Funda")
+        old.barcode = "111"
+        test_db.commit()
+        assert catalog.scan(test_db, DEFAULT_STORE_ID, "111")[1]["name"] == "Funda"
+
+        old.barcode = None
+        test_db.flush()
+        new = Product(name="Mica", brand="Genérico", price=5.0, stock=2, barcode="111")
+        test_db.add(new)
+        test_db.commit()
+
+        assert catalog.scan(test_db, DEFAULT_STORE_ID, "111")[1]["name"] == "Mica"
+
+    def test_hit_is_answered_from_memory(self, test_db, store):
+        """Test a known code scanned again within the refresh interval costs no query"""
+        product = add_product(test_db, "Cargador")
+        product.barcode = "222"
+        test_db.commit()
+        catalog.scan(test_db, DEFAULT_STORE_ID, "222")
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            assert catalog.scan(test_db, DEFAULT_STORE_ID, "222")[0] == "product"
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert statements == []
+
+    def test_other_workers_changes_show_after_the_refresh_interval(self, test_db, store):
+        """Test a change the worker did not commit itself is seen once the snapshot is due a check"""
+        now = [0.0]
+        scans = Catalog(max_delta_versions=10, scan_refresh_seconds=5, clock=lambda: now[0])
+        product = add_product(test_db, "Cargador")
+        product.barcode = "444"
+        test_db.commit()
+        assert scans.scan(test_db, DEFAULT_STORE_ID, "444")[1]["name"] == "Cargador"
+
+        # As another worker would: no flush of this session sees it
+        test_db.execute(text("UPDATE stores SET catalog_version = catalog_version + 1"))
+        test_db.execute(text("UPDATE products SET name = 'Cable', catalog_version = catalog_version + 1"))
+        test_db.commit()
+
+        now[0] = 4.0
+        assert scans.scan(test_db, DEFAULT_STORE_ID, "444")[1]["name"] == "Cargador"
+        now[0] = 5.0
+        assert scans.scan(test_db, DEFAULT_STORE_ID, "444")[1]["name"] == "Cable"
+
+    def test_own_commits_invalidate_at_once(self, test_db, store, monkeypatch):
+        """Test a commit of this worker is seen by the next scan, however long the interval"""
+        monkeypatch.setattr(catalog, "scan_refresh_seconds", 3600)
+        product = add_product(test_db, "Cargador", stock=3)
+        product.barcode = "555"
+        test_db.commit()
+        assert catalog.scan(test_db, DEFAULT_STORE_ID, "555")[1]["stock"] == 3
+
+        product.stock = 2
+        test_db.commit()
+        assert catalog.scan(test_db, DEFAULT_STORE_ID, "555")[1]["stock"] == 2
+
+        product.price = 12.5
+        test_db.flush()
+        test_db.rollback()
+        snapshot = catalog._snapshot(DEFAULT_STORE_ID)
+        assert snapshot.stale is False
+
+    def test_duplicate_barcode_is_rejected(self, client, auth_headers_admin):
+        """Test two products of a store cannot share a barcode"""
+        product = {"name": "Cargador", "brand": "Genérico", "price": 10.0, "stock": 5, "barcode": "333"}
+        assert client.post("/api/products", json=product, headers=auth_headers_admin).status_code == 201
+
+        response = client.post("/api/products", json={**product, "name": "Otro"}, headers=auth_headers_admin)
+        assert response.status_code == 400
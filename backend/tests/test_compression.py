@@ -0,0 +1,96 @@
+"""
+Tests for response compression middleware
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+from app.middleware.compression import CompressionMiddleware, parse_accept_encoding
+from app.models.product import Product
+
+
+LARGE_JSON = b"[" + b",".join(b'{"name":"Funda iPhone 14","stock":10}' for _ in range(200)) + b"]"
+
+
+@pytest.fixture
+def compressed_client():
+    """Minimal app wrapped in the compression middleware"""
+    app = FastAPI()
+
+    @app.get("/json")
+    def large_json():
+        return Response(LARGE_JSON, media_type="application/json", headers={"ETag": '"abc"'})
+
+    @app.get("/small")
+    def small_json():
+        return Response(b'{"status":"ok"}', media_type="application/json")
+
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" + b"\x00" * 4096, media_type="image/png")
+
+    @app.get("/export")
+    def export():
+        def rows():
+            for index in range(100):
+                yield f"{index},Funda iPhone 14,10\n".encode() * 10
+        return StreamingResponse(rows(), media_type="text/csv")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    return TestClient(app)
+
+
+class TestCompression:
+    """Test compression negotiation and skip rules"""
+
+    def test_parse_accept_encoding(self):
+        """Test q-values are parsed per coding"""
+        assert parse_accept_encoding("gzip, br;q=0.5, *;q=0") == {"gzip": 1.0, "br": 0.5, "*": 0.0}
+
+    def test_large_json_is_gzipped(self, compressed_client):
+        """Test large JSON bodies are gzip encoded"""
+        response = compressed_client.get("/json", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < len(LARGE_JSON)
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.headers["etag"] == 'W/"abc"'
+        assert response.content == LARGE_JSON
+
+    def test_not_compressed_without_accept_encoding(self, compressed_client):
+        """Test clients that refuse encodings get identity bodies"""
+        response = compressed_client.get("/json", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.content == LARGE_JSON
+
+    def test_small_body_skipped(self, compressed_client):
+        """Test bodies below the threshold are not compressed"""
+        response = compressed_client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_image_skipped(self, compressed_client):
+        """Test images are never recompressed"""
+        response = compressed_client.get("/image", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert "vary" not in response.headers
+
+    def test_streaming_export_skipped(self, compressed_client):
+        """Test streamed responses pass through untouched"""
+        response = compressed_client.get("/export", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.text.startswith("0,Funda iPhone 14,10")
+
+    def test_listing_endpoint_compressed(self, client, test_db, auth_headers_admin):
+        """Test the real product listing is compressed end to end"""
+        test_db.add_all(
+            Product(name=f"Producto {index}", brand="Generic", stock=5, price=10.0)
+            for index in range(50)
+        )
+        test_db.commit()
+
+        response = client.get(
+            "/api/products",
+            headers={**auth_headers_admin, "Accept-Encoding": "gzip"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 50
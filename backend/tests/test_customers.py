@@ -0,0 +1,143 @@
+"""
+Tests for customers: normalization, matching and history
+"""
+import pytest
+from app.models.customer import Customer
+from app.models.product import Product
+from app.services import customers as customers_service
+from app.services.customers import normalize_phone, normalize_national_id, resolve_customer
+
+
+def create_order(client, headers, **customer):
+    """Create a work order for a customer"""
+    return client.post("/api/work-orders", json={
+        "device": "iPhone 12", "issue": "Pantalla rota", **customer
+    }, headers=headers).json()
+
+
+class TestNormalization:
+    """Test phone and C.I. normalization"""
+
+    @pytest.mark.parametrize("raw", ["0414-123.45.67", "+58 414 1234567", "584141234567", "4141234567",
+                                     "0058 414 1234567"])
+    def test_phones_become_e164(self, raw):
+        """Test the usual ways of typing the same phone"""
+        assert normalize_phone(raw) == "+584141234567"
+
+    def test_invalid_phone(self):
+        """Test numbers too short to be a phone are dropped"""
+        assert normalize_phone("123") is None
+        assert normalize_phone("") is None
+
+    def test_national_id(self):
+        """Test separators and case are ignored"""
+        assert normalize_national_id("v-12.345.678") == "V12345678"
+        assert normalize_national_id(" - ") is None
+
+
+@pytest.mark.work_orders
+class TestCustomerMatching:
+    """Test work orders and sales are linked to one customer"""
+
+    def test_orders_with_same_phone_or_ci_share_a_customer(self, client, test_db, auth_headers_tech):
+        """Test matching by C.I. or phone, and that the latest name wins"""
+        first = create_order(client, auth_headers_tech, customer_name="Ana", customer_phone="0414-1234567")
+        second = create_order(client, auth_headers_tech, customer_name="Ana María",
+                              customer_phone="+584141234567", customer_id="V-12345678")
+        third = create_order(client, auth_headers_tech, customer_name="Ana María", customer_id="V12.345.678")
+
+        assert first["customer_ref_id"] is not None
+        assert first["customer_ref_id"] == second["customer_ref_id"] == third["customer_ref_id"]
+        customer = test_db.query(Customer).one()
+        assert (customer.name, customer.phone, customer.national_id) == ("Ana María", "+584141234567", "V12345678")
+
+    def test_shared_phone_is_not_reassigned(self, client, test_db, auth_headers_tech):
+        """Test a phone registered to one C.I. does not merge another C.I. into it"""
+        parent = create_order(client, auth_headers_tech, customer_name="Luis", customer_phone="04141234567",
+                              customer_id="V1")
+        child = create_order(client, auth_headers_tech, customer_name="Pedro", customer_phone="04141234567",
+                             customer_id="V2")
+
+        assert parent["customer_ref_id"] != child["customer_ref_id"]
+        assert test_db.query(Customer).filter(Customer.national_id == "V2").one().phone is None
+
+    def test_walk_in_is_not_linked(self, client, auth_headers_tech):
+        """Test an order without phone or C.I. has no customer"""
+        order = create_order(client, auth_headers_tech, customer_name="Cliente")
+        assert order["customer_ref_id"] is None
+
+    def test_batched_sales_create_one_customer(self, client, test_db, auth_headers_admin):
+        """Test sales of the same new customer in one sync batch share a customer"""
+        product = Product(name="Funda", brand="Generic", stock=10, price=5.0)
+        test_db.add(product)
+        test_db.commit()
+        sale = {"customer_name": "Ana", "customer_phone": "04141234567", "exchange_rate": 40.0,
+                "items": [{"product_id": product.id, "quantity": 1}]}
+
+        response = client.post("/api/sync/tickets", json={"sales": [
+            {**sale, "idempotency_key": "sale-0001"}, {**sale, "idempotency_key": "sale-0002"}
+        ]}, headers=auth_headers_admin)
+
+        assert response.json()["applied"] == 2
+        assert test_db.query(Customer).count() == 1
+
+    def test_customer_created_concurrently_is_matched(self, test_db, monkeypatch):
+        """Test losing the insert race to another request matches its customer instead of failing"""
+        existing = Customer(name="Ana", phone="+584141234567")
+        test_db.add(existing)
+        test_db.commit()
+        find = customers_service._find
+        lookups = []
+
+        def not_yet_visible(db, attribute, value):
+            # The first lookup runs before the other request commits
+            lookups.append(attribute)
+            return None if len(lookups) == 1 else find(db, attribute, value)
+
+        monkeypatch.setattr(customers_service, "_find", not_yet_visible)
+        customer = resolve_customer(test_db, "Ana María", "0414-1234567")
+        test_db.commit()
+
+        assert customer.id == existing.id
+        assert customer.name == "Ana María"
+        assert test_db.query(Customer).count() == 1
+
+
+@pytest.mark.work_orders
+class TestCustomerEndpoints:
+    """Test customer lookup and history"""
+
+    def test_lookup_by_phone_in_any_format(self, client, auth_headers_tech):
+        """Test the lookup normalizes its input"""
+        order = create_order(client, auth_headers_tech, customer_name="Ana", customer_phone="04141234567")
+
+        response = client.get("/api/customers", params={"phone": "+58 414-123-4567"}, headers=auth_headers_tech)
+
+        assert response.status_code == 200
+        assert [customer["id"] for customer in response.json()] == [order["customer_ref_id"]]
+        assert client.get("/api/customers", headers=auth_headers_tech).status_code == 400
+
+    def test_history(self, client, test_db, auth_headers_admin):
+        """Test the history lists the customer's repairs and sales only"""
+        order = create_order(client, auth_headers_admin, customer_name="Ana", customer_id="V1")
+        create_order(client, auth_headers_admin, customer_name="Luis", customer_id="V2")
+        product = Product(name="Funda", brand="Generic", stock=10, price=5.0)
+        test_db.add(product)
+        test_db.commit()
+        client.post("/api/tickets", json={
+            "customer_name": "Ana", "customer_id": "v-1", "exchange_rate": 40.0,
+            "items": [{"product_id": product.id, "quantity": 2}]
+        }, headers=auth_headers_admin)
+
+        response = client.get(f"/api/customers/{order['customer_ref_id']}/history", headers=auth_headers_admin)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["customer"]["national_id"] == "V1"
+        assert [work_order["id"] for work_order in data["work_orders"]] == [order["id"]]
+        assert [ticket["total"] for ticket in data["tickets"]] == [10.0]
+        assert len(data["tickets"][0]["items"]) == 1
+
+    def test_history_of_missing_customer(self, client, auth_headers_admin):
+        """Test an unknown customer returns 404"""
+        assert client.get("/api/customers/999/history", headers=auth_headers_admin).status_code == 404
@@ -0,0 +1,112 @@
+"""
+Tests for conditional (ETag / If-None-Match) listing responses
+"""
+from datetime import datetime
+
+import pytest
+from app.models.part import Part
+from app.models.product import Product
+from app.models.ticket import Ticket, PaymentStatus
+from app.models.work_order import WorkOrder
+
+
+@pytest.fixture
+def product(test_db):
+    """Create a product to list"""
+    product = Product(name="Cargador USB-C", brand="Generic", stock=10, price=15.0)
+    test_db.add(product)
+    test_db.commit()
+    test_db.refresh(product)
+    return product
+
+
+class TestListingETags:
+    """Test listing validators and 304 responses"""
+
+    @pytest.mark.parametrize("url", ["/api/products", "/api/parts", "/api/work-orders", "/api/tickets"])
+    def test_matching_etag_returns_304(self, client, auth_headers_admin, url):
+        """Test a repeated request with If-None-Match is not re-sent"""
+        first = client.get(url, headers=auth_headers_admin)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+        assert first.headers["cache-control"] == "private, no-cache"
+
+        second = client.get(url, headers={**auth_headers_admin, "If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == etag
+
+    def test_etag_changes_after_write(self, client, auth_headers_admin, product):
+        """Test creating or updating a product invalidates the validator"""
+        etag = client.get("/api/products", headers=auth_headers_admin).headers["etag"]
+
+        client.post(
+            "/api/products",
+            json={"name": "Funda", "brand": "Generic", "stock": 1, "price": 5.0},
+            headers=auth_headers_admin
+        )
+        response = client.get("/api/products", headers={**auth_headers_admin, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+
+    @pytest.mark.parametrize("url, row", [
+        ("/api/products", lambda: Product(name="Funda", brand="Generic", stock=10, price=5.0)),
+        ("/api/parts", lambda: Part(name="Pantalla", sku="LCD-1", stock=10, price=20.0, compatible_models=[])),
+        ("/api/work-orders", lambda: WorkOrder(id="wo-1", customer_name="Ana", device="Moto G", issue="Pantalla")),
+    ])
+    def test_etag_changes_on_edits_within_one_second(self, client, test_db, auth_headers_admin, url, row):
+        """Test two edits of the same row with the same updated_at still change the validator"""
+        moment = datetime(2026, 1, 1, 12, 0, 0)
+        row = row()
+        test_db.add(row)
+        test_db.commit()
+        etags = []
+        for name in ("Primera", "Segunda"):
+            if isinstance(row, WorkOrder):
+                row.customer_name = name
+            else:
+                row.name = name
+            row.updated_at = moment
+            test_db.commit()
+            etags.append(client.get(url, headers=auth_headers_admin).headers["etag"])
+
+        response = client.get(url, headers={**auth_headers_admin, "If-None-Match": etags[0]})
+        assert etags[0] != etags[1]
+        assert response.status_code == 200
+
+    def test_etag_depends_on_query(self, client, auth_headers_admin, product):
+        """Test different searches get different validators"""
+        all_products = client.get("/api/products", headers=auth_headers_admin)
+        searched = client.get("/api/products?q=Cargador", headers=auth_headers_admin)
+        assert all_products.headers["etag"] != searched.headers["etag"]
+
+    def test_ticket_etag_changes_when_paid(self, client, test_db, auth_headers_admin):
+        """Test marking a ticket as paid invalidates the ticket listing"""
+        test_db.add(Ticket(
+            id="ticket-1", customer_name="Cliente General", payment_method="cash",
+            payment_status=PaymentStatus.PENDING, subtotal=10.0, tax=0.0, total=10.0
+        ))
+        test_db.commit()
+        etag = client.get("/api/tickets", headers=auth_headers_admin).headers["etag"]
+
+        client.put("/api/tickets/ticket-1/pay", headers=auth_headers_admin)
+        response = client.get("/api/tickets", headers={**auth_headers_admin, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()[0]["payment_status"] == "Paid"
+
+    def test_ticket_etag_changes_on_any_update(self, client, test_db, auth_headers_admin):
+        """Test a status change other than paying (e.g. to overdue) invalidates the ticket listing"""
+        ticket = Ticket(
+            id="ticket-1", customer_name="Cliente General", payment_method="cash",
+            payment_status=PaymentStatus.PENDING, subtotal=10.0, tax=0.0, total=10.0
+        )
+        test_db.add(ticket)
+        test_db.commit()
+        etag = client.get("/api/tickets", headers=auth_headers_admin).headers["etag"]
+
+        ticket.payment_status = PaymentStatus.OVERDUE
+        test_db.commit()
+        response = client.get("/api/tickets", headers={**auth_headers_admin, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()[0]["payment_status"] == "Overdue"
@@ -0,0 +1,134 @@
+"""
+Tests for exchange rate history, the cached current rate and currency reports
+"""
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.models.exchange_rate import ExchangeRate
+from app.models.ticket import Ticket, PaymentStatus
+from app.services import exchange_rate_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_rate_cache():
+    """Start every test with an empty rate cache"""
+    exchange_rate_cache.invalidate()
+    yield
+    exchange_rate_cache.invalidate()
+
+
+def add_ticket(db, ticket_id, sold_at, total, status=PaymentStatus.PAID, rate=30.0, usd=0.0, ves=0.0):
+    """Insert a ticket sold at a given moment"""
+    db.add(Ticket(
+        id=ticket_id, date=sold_at, customer_name="Cliente", payment_method="mixed",
+        payment_status=status, subtotal=total, tax=0.0, total=total,
+        exchange_rate=rate, amount_usd=usd, amount_ves=ves
+    ))
+    db.commit()
+
+
+class TestExchangeRates:
+    """Test recording and reading exchange rates"""
+
+    def test_record_and_read_current_rate(self, client, auth_headers_admin):
+        """Test the latest effective rate is returned"""
+        client.post("/api/exchange-rates", json={"rate": 36.5, "effective_from": "2024-01-01T00:00:00"},
+                    headers=auth_headers_admin)
+        client.post("/api/exchange-rates", json={"rate": 40.25, "effective_from": "2024-06-01T00:00:00"},
+                    headers=auth_headers_admin)
+
+        response = client.get("/api/exchange-rates/current", headers=auth_headers_admin)
+
+        assert response.status_code == 200
+        assert response.json()["rate"] == 40.25
+        history = client.get("/api/exchange-rates", headers=auth_headers_admin).json()
+        assert [rate["rate"] for rate in history] == [40.25, 36.5]
+
+    def test_current_rate_is_cached_until_updated(self, client, test_db, auth_headers_admin):
+        """Test the cached rate is served until a new rate is recorded"""
+        test_db.add(ExchangeRate(currency="VES", rate=36.5, effective_from=datetime(2024, 1, 1)))
+        test_db.commit()
+        assert client.get("/api/exchange-rates/current", headers=auth_headers_admin).json()["rate"] == 36.5
+
+        # Written behind the API's back: the cached value is still served
+        test_db.query(ExchangeRate).update({"rate": 99})
+        test_db.commit()
+        assert client.get("/api/exchange-rates/current", headers=auth_headers_admin).json()["rate"] == 36.5
+
+        client.post("/api/exchange-rates", json={"rate": 41.0, "effective_from": "2024-02-01T00:00:00"},
+                    headers=auth_headers_admin)
+        assert client.get("/api/exchange-rates/current", headers=auth_headers_admin).json()["rate"] == 41.0
+
+    def test_scheduled_rate_takes_effect_despite_cache(self, client, test_db, auth_headers_admin):
+        """Test the cached rate expires when a rate scheduled for later takes effect"""
+        # Whole seconds in UTC, like the database clock effective_from is compared with
+        scheduled = (datetime.now(timezone.utc) + timedelta(seconds=2)).replace(tzinfo=None, microsecond=0)
+        test_db.add_all([
+            ExchangeRate(currency="VES", rate=36.5, effective_from=datetime(2024, 1, 1)),
+            ExchangeRate(currency="VES", rate=41.0, effective_from=scheduled),
+        ])
+        test_db.commit()
+        assert client.get("/api/exchange-rates/current", headers=auth_headers_admin).json()["rate"] == 36.5
+
+        # SQLite compares the stored timestamp's microseconds as text: in effect a second later
+        time.sleep((scheduled - datetime.now(timezone.utc).replace(tzinfo=None)).total_seconds() + 1.2)
+
+        assert client.get("/api/exchange-rates/current", headers=auth_headers_admin).json()["rate"] == 41.0
+
+    def test_technician_cannot_record_rates(self, client, auth_headers_tech):
+        """Test only admins record rates"""
+        response = client.post("/api/exchange-rates", json={"rate": 36.5}, headers=auth_headers_tech)
+        assert response.status_code == 403
+
+    def test_no_rate_recorded(self, client, auth_headers_tech):
+        """Test a missing current rate returns 404"""
+        response = client.get("/api/exchange-rates/current", headers=auth_headers_tech)
+        assert response.status_code == 404
+
+
+class TestCurrencyReports:
+    """Test SQL-side currency conversion in reports"""
+
+    @pytest.fixture
+    def rates(self, test_db):
+        test_db.add_all([
+            ExchangeRate(currency="VES", rate=30, effective_from=datetime(2024, 1, 1)),
+            ExchangeRate(currency="VES", rate=40, effective_from=datetime(2024, 6, 1)),
+        ])
+        test_db.commit()
+
+    def test_sales_report_uses_rate_at_sale_time(self, client, test_db, auth_headers_admin, rates):
+        """Test each ticket is converted with the rate in effect when it was sold"""
+        add_ticket(test_db, "t-1", datetime(2024, 3, 1), 10.0)
+        add_ticket(test_db, "t-2", datetime(2024, 7, 1), 10.0)
+        add_ticket(test_db, "t-3", datetime(2024, 7, 2), 5.0, status=PaymentStatus.PENDING)
+
+        usd = client.get("/api/reports/sales", headers=auth_headers_admin).json()
+        ves = client.get("/api/reports/sales?currency=VES", headers=auth_headers_admin).json()
+
+        assert usd == {"currency": "USD", "tickets": 3, "total": 25.0, "paid_total": 20.0, "outstanding": 5.0}
+        assert ves["total"] == 10 * 30 + 10 * 40 + 5 * 40
+        assert ves["outstanding"] == 200.0
+
+    def test_sales_report_period(self, client, test_db, auth_headers_admin, rates):
+        """Test the report can be limited to a period"""
+        add_ticket(test_db, "t-1", datetime(2024, 3, 1), 10.0)
+        add_ticket(test_db, "t-2", datetime(2024, 7, 1), 12.5)
+
+        report = client.get(
+            "/api/reports/sales?currency=VES&start_date=2024-06-01T00:00:00",
+            headers=auth_headers_admin
+        ).json()
+
+        assert report["tickets"] == 1
+        assert report["total"] == 500.0
+
+    def test_delinquent_ticket_debt_converts_local_payments(self, client, test_db, auth_headers_admin, rates):
+        """Test bolívar payments are converted to USD before computing the debt"""
+        add_ticket(test_db, "t-partial", datetime(2024, 7, 1), 20.0, status=PaymentStatus.PARTIAL,
+                   usd=5.0, ves=200.0)
+
+        customers = client.get("/api/work-orders/delinquent", headers=auth_headers_admin).json()
+
+        assert customers[0]["total_debt"] == 10.0
+        assert customers[0]["orders"][0]["device"] == "Venta (0 items)"
@@ -0,0 +1,211 @@
+"""
+Tests for product/part image uploads and static image serving
+"""
+import hashlib
+import io
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from app.middleware.upload_limit import MULTIPART_OVERHEAD_BYTES, UploadLimitMiddleware
+from app.models.product import Product
+from app.models.part import Part
+from app.services import image_store
+from app.services.images import render_thumbnails
+from app.utils.static import ImmutableStaticFiles, parse_byte_range
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def png_bytes(size=(64, 32), color=(200, 30, 30)) -> bytes:
+    """Encode a solid-color PNG"""
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def store_root(tmp_path, monkeypatch):
+    """Point the image store at a temporary directory without a worker pool"""
+    monkeypatch.setattr(image_store, "root", str(tmp_path))
+    monkeypatch.setattr(image_store, "thumbnails_enabled", False)
+    return tmp_path
+
+
+class TestImageUpload:
+    """Test the upload endpoints"""
+
+    def test_upload_product_image(self, client, test_db, auth_headers_admin, store_root):
+        """Test the image is stored content-addressed and linked to the product"""
+        product = Product(name="Funda", brand="Generic", stock=1, price=5.0)
+        test_db.add(product)
+        test_db.commit()
+        content = png_bytes()
+
+        response = client.post(
+            f"/api/products/{product.id}/image",
+            files={"file": ("photo.png", content, "image/png")},
+            headers=auth_headers_admin
+        )
+
+        assert response.status_code == 200
+        digest = hashlib.sha256(content).hexdigest()
+        assert response.json()["image_url"] == f"/uploads/products/{digest}.png"
+        assert (store_root / "products" / f"{digest}.png").read_bytes() == content
+
+    def test_identical_uploads_are_deduplicated(self, client, test_db, auth_headers_tech, store_root):
+        """Test uploading the same photo twice stores a single file"""
+        parts = [Part(name=f"Pantalla {index}", sku=f"PAN-{index}", stock=1, price=50.0,
+                      compatible_models=[]) for index in range(2)]
+        test_db.add_all(parts)
+        test_db.commit()
+        content = png_bytes()
+
+        urls = [
+            client.post(
+                f"/api/parts/{part.id}/image",
+                files={"file": ("photo.png", content, "image/png")},
+                headers=auth_headers_tech
+            ).json()["image_url"]
+            for part in parts
+        ]
+
+        assert urls[0] == urls[1]
+        assert len(list((store_root / "parts").iterdir())) == 1
+
+    def test_unsupported_type_rejected(self, client, test_db, auth_headers_admin, store_root):
+        """Test non-image uploads are rejected"""
+        product = Product(name="Funda", brand="Generic", stock=1, price=5.0)
+        test_db.add(product)
+        test_db.commit()
+
+        response = client.post(
+            f"/api/products/{product.id}/image",
+            files={"file": ("notes.txt", b"hello", "text/plain")},
+            headers=auth_headers_admin
+        )
+        assert response.status_code == 415
+
+    def test_declared_type_is_not_trusted(self, client, test_db, auth_headers_admin, store_root):
+        """Test the stored type comes from the decoded file, not the client header"""
+        product = Product(name="Funda", brand="Generic", stock=1, price=5.0)
+        test_db.add(product)
+        test_db.commit()
+
+        disguised = client.post(
+            f"/api/products/{product.id}/image",
+            files={"file": ("photo.png", b"<script>alert(1)</script>", "image/png")},
+            headers=auth_headers_admin
+        )
+        mislabeled = client.post(
+            f"/api/products/{product.id}/image",
+            files={"file": ("photo.jpg", png_bytes(), "image/jpeg")},
+            headers=auth_headers_admin
+        )
+
+        assert disguised.status_code == 415
+        assert mislabeled.status_code == 200
+        assert mislabeled.json()["image_url"].endswith(".png")
+        assert [path.suffix for path in (store_root / "products").iterdir()] == [".png"]
+
+    def test_oversized_upload_rejected(self, client, test_db, auth_headers_admin, store_root, monkeypatch):
+        """Test uploads over the size limit are rejected and not kept"""
+        monkeypatch.setattr(image_store, "max_bytes", 100)
+        product = Product(name="Funda", brand="Generic", stock=1, price=5.0)
+        test_db.add(product)
+        test_db.commit()
+
+        response = client.post(
+            f"/api/products/{product.id}/image",
+            files={"file": ("photo.png", b"\x00" * 1000, "image/png")},
+            headers=auth_headers_admin
+        )
+        assert response.status_code == 413
+        assert list((store_root / "products").iterdir()) == []
+
+    def test_render_thumbnails(self, tmp_path):
+        """Test thumbnails are bounded by each configured size"""
+        source = tmp_path / "original.png"
+        source.write_bytes(png_bytes(size=(400, 200)))
+
+        written = render_thumbnails(str(source), str(tmp_path / "thumbs"), "abc", [128, 256])
+
+        assert len(written) == 2
+        with Image.open(tmp_path / "thumbs" / "128" / "abc.webp") as thumbnail:
+            assert thumbnail.size == (128, 64)
+
+
+class TestUploadLimit:
+    """Test oversized uploads are refused before their body is received"""
+
+    @pytest.fixture
+    def upload_client(self):
+        """Minimal upload endpoint behind the middleware, recording what reached it"""
+        app = FastAPI()
+        app.state.received = []
+
+        @app.post("/api/products/{product_id}/image")
+        def upload(product_id: int, file: UploadFile = File(...)):
+            app.state.received.append(len(file.file.read()))
+            return {}
+
+        app.add_middleware(UploadLimitMiddleware, max_bytes=1000)
+        return TestClient(app)
+
+    def test_declared_length_over_limit_is_refused(self, upload_client):
+        """Test a Content-Length over the limit gets 413 without the endpoint running"""
+        response = upload_client.post(
+            "/api/products/1/image", files={"file": ("photo.png", b"\x00" * (MULTIPART_OVERHEAD_BYTES + 2000))}
+        )
+        assert response.status_code == 413
+        assert upload_client.app.state.received == []
+
+    def test_chunked_body_over_limit_is_refused(self, upload_client):
+        """Test a body without Content-Length is cut off once it goes over the limit"""
+        chunks = iter([b"\x00" * 8192] * 4)
+        response = upload_client.post(
+            "/api/products/1/image", content=chunks,
+            headers={"Content-Type": "multipart/form-data; boundary=x"}
+        )
+        assert response.status_code == 413
+        assert upload_client.app.state.received == []
+
+    def test_uploads_within_limit_pass(self, upload_client):
+        """Test uploads under the limit reach the endpoint"""
+        response = upload_client.post("/api/products/1/image", files={"file": ("photo.png", b"\x00" * 900)})
+        assert response.status_code == 200
+        assert upload_client.app.state.received == [900]
+
+
+class TestImmutableStaticFiles:
+    """Test caching and range support for served images"""
+
+    @pytest.fixture
+    def static_client(self, tmp_path):
+        (tmp_path / "image.png").write_bytes(b"0123456789")
+        app = FastAPI()
+        app.mount("/uploads", ImmutableStaticFiles(directory=str(tmp_path)))
+        return TestClient(app)
+
+    def test_full_response_is_immutable(self, static_client):
+        """Test served files carry long-lived cache headers"""
+        response = static_client.get("/uploads/image.png")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert response.headers["accept-ranges"] == "bytes"
+
+    def test_range_request(self, static_client):
+        """Test a byte range returns 206 with the requested slice"""
+        response = static_client.get("/uploads/image.png", headers={"Range": "bytes=2-5"})
+        assert response.status_code == 206
+        assert response.content == b"2345"
+        assert response.headers["content-range"] == "bytes 2-5/10"
+
+    def test_unsatisfiable_range(self, static_client):
+        """Test a range past the end of file returns 416"""
+        response = static_client.get("/uploads/image.png", headers={"Range": "bytes=50-60"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */10"
+
+    def test_parse_suffix_range(self):
+        """Test suffix ranges select the last bytes"""
+        assert parse_byte_range("bytes=-4", 10) == (6, 9)
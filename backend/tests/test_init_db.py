@@ -0,0 +1,85 @@
+"""
+Tests for the synthetic dataset generator of init_db.py
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from app.database import Base
+from app.models.part import Part
+from app.models.product import Product
+from app.models.ticket import Ticket, TicketItem
+from app.models.work_order import WorkOrder
+from init_db import DEFAULT_UNTIL, DatasetExistsError, ScaleDataGenerator
+
+VOLUMES = {"products": 20, "parts": 15, "customers": 30, "tickets": 60, "work_orders": 25}
+
+
+@pytest.fixture
+def make_engine(tmp_path):
+    """Factory of empty SQLite databases with the full schema"""
+    engines = []
+
+    def make(name):
+        engine = create_engine(f"sqlite:///{tmp_path / name}")
+        Base.metadata.create_all(engine)
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+
+def generate(engine, seed=7):
+    """Generate the small dataset of a seed into an engine"""
+    ScaleDataGenerator(
+        volumes=VOLUMES,
+        seed=seed,
+        days=90,
+        until=datetime.strptime(DEFAULT_UNTIL, "%Y-%m-%d"),
+        batch_size=10,
+        bind=engine,
+    ).run()
+
+
+def summary(engine):
+    """Row counts and money totals of every generated table"""
+    with engine.connect() as conn:
+        return [
+            tuple(conn.execute(select(func.count(), func.sum(column))).one())
+            for column in (Product.price, Part.stock, Ticket.total, TicketItem.quantity, WorkOrder.repair_cost)
+        ] + [conn.execute(select(func.max(Ticket.date))).scalar()]
+
+
+class TestScaleDataGenerator:
+    """The --scale generator is reproducible and refuses to run twice"""
+
+    def test_same_seed_generates_same_dataset(self, make_engine):
+        """Two runs with the same seed produce identical counts and sums"""
+        first, second = make_engine("first.db"), make_engine("second.db")
+        generate(first)
+        generate(second)
+
+        assert summary(first) == summary(second)
+        assert summary(first)[0][0] == VOLUMES["products"]
+
+    def test_second_run_of_a_seed_fails_clearly(self, make_engine):
+        """Generating a seed again into the same database raises DatasetExistsError"""
+        engine = make_engine("shop.db")
+        generate(engine)
+        before = summary(engine)
+
+        with pytest.raises(DatasetExistsError, match="seed 7"):
+            generate(engine)
+
+        assert summary(engine) == before
+
+    def test_other_seed_adds_to_existing_dataset(self, make_engine):
+        """A different seed does not collide with an earlier one"""
+        engine = make_engine("shop.db")
+        generate(engine, seed=7)
+        generate(engine, seed=8)
+
+        assert summary(engine)[0][0] == 2 * VOLUMES["products"]
@@ -0,0 +1,79 @@
+"""
+Tests for integer minor-unit money storage and SQL-side aggregation
+"""
+from decimal import Decimal
+import pytest
+from sqlalchemy import text
+from app.models.money import to_minor_units, from_minor_units
+from app.models.product import Product
+from app.models.work_order import WorkOrder, PaymentStatus
+
+
+class TestMoneyConversion:
+    """Test conversion between amounts and minor units"""
+
+    def test_float_amounts_round_to_the_intended_cent(self):
+        """Test binary float artifacts do not lose a cent"""
+        assert to_minor_units(19.99) == 1999
+        assert to_minor_units(0.1 + 0.2) == 30
+        assert to_minor_units(Decimal("2.675")) == 268
+
+    def test_round_trip(self):
+        """Test minor units convert back to an exact decimal"""
+        assert from_minor_units(1999) == Decimal("19.99")
+        assert from_minor_units(to_minor_units("1234.5", "VES"), "VES") == Decimal("1234.50")
+
+
+class TestMoneyColumns:
+    """Test money columns are stored as integers and read back unchanged"""
+
+    def test_price_stored_as_cents(self, test_db):
+        """Test a float price is persisted as integer cents"""
+        test_db.add(Product(name="Funda", brand="Generic", stock=1, price=19.99))
+        test_db.commit()
+
+        raw = test_db.execute(text("SELECT price FROM products")).scalar()
+        assert raw == 1999
+        assert test_db.query(Product).one().price == 19.99
+
+    def test_ticket_total_is_exact(self, client, test_db, auth_headers_tech):
+        """Test a sale of many cheap items totals exactly"""
+        product = Product(name="Chip", brand="Generic", stock=100, price=0.1)
+        test_db.add(product)
+        test_db.commit()
+
+        response = client.post("/api/tickets", json={
+            "customer_name": "Cliente General",
+            "payment_method": "cash",
+            "payment_status": "Paid",
+            "items": [{"product_id": product.id, "quantity": 3}],
+            "exchange_rate": 36.5,
+        }, headers=auth_headers_tech)
+
+        assert response.json()["total"] == 0.3
+
+    @pytest.mark.work_orders
+    def test_payment_stats_are_exact(self, client, test_db, auth_headers_tech):
+        """Test payment statistics sum cents without drift"""
+        orders = [
+            ("Pagado", PaymentStatus.PAGADO, "0.10", "0.10"),
+            ("Pagado", PaymentStatus.PAGADO, "0.20", "0.20"),
+            ("Parcial", PaymentStatus.PAGO_PARCIAL, "100.00", "33.33"),
+            ("Vencido", PaymentStatus.VENCIDO, "50.05", "0"),
+        ]
+        test_db.add_all([
+            WorkOrder(id=f"wo-{index}", code=f"WO{index}", customer_name=name, device="iPhone",
+                      issue="Pantalla", payment_status=payment_status,
+                      repair_cost=Decimal(cost), amount_paid=Decimal(paid))
+            for index, (name, payment_status, cost, paid) in enumerate(orders)
+        ])
+        test_db.commit()
+
+        stats = client.get("/api/work-orders/payment-stats", headers=auth_headers_tech).json()
+
+        assert stats["total_paid"] == 33.63
+        assert stats["total_partial"] == 66.67
+        assert stats["total_pending"] == 0
+        assert stats["overdue_amount"] == 50.05
+        assert stats["overdue_count"] == 1
+        assert stats["customers_with_debt"] == 2
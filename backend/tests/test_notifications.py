@@ -0,0 +1,126 @@
+"""
+Tests for the notification service against the fake messaging provider
+"""
+import time
+import httpx
+import pytest
+from tests.fake_notification_provider import FakeProvider
+from app.services.notification_transport import TwilioTransport
+from app.services.notifications import NotificationService
+
+PHONE = "+584141234567"
+
+
+@pytest.fixture
+def provider():
+    return FakeProvider()
+
+
+@pytest.fixture
+def make_service(provider):
+    """Build notification services talking to the fake provider in process"""
+    services = []
+
+    def make(auth_token=provider.auth_token, sms_from="+15005550006", **options):
+        transport = TwilioTransport(
+            account_sid=provider.account_sid, auth_token=auth_token, whatsapp_from="whatsapp:+14155238886",
+            sms_from=sms_from, base_url="http://provider", transport=httpx.ASGITransport(app=provider.app),
+            **options
+        )
+        services.append(NotificationService(transport=transport))
+        return services[-1]
+
+    yield make
+    for service in services:
+        service.shutdown()
+
+
+class TestNotificationService:
+    """Test sending through the pooled transport"""
+
+    def test_whatsapp_is_sent(self, provider, make_service):
+        """Test a notification goes out by WhatsApp first"""
+        service = make_service()
+
+        assert service.send_notification(PHONE, "Su equipo está listo") is True
+        [message] = provider.messages
+        assert message.to == f"whatsapp:{PHONE}"
+        assert message.from_ == "whatsapp:+14155238886"
+        assert message.body == "Su equipo está listo"
+
+    def test_sms_fallback_when_whatsapp_fails(self, provider, make_service):
+        """Test a rejected WhatsApp message is retried by SMS"""
+        provider.failing.add(f"whatsapp:{PHONE}")
+        service = make_service()
+
+        assert service.send_notification(PHONE, "Hola") is True
+        assert [message.to for message in provider.messages] == [PHONE]
+
+    def test_failure_without_sms_sender(self, provider, make_service):
+        """Test the notification fails when WhatsApp fails and SMS is not configured"""
+        provider.failing.add(f"whatsapp:{PHONE}")
+        service = make_service(sms_from=None)
+
+        assert service.send_notification(PHONE, "Hola") is False
+        assert provider.messages == []
+
+    def test_rejected_credentials(self, provider, make_service):
+        """Test wrong credentials are reported as a failed send"""
+        service = make_service(auth_token="wrong")
+
+        assert service.send_whatsapp(PHONE, "Hola") is False
+        assert provider.messages == []
+
+    def test_disabled_service_simulates(self, monkeypatch):
+        """Test nothing is sent without credentials"""
+        monkeypatch.setenv("NOTIFICATIONS_ENABLED", "false")
+        service = NotificationService()
+        try:
+            assert service.client is None
+            assert service.send_notification(PHONE, "Hola") is False
+            assert service.send_bulk([(PHONE, "Hola")]) == [False]
+        finally:
+            service.shutdown()
+
+
+class TestBulkSend:
+    """Test concurrency and rate limits of bulk sends"""
+
+    def test_bulk_respects_concurrency(self, provider, make_service):
+        """Test a bulk send keeps at most ``concurrency`` requests in flight"""
+        provider.latency = 0.01
+        service = make_service(concurrency=5)
+        messages = [(f"+58414{n:07d}", f"Mensaje {n}") for n in range(50)]
+
+        outcomes = service.send_bulk(messages)
+
+        assert outcomes == [True] * 50
+        assert len(provider.messages) == 50
+        assert 1 < provider.max_in_flight <= 5
+
+    def test_bulk_reports_each_outcome(self, provider, make_service):
+        """Test outcomes are returned in order, with SMS fallback per message"""
+        provider.failing.update({"whatsapp:+584140000002", "+584140000002", "whatsapp:+584140000003"})
+        service = make_service()
+        phones = ["+584140000001", "+584140000002", "+584140000003"]
+
+        assert service.send_bulk([(phone, "Hola") for phone in phones]) == [True, False, True]
+        assert sorted(message.to for message in provider.messages) == ["+584140000003", "whatsapp:+584140000001"]
+
+    def test_rate_limit_spaces_requests(self, provider, make_service):
+        """Test requests start no faster than ``rate_per_second``"""
+        service = make_service(rate_per_second=50)
+
+        started = time.monotonic()
+        assert service.send_bulk([(PHONE, f"Mensaje {n}") for n in range(6)]) == [True] * 6
+
+        # Five intervals of 20 ms between six requests
+        assert time.monotonic() - started >= 0.09
+
+    def test_client_is_created_on_the_sending_loop(self, provider, make_service):
+        """Test building the service opens no client, so none crosses a fork before the first send"""
+        service = make_service()
+        assert service.client._client is None
+
+        assert service.send_notification(PHONE, "Hola") is True
+        assert service.client._client is not None
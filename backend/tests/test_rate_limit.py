@@ -0,0 +1,144 @@
+"""
+Tests for the token-bucket rate limiting middleware
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from app.database import Base
+from app.middleware.rate_limit import (
+    DatabaseBucketStore, MemoryBucketStore, RateLimitMiddleware, RouteCost, parse_route_costs
+)
+from app.utils.security import create_access_token
+
+
+class FakeClock:
+    """Clock that only moves when told to"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def limited_client(store, **options):
+    """Minimal app wrapped in the rate limit middleware"""
+    app = FastAPI()
+
+    @app.get("/api/products")
+    def products():
+        return []
+
+    @app.get("/api/reports/sales")
+    def report():
+        return {}
+
+    @app.get("/health")
+    def health():
+        return {"status": "healthy"}
+
+    options.setdefault("capacity", 3)
+    options.setdefault("refill_per_second", 1)
+    app.add_middleware(RateLimitMiddleware, store=store, **options)
+    return TestClient(app)
+
+
+def bearer(username):
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': username})}"}
+
+
+class TestRateLimit:
+    """Test buckets, costs and keys"""
+
+    def test_burst_then_429_with_retry_after(self, clock):
+        """Test a client gets ``capacity`` requests, then 429 until tokens refill"""
+        client = limited_client(MemoryBucketStore(clock=clock), refill_per_second=0.5)
+
+        assert [client.get("/api/products").status_code for _ in range(3)] == [200, 200, 200]
+        response = client.get("/api/products")
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "2"
+
+        clock.now += 2
+        assert client.get("/api/products").status_code == 200
+
+    def test_routes_cost_more(self, clock):
+        """Test expensive routes take more tokens from the same bucket"""
+        client = limited_client(
+            MemoryBucketStore(clock=clock), capacity=10, route_costs=[RouteCost("/api/reports", 5)]
+        )
+
+        assert client.get("/api/reports/sales").status_code == 200
+        assert client.get("/api/reports/sales").status_code == 200
+        assert client.get("/api/reports/sales").status_code == 429
+        assert client.get("/api/products").status_code == 429
+
+    def test_clients_are_keyed_by_user_then_ip(self, clock):
+        """Test each user has a bucket, and requests without a valid token share the IP's"""
+        client = limited_client(MemoryBucketStore(clock=clock), capacity=1)
+
+        assert client.get("/api/products", headers=bearer("ana")).status_code == 200
+        assert client.get("/api/products", headers=bearer("ana")).status_code == 429
+        assert client.get("/api/products", headers=bearer("luis")).status_code == 200
+        assert client.get("/api/products", headers={"Authorization": "Bearer forged"}).status_code == 200
+        assert client.get("/api/products").status_code == 429
+
+    def test_exempt_paths_are_not_limited(self, clock):
+        """Test health checks never count"""
+        client = limited_client(MemoryBucketStore(clock=clock), capacity=1)
+
+        assert [client.get("/health").status_code for _ in range(5)] == [200] * 5
+        assert client.get("/api/products").status_code == 200
+
+    def test_store_failure_lets_requests_through(self):
+        """Test a broken store does not take the API down"""
+        class BrokenStore:
+            blocking = True
+
+            def take(self, *args):
+                raise RuntimeError("database is down")
+
+        client = limited_client(BrokenStore(), capacity=1)
+
+        assert [client.get("/api/products").status_code for _ in range(3)] == [200] * 3
+
+    def test_route_costs_are_parsed(self):
+        """Test the RATE_LIMIT_ROUTE_COSTS format"""
+        assert parse_route_costs("/api/reports=10, POST /api/backups=30,") == [
+            RouteCost("/api/reports", 10.0), RouteCost("/api/backups", 30.0, "POST")
+        ]
+
+
+class TestDatabaseBucketStore:
+    """Test buckets shared through the database"""
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'shop.db'}")
+        Base.metadata.create_all(engine)
+        yield engine
+        engine.dispose()
+
+    def test_workers_share_buckets(self, engine, clock):
+        """Test two processes' stores drain and refill the same bucket"""
+        first, second = DatabaseBucketStore(engine, clock=clock), DatabaseBucketStore(engine, clock=clock)
+
+        assert first.take("user:ana", 2, capacity=3, refill_per_second=1) == 0
+        assert second.take("user:ana", 1, capacity=3, refill_per_second=1) == 0
+        assert first.take("user:ana", 2, capacity=3, refill_per_second=1) == pytest.approx(2)
+        assert second.take("user:luis", 3, capacity=3, refill_per_second=1) == 0
+
+        clock.now += 2
+        assert second.take("user:ana", 2, capacity=3, refill_per_second=1) == 0
+
+    def test_middleware_with_database_store(self, engine, clock):
+        """Test the middleware runs the shared store off the event loop"""
+        client = limited_client(DatabaseBucketStore(engine, clock=clock), capacity=2)
+
+        assert [client.get("/api/products").status_code for _ in range(3)] == [200, 200, 429]
@@ -0,0 +1,98 @@
+"""
+Tests for read-replica routing of read-only endpoints
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app import database
+from app.database import Base, ReplicaMonitor
+from app.models.product import Product
+
+
+@pytest.fixture
+def replica_engine():
+    """Separate in-memory database standing in for the replica"""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def replica(replica_engine, monkeypatch):
+    """Route read-only endpoints to the replica database"""
+    monitor = ReplicaMonitor(replica_engine, max_lag_seconds=5, check_interval=60)
+    monkeypatch.setattr(database, "replica_monitor", monitor)
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(bind=replica_engine))
+    session = sessionmaker(bind=replica_engine)()
+    session.add(Product(name="En réplica", brand="Generic", stock=1, price=5.0))
+    session.commit()
+    session.close()
+    return monitor
+
+
+class TestReplicaMonitor:
+    """Test replica health and lag checks"""
+
+    def test_healthy_replica_is_available(self, replica_engine):
+        """Test a reachable replica without lag is used"""
+        assert ReplicaMonitor(replica_engine, max_lag_seconds=5, check_interval=60).available() is True
+
+    def test_lagging_replica_is_skipped(self, replica_engine, monkeypatch):
+        """Test a replica behind the lag threshold is not used"""
+        monitor = ReplicaMonitor(replica_engine, max_lag_seconds=5, check_interval=60)
+        monkeypatch.setattr(monitor, "lag_seconds", lambda: 30.0)
+        assert monitor.available() is False
+
+    def test_unreachable_replica_is_skipped(self, tmp_path):
+        """Test connection errors make the replica unavailable"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+        assert ReplicaMonitor(engine, max_lag_seconds=5, check_interval=60).available() is False
+
+    def test_verdict_is_cached(self, replica_engine, monkeypatch):
+        """Test the replica is probed at most once per check interval"""
+        monitor = ReplicaMonitor(replica_engine, max_lag_seconds=5, check_interval=60)
+        probes = []
+        monkeypatch.setattr(monitor, "lag_seconds", lambda: probes.append(1) or 0.0)
+
+        monitor.available()
+        monitor.available()
+
+        assert len(probes) == 1
+
+
+class TestReadRouting:
+    """Test which database read-only endpoints use"""
+
+    def test_listing_reads_from_replica(self, client, test_db, auth_headers_tech, replica):
+        """Test listings are served by the replica when it is healthy"""
+        test_db.add(Product(name="En primario", brand="Generic", stock=1, price=5.0))
+        test_db.commit()
+
+        response = client.get("/api/products", headers=auth_headers_tech)
+
+        assert [product["name"] for product in response.json()] == ["En réplica"]
+
+    def test_falls_back_to_primary(self, client, test_db, auth_headers_tech, replica, monkeypatch):
+        """Test listings use the primary while the replica lags"""
+        monkeypatch.setattr(replica, "lag_seconds", lambda: 60.0)
+        test_db.add(Product(name="En primario", brand="Generic", stock=1, price=5.0))
+        test_db.commit()
+
+        response = client.get("/api/products", headers=auth_headers_tech)
+
+        assert [product["name"] for product in response.json()] == ["En primario"]
+
+    def test_writes_use_primary(self, client, test_db, auth_headers_admin, replica):
+        """Test write endpoints never use the replica"""
+        response = client.post("/api/products", json={
+            "name": "Nuevo", "brand": "Generic", "stock": 1, "price": 5.0
+        }, headers=auth_headers_admin)
+
+        assert response.status_code == 201
+        assert test_db.query(Product).filter(Product.name == "Nuevo").count() == 1
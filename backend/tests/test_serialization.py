@@ -0,0 +1,91 @@
+"""
+Tests for the projected list serialization path
+"""
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+from pydantic import TypeAdapter
+from fastapi.responses import JSONResponse
+from app.models.product import Product
+from app.models.part import Part
+from app.models.ticket import Ticket, TicketItem, PaymentStatus
+from app.models.work_order import WorkOrder, RepairStatus, PaymentStatus as WOPaymentStatus
+from app.schemas.product import ProductResponse
+from app.schemas.part import PartResponse
+from app.schemas.ticket import TicketResponse
+from app.schemas.work_order import WorkOrderResponse
+
+
+def render_with_schema(schema, objects) -> bytes:
+    """Render ORM objects the way FastAPI does through response_model"""
+    content = TypeAdapter(List[schema]).dump_python(
+        TypeAdapter(List[schema]).validate_python(objects, from_attributes=True),
+        mode="json"
+    )
+    return JSONResponse(content).body
+
+
+@pytest.fixture
+def catalog(test_db):
+    """Seed one row of every listed entity"""
+    product = Product(name="Funda iPhone 14 ñ", brand="Apple", stock=3, price=12.5, image_url=None)
+    part = Part(name="Pantalla", sku="PAN-001", stock=2, price=80.0, compatible_models=["iPhone 13", "iPhone 14"])
+    test_db.add_all([product, part])
+    test_db.commit()
+
+    ticket = Ticket(
+        id="ticket-1",
+        date=datetime(2024, 5, 1, 10, 30, 15, 250000),
+        customer_name="Cliente General",
+        payment_method="mixed",
+        payment_status=PaymentStatus.PARTIAL,
+        subtotal=25.0,
+        tax=0.0,
+        total=25.0,
+        exchange_rate=36.52,
+        amount_usd=10.0,
+        amount_ves=0.0
+    )
+    test_db.add(ticket)
+    test_db.add(TicketItem(ticket_id="ticket-1", product_id=product.id, quantity=2, price=12.5))
+    test_db.add(WorkOrder(
+        id="order-1",
+        code="ABC123",
+        customer_name="José Pérez",
+        device="Galaxy S23",
+        issue="No carga",
+        status=RepairStatus.ESPERANDO_PARTE,
+        repair_cost=Decimal("45.50"),
+        amount_paid=Decimal("10"),
+        payment_status=WOPaymentStatus.PAGO_PARCIAL
+    ))
+    test_db.commit()
+    return test_db
+
+
+class TestProjectedListSerialization:
+    """List endpoints must stay byte-compatible with their response schemas"""
+
+    @pytest.mark.parametrize("url, model, schema", [
+        ("/api/products", Product, ProductResponse),
+        ("/api/parts", Part, PartResponse),
+        ("/api/work-orders", WorkOrder, WorkOrderResponse),
+        ("/api/tickets", Ticket, TicketResponse),
+    ])
+    def test_matches_response_model_output(self, client, catalog, auth_headers_admin, url, model, schema):
+        """Test projected output equals the response_model rendering"""
+        response = client.get(url, headers=auth_headers_admin)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+
+        expected = render_with_schema(schema, catalog.query(model).all())
+        assert response.content == expected
+
+    def test_ticket_items_are_nested(self, client, catalog, auth_headers_admin):
+        """Test ticket items are attached to their ticket"""
+        response = client.get("/api/tickets", headers=auth_headers_admin)
+        data = response.json()
+        assert len(data) == 1
+        assert [item["quantity"] for item in data[0]["items"]] == [2]
+        assert data[0]["payment_status"] == "Partial"
@@ -0,0 +1,242 @@
+"""
+Tests for the incremental Google Sheets sync
+"""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from app.database import Base
+from app.models.store import Store, DEFAULT_STORE_ID, DEFAULT_STORE_NAME
+from app.models.ticket import Ticket, PaymentStatus
+from app.models.work_order import WorkOrder, RepairStatus
+from app.services import sheets_sync
+from app.services.sheets_sync import SHEETS_SYNC_LOCK, sync_to_sheets
+from app.utils.locks import process_lock
+
+NOW = datetime(2024, 6, 10, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeAPIError(Exception):
+    """Error shaped like gspread's APIError"""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = SimpleNamespace(status_code=status_code)
+
+
+class FakeWorksheet:
+    """In-memory worksheet with the gspread methods the sync uses"""
+
+    def __init__(self, title):
+        self.title = title
+        self.rows = []
+        self.calls = []
+        self.failures = []
+
+    def _record(self, name):
+        self.calls.append(name)
+        # Queued outcomes of the next calls: an HTTP error status, or None for success
+        status_code = self.failures.pop(0) if self.failures else None
+        if status_code is not None:
+            raise FakeAPIError(status_code)
+
+    def col_values(self, col):
+        self._record("col_values")
+        return [row[col - 1] for row in self.rows]
+
+    def append_rows(self, values, value_input_option=None, insert_data_option=None):
+        self._record("append_rows")
+        self.rows += [list(row) for row in values]
+
+    def batch_update(self, data, value_input_option=None):
+        self._record("batch_update")
+        for update in data:
+            number = int(update["range"].split(":")[0][1:])
+            self.rows[number - 1] = list(update["values"][0])
+
+
+class FakeSpreadsheet:
+    """In-memory spreadsheet"""
+
+    def __init__(self):
+        self.sheets = {}
+
+    def worksheets(self):
+        return list(self.sheets.values())
+
+    def add_worksheet(self, title, rows, cols):
+        self.sheets[title] = FakeWorksheet(title)
+        return self.sheets[title]
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """File database shared by the job's own sessions, without backoff sleeps"""
+    monkeypatch.setattr(sheets_sync, "_sleep", lambda seconds: None)
+    engine = create_engine(f"sqlite:///{tmp_path / 'shop.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(Store(id=DEFAULT_STORE_ID, name=DEFAULT_STORE_NAME))
+        db.commit()
+    yield engine
+    engine.dispose()
+
+
+def add_ticket(engine, ticket_id, changed_minutes_ago, customer="Ana"):
+    with Session(engine) as db:
+        changed_at = NOW - timedelta(minutes=changed_minutes_ago)
+        db.add(Ticket(id=ticket_id, date=changed_at, updated_at=changed_at, customer_name=customer,
+                      payment_method="Efectivo", payment_status=PaymentStatus.PENDING,
+                      subtotal=10.0, tax=1.6, total=11.6))
+        db.commit()
+
+
+def add_order(engine, order_id, changed_minutes_ago, store_id=DEFAULT_STORE_ID):
+    with Session(engine) as db:
+        changed_at = NOW - timedelta(minutes=changed_minutes_ago)
+        db.add(WorkOrder(id=order_id, code=order_id.upper(), customer_name="Luis", device="iPhone 12",
+                         issue="Pantalla", status=RepairStatus.RECIBIDO, store_id=store_id,
+                         created_at=changed_at, updated_at=changed_at))
+        db.commit()
+
+
+@pytest.mark.tickets
+class TestSheetsSync:
+    """Test the incremental export"""
+
+    def test_first_run_exports_everything_with_headers(self, engine):
+        """Test the first run appends every row after a header row"""
+        add_ticket(engine, "t1", 30)
+        add_ticket(engine, "t2", 20)
+        add_order(engine, "o1", 10)
+        spreadsheet = FakeSpreadsheet()
+
+        results = sync_to_sheets(engine, now=NOW, spreadsheet=spreadsheet)
+
+        assert results["Tickets"].appended == 2
+        assert results["Órdenes de trabajo"].appended == 1
+        tickets = spreadsheet.sheets["Tickets"].rows
+        assert tickets[0][:4] == ["ID", "Fecha", "Sucursal", "Cliente"]
+        assert [row[0] for row in tickets[1:]] == ["t1", "t2"]
+        assert tickets[1][2] == DEFAULT_STORE_NAME
+        assert tickets[1][5] == "Pending"
+        orders = spreadsheet.sheets["Órdenes de trabajo"].rows
+        assert orders[1][0] == "o1" and orders[1][8] == "Recibido"
+
+    def test_later_runs_only_send_changes(self, engine):
+        """Test a run sends only changed rows, updating existing ones in place in one call"""
+        add_ticket(engine, "t1", 30)
+        add_ticket(engine, "t2", 20)
+        spreadsheet = FakeSpreadsheet()
+        sync_to_sheets(engine, now=NOW, spreadsheet=spreadsheet)
+        worksheet = spreadsheet.sheets["Tickets"]
+        worksheet.calls.clear()
+
+        later = NOW + timedelta(minutes=10)
+        with Session(engine) as db:
+            ticket = db.get(Ticket, "t1")
+            ticket.payment_status = PaymentStatus.PAID
+            ticket.updated_at = later - timedelta(minutes=5)
+            db.commit()
+        add_ticket(engine, "t3", -5)
+
+        results = sync_to_sheets(engine, now=later, spreadsheet=spreadsheet)
+
+        assert (results["Tickets"].updated, results["Tickets"].appended) == (1, 1)
+        assert worksheet.calls == ["col_values", "batch_update", "append_rows"]
+        assert [row[0] for row in worksheet.rows] == ["ID", "t1", "t2", "t3"]
+        assert worksheet.rows[1][5] == "Paid"
+
+        # Nothing changed since: nothing is written
+        worksheet.calls.clear()
+        results = sync_to_sheets(engine, now=later, spreadsheet=spreadsheet)
+        assert (results["Tickets"].updated, results["Tickets"].appended) == (0, 0)
+        assert worksheet.calls == ["col_values"]
+
+    def test_rows_are_batched(self, engine, monkeypatch):
+        """Test rows are written in batches of SHEETS_SYNC_BATCH_SIZE"""
+        monkeypatch.setattr(sheets_sync.settings, "SHEETS_SYNC_BATCH_SIZE", 2)
+        for n in range(5):
+            add_ticket(engine, f"t{n}", 30 - n)
+        spreadsheet = FakeSpreadsheet()
+
+        sync_to_sheets(engine, now=NOW, spreadsheet=spreadsheet)
+
+        worksheet = spreadsheet.sheets["Tickets"]
+        # Header, then three batches
+        assert worksheet.calls.count("append_rows") == 4
+        assert len(worksheet.rows) == 6
+
+    def test_rows_are_read_store_by_store(self, engine):
+        """Test every store is exported, each read with its own range of the (store_id, updated_at) index"""
+        with Session(engine) as db:
+            db.add(Store(id=2, name="Norte"))
+            db.commit()
+        add_order(engine, "o1", 10, store_id=2)
+        add_order(engine, "o2", 20)
+        spreadsheet = FakeSpreadsheet()
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT") and "FROM work_orders" in statement:
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            sync_to_sheets(engine, now=NOW, spreadsheet=spreadsheet)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        orders = spreadsheet.sheets["Órdenes de trabajo"].rows
+        assert [(row[0], row[2]) for row in orders[1:]] == [("o2", DEFAULT_STORE_NAME), ("o1", "Norte")]
+        assert len(statements) == 2
+        assert all("work_orders.store_id = " in statement for statement in statements)
+
+    def test_recent_changes_wait_to_settle(self, engine):
+        """Test changes newer than SHEETS_SYNC_SETTLE_SECONDS are left for the next run"""
+        add_ticket(engine, "old", 5)
+        add_ticket(engine, "recent", 0)
+        spreadsheet = FakeSpreadsheet()
+
+        sync_to_sheets(engine, now=NOW, spreadsheet=spreadsheet)
+        assert [row[0] for row in spreadsheet.sheets["Tickets"].rows] == ["ID", "old"]
+
+        sync_to_sheets(engine, now=NOW + timedelta(minutes=5), spreadsheet=spreadsheet)
+        assert [row[0] for row in spreadsheet.sheets["Tickets"].rows] == ["ID", "old", "recent"]
+
+    def test_quota_errors_are_retried(self, engine):
+        """Test a call hitting the quota is retried"""
+        add_ticket(engine, "t1", 30)
+        spreadsheet = FakeSpreadsheet()
+        spreadsheet.add_worksheet("Tickets", 1000, 13).failures = [429, 503]
+
+        results = sync_to_sheets(engine, now=NOW, spreadsheet=spreadsheet)
+
+        assert results["Tickets"].appended == 1
+
+    def test_failed_run_is_repeated_without_duplicates(self, engine):
+        """Test a run failing halfway keeps the watermark, and the retry updates rows already written"""
+        add_ticket(engine, "t1", 30)
+        add_ticket(engine, "t2", 20)
+        spreadsheet = FakeSpreadsheet()
+        worksheet = spreadsheet.add_worksheet("Tickets", 1000, 13)
+        worksheet.rows = [["ID"], ["t1"]]  # Written by the interrupted run
+        worksheet.failures = [None, 403]
+
+        with pytest.raises(FakeAPIError):
+            sync_to_sheets(engine, now=NOW, spreadsheet=spreadsheet)
+
+        results = sync_to_sheets(engine, now=NOW, spreadsheet=spreadsheet)
+
+        assert (results["Tickets"].updated, results["Tickets"].appended) == (1, 1)
+        assert [row[0] for row in worksheet.rows] == ["ID", "t1", "t2"]
+
+    def test_run_is_skipped_while_another_process_syncs(self, engine):
+        """Test concurrent workers do not sync twice"""
+        spreadsheet = FakeSpreadsheet()
+
+        with process_lock(SHEETS_SYNC_LOCK, bind=engine):
+            assert sync_to_sheets(engine, now=NOW, spreadsheet=spreadsheet) is None
+
+        assert spreadsheet.sheets == {}
@@ -0,0 +1,228 @@
+"""
+Tests for multi-store tenancy: scoped queries, store claims and cross-store reports
+"""
+import pytest
+from sqlalchemy import event
+from app.models.part import Part
+from app.models.product import Product
+from app.models.store import Store, ALL_STORES, set_store_scope
+from app.models.ticket import Ticket, TicketItem, PaymentStatus
+from app.models.user import User
+from app.routers.dashboard import dashboard_cache
+from app.utils.security import create_access_token, get_password_hash
+from tests.conftest import engine
+
+
+@pytest.fixture(autouse=True)
+def clear_dashboard_cache():
+    """Start every test with empty dashboard counters"""
+    dashboard_cache.invalidate()
+    yield
+    dashboard_cache.invalidate()
+
+
+@pytest.fixture
+def stores(test_db):
+    """The default store and a second branch"""
+    test_db.add_all([Store(id=1, name="Principal"), Store(id=2, name="Norte")])
+    test_db.commit()
+
+
+@pytest.fixture
+def auth_headers_north(test_db, stores):
+    """Headers of an admin of the second store"""
+    test_db.add(User(
+        username="norte", hashed_password=get_password_hash("norte123"), role="admin", store_id=2
+    ))
+    test_db.commit()
+    token = create_access_token(data={"sub": "norte", "role": "admin", "store_id": 2})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def add_product(db, name, store_id, stock=10):
+    """Insert a product of a given store"""
+    product = Product(name=name, brand="Generic", stock=stock, price=5.0, store_id=store_id)
+    db.add(product)
+    db.commit()
+    return product
+
+
+def add_ticket(db, ticket_id, total, store_id):
+    """Insert a paid ticket of a given store"""
+    db.add(Ticket(
+        id=ticket_id, customer_name="Cliente", payment_method="cash", payment_status=PaymentStatus.PAID,
+        subtotal=total, tax=0.0, total=total, amount_usd=total, store_id=store_id
+    ))
+    db.commit()
+
+
+class TestStoreScope:
+    """Test every query of a request only sees the user's store"""
+
+    def test_listing_only_shows_own_store(self, client, test_db, auth_headers_admin, auth_headers_north):
+        """Test each store lists only its own products"""
+        add_product(test_db, "Funda centro", 1)
+        add_product(test_db, "Funda norte", 2)
+
+        main = client.get("/api/products", headers=auth_headers_admin).json()
+        north = client.get("/api/products", headers=auth_headers_north).json()
+
+        assert [product["name"] for product in main] == ["Funda centro"]
+        assert [product["name"] for product in north] == ["Funda norte"]
+
+    def test_created_rows_belong_to_the_users_store(self, client, test_db, auth_headers_north):
+        """Test new rows are stamped with the store of the token"""
+        response = client.post("/api/products", json={
+            "name": "Cargador", "brand": "Generic", "stock": 1, "price": 5.0
+        }, headers=auth_headers_north)
+
+        assert response.status_code == 201
+        set_store_scope(test_db, None)
+        assert test_db.query(Product.store_id).filter(Product.name == "Cargador").scalar() == 2
+
+    def test_other_store_rows_are_not_found(self, client, test_db, auth_headers_north):
+        """Test another store's rows cannot be read, updated or deleted"""
+        product = add_product(test_db, "Funda centro", 1)
+
+        update = client.put(f"/api/products/{product.id}", json={"stock": 0}, headers=auth_headers_north)
+        delete = client.delete(f"/api/products/{product.id}", headers=auth_headers_north)
+
+        assert update.status_code == 404
+        assert delete.status_code == 404
+        set_store_scope(test_db, None)
+        test_db.expire_all()
+        assert test_db.query(Product.stock).filter(Product.id == product.id).scalar() == 10
+
+    def test_bulk_update_is_scoped(self, test_db, stores):
+        """Test ORM UPDATE statements of a bound session only touch its store"""
+        add_product(test_db, "Funda centro", 1)
+        add_product(test_db, "Funda norte", 2)
+
+        set_store_scope(test_db, 2)
+        test_db.query(Product).update({"stock": 0})
+        test_db.commit()
+        set_store_scope(test_db, None)
+
+        stocks = dict(test_db.query(Product.name, Product.stock))
+        assert stocks == {"Funda centro": 10, "Funda norte": 0}
+
+    def test_all_stores_option_skips_the_filter(self, test_db, stores):
+        """Test a statement can opt out of the store filter"""
+        add_product(test_db, "Funda centro", 1)
+        add_product(test_db, "Funda norte", 2)
+        set_store_scope(test_db, 1)
+
+        assert test_db.query(Product).count() == 1
+        assert test_db.query(Product).execution_options(**{ALL_STORES: True}).count() == 2
+
+    def test_sku_is_unique_per_store(self, client, test_db, auth_headers_admin, auth_headers_north):
+        """Test two stores may stock the same SKU"""
+        test_db.add(Part(name="Pantalla", sku="LCD-1", stock=1, price=20.0, compatible_models=[], store_id=1))
+        test_db.commit()
+
+        response = client.post("/api/parts", json={
+            "name": "Pantalla", "sku": "LCD-1", "stock": 1, "price": 20.0, "compatible_models": []
+        }, headers=auth_headers_north)
+
+        assert response.status_code == 201
+
+    def test_ticket_listing_reads_only_own_items(self, client, test_db, auth_headers_admin, auth_headers_north):
+        """Test the tickets listing fetches the items of its store's tickets only"""
+        product = add_product(test_db, "Funda centro", 1)
+        add_ticket(test_db, "t-1", 10.0, 1)
+        add_ticket(test_db, "t-2", 25.0, 2)
+        test_db.add_all([
+            TicketItem(ticket_id=ticket_id, product_id=product.id, quantity=1, price=total)
+            for ticket_id, total in (("t-1", 10.0), ("t-2", 25.0))
+        ])
+        test_db.commit()
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if "FROM ticket_items" in statement:
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            north = client.get("/api/tickets", headers=auth_headers_north).json()
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert [(ticket["id"], len(ticket["items"])) for ticket in north] == [("t-2", 1)]
+        assert len(statements) == 1
+        assert "tickets.store_id" in statements[0]
+
+    def test_idempotency_keys_are_per_store(self, client, test_db, auth_headers_admin, auth_headers_north):
+        """Test a key already used by another store creates a new ticket instead of replaying"""
+        sales = []
+        for store_id, headers in ((1, auth_headers_admin), (2, auth_headers_north)):
+            product = add_product(test_db, f"Funda {store_id}", store_id)
+            sales.append(client.post("/api/tickets", json={
+                "customer_name": "Cliente", "payment_method": "cash", "payment_status": "Paid",
+                "items": [{"product_id": product.id, "quantity": 1}], "exchange_rate": 36.5, "amount_usd": 5.0
+            }, headers={**headers, "Idempotency-Key": "terminal-1-0001"}))
+
+        assert [response.status_code for response in sales] == [201, 201]
+        assert "idempotent-replayed" not in sales[1].headers
+        assert sales[0].json()["id"] != sales[1].json()["id"]
+
+    def test_dashboard_counters_are_per_store(self, client, test_db, auth_headers_admin, auth_headers_north):
+        """Test each store gets its own cached dashboard"""
+        add_ticket(test_db, "t-1", 10.0, 1)
+        add_ticket(test_db, "t-2", 25.0, 2)
+
+        main = client.get("/api/dashboard/summary", headers=auth_headers_admin).json()
+        north = client.get("/api/dashboard/summary", headers=auth_headers_north).json()
+
+        assert (main["totalSales"], main["totalTickets"]) == (10.0, 1)
+        assert (north["totalSales"], north["totalTickets"]) == (25.0, 1)
+
+
+class TestStoreClaim:
+    """Test the store carried in the JWT"""
+
+    def test_login_token_carries_store(self, client, test_db, auth_headers_north):
+        """Test login returns the user's store"""
+        response = client.post("/api/auth/login", json={"username": "norte", "password": "norte123"})
+
+        assert response.status_code == 200
+        assert response.json()["store_id"] == 2
+
+    def test_token_of_another_store_is_rejected(self, client, test_db, auth_headers_north):
+        """Test a token whose store no longer matches the user is rejected"""
+        token = create_access_token(data={"sub": "norte", "role": "admin", "store_id": 1})
+
+        response = client.get("/api/products", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 401
+
+    def test_usernames_are_unique_across_stores(self, client, auth_headers_admin, auth_headers_north):
+        """Test a username taken in another store cannot be reused"""
+        response = client.post("/api/users", json={
+            "username": "norte", "password": "secret123", "role": "technician"
+        }, headers=auth_headers_admin)
+
+        assert response.status_code == 400
+
+
+class TestCrossStoreReport:
+    """Test the sales report of all stores"""
+
+    def test_sales_by_store(self, client, test_db, auth_headers_admin, stores):
+        """Test every store gets a row from one grouped query"""
+        add_ticket(test_db, "t-1", 10.0, 1)
+        add_ticket(test_db, "t-2", 15.0, 1)
+        test_db.add(Store(id=3, name="Sur"))
+        test_db.commit()
+
+        response = client.get("/api/reports/sales/by-store", headers=auth_headers_admin)
+
+        assert response.status_code == 200
+        totals = {row["store_name"]: (row["tickets"], row["total"]) for row in response.json()}
+        assert totals == {"Principal": (2, 25.0), "Norte": (0, 0.0), "Sur": (0, 0.0)}
+
+    def test_sales_by_store_requires_admin(self, client, auth_headers_tech):
+        """Test technicians cannot see other stores' figures"""
+        response = client.get("/api/reports/sales/by-store", headers=auth_headers_tech)
+
+        assert response.status_code == 403
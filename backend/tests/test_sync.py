@@ -0,0 +1,153 @@
+"""
+Tests for offline batch sync and idempotent ticket creation
+"""
+import pytest
+from sqlalchemy.exc import IntegrityError
+from app.models.product import Product
+from app.models.ticket import Ticket
+from app.schemas.ticket import TicketCreate
+from app.services import sales as sales_service
+from app.services.sales import PendingSale, apply_sales
+
+
+@pytest.fixture
+def product(test_db):
+    """Create a product with limited stock"""
+    product = Product(name="Cargador USB-C", brand="Generic", stock=5, price=10.0)
+    test_db.add(product)
+    test_db.commit()
+    test_db.refresh(product)
+    return product
+
+
+def sale(product_id, quantity=1, key=None, **extra):
+    """Build a sale payload"""
+    payload = {
+        "customer_name": "Cliente General",
+        "payment_method": "cash",
+        "payment_status": "Paid",
+        "items": [{"product_id": product_id, "quantity": quantity}],
+        "exchange_rate": 36.5,
+        "amount_usd": 10.0 * quantity,
+        **extra
+    }
+    if key:
+        payload["idempotency_key"] = key
+    return payload
+
+
+@pytest.mark.tickets
+class TestTicketSync:
+    """Test batch sync of queued sales"""
+
+    def test_batch_applies_sales(self, client, test_db, auth_headers_tech, product):
+        """Test every sale in a batch is applied and stock is decremented"""
+        response = client.post(
+            "/api/sync/tickets",
+            json={"sales": [
+                sale(product.id, 2, key="sale-0001", sold_at="2024-05-01T10:00:00"),
+                sale(product.id, 1, key="sale-0002"),
+            ]},
+            headers=auth_headers_tech
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["applied"] == 2
+        assert [result["status_code"] for result in data["results"]] == [201, 201]
+        test_db.refresh(product)
+        assert product.stock == 2
+
+        ticket = test_db.query(Ticket).filter(Ticket.id == data["results"][0]["ticket_id"]).first()
+        assert ticket.date.year == 2024
+
+    def test_replayed_keys_are_ignored(self, client, test_db, auth_headers_tech, product):
+        """Test resending a batch does not sell twice"""
+        batch = {"sales": [sale(product.id, 2, key="sale-0001")]}
+        first = client.post("/api/sync/tickets", json=batch, headers=auth_headers_tech).json()
+        second = client.post("/api/sync/tickets", json=batch, headers=auth_headers_tech).json()
+
+        assert second["replayed"] == 1
+        assert second["results"][0]["ticket_id"] == first["results"][0]["ticket_id"]
+        test_db.refresh(product)
+        assert product.stock == 3
+        assert test_db.query(Ticket).count() == 1
+
+    def test_failed_sale_does_not_block_batch(self, client, test_db, auth_headers_tech, product):
+        """Test a sale without stock is reported while the rest are applied"""
+        response = client.post(
+            "/api/sync/tickets",
+            json={"sales": [
+                sale(product.id, 4, key="sale-0001"),
+                sale(product.id, 4, key="sale-0002"),
+                sale(999, 1, key="sale-0003"),
+                sale(product.id, 1, key="sale-0004"),
+            ]},
+            headers=auth_headers_tech
+        )
+
+        data = response.json()
+        assert [result["status"] for result in data["results"]] == ["applied", "failed", "failed", "applied"]
+        assert [result["status_code"] for result in data["results"]] == [201, 400, 404, 201]
+        test_db.refresh(product)
+        assert product.stock == 0
+
+    def test_reused_key_with_different_sale_conflicts(self, client, auth_headers_tech, product):
+        """Test a key reused for another payload is rejected"""
+        client.post("/api/sync/tickets", json={"sales": [sale(product.id, 1, key="sale-0001")]},
+                    headers=auth_headers_tech)
+        response = client.post("/api/sync/tickets", json={"sales": [sale(product.id, 2, key="sale-0001")]},
+                               headers=auth_headers_tech)
+
+        assert response.json()["results"][0]["status_code"] == 409
+
+
+@pytest.mark.tickets
+class TestIdempotentTicketCreation:
+    """Test the Idempotency-Key header on single ticket creation"""
+
+    def test_retry_returns_original_ticket(self, client, test_db, auth_headers_tech, product):
+        """Test retrying with the same key returns the first ticket"""
+        headers = {**auth_headers_tech, "Idempotency-Key": "retry-0001"}
+        first = client.post("/api/tickets", json=sale(product.id, 2), headers=headers)
+        second = client.post("/api/tickets", json=sale(product.id, 2), headers=headers)
+
+        assert first.status_code == 201
+        assert second.status_code == 201
+        assert second.headers["idempotent-replayed"] == "true"
+        assert second.json()["id"] == first.json()["id"]
+        test_db.refresh(product)
+        assert product.stock == 3
+
+    def test_key_shared_with_batch_sync(self, client, auth_headers_tech, product):
+        """Test a sale sent singly and then re-queued in a batch is replayed"""
+        headers = {**auth_headers_tech, "Idempotency-Key": "sale-0001"}
+        first = client.post("/api/tickets", json=sale(product.id, 1), headers=headers).json()
+        batch = client.post(
+            "/api/sync/tickets",
+            json={"sales": [sale(product.id, 1, key="sale-0001", sold_at="2024-05-01T10:00:00")]},
+            headers=auth_headers_tech
+        ).json()
+
+        assert batch["results"][0]["status"] == "replayed"
+        assert batch["results"][0]["ticket_id"] == first["id"]
+
+    def test_other_integrity_errors_are_not_retried(self, test_db, product, monkeypatch):
+        """Test only an idempotency key conflict replays the batch"""
+        calls = []
+        process_sales = sales_service.process_sales
+
+        def counted(*args, **kwargs):
+            calls.append(1)
+            return process_sales(*args, **kwargs)
+
+        def fail():
+            raise IntegrityError("INSERT", {}, Exception("NOT NULL constraint failed: tickets.total"))
+
+        monkeypatch.setattr(sales_service, "process_sales", counted)
+        monkeypatch.setattr(test_db, "commit", fail)
+        pending = PendingSale(ticket_data=TicketCreate(**sale(product.id)), idempotency_key="sale-0002")
+
+        with pytest.raises(IntegrityError):
+            apply_sales(test_db, [pending])
+        assert len(calls) == 1
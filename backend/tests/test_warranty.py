@@ -0,0 +1,134 @@
+"""
+Tests for warranty expiration reminders
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.database import Base
+from app.models.store import Store, DEFAULT_STORE_ID, DEFAULT_STORE_NAME
+from app.models.warranty_reminder import WarrantyReminder
+from app.models.work_order import WorkOrder, RepairStatus
+from app.models.work_order_event import WorkOrderStatusEvent
+from app.services.warranty import WARRANTY_LOCK, send_warranty_reminders
+from app.utils.locks import process_lock
+from app.utils.scheduler import PeriodicJob
+
+NOW = datetime(2024, 6, 10, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """File database shared by the job's own sessions"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'shop.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(Store(id=DEFAULT_STORE_ID, name=DEFAULT_STORE_NAME))
+        db.commit()
+    yield engine
+    engine.dispose()
+
+
+def deliver(engine, order_id, days_ago, phone="0414-1234567", status=RepairStatus.ENTREGADO):
+    """Insert an order delivered ``days_ago`` days before NOW"""
+    with Session(engine) as db:
+        db.add(WorkOrder(id=order_id, code=order_id.upper(), customer_name="Ana", customer_phone=phone,
+                         device="iPhone 12", issue="Pantalla", status=status))
+        db.add(WorkOrderStatusEvent(work_order_id=order_id, status=RepairStatus.ENTREGADO, device="iPhone 12",
+                                    entered_at=NOW - timedelta(days=days_ago)))
+        db.commit()
+
+
+class Outbox:
+    """Fake bulk notification sender"""
+
+    def __init__(self, accept=True):
+        self.accept = accept
+        self.messages = []
+
+    def __call__(self, messages):
+        self.messages += messages
+        return [self.accept] * len(messages)
+
+
+@pytest.mark.work_orders
+class TestWarrantyReminders:
+    """Test the reminder run"""
+
+    def test_due_orders_are_reminded_once(self, engine):
+        """Test only orders in the reminder window get one message"""
+        deliver(engine, "due", days_ago=7)
+        deliver(engine, "early", days_ago=3)
+        deliver(engine, "expired", days_ago=9)
+        deliver(engine, "no-phone", days_ago=7, phone=None)
+        deliver(engine, "reopened", days_ago=7, status=RepairStatus.EN_REPARACION)
+        outbox = Outbox()
+
+        first = send_warranty_reminders(engine, now=NOW, send_bulk=outbox)
+        second = send_warranty_reminders(engine, now=NOW, send_bulk=outbox)
+
+        assert (first.sent, first.failed) == (1, 0)
+        assert (second.sent, second.failed) == (0, 0)
+        [(phone, message)] = outbox.messages
+        assert phone == "+584141234567"
+        assert "vence en 1 días" in message
+        with Session(engine) as db:
+            reminder = db.query(WarrantyReminder).one()
+            assert (reminder.work_order_id, reminder.delivered) == ("due", True)
+            assert reminder.sent_at is not None
+
+    def test_batches_cover_every_due_order(self, engine, monkeypatch):
+        """Test more due orders than one batch are all sent"""
+        monkeypatch.setattr("app.services.warranty.settings.WARRANTY_REMINDER_BATCH_SIZE", 2)
+        for index in range(5):
+            deliver(engine, f"due-{index}", days_ago=6.5)
+        outbox = Outbox()
+
+        result = send_warranty_reminders(engine, now=NOW, send_bulk=outbox)
+
+        assert result.sent == 5
+        assert len(outbox.messages) == 5
+
+    def test_failed_send_is_recorded_and_not_retried(self, engine):
+        """Test a rejected message is recorded as undelivered"""
+        deliver(engine, "due", days_ago=7)
+
+        result = send_warranty_reminders(engine, now=NOW, send_bulk=Outbox(accept=False))
+        retry = send_warranty_reminders(engine, now=NOW, send_bulk=Outbox())
+
+        assert (result.sent, result.failed) == (0, 1)
+        assert retry.sent == 0
+        with Session(engine) as db:
+            assert db.query(WarrantyReminder).one().delivered is False
+
+    def test_run_is_skipped_while_another_process_sends(self, engine):
+        """Test concurrent workers do not send twice"""
+        deliver(engine, "due", days_ago=7)
+        outbox = Outbox()
+
+        with process_lock(WARRANTY_LOCK, bind=engine):
+            assert send_warranty_reminders(engine, now=NOW, send_bulk=outbox) is None
+
+        assert outbox.messages == []
+
+
+class TestScheduling:
+    """Test the periodic job"""
+
+    def test_periodic_job_runs_until_stopped(self):
+        """Test the job ticks and stops, surviving a failing tick"""
+        ticks = []
+
+        def tick():
+            ticks.append(1)
+            if len(ticks) == 1:
+                raise RuntimeError("boom")
+
+        job = PeriodicJob("test", 0.01, tick).start()
+        deadline = datetime.now() + timedelta(seconds=2)
+        while len(ticks) < 3 and datetime.now() < deadline:
+            threading.Event().wait(0.01)
+        job.stop()
+
+        assert len(ticks) >= 3
@@ -1,8 +1,13 @@
 """
 Tests for work order endpoints
 """
+from datetime import datetime, timedelta
 import pytest
+from sqlalchemy import event
 from app.models.work_order import WorkOrder, RepairStatus
+from app.models.work_order_event import WorkOrderStatusEvent
+from app.services import notification_service
+from tests.conftest import engine
 
 
 @pytest.mark.work_orders
@@ -119,3 +124,149 @@ class TestWorkOrders:
         data = response.json()
         assert len(data) == 1
         assert data[0]["customer_name"] == "John Doe"
+
+
+
+def add_orders(db, repair_status, count, prefix):
+    """Insert ``count`` orders in a status, received one hour apart"""
+    for index in range(count):
+        db.add(WorkOrder(
+            id=f"{prefix}-{index}", code=f"{prefix}{index}", customer_name="Cliente", device="iPhone",
+            issue="Pantalla", status=repair_status, received_date=datetime(2024, 1, 1) + timedelta(hours=index)
+        ))
+    db.commit()
+
+
+@pytest.mark.work_orders
+class TestWorkOrderBoard:
+    """Test the per-status board"""
+    
+    def test_board_counts_and_first_pages(self, client, test_db, auth_headers_tech):
+        """Test every status is counted and active columns hold the newest orders"""
+        add_orders(test_db, RepairStatus.RECIBIDO, 3, "R")
+        add_orders(test_db, RepairStatus.EN_REPARACION, 1, "E")
+        add_orders(test_db, RepairStatus.ENTREGADO, 5, "D")
+        
+        response = client.get("/api/work-orders/board?limit=2", headers=auth_headers_tech)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["counts"]["Recibido"] == 3
+        assert data["counts"]["Entregado"] == 5
+        assert data["counts"]["Reparado"] == 0
+        columns = {column["status"]: column for column in data["columns"]}
+        assert "Entregado" not in columns
+        assert [order["id"] for order in columns["Recibido"]["orders"]] == ["R-2", "R-1"]
+        assert columns["Recibido"]["next_cursor"] is not None
+        assert [order["id"] for order in columns["En Reparación"]["orders"]] == ["E-0"]
+        assert columns["En Reparación"]["next_cursor"] is None
+        assert columns["Reparado"]["orders"] == []
+    
+    def test_column_cursor_loads_the_rest(self, client, test_db, auth_headers_tech):
+        """Test following a column's cursor walks every order exactly once"""
+        add_orders(test_db, RepairStatus.ENTREGADO, 5, "D")
+        
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = client.get(
+                "/api/work-orders/board/Entregado", params=params, headers=auth_headers_tech
+            ).json()
+            seen += [order["id"] for order in page["orders"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        
+        assert seen == ["D-4", "D-3", "D-2", "D-1", "D-0"]
+    
+    def test_invalid_cursor(self, client, auth_headers_tech):
+        """Test a malformed cursor is rejected"""
+        response = client.get(
+            "/api/work-orders/board/Recibido", params={"cursor": "nope"}, headers=auth_headers_tech
+        )
+        assert response.status_code == 400
+
+
+
+@pytest.mark.work_orders
+class TestBulkStatus:
+    """Test moving many work orders to one status at once"""
+    
+    def test_bulk_status_reports_each_order(self, client, test_db, auth_headers_tech):
+        """Test orders change with one UPDATE, by id or code, and missing ones are reported"""
+        add_orders(test_db, RepairStatus.EN_REPARACION, 3, "E")
+        add_orders(test_db, RepairStatus.REPARADO, 1, "R")
+        statements = []
+        
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            response = client.post("/api/work-orders/bulk-status", json={
+                "status": "Reparado", "ids": ["E-0", "E-1", "R-0", "missing"], "codes": ["E2", "NOPE"]
+            }, headers=auth_headers_tech)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["updated"] == 3
+        assert data["not_found"] == ["missing", "NOPE"]
+        assert [(result["key"], result["result"]) for result in data["results"]] == [
+            ("E-0", "updated"), ("E-1", "updated"), ("R-0", "unchanged"), ("missing", "not_found"),
+            ("E2", "updated"), ("NOPE", "not_found")
+        ]
+        assert data["results"][0]["previous_status"] == "En Reparación"
+        assert len([statement for statement in statements if statement.startswith("UPDATE work_orders")]) == 1
+        
+        test_db.expire_all()
+        assert {order.status for order in test_db.query(WorkOrder)} == {RepairStatus.REPARADO}
+        events = test_db.query(WorkOrderStatusEvent).all()
+        assert sorted(event.work_order_id for event in events) == ["E-0", "E-1", "E-2"]
+    
+    def test_codes_are_case_insensitive(self, client, test_db, auth_headers_tech):
+        """Test codes match in any case, as in GET /code/{code}, and are reported upper case"""
+        add_orders(test_db, RepairStatus.EN_REPARACION, 2, "E")
+        
+        response = client.post("/api/work-orders/bulk-status", json={
+            "status": "Reparado", "codes": ["e0", "E0", "e1", "nope"]
+        }, headers=auth_headers_tech)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["updated"] == 2
+        assert data["not_found"] == ["NOPE"]
+        assert [(result["key"], result["result"]) for result in data["results"]] == [
+            ("E0", "updated"), ("E1", "updated"), ("NOPE", "not_found")
+        ]
+    
+    def test_notifications_are_sent_as_one_batch(self, client, test_db, auth_headers_tech, monkeypatch):
+        """Test delivered orders with a phone are notified in a single batch"""
+        batches = []
+        monkeypatch.setattr(notification_service, "send_bulk",
+                            lambda messages, prefer_whatsapp=True: batches.append(messages))
+        add_orders(test_db, RepairStatus.REPARADO, 3, "R")
+        for order in test_db.query(WorkOrder).filter(WorkOrder.id != "R-2"):
+            order.customer_phone = f"0414-000000{order.id[-1]}"
+        test_db.commit()
+        
+        response = client.post("/api/work-orders/bulk-status", json={
+            "status": "Entregado", "codes": ["R0", "R1", "R2"]
+        }, headers=auth_headers_tech)
+        
+        assert response.json()["notifications_queued"] == 2
+        assert len(batches) == 1
+        assert sorted(phone for phone, _ in batches[0]) == ["0414-0000000", "0414-0000001"]
+    
+    def test_bulk_status_validation(self, client, auth_headers_tech):
+        """Test an empty selection or an unknown status is rejected"""
+        response = client.post(
+            "/api/work-orders/bulk-status", json={"status": "Reparado"}, headers=auth_headers_tech
+        )
+        assert response.status_code == 400
+        
+        response = client.post(
+            "/api/work-orders/bulk-status", json={"status": "Perdido", "ids": ["x"]}, headers=auth_headers_tech
+        )
+        assert response.status_code == 422